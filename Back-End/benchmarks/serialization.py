@@ -0,0 +1,107 @@
+"""
+Micro-benchmark de l'encodage JSON des documents MongoDB.
+
+Compare l'ancienne méthode des routes (parcours sanitize récursif qui réécrit
+le document, puis json.dumps de Flask) avec utils.serialization, avec et sans
+orjson. Les documents sont construits hors de la mesure.
+
+    python -m benchmarks.serialization [nombre_de_documents] [répétitions]
+"""
+import json
+import sys
+import timeit
+from datetime import datetime, timedelta
+from bson import ObjectId
+from utils import serialization
+
+
+def make_documents(count):
+    """
+    Documents de la forme renvoyée par admin_center/get_users ($lookup du rôle)
+    """
+    now = datetime(2024, 1, 1)
+    role_id = ObjectId()
+    return [
+        {
+            "_id": ObjectId(),
+            "nom": "Dupont",
+            "prenom": "Élodie",
+            "mail": f"user{i}@example.org",
+            "username": f"user{i}",
+            "created_at": now + timedelta(minutes=i),
+            "role_id": role_id,
+            "role_info": {"nom_role": "utilisateur", "permissions": ["resource:create", "comment:create"],
+                          "created_at": now},
+            "favoris": [ObjectId() for _ in range(3)],
+        }
+        for i in range(count)
+    ]
+
+
+def sanitize(doc):
+    # Copie du parcours des routes avant le fournisseur JSON
+    if isinstance(doc, dict):
+        for key, value in list(doc.items()):
+            if isinstance(value, ObjectId):
+                doc[key] = str(value)
+            elif isinstance(value, datetime):
+                doc[key] = value.isoformat()
+            elif isinstance(value, dict):
+                sanitize(value)
+            elif isinstance(value, list):
+                for index, item in enumerate(value):
+                    if isinstance(item, ObjectId):
+                        value[index] = str(item)
+                    elif isinstance(item, (dict, list)):
+                        sanitize(item)
+    elif isinstance(doc, list):
+        for item in doc:
+            sanitize(item)
+    return doc
+
+
+def legacy(documents):
+    documents = [sanitize(doc) for doc in documents]
+    return json.dumps(documents, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def provider_stdlib(documents):
+    orjson = serialization.orjson
+    serialization.orjson = None
+    try:
+        return serialization.dumps_bytes(documents, sort_keys=True)
+    finally:
+        serialization.orjson = orjson
+
+
+def provider(documents):
+    return serialization.dumps_bytes(documents, sort_keys=True)
+
+
+def measure(func, count, repeat):
+    """
+    Meilleur temps de func ; les documents sont reconstruits hors mesure avant
+    chaque essai (sanitize les modifie)
+    """
+    state = {}
+
+    def setup():
+        state['documents'] = make_documents(count)
+
+    return min(timeit.repeat(lambda: func(state['documents']), setup=setup, number=1, repeat=repeat))
+
+
+def main(count=2000, repeat=20):
+    results = [("sanitize + json (avant)", legacy), ("fournisseur, json standard", provider_stdlib)]
+    if serialization.HAS_ORJSON:
+        results.append(("fournisseur, orjson", provider))
+    print(f"{count} documents, meilleur temps sur {repeat} essais")
+    reference = None
+    for label, func in results:
+        elapsed = measure(func, count, repeat)
+        reference = reference or elapsed
+        print(f"  {label:<28} {elapsed * 1000:8.2f} ms  x{reference / elapsed:.1f}")
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
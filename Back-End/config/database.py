@@ -1,7 +1,12 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 from datetime import datetime
+import atexit
 import os
+import threading
 from dotenv import load_dotenv
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Charger les variables d'environnement
 load_dotenv()
@@ -10,30 +15,183 @@ load_dotenv()
 MONGO_URI = os.getenv('MONGO_URI')
 DB_NAME = os.getenv('DB_NAME', 'ressource_relationnelle')
 
-print(f"Connecting to MongoDB with URI: {MONGO_URI}")
-print(f"Using database name: {DB_NAME}")
+# Réglages du pool de connexions (un pool partagé par worker gunicorn)
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '50'))
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '300000'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', '20000'))
+# zlib est toujours disponible ; snappy/zstd nécessitent python-snappy/zstandard
+MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', 'zlib')
+
+logger.debug("Using database name: %s", DB_NAME)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Compteurs du pool de connexions, alimentés par les événements PyMongo
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.pools_created = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.checkout_failures = 0
+            self.pool_cleared = 0
+
+    def _incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def pool_created(self, event):
+        self._incr('pools_created')
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr('pool_cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr('connections_created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr('connections_closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr('checkout_failures')
+
+    def connection_checked_out(self, event):
+        self._incr('checkouts')
+
+    def connection_checked_in(self, event):
+        self._incr('checkins')
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pools_created": self.pools_created,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "connections_open": self.connections_created - self.connections_closed,
+                "connections_in_use": self.checkouts - self.checkins,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checkout_failures": self.checkout_failures,
+                "pool_cleared": self.pool_cleared,
+            }
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+_pool_stats = PoolStatsListener()
+
+
+def _create_client():
+    return MongoClient(
+        MONGO_URI,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        compressors=MONGO_COMPRESSORS,
+        retryWrites=True,
+        retryReads=True,
+        # Pas de connexion avant le premier usage : le client peut être créé avant un fork
+        connect=False,
+        event_listeners=[_pool_stats],
+    )
+
+
+def get_client():
+    """
+    Retourne le MongoClient du processus courant, créé à la première demande.
+    Un client hérité d'un fork (pid différent) n'est jamais réutilisé.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            # Les sockets d'un client hérité du parent ne doivent pas être partagées
+            if _client is not None:
+                _pool_stats.reset()
+            logger.debug("Creating MongoDB client for process %s...", pid)
+            _client = _create_client()
+            _client_pid = pid
+    return _client
+
+
+def close_client():
+    """
+    Ferme le client du processus courant (arrêt du worker, tests)
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+atexit.register(close_client)
+
+
+def get_pool_stats():
+    """
+    Statistiques du pool de connexions du processus courant
+    """
+    stats = _pool_stats.snapshot()
+    stats.update({
+        "pid": os.getpid(),
+        "client_initialized": _client is not None and _client_pid == os.getpid(),
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+        "compressors": MONGO_COMPRESSORS,
+        "collected_at": datetime.utcnow().isoformat(),
+    })
+    return stats
+
+
+def ping():
+    """
+    Vérifie que la base répond (healthcheck), sans créer de nouveau client
+    """
+    try:
+        get_client().admin.command('ping')
+        return True
+    except Exception as e:
+        logger.error("Erreur de connexion à MongoDB: %s", e)
+        return False
+
 
 def get_db():
     try:
-        print("Creating new MongoDB connection...")
-        client = MongoClient(MONGO_URI)
-        # Test de la connexion
-        print("Testing connection with ping...")
-        client.admin.command('ping')
-        print("Connection successful!")
-        
-        # Vérification de la base de données
-        dbs = client.list_database_names()
-        print(f"Available databases: {dbs}")
-        
-        if DB_NAME not in dbs:
-            print(f"Database {DB_NAME} does not exist, it will be created on first use")
-        else:
-            print(f"Database {DB_NAME} exists")
-        
-        db = client[DB_NAME]
-        print(f"Using database: {db.name}")
-        return db
+        return get_client()[DB_NAME]
     except Exception as e:
-        print(f"Erreur de connexion à MongoDB: {e}")
-        return None 
\ No newline at end of file
+        logger.error("Erreur de connexion à MongoDB: %s", e)
+        return None
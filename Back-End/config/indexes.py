@@ -0,0 +1,359 @@
+"""
+Manifeste des index MongoDB de l'application.
+
+Chaque index dont dépend une requête des blueprints est déclaré ici. Le manifeste
+est appliqué au démarrage (voir main.py) ou en ligne de commande :
+
+    python -m config.indexes apply     # crée les index manquants
+    python -m config.indexes check     # signale les écarts (code retour 1 si écart)
+    python -m config.indexes explain   # vérifie que les requêtes principales utilisent un index
+
+Les index unique portent des règles métier (un compte par mail, un favori par
+ressource...) que les routes ne vérifient plus avant l'écriture : le worker
+refuse de démarrer s'il en manque un (require_unique_indexes), même lorsque
+leur création automatique est désactivée (MONGO_ENSURE_INDEXES=0).
+"""
+import sys
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+# Index déclarés : collection, clés et options passées à IndexModel
+INDEXES = [
+    # Authentification : lookup de la session par l'empreinte du token à chaque requête authentifiée
+    {"collection": "token", "keys": [("access_token_hash", ASCENDING)], "options": {"name": "access_token_hash_1"}},
+    {"collection": "token", "keys": [("refresh_token_hash", ASCENDING)], "options": {"name": "refresh_token_hash_1"}},
+    # Détection de la réutilisation d'un refresh token déjà tourné
+    {
+        "collection": "token",
+        "keys": [("previous_refresh_hashes", ASCENDING)],
+        "options": {"name": "previous_refresh_hashes_1"},
+    },
+    # Sessions d'un utilisateur (liste, révocation, limite MAX_SESSIONS_PER_USER)
+    {
+        "collection": "token",
+        "keys": [("id_user", ASCENDING), ("created_at", DESCENDING)],
+        "options": {"name": "id_user_1_created_at_-1"},
+    },
+    # Suppression automatique des sessions expirées (index TTL)
+    {
+        "collection": "token",
+        "keys": [("expiration_refresh_token", ASCENDING)],
+        "options": {"name": "expiration_refresh_token_1", "expireAfterSeconds": 0},
+    },
+    # Unicité de l'adresse mail (remplace la vérification find_one de register)
+    {"collection": "users", "keys": [("mail", ASCENDING)], "options": {"name": "mail_1", "unique": True}},
+    # Une seule entrée d'historique / de favori par couple utilisateur-ressource
+    {
+        "collection": "historique",
+        "keys": [("user_id", ASCENDING), ("resource_id", ASCENDING)],
+        "options": {"name": "user_id_1_resource_id_1", "unique": True},
+    },
+    {
+        "collection": "favoris",
+        "keys": [("user_id", ASCENDING), ("resource_id", ASCENDING)],
+        "options": {"name": "user_id_1_resource_id_1", "unique": True},
+    },
+    # Favoris / consultations d'une ressource : compteurs de popularité (migration 0005)
+    # et nettoyage de delete_resource
+    {"collection": "historique", "keys": [("resource_id", ASCENDING)], "options": {"name": "resource_id_1"}},
+    {"collection": "favoris", "keys": [("resource_id", ASCENDING)], "options": {"name": "resource_id_1"}},
+    # Favoris d'un utilisateur, paginés par date d'ajout (get_favorites)
+    {
+        "collection": "favoris",
+        "keys": [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        "options": {"name": "user_id_1_created_at_-1__id_-1"},
+    },
+    # Commentaires d'une ressource, triés par date (fil paginé : _id départage les égalités)
+    {
+        "collection": "commentaire",
+        "keys": [("id_ressource", ASCENDING), ("date_publication", DESCENDING), ("_id", DESCENDING)],
+        "options": {"name": "id_ressource_1_date_publication_-1__id_-1"},
+    },
+    # Réponses d'un commentaire, triées par date
+    {
+        "collection": "sous_commentaire",
+        "keys": [("resource_id", ASCENDING), ("comment_id", ASCENDING), ("created_at", ASCENDING)],
+        "options": {"name": "resource_id_1_comment_id_1_created_at_1"},
+    },
+    # Ressources validées (tirage aléatoire)
+    {"collection": "ressource", "keys": [("date_validation", ASCENDING)], "options": {"name": "date_validation_1"}},
+    # Tirage aléatoire : parcours de la clé random_key (présente sur les seules ressources validées)
+    {"collection": "ressource", "keys": [("random_key", ASCENDING)], "options": {"name": "random_key_1", "sparse": True}},
+    # Liste paginée (list_resources) : (filtre, champ de tri, _id) pour chaque tri
+    *[
+        {
+            "collection": "ressource",
+            "keys": prefix + [(field, DESCENDING), ("_id", DESCENDING)],
+            "options": {"name": "_".join(f"{k}_{d}" for k, d in prefix + [(field, DESCENDING), ("_id", DESCENDING)])},
+        }
+        for field in ("createdAt", "favorites_count", "views_count")
+        for prefix in ([], [("approved", ASCENDING)], [("id_categorie", ASCENDING)])
+    ],
+    {
+        "collection": "ressource",
+        "keys": [("id_publieur", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)],
+        "options": {"name": "id_publieur_1_createdAt_-1__id_-1"},
+    },
+    # File de modération (list_pending_resources) : index partiel limité aux
+    # ressources non approuvées, parcouru des plus anciennes aux plus récentes
+    {
+        "collection": "ressource",
+        "keys": [("createdAt", ASCENDING), ("_id", ASCENDING)],
+        "options": {"name": "pending_createdAt_1__id_1", "partialFilterExpression": {"approved": False}},
+    },
+]
+
+# Formes des requêtes principales des routes, vérifiées avec explain()
+QUERY_SHAPES = [
+    {"name": "load_principal", "collection": "token", "filter": {"access_token_hash": "x"}},
+    {"name": "refresh_token", "collection": "token", "filter": {"refresh_token_hash": "x"}},
+    {"name": "refresh_token.reuse", "collection": "token", "filter": {"previous_refresh_hashes": "x"}},
+    {
+        "name": "list_sessions",
+        "collection": "token",
+        "filter": {"id_user": "x"},
+        "sort": [("created_at", DESCENDING)],
+    },
+    {"name": "auth_from_password", "collection": "users", "filter": {"mail": "x"}},
+    {"name": "random_ressources.historique", "collection": "historique", "filter": {"user_id": "x"}},
+    {
+        "name": "get_favorites",
+        "collection": "favoris",
+        "filter": {"user_id": "x"},
+        "sort": [("created_at", DESCENDING), ("_id", DESCENDING)],
+    },
+    {
+        "name": "get_comments",
+        "collection": "commentaire",
+        "filter": {"id_ressource": "x"},
+        "sort": [("date_publication", DESCENDING)],
+    },
+    {
+        "name": "get_comment_thread",
+        "collection": "commentaire",
+        "filter": {"id_ressource": "x"},
+        "sort": [("date_publication", DESCENDING), ("_id", DESCENDING)],
+    },
+    {"name": "get_comment_thread.replies", "collection": "sous_commentaire", "filter": {"resource_id": "x"}},
+    {
+        "name": "get_sous_comments",
+        "collection": "sous_commentaire",
+        "filter": {"resource_id": "x", "comment_id": "y"},
+        "sort": [("created_at", ASCENDING)],
+    },
+    {
+        "name": "random_ressources.historique_batch",
+        "collection": "historique",
+        "filter": {"user_id": "x", "resource_id": {"$in": ["y"]}},
+    },
+    {
+        "name": "random_ressources",
+        "collection": "ressource",
+        "filter": {"random_key": {"$gte": 0.5}},
+        "sort": [("random_key", ASCENDING)],
+    },
+    {"name": "get_categories_resources", "collection": "ressource", "filter": {"id_categorie": "x"}},
+    {
+        "name": "list_resources.recent",
+        "collection": "ressource",
+        "filter": {"approved": True},
+        "sort": [("createdAt", DESCENDING), ("_id", DESCENDING)],
+    },
+    {
+        "name": "list_resources.favorites",
+        "collection": "ressource",
+        "filter": {"id_categorie": "x"},
+        "sort": [("favorites_count", DESCENDING), ("_id", DESCENDING)],
+    },
+    {
+        "name": "list_pending_resources",
+        "collection": "ressource",
+        "filter": {"approved": False},
+        "sort": [("createdAt", ASCENDING), ("_id", ASCENDING)],
+    },
+    {
+        "name": "claim_pending_resources",
+        "collection": "ressource",
+        "filter": {"approved": False, "$or": [{"claim_expires": None}, {"claim_expires": {"$lt": 0}}]},
+        "sort": [("createdAt", ASCENDING), ("_id", ASCENDING)],
+    },
+    {
+        "name": "list_resources.author",
+        "collection": "ressource",
+        "filter": {"id_publieur": "x"},
+        "sort": [("createdAt", DESCENDING), ("_id", DESCENDING)],
+    },
+]
+
+# Options comparées pour détecter un index modifié
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _spec_name(spec):
+    return spec["options"].get("name") or "_".join(f"{k}_{d}" for k, d in spec["keys"])
+
+
+def _same_definition(spec, info):
+    """
+    Compare la déclaration du manifeste avec l'index existant (index_information)
+    """
+    if [tuple(k) for k in info.get("key", [])] != [tuple(k) for k in spec["keys"]]:
+        return False
+    for option in _COMPARED_OPTIONS:
+        if spec["options"].get(option) != info.get(option):
+            # unique absent côté serveur équivaut à False
+            if option in ("unique", "sparse") and not spec["options"].get(option) and not info.get(option):
+                continue
+            return False
+    return True
+
+
+def _specs_by_collection():
+    grouped = {}
+    for spec in INDEXES:
+        grouped.setdefault(spec["collection"], []).append(spec)
+    return grouped
+
+
+def check_drift(db):
+    """
+    Compare le manifeste aux index présents en base.
+    Retourne les index manquants, ceux dont la définition diffère et ceux non déclarés.
+    """
+    report = {"missing": [], "conflicting": [], "unmanaged": []}
+    for collection, specs in _specs_by_collection().items():
+        existing = db[collection].index_information()
+        declared = set()
+        for spec in specs:
+            name = _spec_name(spec)
+            declared.add(name)
+            if name not in existing:
+                report["missing"].append(f"{collection}.{name}")
+            elif not _same_definition(spec, existing[name]):
+                report["conflicting"].append(f"{collection}.{name}")
+        for name in existing:
+            if name != "_id_" and name not in declared:
+                report["unmanaged"].append(f"{collection}.{name}")
+    return report
+
+
+class MissingUniqueIndex(RuntimeError):
+    """
+    Un index unique du manifeste est absent ou différent en base
+    """
+
+
+def require_unique_indexes(db):
+    """
+    Lève MissingUniqueIndex si un index unique du manifeste est absent ou
+    différent en base (les doublons ne seraient plus refusés)
+    """
+    report = check_drift(db)
+    unique = {f"{spec['collection']}.{_spec_name(spec)}" for spec in INDEXES if spec["options"].get("unique")}
+    missing = sorted(unique.intersection(report["missing"] + report["conflicting"]))
+    if missing:
+        raise MissingUniqueIndex(f"index unique absent ou différent: {', '.join(missing)}")
+
+
+def ensure_indexes(db):
+    """
+    Crée les index manquants du manifeste. Les index existants ne sont jamais
+    supprimés ni modifiés : un conflit est signalé dans le rapport.
+    """
+    report = {"created": [], "existing": [], "errors": []}
+    for collection, specs in _specs_by_collection().items():
+        existing = db[collection].index_information()
+        for spec in specs:
+            name = _spec_name(spec)
+            if name in existing:
+                if _same_definition(spec, existing[name]):
+                    report["existing"].append(f"{collection}.{name}")
+                else:
+                    report["errors"].append(f"{collection}.{name}: définition différente en base")
+                continue
+            try:
+                db[collection].create_indexes([IndexModel(spec["keys"], **spec["options"])])
+                report["created"].append(f"{collection}.{name}")
+            except OperationFailure as e:
+                # Par exemple des doublons empêchant la création d'un index unique
+                report["errors"].append(f"{collection}.{name}: {e}")
+    return report
+
+
+def _plan_stages(plan):
+    """
+    Liste récursivement les étapes d'un plan d'exécution (classique ou SBE)
+    """
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for key in ("inputStage", "queryPlan", "outerStage", "innerStage"):
+            if key in plan:
+                stages.extend(_plan_stages(plan[key]))
+        for child in plan.get("inputStages", []):
+            stages.extend(_plan_stages(child))
+    return stages
+
+
+def explain_queries(db):
+    """
+    Exécute explain() sur chaque forme de requête déclarée et signale les
+    parcours complets de collection (COLLSCAN)
+    """
+    results = []
+    for shape in QUERY_SHAPES:
+        cursor = db[shape["collection"]].find(shape["filter"])
+        if shape.get("sort"):
+            cursor = cursor.sort(shape["sort"])
+        plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        stages = _plan_stages(plan)
+        results.append({
+            "name": shape["name"],
+            "collection": shape["collection"],
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+        })
+    return results
+
+
+def main(argv=None):
+    from config.database import get_db
+
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "apply"
+    db = get_db()
+    if db is None:
+        print("❌ Erreur: Base de données non connectée")
+        return 2
+
+    if command == "apply":
+        report = ensure_indexes(db)
+        for name in report["created"]:
+            print(f"✅ Index créé: {name}")
+        for error in report["errors"]:
+            print(f"❌ {error}")
+        print(f"{len(report['existing'])} index déjà présents")
+        return 1 if report["errors"] else 0
+
+    if command == "check":
+        report = check_drift(db)
+        for kind, names in report.items():
+            for name in names:
+                print(f"{kind}: {name}")
+        return 1 if report["missing"] or report["conflicting"] else 0
+
+    if command == "explain":
+        failed = False
+        for result in explain_queries(db):
+            status = "❌ COLLSCAN" if result["collscan"] else "✅"
+            print(f"{status} {result['name']} ({result['collection']}): {' > '.join(result['stages'])}")
+            failed = failed or result["collscan"]
+        return 1 if failed else 0
+
+    print(f"Commande inconnue: {command} (apply, check, explain)")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,474 @@
+"""
+Migrations de données MongoDB (normalisation des types de champs).
+
+Chaque migration porte un identifiant versionné ("0001_...") et s'applique à une
+collection : les documents qui correspondent à son filtre sont réécrits par lots
+de MIGRATIONS_BATCH_SIZE, dans l'ordre des _id. L'état est enregistré dans la
+collection migrations ({_id, last_id, migrated, done_at}) :
+
+- reprise : après une interruption, la migration repart après le dernier lot écrit ;
+- idempotence : le filtre ne sélectionne que les documents encore à convertir ;
+- un seul worker exécute une migration à la fois (verrou à durée limitée).
+
+Un worker qui trouve une migration verrouillée ailleurs la retente en arrière-plan
+(start_retrier, toutes les MIGRATIONS_RETRY_INTERVAL secondes) : le verrou d'un
+worker mort expire après MIGRATIONS_LOCK_TTL et la migration est reprise sans
+attendre le prochain déploiement. Tant qu'une migration n'est pas terminée
+(is_applied), les routes qui lisent ses champs acceptent l'ancien format.
+
+Les migrations sont appliquées au démarrage (voir main.py) ou en ligne de commande :
+
+    python -m config.migrations apply    # applique les migrations en attente
+    python -m config.migrations status   # état de chaque migration
+"""
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Documents réécrits par aller-retour
+MIGRATIONS_BATCH_SIZE = int(os.getenv('MIGRATIONS_BATCH_SIZE', '500'))
+# Durée (secondes) du verrou d'une migration, renouvelé à chaque lot
+MIGRATIONS_LOCK_TTL = int(os.getenv('MIGRATIONS_LOCK_TTL', '300'))
+# Attente maximale (secondes) des migrations préalables aux index exécutées par un autre worker
+MIGRATIONS_WAIT_TIMEOUT = float(os.getenv('MIGRATIONS_WAIT_TIMEOUT', str(2 * MIGRATIONS_LOCK_TTL)))
+# Intervalle (secondes) entre deux tentatives des migrations verrouillées ailleurs ; 0 désactive le thread
+MIGRATIONS_RETRY_INTERVAL = float(os.getenv('MIGRATIONS_RETRY_INTERVAL', '30'))
+
+# Migrations terminées vues par ce processus (une migration terminée le reste)
+_applied = set()
+_retrier_lock = threading.Lock()
+_retrier = None
+_retrier_pid = None
+
+
+class Migration:
+    """
+    Conversion des documents de collection qui correspondent à filter ;
+    convert(document) retourne les champs à réécrire ($set). Une migration
+    qui écrit ailleurs que dans sa collection fournit write(db, documents),
+    appelé pour chaque lot, qui retourne le nombre de documents migrés. Une
+    migration exécutée en une passe côté serveur (agrégation) fournit run(db),
+    sans lots ni point de reprise. before_indexes : appliquée avant la création
+    des index (apply_before_indexes), par exemple pour retirer des doublons
+    qui empêcheraient un index unique.
+    """
+
+    def __init__(self, id, description, collection, filter, fields, convert=None, write=None,
+                 run=None, before_indexes=False):
+        self.id = id
+        self.description = description
+        self.collection = collection
+        self.filter = filter
+        self.fields = fields
+        self.convert = convert
+        self.write = write
+        self.run = run
+        self.before_indexes = before_indexes
+
+
+def parse_extended_date(value):
+    """
+    Date enregistrée en JSON étendu ({"$date": ISO 8601 ou millisecondes}) en
+    datetime UTC naïf, comme datetime.utcnow() dans les routes
+    """
+    raw = value.get("$date") if isinstance(value, dict) else value
+    if isinstance(raw, dict) and "$numberLong" in raw:
+        raw = int(raw["$numberLong"])
+    if isinstance(raw, (int, float)):
+        return datetime.fromtimestamp(raw / 1000, tz=timezone.utc).replace(tzinfo=None)
+    if isinstance(raw, str):
+        parsed = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    raise ValueError(f"date non reconnue: {value!r}")
+
+
+def _convert_dates(fields):
+    def convert(document):
+        updates = {}
+        for field in fields:
+            value = document.get(field)
+            if isinstance(value, dict):
+                try:
+                    updates[field] = parse_extended_date(value)
+                except ValueError as e:
+                    logger.warning("Document %s, champ %s ignoré: %s", document["_id"], field, e)
+        return updates
+    return convert
+
+
+def _convert_object_ids(fields):
+    def convert(document):
+        return {
+            field: ObjectId(document[field])
+            for field in fields
+            if isinstance(document.get(field), str) and ObjectId.is_valid(document[field])
+        }
+    return convert
+
+
+def _fold_pending_resources(db, documents):
+    """
+    Replie un lot de ressources_en_attente dans ressource : la ressource garde
+    approved: false (file de modération), puis la copie est supprimée.
+    create_resource insérait toujours dans ressource d'abord : une copie sans
+    ressource correspondante est celle d'une ressource supprimée (delete_resource
+    ne nettoyait pas la copie) et n'est pas recréée.
+    """
+    ids = [document["_id"] for document in documents]
+    result = db.ressource.update_many(
+        {"_id": {"$in": ids}, "approved": {"$exists": False}},
+        {"$set": {"approved": False}},
+    )
+    db.ressources_en_attente.delete_many({"_id": {"$in": ids}})
+    return result.modified_count
+
+
+def unwrap_dates(documents, field):
+    """
+    Dates encore enregistrées en {"$date": ...} (migration non terminée)
+    converties en datetime dans les documents lus
+    """
+    for document in documents:
+        value = document.get(field)
+        if isinstance(value, dict):
+            try:
+                document[field] = parse_extended_date(value)
+            except ValueError:
+                document[field] = value.get("$date")
+    return documents
+
+
+def _distinct_users_per_resource(collection, ids):
+    """
+    Nombre d'utilisateurs distincts par ressource (un favori ou une consultation
+    par couple utilisateur-ressource, doublons antérieurs à l'index unique exclus)
+    """
+    pipeline = [
+        {"$match": {"resource_id": {"$in": ids}}},
+        {"$group": {"_id": {"resource_id": "$resource_id", "user_id": "$user_id"}}},
+        {"$group": {"_id": "$_id.resource_id", "count": {"$sum": 1}}},
+    ]
+    return {row["_id"]: row["count"] for row in collection.aggregate(pipeline)}
+
+
+def _count_popularity(db, documents):
+    """
+    Recalcule favorites_count et views_count d'un lot de ressources à partir de
+    favoris et historique : les ressources antérieures aux compteurs n'en avaient
+    pas (ou les avaient commencés à 0 au premier $inc), ce qui faussait les tris
+    favorites et views de list_resources
+    """
+    ids = [document["_id"] for document in documents]
+    favorites = _distinct_users_per_resource(db.favoris, ids)
+    views = _distinct_users_per_resource(db.historique, ids)
+    operations = [
+        UpdateOne({"_id": resource_id},
+                  {"$set": {"favorites_count": favorites.get(resource_id, 0), "views_count": views.get(resource_id, 0)}})
+        for resource_id in ids
+    ]
+    db.ressource.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+def _dedupe_pairs(collection_name):
+    """
+    Supprime les doublons (user_id, resource_id) d'une collection en gardant la
+    plus ancienne entrée : add_to_history et post_favorite vérifiaient l'absence
+    par find_one avant insert_one, deux requêtes simultanées pouvaient donc
+    insérer deux fois le même couple, ce qui empêche l'index unique
+    """
+    def run(db):
+        collection = db[collection_name]
+        pipeline = [
+            {"$sort": {"_id": ASCENDING}},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "resource_id": "$resource_id"},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1},
+            }},
+            {"$match": {"count": {"$gt": 1}}},
+        ]
+        removed = 0
+        duplicates = []
+        for group in collection.aggregate(pipeline, allowDiskUse=True):
+            duplicates.extend(group["ids"][1:])
+            if len(duplicates) >= MIGRATIONS_BATCH_SIZE:
+                removed += collection.delete_many({"_id": {"$in": duplicates}}).deleted_count
+                duplicates = []
+        if duplicates:
+            removed += collection.delete_many({"_id": {"$in": duplicates}}).deleted_count
+        return removed
+    return run
+
+
+def _date_migration(id, collection, fields):
+    return Migration(
+        id, f"{collection}: dates {{'$date': ...}} en dates BSON ({', '.join(fields)})",
+        collection, {"$or": [{field: {"$type": "object"}} for field in fields]}, fields, _convert_dates(fields),
+    )
+
+
+# Migrations dont dépendent les lectures de commentaire et sous_commentaire (is_applied)
+COMMENTAIRE_DATES = "0001_commentaire_dates"
+SOUS_COMMENTAIRE_DATES = "0002_sous_commentaire_dates"
+SOUS_COMMENTAIRE_OBJECT_IDS = "0003_sous_commentaire_object_ids"
+
+MIGRATIONS = [
+    _date_migration(COMMENTAIRE_DATES, "commentaire", ("date_publication", "createdAt")),
+    _date_migration(SOUS_COMMENTAIRE_DATES, "sous_commentaire", ("created_at",)),
+    Migration(
+        SOUS_COMMENTAIRE_OBJECT_IDS,
+        "sous_commentaire: resource_id et comment_id en ObjectId",
+        "sous_commentaire",
+        {"$or": [{"resource_id": {"$type": "string"}}, {"comment_id": {"$type": "string"}}]},
+        ("resource_id", "comment_id"),
+        _convert_object_ids(("resource_id", "comment_id")),
+    ),
+    Migration(
+        "0004_fold_ressources_en_attente",
+        "ressources_en_attente repliée dans ressource (file de modération : approved: false)",
+        "ressources_en_attente",
+        {},
+        ("_id",),
+        write=_fold_pending_resources,
+    ),
+    Migration(
+        "0005_resource_popularity_counters",
+        "ressource: favorites_count et views_count recalculés depuis favoris et historique",
+        "ressource",
+        {},
+        ("_id",),
+        write=_count_popularity,
+    ),
+    Migration(
+        "0006_dedupe_historique",
+        "historique: doublons (user_id, resource_id) supprimés avant l'index unique",
+        "historique", {}, ("user_id", "resource_id"),
+        run=_dedupe_pairs("historique"), before_indexes=True,
+    ),
+    Migration(
+        "0007_dedupe_favoris",
+        "favoris: doublons (user_id, resource_id) supprimés avant l'index unique",
+        "favoris", {}, ("user_id", "resource_id"),
+        run=_dedupe_pairs("favoris"), before_indexes=True,
+    ),
+]
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _acquire(db, migration_id, owner):
+    """
+    Prend le verrou de la migration ; False si un autre processus le détient
+    """
+    now = _now()
+    try:
+        db.migrations.find_one_and_update(
+            {
+                "_id": migration_id,
+                "done_at": None,
+                "$or": [{"locked_until": None}, {"locked_until": {"$lt": now}}, {"locked_by": owner}],
+            },
+            {"$set": {"locked_by": owner, "locked_until": now + timedelta(seconds=MIGRATIONS_LOCK_TTL)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Le document existe mais ne correspond pas : verrou détenu ailleurs ou migration terminée
+        return False
+    return True
+
+
+def _run(db, migration, owner, batch_size):
+    if migration.run is not None:
+        return migration.run(db)
+    state = db.migrations.find_one({"_id": migration.id}) or {}
+    last_id = state.get("last_id")
+    migrated = state.get("migrated", 0)
+    projection = {field: 1 for field in migration.fields}
+    collection = db[migration.collection]
+
+    while True:
+        query = migration.filter if last_id is None else {"$and": [migration.filter, {"_id": {"$gt": last_id}}]}
+        documents = list(collection.find(query, projection).sort("_id", ASCENDING).limit(batch_size))
+        if not documents:
+            return migrated
+
+        if migration.write is not None:
+            migrated += migration.write(db, documents)
+        else:
+            operations = []
+            for document in documents:
+                updates = migration.convert(document)
+                if updates:
+                    operations.append(UpdateOne({"_id": document["_id"]}, {"$set": updates}))
+            if operations:
+                collection.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+        last_id = documents[-1]["_id"]
+
+        # Point de reprise et renouvellement du verrou
+        db.migrations.update_one(
+            {"_id": migration.id, "locked_by": owner},
+            {"$set": {
+                "last_id": last_id,
+                "migrated": migrated,
+                "locked_until": _now() + timedelta(seconds=MIGRATIONS_LOCK_TTL),
+            }},
+        )
+
+
+def apply_migrations(db, migrations=None, batch_size=None):
+    """
+    Applique les migrations en attente, dans l'ordre. S'arrête à la première
+    migration verrouillée par un autre processus : les suivantes peuvent en dépendre.
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    batch_size = batch_size or MIGRATIONS_BATCH_SIZE
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    done = {state["_id"] for state in db.migrations.find({"done_at": {"$ne": None}}, {"_id": 1})}
+    report = {"applied": [], "done": [], "locked": []}
+
+    _applied.update(done)
+
+    for migration in migrations:
+        if migration.id in done:
+            report["done"].append(migration.id)
+            continue
+        if not _acquire(db, migration.id, owner):
+            report["locked"].append(migration.id)
+            break
+        migrated = _run(db, migration, owner, batch_size)
+        db.migrations.update_one(
+            {"_id": migration.id},
+            {"$set": {"done_at": _now(), "description": migration.description},
+             "$unset": {"locked_by": "", "locked_until": ""}},
+        )
+        _applied.add(migration.id)
+        logger.info("Migration %s appliquée: %s documents", migration.id, migrated)
+        report["applied"].append(migration.id)
+    return report
+
+
+def apply_before_indexes(db, timeout=None):
+    """
+    Applique les migrations préalables aux index (before_indexes). Si un autre
+    worker les exécute, attend qu'il ait terminé (ou que son verrou expire et
+    qu'elles soient reprises ici), au plus timeout secondes : les index uniques
+    ne peuvent pas être créés avant.
+    """
+    timeout = MIGRATIONS_WAIT_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    pending = [migration for migration in MIGRATIONS if migration.before_indexes]
+    while True:
+        report = apply_migrations(db, pending)
+        if not report["locked"] or time.monotonic() >= deadline:
+            return report
+        time.sleep(1)
+
+
+def is_applied(db, migration_id):
+    """
+    True si la migration est terminée (done_at enregistré) ; mémorisé par
+    processus, la collection migrations n'est relue que tant qu'elle ne l'est pas
+    """
+    if migration_id in _applied:
+        return True
+    if db.migrations.find_one({"_id": migration_id, "done_at": {"$ne": None}}, {"_id": 1}) is None:
+        return False
+    _applied.add(migration_id)
+    return True
+
+
+def _run_retrier(get_db, interval, stop):
+    # Retente jusqu'à ce qu'aucune migration ne soit plus verrouillée ailleurs
+    while not stop.wait(interval):
+        try:
+            db = get_db()
+            if db is None:
+                continue
+            report = apply_migrations(db)
+            if report["applied"]:
+                logger.info("Migrations appliquées: %s", report["applied"])
+            if not report["locked"]:
+                return
+        except Exception as e:
+            logger.exception("Erreur lors de l'application des migrations: %s", e)
+
+
+def start_retrier(get_db, interval=MIGRATIONS_RETRY_INTERVAL):
+    """
+    Démarre le thread qui retente les migrations verrouillées par un autre
+    processus (une fois par processus, refait après un fork)
+    """
+    global _retrier, _retrier_pid
+    if interval <= 0:
+        return None
+    with _retrier_lock:
+        if _retrier_pid == os.getpid():
+            return _retrier
+        stop = threading.Event()
+        thread = threading.Thread(target=_run_retrier, args=(get_db, interval, stop),
+                                  name='migrations-retrier', daemon=True)
+        thread.start()
+        _retrier, _retrier_pid = stop, os.getpid()
+        return stop
+
+
+def migration_status(db, migrations=None):
+    migrations = MIGRATIONS if migrations is None else migrations
+    states = {state["_id"]: state for state in db.migrations.find()}
+    return [
+        {
+            "id": migration.id,
+            "description": migration.description,
+            "done_at": states.get(migration.id, {}).get("done_at"),
+            "migrated": states.get(migration.id, {}).get("migrated", 0),
+        }
+        for migration in migrations
+    ]
+
+
+def main(argv=None):
+    from config.database import get_db
+
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "apply"
+    db = get_db()
+    if db is None:
+        print("❌ Erreur: Base de données non connectée")
+        return 2
+
+    if command == "apply":
+        report = apply_migrations(db)
+        for migration_id in report["applied"]:
+            print(f"✅ Migration appliquée: {migration_id}")
+        for migration_id in report["locked"]:
+            print(f"⏳ Migration en cours dans un autre processus: {migration_id}")
+        print(f"{len(report['done'])} migrations déjà appliquées")
+        return 1 if report["locked"] else 0
+
+    if command == "status":
+        for status in migration_status(db):
+            state = f"✅ {status['done_at']}" if status["done_at"] else "⏳ en attente"
+            print(f"{status['id']} ({status['migrated']} documents) {state} — {status['description']}")
+        return 0
+
+    print(f"Commande inconnue: {command} (apply, status)")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,35 @@
 # -*- coding: utf-8 -*-
 # Import Flask et CORS
+import os
 from flask import Flask
 from flask_cors import CORS
 
 # Import DB et routes
-from config.database import get_db
+from config.database import get_db, get_pool_stats, ping
+from config.indexes import ensure_indexes, require_unique_indexes, MissingUniqueIndex
+from config.migrations import apply_migrations, apply_before_indexes, start_retrier as start_migration_retrier
+from pymongo.errors import PyMongoError
+from utils.sampling import backfill_random_keys
+from utils.category_counts import start_reconciler
+from utils.passwords import get_password_stats
 from routes.auth import auth_bp
 from routes.resources import resources_bp
 from routes.users import users_bp
 from routes.categories import categories_bp
 from routes.admin_center import admin_bp
+from utils.logger import get_logger, get_logging_stats, init_app as init_logging, setup_logging
+from utils.response_cache import get_response_cache_stats
+from utils.serialization import init_app as init_json
+
+# ---- Logs (file d'attente + thread d'écriture, voir utils/logger.py) ----
+setup_logging()
+logger = get_logger(__name__)
 
 # Création de l'app Flask
 app = Flask(__name__)
+init_logging(app)
+# Encodage JSON des ObjectId/datetime (voir utils/serialization.py)
+init_json(app)
 
 
 FRONT_HTTP  = "https://guillaume-lechevallier.freeboxos.fr"
@@ -25,7 +42,7 @@ CORS(app, resources={r"/*": {
     "supports_credentials": True,
     "allow_headers": ["Content-Type", "Authorization", "X-Requested-With"],
     "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-    "expose_headers": ["Content-Length", "Content-Type"]
+    "expose_headers": ["Content-Length", "Content-Type", "X-Request-ID", "X-Next-Cursor"]
 }})
 
 # (Optionnel) si tu veux forcer des headers supplémentaires sur toutes les réponses :
@@ -35,9 +52,67 @@ CORS(app, resources={r"/*": {
 #     return resp
 
 # ---- Connexion DB ----
-print("Initializing database connection...")
+logger.debug("Initializing database connection...")
 db = get_db()
-print("Database connection initialized")
+logger.debug("Database connection initialized")
+
+# ---- Migrations préalables aux index (doublons qui empêcheraient un index unique) ----
+if db is not None and os.getenv('MONGO_APPLY_MIGRATIONS', '1') == '1':
+    try:
+        pre_index_report = apply_before_indexes(db)
+        if pre_index_report['applied']:
+            logger.info("Migrations appliquées: %s", pre_index_report['applied'])
+        if pre_index_report['locked']:
+            logger.warning("Migrations toujours en cours dans un autre worker: %s", pre_index_report['locked'])
+    except Exception as e:
+        logger.error("Erreur lors de l'application des migrations préalables aux index: %s", e)
+
+# ---- Index MongoDB (voir config/indexes.py) ----
+if db is not None and os.getenv('MONGO_ENSURE_INDEXES', '1') == '1':
+    try:
+        index_report = ensure_indexes(db)
+        logger.info("Index créés: %s", index_report['created'])
+        for index_error in index_report['errors']:
+            logger.warning("Index non appliqué: %s", index_error)
+    except Exception as e:
+        logger.error("Erreur lors de l'application des index: %s", e)
+
+# Unicité garantie par les seuls index (mail des comptes...) : le worker ne démarre pas sans eux
+if db is not None:
+    try:
+        require_unique_indexes(db)
+    except MissingUniqueIndex as e:
+        logger.critical("Démarrage refusé: %s", e)
+        raise
+    except PyMongoError as e:
+        # Base injoignable : les routes répondront 500, le worker démarre quand même
+        logger.error("Vérification des index uniques impossible: %s", e)
+
+# ---- Migrations de données (voir config/migrations.py) ----
+if db is not None and os.getenv('MONGO_APPLY_MIGRATIONS', '1') == '1':
+    try:
+        migration_report = apply_migrations(db)
+        if migration_report['applied']:
+            logger.info("Migrations appliquées: %s", migration_report['applied'])
+        if migration_report['locked']:
+            logger.info("Migrations en cours dans un autre worker: %s", migration_report['locked'])
+            start_migration_retrier(get_db)
+    except Exception as e:
+        logger.error("Erreur lors de l'application des migrations: %s", e)
+        start_migration_retrier(get_db)
+
+# ---- Clés du tirage aléatoire des ressources validées avant random_key ----
+if db is not None:
+    try:
+        backfilled = backfill_random_keys(db)
+        if backfilled:
+            logger.info("Clés aléatoires attribuées: %s ressources", backfilled)
+    except Exception as e:
+        logger.error("Erreur lors de l'attribution des clés aléatoires: %s", e)
+
+# ---- Réconciliation périodique des compteurs de catégories (voir utils/category_counts.py) ----
+if db is not None:
+    start_reconciler(get_db)
 
 # ---- Blueprints ----
 app.register_blueprint(auth_bp, url_prefix='/auth')
@@ -52,6 +127,29 @@ app.register_blueprint(admin_bp, url_prefix='/admin')
 @app.get("/health")
 def health():
     return {"status": "ok"}, 200
+
+# Statistiques du pool MongoDB du worker courant
+@app.get("/health/db")
+def health_db():
+    stats = get_pool_stats()
+    stats["ping"] = ping()
+    return stats, (200 if stats["ping"] else 503)
+
+# Latence du hachage des mots de passe et attente dans la file du pool
+@app.get("/health/passwords")
+def health_passwords():
+    return get_password_stats(), 200
+
+# File d'attente des logs du worker courant
+@app.get("/health/logging")
+def health_logging():
+    return get_logging_stats(), 200
+
+# Cache des réponses publiques du worker courant
+@app.get("/health/response_cache")
+def health_response_cache():
+    return get_response_cache_stats(), 200
+
 @app.after_request
 def add_cors_headers(resp):
     origin = resp.headers.get("Access-Control-Allow-Origin")
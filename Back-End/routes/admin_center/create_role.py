@@ -3,6 +3,11 @@ from bson import ObjectId
 from datetime import datetime
 from . import admin_bp
 from .utils import check_admin_permissions
+from utils.roles import bump_role_version
+from utils.logger import get_logger
+from utils import repository
+
+logger = get_logger(__name__)
 
 @admin_bp.route('/create_role', methods=['POST'])
 def create_role():
@@ -10,7 +15,7 @@ def create_role():
     Route pour créer un nouveau rôle
     Accessible uniquement aux administrateurs et super-administrateurs
     """
-    print("🔄 Début de la route create_role")
+    logger.debug("Début de la route create_role")
 
     # Vérification des permissions
     user_id, db, error_response, status_code = check_admin_permissions(request.cookies.get('access_token'))
@@ -21,13 +26,13 @@ def create_role():
         # Récupérer les données du rôle
         data = request.get_json()
         if not data or 'nom_role' not in data:
-            print("❌ Données de rôle manquantes")
+            logger.warning("Données de rôle manquantes")
             return jsonify({"error": "Le nom du rôle est requis"}), 400
 
         # Vérifier si le rôle existe déjà
-        existing_role = db.role.find_one({"nom_role": data['nom_role']})
+        existing_role = repository.roles(db).exists({"nom_role": data['nom_role']})
         if existing_role:
-            print(f"❌ Le rôle '{data['nom_role']}' existe déjà")
+            logger.warning("Le rôle '%s' existe déjà", data['nom_role'])
             return jsonify({"error": "Ce rôle existe déjà"}), 400
 
         # Créer le nouveau rôle
@@ -41,16 +46,12 @@ def create_role():
         }
 
         # Insérer le rôle
-        result = db.role.insert_one(new_role)
-        new_role['_id'] = str(new_role['_id'])
-        new_role['created_by'] = str(new_role['created_by'])
-        new_role['created_at'] = new_role['created_at'].isoformat()
+        repository.roles(db).insert(new_role)
+        bump_role_version(db)
 
-        print(f"✅ Rôle créé avec succès: {new_role['nom_role']}")
+        logger.info("Rôle créé avec succès: %s", new_role['nom_role'])
         return jsonify(new_role), 201
 
     except Exception as e:
-        print(f"❌ Erreur lors de la création du rôle: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la création du rôle: %s", e)
         return jsonify({"error": f"Erreur lors de la création du rôle: {str(e)}"}), 500 
\ No newline at end of file
@@ -3,6 +3,15 @@ from bson import ObjectId
 from datetime import datetime
 from . import admin_bp
 from .utils import check_admin_permissions
+from utils.auth import evict_user, load_principal
+from utils.sessions import revoke_sessions
+from utils.conditional import bump_version, USERS
+from utils.profiles import evict_profile
+from utils import repository
+from utils.roles import get_role_registry, PERM_SUPER_ADMIN
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 @admin_bp.route('/delete_user/<user_id>', methods=['DELETE'])
 def delete_user(user_id):
@@ -10,7 +19,7 @@ def delete_user(user_id):
     Route pour supprimer un utilisateur
     Accessible uniquement aux administrateurs et super-administrateurs
     """
-    print(f"🔄 Début de la route delete_user pour l'ID: {user_id}")
+    logger.debug("Début de la route delete_user pour l'ID: %s", user_id)
 
     # Vérification des permissions
     admin_id, db, error_response, status_code = check_admin_permissions(request.cookies.get('access_token'))
@@ -19,54 +28,55 @@ def delete_user(user_id):
 
     try:
         # Vérifier si l'utilisateur existe
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = repository.users(db).get(user_id, projection={"mail": 1, "role_id": 1})
         if not user:
-            print(f"❌ Utilisateur non trouvé pour l'ID: {user_id}")
+            logger.warning("Utilisateur non trouvé pour l'ID: %s", user_id)
             return jsonify({"error": "Utilisateur non trouvé"}), 404
 
         # Vérifier si on essaie de supprimer un super-admin
         if user.get('role_id'):
-            role = db.role.find_one({"_id": user['role_id']})
-            if role and role.get('nom_role') == 'super-administrateur':
+            if PERM_SUPER_ADMIN in get_role_registry().permissions(user['role_id']):
                 # Seul un super-admin peut supprimer un autre super-admin
-                admin_role = db.role.find_one({"_id": db.users.find_one({"_id": ObjectId(admin_id)})['role_id']})
-                if admin_role.get('nom_role') != 'super-administrateur':
-                    print("❌ Tentative de suppression d'un super-administrateur par un non super-admin")
+                admin = load_principal(request.cookies.get('access_token'), db)
+                if PERM_SUPER_ADMIN not in admin.permissions:
+                    logger.warning("Tentative de suppression d'un super-administrateur par un non super-admin")
                     return jsonify({"error": "Vous n'avez pas les permissions pour supprimer un super-administrateur"}), 403
 
-        # Vérifier si l'utilisateur a des ressources associées
-        resources_count = db.resources.count_documents({"created_by": ObjectId(user_id)})
+        # Vérifier si l'utilisateur a des ressources associées (publiées par lui)
+        resources_count = repository.resources(db).count({"id_publieur": ObjectId(user_id)})
         if resources_count > 0:
-            print(f"❌ L'utilisateur a {resources_count} ressources associées")
+            logger.warning("L'utilisateur a %s ressources associées", resources_count)
             return jsonify({
                 "error": "Impossible de supprimer cet utilisateur car il a des ressources associées",
                 "resources_count": resources_count
             }), 400
 
         # Vérifier si l'utilisateur a des commentaires associés
-        comments_count = db.comments.count_documents({"created_by": ObjectId(user_id)})
+        comments_count = repository.comments(db).count({"id_user": ObjectId(user_id)})
         if comments_count > 0:
-            print(f"❌ L'utilisateur a {comments_count} commentaires associés")
+            logger.warning("L'utilisateur a %s commentaires associés", comments_count)
             return jsonify({
                 "error": "Impossible de supprimer cet utilisateur car il a des commentaires associés",
                 "comments_count": comments_count
             }), 400
 
         # Supprimer l'utilisateur
-        result = db.users.delete_one({"_id": ObjectId(user_id)})
+        deleted = repository.users(db).delete(user_id)
+        revoke_sessions(db, ObjectId(user_id))
+        evict_user(user_id)
+        evict_profile(user_id)
         
-        if result.deleted_count == 0:
-            print("❌ Erreur lors de la suppression de l'utilisateur")
+        if not deleted:
+            logger.error("Erreur lors de la suppression de l'utilisateur")
             return jsonify({"error": "Erreur lors de la suppression de l'utilisateur"}), 500
 
-        print(f"✅ Utilisateur supprimé avec succès: {user.get('mail')}")
+        bump_version(db, USERS)
+        logger.info("Utilisateur supprimé avec succès: %s", user.get('mail'))
         return jsonify({
             "message": "Utilisateur supprimé avec succès",
             "mail": user.get('mail')
         }), 200
 
     except Exception as e:
-        print(f"❌ Erreur lors de la suppression de l'utilisateur: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la suppression de l'utilisateur: %s", e)
         return jsonify({"error": f"Erreur lors de la suppression de l'utilisateur: {str(e)}"}), 500 
\ No newline at end of file
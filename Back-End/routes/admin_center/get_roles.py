@@ -1,67 +1,36 @@
-from flask import request, jsonify
-from bson import ObjectId
+from flask import jsonify
 from config.database import get_db
 from . import admin_bp
-from utils.auth import get_user_id_from_token
+from utils.roles import requires, PERM_ADMIN
 from flask_cors import cross_origin
+from utils.logger import get_logger
+from utils import repository
+
+logger = get_logger(__name__)
 
 @admin_bp.route('/all_roles', methods=['GET'])
 @cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
-def get_roles():
+@requires(PERM_ADMIN)
+def get_roles(principal):
     """
     Route pour récupérer tous les rôles disponibles dans la base de données
     Accessible uniquement aux utilisateurs ayant le rôle 'administrateur' ou 'super-administrateur'
     """
-    print("🔄 Début de la route get_roles")
-
-    token_cookie = request.cookies.get('access_token')
-    if not token_cookie:
-        print("❌ Token manquant ou mal formé")
-        return jsonify({"error": "Token manquant ou invalide"}), 401
-
-    user_id = get_user_id_from_token(token_cookie)
-    if not user_id:
-        return jsonify({"error": "Token invalide"}), 401
+    logger.debug("Début de la route get_roles")
 
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     try:
-        user = db.users.find_one({"_id": ObjectId(user_id)})
-        if not user:
-            print("❌ Utilisateur non trouvé")
-            return jsonify({"error": "Utilisateur non trouvé"}), 404
-
-        role = db.role.find_one({"_id": user.get("role_id")})
-        if not role:
-            print("❌ Rôle non trouvé pour l'utilisateur")
-            return jsonify({"error": "Rôle non trouvé"}), 404
-
-        user_role = role.get("nom_role")
-        if user_role not in ["administrateur", "super-administrateur"]:
-            print(f"❌ Accès refusé : l'utilisateur a le rôle '{user_role}'")
-            return jsonify({"error": "Accès non autorisé"}), 403
-
         # Récupérer tous les rôles sans filtrage
-        roles = list(db.role.find())
-        print(f"🔍 Récupération de tous les rôles : {len(roles)} rôles trouvés")
-
-        def sanitize(doc):
-            doc_copy = doc.copy()  # Créer une copie pour éviter de modifier l'original
-            for key, value in doc.items():
-                if isinstance(value, ObjectId):
-                    doc_copy[key] = str(value)
-            return doc_copy
-
-        sanitized_roles = [sanitize(role) for role in roles]
+        roles = list(repository.roles(db).find())
+        logger.debug("Récupération de tous les rôles : %s rôles trouvés", len(roles))
 
-        print(f"✅ {len(sanitized_roles)} rôles récupérés avec succès")
-        return jsonify(sanitized_roles), 200
+        logger.debug("%s rôles récupérés avec succès", len(roles))
+        return jsonify(roles), 200
 
     except Exception as e:
-        print(f"❌ Erreur lors de la récupération des rôles: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la récupération des rôles: %s", e)
         return jsonify({"error": f"Erreur lors de la récupération des rôles: {str(e)}"}), 500
\ No newline at end of file
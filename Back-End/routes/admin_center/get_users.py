@@ -1,79 +1,63 @@
 from flask import request, jsonify
-from bson import ObjectId
-from datetime import datetime
 from . import admin_bp
 from .utils import check_admin_permissions
+from utils.logger import get_logger
+from utils import repository
+from utils.streaming import stream_json_array
+from utils.projections import parse_fields, ADMIN
+
+logger = get_logger(__name__)
 
 @admin_bp.route('/get_users', methods=['GET'])
 def get_users():
     """
     Route pour lister tous les utilisateurs avec leurs rôles
     Accessible uniquement aux administrateurs et super-administrateurs
+    (fields : admin par défaut, card pour les noms seulement)
     """
-    print("🔄 Début de la route get_users")
-    print(f"Cookies reçus: {request.cookies}")
+    logger.debug("Début de la route get_users")
 
     # Vérification des permissions
     user_id, db, error_response, status_code = check_admin_permissions(request.cookies.get('access_token'))
-    print(f"Résultat de check_admin_permissions: user_id={user_id}, error_response={error_response}, status_code={status_code}")
+    logger.debug("Résultat de check_admin_permissions: user_id=%s, error_response=%s, status_code=%s", user_id, error_response, status_code)
     if error_response:
         return error_response, status_code
 
     try:
-        # Récupérer tous les utilisateurs avec leurs rôles
-        pipeline = [
-            {
-                "$lookup": {
-                    "from": "role",
-                    "localField": "role_id",
-                    "foreignField": "_id",
-                    "as": "role_info"
-                }
-            },
-            {
-                "$unwind": {
-                    "path": "$role_info",
-                    "preserveNullAndEmptyArrays": True
-                }
-            },
-            {
-                "$project": {
-                    "password": 0,  # Exclure le mot de passe
-                    "role_info._id": 0  # Exclure l'ID du rôle car déjà dans role_id
-                }
-            }
-        ]
+        projection = parse_fields('users', request.args.get('fields'), default=ADMIN)
+    except ValueError as e:
+        return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
 
-        users = list(db.users.aggregate(pipeline))
-
-        # Sanitize la réponse
-        def sanitize(doc):
-            if isinstance(doc, dict):
-                for key, value in list(doc.items()):
-                    if isinstance(value, ObjectId):
-                        doc[key] = str(value)
-                    elif isinstance(value, datetime):
-                        doc[key] = value.isoformat()
-                    elif isinstance(value, dict):
-                        sanitize(value)
-                    elif isinstance(value, list):
-                        for item in value:
-                            if isinstance(item, (dict, ObjectId, datetime)):
-                                sanitize(item)
-            elif isinstance(doc, list):
-                for item in doc:
-                    if isinstance(item, (dict, ObjectId, datetime)):
-                        sanitize(item)
-            return doc
-
-        # Nettoyage des documents
-        sanitized_users = [sanitize(user) for user in users]
+    try:
+        # Récupérer tous les utilisateurs avec leurs rôles ; la projection est
+        # appliquée avant la jointure (mot de passe toujours exclu)
+        pipeline = [{"$project": projection}]
+        if projection.get('_id') != 1 or 'role_id' in projection:
+            pipeline += [
+                {
+                    "$lookup": {
+                        "from": "role",
+                        "localField": "role_id",
+                        "foreignField": "_id",
+                        "as": "role_info"
+                    }
+                },
+                {
+                    "$unwind": {
+                        "path": "$role_info",
+                        "preserveNullAndEmptyArrays": True
+                    }
+                },
+                {
+                    "$project": {
+                        "role_info._id": 0  # Exclure l'ID du rôle car déjà dans role_id
+                    }
+                }
+            ]
 
-        print(f"✅ {len(sanitized_users)} utilisateurs récupérés avec succès")
-        return jsonify(sanitized_users), 200
+        # Utilisateurs envoyés au fil de la lecture du curseur d'agrégation
+        return stream_json_array(repository.users(db).aggregate(pipeline))
 
     except Exception as e:
-        print(f"❌ Erreur lors de la récupération des utilisateurs: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la récupération des utilisateurs: %s", e)
         return jsonify({"error": f"Erreur lors de la récupération des utilisateurs: {str(e)}"}), 500
\ No newline at end of file
@@ -3,6 +3,15 @@ from bson import ObjectId
 from datetime import datetime
 from . import admin_bp
 from .utils import check_admin_permissions
+from utils.auth import evict_user, load_principal
+from utils.conditional import bump_version, USERS
+from utils.profiles import evict_profile
+from utils.roles import get_role_registry, PERM_SUPER_ADMIN
+from utils.logger import get_logger
+from utils import repository
+from utils.repository import parse_version, VersionConflict
+
+logger = get_logger(__name__)
 
 @admin_bp.route('/update_user/<user_id>', methods=['PUT'])
 def update_user(user_id):
@@ -10,7 +19,7 @@ def update_user(user_id):
     Route pour mettre à jour un utilisateur
     Accessible uniquement aux administrateurs et super-administrateurs
     """
-    print(f" Début de la route update_user pour l'ID: {user_id}")
+    logger.debug("Début de la route update_user pour l'ID: %s", user_id)
 
     # Vérification des permissions
     admin_id, db, error_response, status_code = check_admin_permissions(request.cookies.get('access_token'))
@@ -18,47 +27,38 @@ def update_user(user_id):
         return error_response, status_code
 
     try:
-        # Vérifier si l'utilisateur existe
-        user = db.users.find_one({"_id": ObjectId(user_id)})
-        if not user:
-            print(f" Utilisateur non trouvé pour l'ID: {user_id}")
-            return jsonify({"error": "Utilisateur non trouvé"}), 404
-
         # Récupérer les données de mise à jour
         data = request.get_json()
         if not data:
-            print(" Aucune donnée de mise à jour fournie")
+            logger.warning("Aucune donnée de mise à jour fournie")
             return jsonify({"error": "Aucune donnée de mise à jour fournie"}), 400
-        print(data['role_id'])
-        print(data['mail'])
-        print(data['is_active'])
-        print(data['nom'])
-        print(data['prenom'])
+        try:
+            version = parse_version(data)
+        except ValueError as e:
+            return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
+
+        users = repository.users(db)
 
         # Vérifier si l'mail est déjà utilisé par un autre utilisateur
-        if 'mail' in data and data['mail'] != user.get('mail'):
-            existing_user = db.users.find_one({"mail": data['mail']})
-            if existing_user:
-                print(f" L'mail '{data['mail']}' est déjà utilisé")
+        if 'mail' in data:
+            if users.exists({"mail": data['mail'], "_id": {"$ne": ObjectId(user_id)}}):
+                logger.warning("L'mail '%s' est déjà utilisé", data['mail'])
                 return jsonify({"error": "Cet mail est déjà utilisé"}), 400
 
         # Vérifier si le rôle existe si on le modifie
+        protected = None
         if 'role_id' in data:
-            role = db.role.find_one({"_id": ObjectId(data['role_id'])})
+            role = get_role_registry().get(data['role_id'])
             
             if not role:
-                print(f" Rôle non trouvé pour l'ID: {data['role_id']}")
+                logger.warning("Rôle non trouvé pour l'ID: %s", data['role_id'])
                 return jsonify({"error": "Rôle non trouvé"}), 404
 
-            # Vérifier si on essaie de modifier un super-admin
-            if user.get('role_id'):
-                current_role = db.role.find_one({"_id": user['role_id']})
-                if current_role and current_role.get('nom_role') == 'super-administrateur':
-                    # Seul un super-admin peut modifier un autre super-admin
-                    admin_role = db.role.find_one({"_id": db.users.find_one({"_id": ObjectId(admin_id)})['role_id']})
-                    if admin_role.get('nom_role') != 'super-administrateur':
-                        print(" Tentative de modification d'un super-administrateur par un non super-admin")
-                        return jsonify({"error": "Vous n'avez pas les permissions pour modifier un super-administrateur"}), 403
+            # Seul un super-admin peut modifier le rôle d'un autre super-admin :
+            # pour les autres, le filtre de la mise à jour exclut les super-admins
+            admin = load_principal(request.cookies.get('access_token'), db)
+            if PERM_SUPER_ADMIN not in admin.permissions:
+                protected = {"role_id": {"$nin": get_role_registry().role_ids_with(PERM_SUPER_ADMIN)}}
 
         # Préparer les champs à mettre à jour
         update_fields = {}
@@ -72,75 +72,38 @@ def update_user(user_id):
                     update_fields[field] = data[field]
 
         if not update_fields:
-            print(" Aucun champ valide à mettre à jour")
+            logger.warning("Aucun champ valide à mettre à jour")
             return jsonify({"error": "Aucun champ valide à mettre à jour"}), 400
 
         # Ajouter les métadonnées de mise à jour
         update_fields['updated_at'] = datetime.utcnow()
         update_fields['updated_by'] = ObjectId(admin_id)
 
-        # Mettre à jour l'utilisateur
-        result = db.users.update_one(
-            {"_id": ObjectId(user_id)},
-            {"$set": update_fields}
-        )
-
-        if result.modified_count == 0:
-            print(" Aucune modification effectuée")
-            return jsonify({"error": "Aucune modification effectuée"}), 400
-
-        # Récupérer l'utilisateur mis à jour avec son rôle
-        updated_users = list(db.users.aggregate([
-            {"$match": {"_id": ObjectId(user_id)}},
-            {
-                "$lookup": {
-                    "from": "role",
-                    "localField": "role_id",
-                    "foreignField": "_id",
-                    "as": "role_info"
-                }
-            },
-            {
-                "$unwind": {
-                    "path": "$role_info",
-                    "preserveNullAndEmptyArrays": True
-                }
-            },
-            {"$project": {"password": 0, "role_info._id": 0}}
-        ]))
-
-        if not updated_users:
-            print(" Erreur lors de la récupération de l'utilisateur mis à jour")
-            return jsonify({"error": "Erreur lors de la récupération de l'utilisateur mis à jour"}), 500
-
-        updated_user = updated_users[0]
+        # Mettre à jour l'utilisateur et le relire en un aller-retour
+        updated_user = users.update(user_id, update_fields, version=version, query=protected,
+                                    projection={"password": 0})
+        if not updated_user:
+            # Chemin d'échec seulement : utilisateur absent ou super-admin protégé
+            if protected and users.exists(user_id):
+                logger.warning("Tentative de modification d'un super-administrateur par un non super-admin")
+                return jsonify({"error": "Vous n'avez pas les permissions pour modifier un super-administrateur"}), 403
+            logger.warning("Utilisateur non trouvé pour l'ID: %s", user_id)
+            return jsonify({"error": "Utilisateur non trouvé"}), 404
+        evict_user(user_id)
+        evict_profile(user_id)
+        bump_version(db, USERS)
 
-        # Sanitize la réponse
-        def sanitize(doc):
-            if isinstance(doc, dict):
-                for key, value in list(doc.items()):
-                    if isinstance(value, ObjectId):
-                        doc[key] = str(value)
-                    elif isinstance(value, datetime):
-                        doc[key] = value.isoformat()
-                    elif isinstance(value, dict):
-                        sanitize(value)
-                    elif isinstance(value, list):
-                        for item in value:
-                            if isinstance(item, (dict, ObjectId, datetime)):
-                                sanitize(item)
-            elif isinstance(doc, list):
-                for item in doc:
-                    if isinstance(item, (dict, ObjectId, datetime)):
-                        sanitize(item)
-            return doc
+        # Rôle de l'utilisateur, depuis la table des rôles du worker
+        role = get_role_registry().get(updated_user.get('role_id'))
+        if role:
+            updated_user['role_info'] = {key: value for key, value in role.items() if key != '_id'}
 
-        sanitized_user = sanitize(updated_user)
-        print(f" Utilisateur mis à jour avec succès: {sanitized_user.get('mail')}")
-        return jsonify(sanitized_user), 200
+        logger.info("Utilisateur mis à jour avec succès: %s", updated_user.get('mail'))
+        return jsonify(updated_user), 200
 
+    except VersionConflict as e:
+        logger.warning("Conflit de version pour l'utilisateur %s (version actuelle %s)", user_id, e.current)
+        return jsonify({"error": "L'utilisateur a été modifié entre-temps", "version": e.current}), 409
     except Exception as e:
-        print(f" Erreur lors de la mise à jour de l'utilisateur: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la mise à jour de l'utilisateur: %s", e)
         return jsonify({"error": f"Erreur lors de la mise à jour de l'utilisateur: {str(e)}"}), 500
\ No newline at end of file
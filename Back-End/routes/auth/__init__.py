@@ -2,4 +2,4 @@ from flask import Blueprint
 
 auth_bp = Blueprint('auth', __name__)
 
-from . import register, logout, auth_from_password, refresh_token
\ No newline at end of file
+from . import register, logout, auth_from_password, refresh_token, sessions
\ No newline at end of file
@@ -6,7 +6,12 @@ from config.database import get_db
 from . import auth_bp
 from flask_cors import cross_origin
 from bson import ObjectId
-import bcrypt
+from utils.sessions import create_session, find_by_access_token
+from utils.passwords import check_password, hash_password, needs_rehash, record_rehash, PasswordPoolBusy
+from utils.logger import get_logger
+from utils import repository
+
+logger = get_logger(__name__)
 
 # Clé secrète pour JWT
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-secret-key')
@@ -14,65 +19,61 @@ JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-secret-key')
 @auth_bp.route('/auth_from_password', methods=['POST'])
 @cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
 def auth_from_password():
-    print("\n\n========== DÉBUT AUTH FROM PASSWORD ==========")
-    print(f"Méthode de la requête: {request.method}")
-    print(f"En-têtes de la requête: {dict(request.headers)}")
-    
     try:
         db = get_db()
         if db is None:
-            print("❌ ERREUR: Base de données non connectée")
+            logger.error("Base de données non connectée")
             return jsonify({'error': 'Erreur de connexion à la base de données'}), 500
 
         data = request.get_json()
-        print(f"Données reçues: {data}")
 
         # Vérification des données requises
         if not all(k in data for k in ('mail', 'password')):
-            print("❌ ERREUR: Champs requis manquants")
+            logger.warning("Champs requis manquants")
             return jsonify({'error': 'Email et mot de passe requis'}), 400
     
         # Recherche de l'utilisateur
-        user = db.users.find_one({'mail': data['mail']})
+        user = repository.users(db).find_one({'mail': data['mail']})
         
         if not user:
-            print(f"❌ ERREUR: Aucun utilisateur trouvé avec l'email: {data['mail']}")
+            logger.warning("Aucun utilisateur trouvé avec l'email: %s", data['mail'])
             return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
             
         try:
-            # Encode les deux mots de passe en bytes pour la comparaison
-            password_input = data['password'].encode('utf-8')
             stored_password = user['password']
-            
-            # Si le mot de passe stocké est une chaîne, le convertir en bytes
-            if isinstance(stored_password, str):
-                stored_password = stored_password.encode('utf-8')
-            
-            # Vérification principale avec bcrypt    
+
+            # Vérification principale avec bcrypt (pool de processus, voir utils/passwords.py)
             password_correct = False
             try:
-                password_correct = bcrypt.checkpw(password_input, stored_password)
-            except Exception as e:
-                print(f"Erreur bcrypt, possible ancien format de mot de passe: {str(e)}")
+                password_correct = check_password(data['password'], stored_password)
+            except ValueError as e:
+                logger.warning("Erreur bcrypt, possible ancien format de mot de passe: %s", e)
                 # Si l'erreur est due à un format incompatible, vérifier si le mot de passe est stocké en clair
                 # (mesure temporaire pour la transition)
-                if data['password'] == user.get('password'):
-                    password_correct = True
-                    
-                    # Mettre à jour le mot de passe avec un hachage bcrypt
-                    print("Mise à jour du mot de passe vers le format bcrypt")
-                    hashed_password = bcrypt.hashpw(password_input, bcrypt.gensalt())
-                    db.users.update_one(
-                        {'_id': user['_id']},
-                        {'$set': {'password': hashed_password}}
-                    )
-            
+                password_correct = data['password'] == user.get('password')
+
             if not password_correct:
-                print(f"❌ ERREUR: Mot de passe incorrect pour l'utilisateur: {data['mail']}")
+                logger.warning("Mot de passe incorrect pour l'utilisateur: %s", data['mail'])
                 return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
-                
+
+            # Ancien format ou coût différent de BCRYPT_ROUNDS : re-hachage transparent
+            if needs_rehash(stored_password):
+                try:
+                    logger.info("Mise à jour du hachage du mot de passe")
+                    repository.users(db).update_one(
+                        {'_id': user['_id'], 'password': stored_password},
+                        {'$set': {'password': hash_password(data['password'])}}
+                    )
+                    record_rehash()
+                except PasswordPoolBusy:
+                    # Le re-hachage sera retenté à la prochaine connexion
+                    pass
+
+        except PasswordPoolBusy as e:
+            logger.error("Pool de hachage saturé")
+            return jsonify({'error': 'Serveur occupé, veuillez réessayer'}), 503, {'Retry-After': str(e.retry_after)}
         except Exception as e:
-            print(f"❌ ERREUR lors de la vérification du mot de passe: {str(e)}")
+            logger.exception("Erreur lors de la vérification du mot de passe: %s", e)
             return jsonify({'error': 'Erreur lors de la vérification du mot de passe'}), 500
 
         # 1. Génération des timestamps avec timezone
@@ -96,26 +97,15 @@ def auth_from_password():
             'jti': str(ObjectId())  # Identifiant unique pour ce token
         }, JWT_SECRET_KEY, algorithm='HS256')
 
-        # 3. Invalider les anciens tokens de cet utilisateur (optionnel)
-        # Vous pouvez choisir de conserver les anciens tokens pour permettre la connexion multi-appareils
-        # ou les supprimer pour une sécurité accrue
-        # db.token.delete_many({'id_user': user['_id']})
-
-        # 4. Création du document token
-        token_data = {
-            'id_user': user['_id'],
-            'access_token': access_token,
-            'expiration_access_token': access_token_expiration,
-            'refresh_token': refresh_token,
-            'expiration_refresh_token': refresh_token_expiration,
-            'created_at': current_time,
-            'user_agent': request.headers.get('User-Agent', 'Unknown'),
-            'ip_address': request.remote_addr
-        }
-
-        # 5. Insertion du token dans la base de données
-        result = db.token.insert_one(token_data)
-        print(f"✅ Token inséré avec ID: {result.inserted_id}")
+        # 3-5. Enregistrement de la session (empreintes des tokens) ; au-delà de
+        # MAX_SESSIONS_PER_USER, les sessions les plus anciennes sont révoquées
+        session = create_session(
+            db, user['_id'], access_token, refresh_token,
+            access_token_expiration, refresh_token_expiration,
+            user_agent=request.headers.get('User-Agent', 'Unknown'),
+            ip_address=request.remote_addr
+        )
+        logger.info("Session créée avec ID: %s", session['_id'])
 
         # 6. Préparation des données utilisateur pour la réponse
         # Ne pas inclure de données sensibles comme le mot de passe
@@ -153,27 +143,17 @@ def auth_from_password():
             samesite='None'
         )
 
-        print("✅ Authentification réussie")
-        print("========== FIN AUTH FROM PASSWORD (SUCCÈS) ==========\n\n")
+        logger.info("Authentification réussie")
         return response
 
     except Exception as e:
-        print(f"❌ ERREUR CRITIQUE lors de l'authentification: {str(e)}")
-        import traceback
-        traceback_str = traceback.format_exc()
-        print(f"Stack trace détaillée:\n{traceback_str}")
-        print("========== FIN AUTH FROM PASSWORD (ERREUR) ==========\n\n")
+        logger.exception("Erreur critique lors de l'authentification: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # Endpoint pour récupérer les informations de l'utilisateur courant
 @auth_bp.route('/me', methods=['GET'])
 @cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
 def get_user_info():
-    print("\n\n========== DÉBUT GET USER INFO ==========")
-    print(f"Méthode de la requête: {request.method}")
-    print(f"En-têtes de la requête: {dict(request.headers)}")
-    print(f"Cookies reçus: {request.cookies}")
-    
     try:
         # Récupérer le token d'accès
         access_token = request.cookies.get('access_token')
@@ -186,7 +166,7 @@ def get_user_info():
                 access_token = request.headers.get('token')
         
         if not access_token:
-            print("❌ ERREUR: Token d'accès manquant")
+            logger.warning("Token d'accès manquant")
             return jsonify({"error": "Non authentifié"}), 401
             
         # Vérifier le token
@@ -197,17 +177,17 @@ def get_user_info():
             
             # Vérifier que le token existe dans la base de données
             db = get_db()
-            token_doc = db.token.find_one({"access_token": access_token})
+            token_doc = find_by_access_token(db, access_token)
             
             if not token_doc:
-                print("❌ ERREUR: Token non trouvé dans la base de données")
+                logger.warning("Token non trouvé dans la base de données")
                 return jsonify({"error": "Token invalide"}), 401
                 
             # Récupérer les informations de l'utilisateur
-            user = db.users.find_one({"_id": ObjectId(user_id)})
+            user = repository.users(db).get(user_id)
             
             if not user:
-                print(f"❌ ERREUR: Utilisateur avec ID {user_id} non trouvé")
+                logger.warning("Utilisateur avec ID %s non trouvé", user_id)
                 return jsonify({"error": "Utilisateur non trouvé"}), 404
                 
             # Préparer la réponse avec les informations de l'utilisateur
@@ -220,21 +200,16 @@ def get_user_info():
                 'role_id': str(user.get('role_id')) if user.get('role_id') else None
             }
             
-            print(f"✅ Informations utilisateur récupérées: {user_data}")
-            print("========== FIN GET USER INFO (SUCCÈS) ==========\n\n")
+            logger.debug("Informations utilisateur récupérées: %s", user_data)
             return jsonify(user_data), 200
             
         except jwt.ExpiredSignatureError:
-            print("❌ ERREUR: Token JWT expiré")
+            logger.warning("Token JWT expiré")
             return jsonify({"error": "Token expiré"}), 401
         except jwt.InvalidTokenError:
-            print("❌ ERREUR: Token JWT invalide")
+            logger.warning("Token JWT invalide")
             return jsonify({"error": "Token invalide"}), 401
             
     except Exception as e:
-        print(f"❌ ERREUR CRITIQUE lors de la récupération des informations utilisateur: {str(e)}")
-        import traceback
-        traceback_str = traceback.format_exc()
-        print(f"Stack trace détaillée:\n{traceback_str}")
-        print("========== FIN GET USER INFO (ERREUR) ==========\n\n")
+        logger.exception("Erreur critique lors de la récupération des informations utilisateur: %s", e)
         return jsonify({"error": str(e)}), 500
@@ -3,27 +3,33 @@ from datetime import datetime, timedelta
 import jwt
 from config.database import get_db
 from config.config import SECRET_KEY
+from utils.sessions import find_by_access_token, create_session
 from . import auth_bp
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 @auth_bp.route('/auth_from_token', methods=['POST'])
 def auth_from_password():
-    print("Received auth_from_token request")
+    logger.debug("Received auth_from_token request")
     try:
         db = get_db()
         if db is None:
-            print("Database connection failed")
+            logger.error("Database connection failed")
             return jsonify({'error': 'Database connection failed'}), 500
 
         data = request.get_json()
-        print(f"Received data: {data}")
 
         # Vérification des données requises
-        if not all(k in data for k in ('mail', 'password')):
-            print("Missing required fields")
-            return jsonify({'error': 'mail et mot de passe requis'}), 400
+        if not data or not data.get('access_token'):
+            logger.warning("Missing required fields")
+            return jsonify({'error': 'access_token requis'}), 400
 
-        # Recherche de l'utilisateur
-        user = db.token.find_one({'access_token': data['access_token']})
+        # Recherche de la session (collection token, empreinte du token)
+        session = find_by_access_token(db, data['access_token'])
+        if not session:
+            logger.warning("Session not found")
+            return jsonify({'error': 'Token invalide'}), 401
 
         # Génération des timestamps
         current_time = datetime.utcnow()
@@ -32,28 +38,23 @@ def auth_from_password():
 
         # Génération des tokens
         access_token = jwt.encode({
-            'user_id': str(user['_id']),
+            'user_id': str(session['id_user']),
             'exp': access_token_expiration
         }, SECRET_KEY, algorithm='HS256')
 
         refresh_token = jwt.encode({
-            'user_id': str(user['_id']),
+            'user_id': str(session['id_user']),
             'exp': refresh_token_expiration
         }, SECRET_KEY, algorithm='HS256')
 
-        # Création du document token
-        token_data = {
-            'id_user': user['_id'],
-            'access_token': access_token,
-            'expiration_access_token': access_token_expiration,
-            'refresh_token': refresh_token,
-            'expiration_refresh_token': refresh_token_expiration
-        }
-
-        # Mise à jour ou insertion du token dans la base de données
-        print("Token data to be inserted:", token_data)
-        result = db.Token.insert_one(token_data)
-        print("Token inserted with ID:", result.inserted_id)
+        # Enregistrement de la nouvelle session (empreintes des tokens)
+        new_session = create_session(
+            db, session['id_user'], access_token, refresh_token,
+            access_token_expiration, refresh_token_expiration,
+            user_agent=request.headers.get('User-Agent', 'Unknown'),
+            ip_address=request.remote_addr
+        )
+        logger.info("Session created with ID: %s", new_session['_id'])
 
         # Préparation de la réponse
         response_data = {
@@ -63,9 +64,8 @@ def auth_from_password():
             'expiration_refresh_token': refresh_token_expiration.isoformat()
         }
 
-        print("Authentication successful")
+        logger.debug("Authentication successful")
         return jsonify(response_data), 201
 
     except Exception as e:
-        print(f"Error in auth_from_password: {str(e)}")
         return jsonify({'error': str(e)}), 500
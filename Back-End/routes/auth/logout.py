@@ -1,15 +1,19 @@
 from flask import request, jsonify, make_response
 from config.database import get_db
+from utils.sessions import revoke_access_token
 from . import auth_bp
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
-    print("Received logout request")
+    logger.debug("Received logout request")
     try:
         db = get_db()
         if db is None:
-            print("Database connection failed")
+            logger.error("Database connection failed")
             return jsonify({'error': 'Database connection failed'}), 500
 
         # Récupérer le token depuis les cookies
@@ -21,12 +25,12 @@ def logout():
             if auth_cookie and auth_cookie.startswith('Bearer '):
                 token = auth_cookie.split(' ')[1]
             else:
-                print("Missing token")
+                logger.warning("Missing token")
                 return jsonify({'error': 'Token manquant'}), 401
 
-        # Suppression du document contenant le bon access_token
-        result = db.Token.delete_one({'access_token': token})
-        print(f"Nombre de documents supprimés: {result.deleted_count}")
+        # Suppression de la session de cet access_token
+        deleted_count = revoke_access_token(db, token)
+        logger.info("Nombre de documents supprimés: %s", deleted_count)
 
         # Même si aucun token n'a été trouvé dans la base, on supprime les cookies
         response = make_response(jsonify({'message': 'Déconnexion réussie'}), 200)
@@ -38,5 +42,5 @@ def logout():
         return response
 
     except Exception as e:
-        print(f"Erreur dans logout: {str(e)}")
+        logger.exception("Erreur dans logout: %s", e)
         return jsonify({'error': str(e)}), 500
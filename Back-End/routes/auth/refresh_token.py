@@ -6,101 +6,53 @@ from config.database import get_db
 from . import auth_bp
 from flask_cors import cross_origin
 from bson import ObjectId
+from bson.errors import InvalidId
+from utils.auth import evict_token
+from utils.sessions import rotate_session, ROTATED, CONCURRENT, REUSED, EXPIRED
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Clé secrète pour JWT
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', '')
 
 
-def parse_date(date_value):
-    """
-    Fonction pour parser proprement une date venant de MongoDB.
-    """
-    if isinstance(date_value, datetime):
-        return date_value
-    if isinstance(date_value, dict) and 'date' in date_value:
-        return datetime.fromisoformat(date_value['date'].replace('Z', '+00:00'))
-    if isinstance(date_value, str):
-        try:
-            return datetime.fromisoformat(date_value.replace('Z', '+00:00'))
-        except Exception:
-            return datetime.strptime(date_value, '%Y-%m-%d %H:%M:%S')
-    raise ValueError("Format de date non reconnu")
-
-
 @auth_bp.route('/refresh_token', methods=['POST'])
 @cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
 def refresh_token():
-    print("\n\n========== DÉBUT REFRESH TOKEN ==========")
-    print(f"Méthode de la requête: {request.method}")
-    print(f"En-têtes de la requête: {dict(request.headers)}")
-    print(f"Cookies reçus: {request.cookies}")
-    
     db = get_db()
     if db is None:
-        print("❌ ERREUR: Base de données non connectée")
+        logger.error("Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     # Récupérer le refresh token des cookies
     refresh_token = request.cookies.get('refresh_token')
-    print(f"Refresh token trouvé dans les cookies: {'Oui - ' + refresh_token[:10] + '...' if refresh_token else 'Non'}")
     
     if not refresh_token:
-        print("❌ ERREUR: Refresh token manquant dans la requête")
+        logger.warning("Refresh token manquant dans la requête")
         return jsonify({"error": "Refresh token manquant"}), 401
 
     try:
-        # 1. Vérifier si le refresh token existe dans la base de données
-        token_doc = db.token.find_one({"refresh_token": refresh_token})
-        
-        if not token_doc:
-            print("❌ ERREUR: Token non trouvé dans la base de données")
-            return jsonify({"error": "Refresh token invalide"}), 401
-
-        # 2. Vérifier si le refresh token n'est pas expiré
+        # 1. Vérifier la signature et l'expiration du JWT (sans accès à la base)
         try:
-            # Décoder le token pour vérifier la signature et l'expiration
             decoded_token = jwt.decode(refresh_token, JWT_SECRET_KEY, algorithms=['HS256'])
-            user_id = decoded_token.get('user_id')
-            
-            # Vérifier que l'ID utilisateur correspond
-            if str(token_doc['id_user']) != user_id:
-                print("❌ ERREUR: ID utilisateur ne correspond pas")
-                return jsonify({"error": "Refresh token invalide"}), 401
-                
-            # Vérifier l'expiration dans la base de données également
-            expiration_refresh = parse_date(token_doc['expiration_refresh_token'])
-            
-            # Ajouter un fuseau horaire si la date est naive
-            if expiration_refresh.tzinfo is None:
-                expiration_refresh = expiration_refresh.replace(tzinfo=timezone.utc)
-            
-            if expiration_refresh < datetime.now(timezone.utc):
-                print("❌ ERREUR: Refresh token expiré")
-                # Supprimer le token expiré de la base de données
-                db.token.delete_one({"_id": token_doc['_id']})
-                return jsonify({"error": "Refresh token expiré"}), 401
-                
+            user_id = ObjectId(decoded_token.get('user_id'))
         except jwt.ExpiredSignatureError:
-            print("❌ ERREUR: Refresh token JWT expiré")
-            # Supprimer le token expiré de la base de données
-            db.token.delete_one({"_id": token_doc['_id']})
+            logger.warning("Refresh token JWT expiré")
+            # La session expirée est supprimée par l'index TTL
             return jsonify({"error": "Refresh token expiré"}), 401
-        except jwt.InvalidTokenError:
-            print("❌ ERREUR: Refresh token JWT invalide")
+        except (jwt.InvalidTokenError, InvalidId, TypeError):
+            logger.warning("Refresh token JWT invalide")
             return jsonify({"error": "Refresh token invalide"}), 401
-        except Exception as e:
-            print(f"❌ ERREUR lors de la vérification du token: {str(e)}")
-            return jsonify({"error": "Erreur de validation du token"}), 500
 
-        # 3. Générer de nouveaux tokens (rotation complète)
-        user_id = token_doc['id_user']
+        # 2. Générer de nouveaux tokens (rotation complète)
         current_time = datetime.now(timezone.utc)
         expiration_access = current_time + timedelta(minutes=15)
         expiration_refresh = current_time + timedelta(days=7)
 
-        print(f"👤 ID utilisateur: {user_id}")
-        print(f"⏰ Nouvelle expiration access token: {expiration_access}")
-        print(f"⏰ Nouvelle expiration refresh token: {expiration_refresh}")
+        logger.debug("ID utilisateur: %s", user_id)
+        logger.debug("Nouvelle expiration access token: %s", expiration_access)
+        logger.debug("Nouvelle expiration refresh token: %s", expiration_refresh)
 
         # Générer un nouveau access token
         new_access_token = jwt.encode(
@@ -123,25 +75,30 @@ def refresh_token():
             algorithm='HS256'
         )
 
-        # 4. Invalider l'ancien refresh token et stocker les nouveaux
-        # Supprimer l'ancien token
-        db.token.delete_one({"_id": token_doc['_id']})
-        
-        # Créer un nouveau document token
-        new_token_data = {
-            'id_user': user_id,
-            'access_token': new_access_token,
-            'expiration_access_token': expiration_access,
-            'refresh_token': new_refresh_token,
-            'expiration_refresh_token': expiration_refresh,
-            'created_at': current_time,
-            'user_agent': request.headers.get('User-Agent', 'Unknown'),
-            'ip_address': request.remote_addr
-        }
-        
-        # Insérer le nouveau token
-        insert_result = db.token.insert_one(new_token_data)
-        print(f"✅ Nouveau token inséré avec ID: {insert_result.inserted_id}")
+        # 3-4. Remplacer les empreintes de la session en un seul aller-retour
+        # (find_one_and_update filtré sur l'empreinte de l'ancien refresh token)
+        result, session = rotate_session(
+            db, user_id, refresh_token, new_access_token, new_refresh_token,
+            expiration_access, expiration_refresh
+        )
+        evict_token(request.cookies.get('access_token'))
+
+        if result == CONCURRENT:
+            # Un autre onglet vient de renouveler cette session : ses cookies
+            # (partagés par le navigateur) font foi, aucun cookie n'est posé ici
+            logger.info("Refresh token déjà renouvelé par une requête parallèle, session %s", session['_id'])
+            return jsonify({"message": "Token déjà rafraîchi par une requête parallèle"}), 200
+        if result == REUSED:
+            logger.warning("Réutilisation d'un refresh token, session %s révoquée", session['_id'])
+            return jsonify({"error": "Refresh token invalide"}), 401
+        if result == EXPIRED:
+            logger.warning("Refresh token expiré")
+            return jsonify({"error": "Refresh token expiré"}), 401
+        if result != ROTATED:
+            logger.warning("Token non trouvé dans la base de données")
+            return jsonify({"error": "Refresh token invalide"}), 401
+
+        logger.info("Session %s renouvelée", session['_id'])
 
         # 5. Préparer la réponse avec les nouveaux cookies
         response = make_response(jsonify({
@@ -169,13 +126,8 @@ def refresh_token():
             samesite='Lax'
         )
         
-        print("========== FIN REFRESH TOKEN (SUCCÈS) ==========\n\n")
         return response, 200
         
     except Exception as e:
-        print(f"❌ ERREUR CRITIQUE lors du refresh token: {str(e)}")
-        import traceback
-        traceback_str = traceback.format_exc()
-        print(f"Stack trace détaillée:\n{traceback_str}")
-        print("========== FIN REFRESH TOKEN (ERREUR) ==========\n\n")
+        logger.exception("Erreur critique lors du refresh token: %s", e)
         return jsonify({"error": f"Erreur lors du renouvellement du token: {str(e)}"}), 500
@@ -4,37 +4,38 @@ import jwt
 from bson import ObjectId
 from config.database import get_db
 from config.config import SECRET_KEY
+from pymongo.errors import DuplicateKeyError
+from utils.roles import get_role_registry, bump_role_version
 from . import auth_bp
-import bcrypt
+from utils.sessions import create_session
+from utils.passwords import hash_password, PasswordPoolBusy
+from utils.logger import get_logger
+from utils import repository
+
+logger = get_logger(__name__)
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
-    print("Received registration request")
+    logger.debug("Received registration request")
     try:
         db = get_db()
         if db is None:
-            print("Database connection failed")
+            logger.error("Database connection failed")
             return jsonify({'error': 'Database connection failed'}), 500
 
         data = request.get_json()
-        print(f"Received data: {data}")
 
         # Vérification des données requises
         required_fields = ['nom', 'prenom', 'mail', 'password', 'username', 'genre']
         if not all(k in data for k in required_fields):
             missing_fields = [field for field in required_fields if field not in data]
-            print(f"Missing required fields: {missing_fields}")
+            logger.warning("Missing required fields: %s", missing_fields)
             return jsonify({'error': 'Tous les champs sont requis', 'missing_fields': missing_fields}), 400
 
-        # Vérification si l'mail existe déjà
-        if db.users.find_one({'mail': data['mail']}):
-            print("mail already exists")
-            return jsonify({'error': 'mail déjà utilisé'}), 400
-
         # Récupérer le rôle "Citoyen"
-        citoyen_role = db.role.find_one({'nom_role': 'Citoyen'})
+        citoyen_role = get_role_registry().find_by_name('Citoyen')
         if not citoyen_role:
-            print("Rôle 'Citoyen' non trouvé, création du rôle")
+            logger.debug("Rôle 'Citoyen' non trouvé, création du rôle")
             # Créer le rôle citoyen s'il n'existe pas
             citoyen_role = {
                 '_id': ObjectId(),
@@ -42,20 +43,23 @@ def register():
                 'permissions': ['read'],
                 'created_at': datetime.utcnow()
             }
-            db.role.insert_one(citoyen_role)
-            print(f"Rôle 'citoyen' créé avec l'ID: {citoyen_role['_id']}")
+            repository.roles(db).insert(citoyen_role)
+            bump_role_version(db)
+            logger.info("Rôle 'citoyen' créé avec l'ID: %s", citoyen_role['_id'])
 
         # Hashage du mot de passe
         try:
-            # Encode le mot de passe en utf-8 et le hache avec bcrypt
-            password_bytes = data['password'].encode('utf-8')
-            hashed_password = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
-            
+            # Hachage bcrypt dans le pool de processus (voir utils/passwords.py)
+            hashed_password = hash_password(data['password'])
+
             # Le mot de passe haché est stocké directement comme bytes dans MongoDB
             data['password'] = hashed_password
-            print("Mot de passe haché avec succès")
+            logger.debug("Mot de passe haché avec succès")
+        except PasswordPoolBusy as e:
+            logger.error("Pool de hachage saturé")
+            return jsonify({'error': 'Serveur occupé, veuillez réessayer'}), 503, {'Retry-After': str(e.retry_after)}
         except Exception as e:
-            print(f"Erreur lors du hashage du mot de passe: {str(e)}")
+            logger.exception("Erreur lors du hashage du mot de passe: %s", e)
             return jsonify({'error': 'Erreur lors de la création du compte'}), 500
             
         # Création de l'utilisateur
@@ -72,9 +76,13 @@ def register():
             'created_at': datetime.utcnow()
         }
 
-        # Insertion dans la base de données
-        result = db.users.insert_one(user)
-        print(f"User created with id: {result.inserted_id}")
+        # Insertion dans la base de données (l'index unique sur mail refuse les doublons)
+        try:
+            user_id = repository.users(db).insert(user)
+        except DuplicateKeyError:
+            logger.warning("mail already exists")
+            return jsonify({'error': 'mail déjà utilisé'}), 400
+        logger.info("User created with id: %s", user_id)
         
         # Génération des timestamps pour les tokens
         current_time = datetime.utcnow()
@@ -92,17 +100,13 @@ def register():
             'exp': refresh_token_expiration
         }, SECRET_KEY, algorithm='HS256')
 
-        # Création du document token
-        token_data = {
-            'id_user': user['_id'],
-            'access_token': access_token,
-            'expiration_access_token': access_token_expiration,
-            'refresh_token': refresh_token,
-            'expiration_refresh_token': refresh_token_expiration
-        }
-
-        # Insertion du token dans la base de données
-        db.token.insert_one(token_data)
+        # Enregistrement de la session dans la base de données
+        create_session(
+            db, user['_id'], access_token, refresh_token,
+            access_token_expiration, refresh_token_expiration,
+            user_agent=request.headers.get('User-Agent', 'Unknown'),
+            ip_address=request.remote_addr
+        )
 
         # Préparation de la réponse
         response_data = {
@@ -139,5 +143,5 @@ def register():
         return response
 
     except Exception as e:
-        print(f"Error in register: {str(e)}")
+        logger.exception("Error in register: %s", e)
         return jsonify({'error': str(e)}), 500
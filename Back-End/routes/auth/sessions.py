@@ -0,0 +1,119 @@
+from flask import request, jsonify
+from bson import ObjectId
+from bson.errors import InvalidId
+from config.database import get_db
+from utils.auth import get_request_token, load_principal
+from utils.sessions import hash_token, list_sessions, revoke_sessions
+from . import auth_bp
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _authenticate():
+    """
+    Retourne (token, principal, db, réponse d'erreur)
+    """
+    db = get_db()
+    if db is None:
+        logger.error("Erreur: Base de données non connectée")
+        return None, None, None, (jsonify({"error": "Erreur de connexion à la base de données"}), 500)
+
+    token = get_request_token()
+    if not token:
+        logger.warning("Token manquant ou mal formé")
+        return None, None, db, (jsonify({"error": "Token manquant ou invalide"}), 401)
+
+    principal = load_principal(token, db)
+    if not principal:
+        return None, None, db, (jsonify({"error": "Token invalide"}), 401)
+    return token, principal, db, None
+
+
+@auth_bp.route('/sessions', methods=['GET'])
+def get_sessions():
+    """
+    Liste les sessions actives de l'utilisateur connecté
+    """
+    logger.debug("Début de la route get_sessions")
+    token, principal, db, error = _authenticate()
+    if error:
+        return error
+
+    try:
+        current_hash = hash_token(token)
+        sessions = [{
+            "_id": str(session['_id']),
+            "created_at": session.get('created_at').isoformat() if session.get('created_at') else None,
+            "expiration_refresh_token": session['expiration_refresh_token'].isoformat()
+            if hasattr(session.get('expiration_refresh_token'), 'isoformat') else None,
+            "user_agent": session.get('user_agent'),
+            "ip_address": session.get('ip_address'),
+            "current": session.get('access_token_hash') == current_hash
+        } for session in list_sessions(db, principal.user_id)]
+
+        logger.debug("%s session(s) trouvée(s)", len(sessions))
+        return jsonify(sessions), 200
+
+    except Exception as e:
+        logger.exception("Erreur lors de la récupération des sessions: %s", e)
+        return jsonify({"error": f"Erreur lors de la récupération des sessions: {str(e)}"}), 500
+
+
+@auth_bp.route('/sessions', methods=['DELETE'])
+def delete_sessions():
+    """
+    Révoque en une fois des sessions de l'utilisateur connecté.
+    Body optionnel : {"session_ids": [...]} ; sans liste, toutes les sessions
+    sauf la session courante sont révoquées (?include_current=1 pour l'inclure).
+    """
+    logger.debug("Début de la route delete_sessions")
+    token, principal, db, error = _authenticate()
+    if error:
+        return error
+
+    data = request.get_json(silent=True) or {}
+    session_ids = data.get('session_ids')
+    if session_ids is not None and not isinstance(session_ids, list):
+        return jsonify({"error": "session_ids doit être une liste"}), 400
+
+    keep_current = request.args.get('include_current') != '1'
+
+    try:
+        revoked = revoke_sessions(
+            db, principal.user_id,
+            session_ids=session_ids,
+            keep_access_token=token if keep_current else None
+        )
+        logger.info("%s session(s) révoquée(s)", revoked)
+        return jsonify({"message": "Sessions révoquées", "revoked": revoked}), 200
+
+    except InvalidId:
+        return jsonify({"error": "ID de session invalide"}), 400
+    except Exception as e:
+        logger.exception("Erreur lors de la révocation des sessions: %s", e)
+        return jsonify({"error": f"Erreur lors de la révocation des sessions: {str(e)}"}), 500
+
+
+@auth_bp.route('/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    """
+    Révoque une session de l'utilisateur connecté
+    """
+    logger.debug("Début de la route delete_session pour l'ID: %s", session_id)
+    token, principal, db, error = _authenticate()
+    if error:
+        return error
+
+    if not ObjectId.is_valid(session_id):
+        return jsonify({"error": "ID de session invalide"}), 400
+
+    try:
+        revoked = revoke_sessions(db, principal.user_id, session_ids=[session_id])
+        if not revoked:
+            return jsonify({"error": "Session non trouvée"}), 404
+        return jsonify({"message": "Session révoquée"}), 200
+
+    except Exception as e:
+        logger.exception("Erreur lors de la révocation de la session: %s", e)
+        return jsonify({"error": f"Erreur lors de la révocation de la session: {str(e)}"}), 500
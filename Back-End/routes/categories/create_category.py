@@ -4,6 +4,11 @@ from datetime import datetime
 from . import categories_bp
 from .utils import check_category_permissions
 from flask_cors import cross_origin
+from utils.logger import get_logger
+from utils import repository
+from utils.conditional import bump_version, CATEGORIES
+
+logger = get_logger(__name__)
 
 @categories_bp.route('/create_category', methods=['POST'])
 @cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
@@ -12,7 +17,7 @@ def create_category():
     Route pour créer une nouvelle catégorie
     Accessible uniquement aux administrateurs et super-administrateurs
     """
-    print(" Début de la route create_category")
+    logger.debug("Début de la route create_category")
 
     # Vérification des permissions
     user_id, db, error_response, status_code = check_category_permissions(request.cookies.get('access_token'))
@@ -23,13 +28,13 @@ def create_category():
         # Récupérer les données de la catégorie
         data = request.get_json()
         if not data or 'nom_categorie' not in data:
-            print(" Données de catégorie manquantes")
+            logger.warning("Données de catégorie manquantes")
             return jsonify({"error": "Le nom de la catégorie est requis"}), 400
 
         # Vérifier si la catégorie existe déjà
-        existing_category = db.categories.find_one({"nom_categorie": data['nom_categorie']})
+        existing_category = repository.categories(db).exists({"nom_categorie": data['nom_categorie']})
         if existing_category:
-            print(f" La catégorie '{data['nom_categorie']}' existe déjà")
+            logger.warning("La catégorie '%s' existe déjà", data['nom_categorie'])
             return jsonify({"error": "Cette catégorie existe déjà"}), 400
 
         # Créer la nouvelle catégorie
@@ -44,20 +49,12 @@ def create_category():
         }
 
         # Insérer la catégorie
-        result = db.categories.insert_one(new_category)
-
-        # Sanitize la réponse
-        new_category['_id'] = str(new_category['_id'])
-        new_category['created_by'] = str(new_category['created_by'])
-        if new_category['parent_id']:
-            new_category['parent_id'] = str(new_category['parent_id'])
-        new_category['created_at'] = new_category['created_at'].isoformat()
+        repository.categories(db).insert(new_category)
+        bump_version(db, CATEGORIES)
 
-        print(f" Catégorie créée avec succès: {new_category['nom_categorie']}")
+        logger.info("Catégorie créée avec succès: %s", new_category['nom_categorie'])
         return jsonify(new_category), 201
 
     except Exception as e:
-        print(f" Erreur lors de la création de la catégorie: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la création de la catégorie: %s", e)
         return jsonify({"error": f"Erreur lors de la création de la catégorie: {str(e)}"}), 500 
\ No newline at end of file
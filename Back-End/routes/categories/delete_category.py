@@ -3,6 +3,11 @@ from bson import ObjectId
 from datetime import datetime
 from . import categories_bp
 from .utils import check_category_permissions
+from utils.logger import get_logger
+from utils.conditional import bump_version, CATEGORIES
+from utils import repository
+
+logger = get_logger(__name__)
 
 @categories_bp.route('/delete_category/<category_id>', methods=['DELETE'])
 def delete_category(category_id):
@@ -10,7 +15,7 @@ def delete_category(category_id):
     Route pour supprimer une catégorie
     Accessible uniquement aux administrateurs et super-administrateurs
     """
-    print(f"🔄 Début de la route delete_category pour l'ID: {category_id}")
+    logger.debug("Début de la route delete_category pour l'ID: %s", category_id)
 
     # Vérification des permissions
     user_id, db, error_response, status_code = check_category_permissions(request.cookies.get('access_token'))
@@ -19,44 +24,43 @@ def delete_category(category_id):
 
     try:
         # Vérifier si la catégorie existe
-        category = db.categories.find_one({"_id": ObjectId(category_id)})
+        category = repository.categories(db).get(category_id, projection={"nom_categorie": 1})
         if not category:
-            print(f"❌ Catégorie non trouvée pour l'ID: {category_id}")
+            logger.warning("Catégorie non trouvée pour l'ID: %s", category_id)
             return jsonify({"error": "Catégorie non trouvée"}), 404
 
         # Vérifier si la catégorie a des sous-catégories
-        subcategories_count = db.categories.count_documents({"parent_id": ObjectId(category_id)})
+        subcategories_count = repository.categories(db).count({"parent_id": ObjectId(category_id)})
         if subcategories_count > 0:
-            print(f"❌ La catégorie a {subcategories_count} sous-catégories")
+            logger.warning("La catégorie a %s sous-catégories", subcategories_count)
             return jsonify({
                 "error": "Impossible de supprimer cette catégorie car elle a des sous-catégories",
                 "subcategories_count": subcategories_count
             }), 400
 
         # Vérifier si la catégorie est utilisée par des ressources
-        resources_count = db.resources.count_documents({"category_id": ObjectId(category_id)})
+        resources_count = repository.resources(db).count({"id_categorie": ObjectId(category_id)})
         if resources_count > 0:
-            print(f"❌ La catégorie est utilisée par {resources_count} ressources")
+            logger.warning("La catégorie est utilisée par %s ressources", resources_count)
             return jsonify({
                 "error": "Impossible de supprimer cette catégorie car elle est utilisée par des ressources",
                 "resources_count": resources_count
             }), 400
 
         # Supprimer la catégorie
-        result = db.categories.delete_one({"_id": ObjectId(category_id)})
+        deleted = repository.categories(db).delete(category_id)
         
-        if result.deleted_count == 0:
-            print("❌ Erreur lors de la suppression de la catégorie")
+        if not deleted:
+            logger.error("Erreur lors de la suppression de la catégorie")
             return jsonify({"error": "Erreur lors de la suppression de la catégorie"}), 500
+        bump_version(db, CATEGORIES)
 
-        print(f"✅ Catégorie supprimée avec succès: {category.get('nom_categorie')}")
+        logger.info("Catégorie supprimée avec succès: %s", category.get('nom_categorie'))
         return jsonify({
             "message": "Catégorie supprimée avec succès",
             "category_name": category.get("nom_categorie")
         }), 200
 
     except Exception as e:
-        print(f"❌ Erreur lors de la suppression de la catégorie: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la suppression de la catégorie: %s", e)
         return jsonify({"error": f"Erreur lors de la suppression de la catégorie: {str(e)}"}), 500 
\ No newline at end of file
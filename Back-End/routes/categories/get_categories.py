@@ -1,46 +1,39 @@
 from flask import jsonify
 from config.database import get_db
-from bson import json_util
-import json
 from . import categories_bp
 from flask_cors import cross_origin
+from utils.logger import get_logger
+from utils import repository
+from utils.conditional import conditional, max_age, CATEGORIES
+from utils.streaming import stream_json_array
+
+logger = get_logger(__name__)
 
 @categories_bp.route('/all_categories', methods=['GET'])
 @cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
+@conditional(CATEGORIES, cache_control=max_age(60))
 def get_categories():
     """
     Récupère toutes les catégories de ressources
     """
-    print(" Début de la route get_categories")
+    logger.debug("Début de la route get_categories")
     
     db = get_db()
     if db is None:
-        print(" Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
         
     try:
-        categories = list(db.categories.find())
-        print(f" Nombre de catégories trouvées dans la base de données: {len(categories)}")
-        
-        # Convertir ObjectId en string pour la sérialisation JSON
-        categories_json = json.loads(json_util.dumps(categories))
-        
         # Transformer les données pour qu'elles correspondent au format attendu par le frontend
-        transformed_categories = []
-        for category in categories_json:
-            transformed_category = {
-                "_id": category["_id"]["$oid"],
+        def transform(category):
+            return {
+                "_id": str(category["_id"]),
                 "nom": category.get("nom_categorie", ""),
                 "description": category.get("description_categorie", "")
             }
-            transformed_categories.append(transformed_category)
-        
-        print(f" Catégories récupérées et transformées : {len(transformed_categories)}")
-        print(f" Première catégorie (exemple) : {transformed_categories[0] if transformed_categories else 'Aucune catégorie'}")
-        
-        return jsonify(transformed_categories), 200
+
+        projection = {"nom_categorie": 1, "description_categorie": 1}
+        return stream_json_array(repository.categories(db).find({}, projection), transform=transform)
     except Exception as e:
-        print(f" Erreur lors de la récupération des catégories: {str(e)}")
-        import traceback
-        print(f" Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la récupération des catégories: %s", e)
         return jsonify({"error": f"Erreur lors de la récupération des catégories: {str(e)}"}), 500
\ No newline at end of file
@@ -1,7 +1,10 @@
 from flask import jsonify
-from bson import ObjectId
 from config.database import get_db
-from utils.auth import get_user_id_from_token
+from utils.auth import load_principal
+from utils.roles import PERM_MANAGE_CATEGORIES
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 def check_category_permissions(token_cookie):
     """
@@ -9,41 +12,32 @@ def check_category_permissions(token_cookie):
     Retourne (user_id, db) si les permissions sont valides, sinon retourne (None, None)
     """
     if not token_cookie:
-        print("❌ Token manquant ou mal formé")
+        logger.warning("Token manquant ou mal formé")
         return None, None, jsonify({"error": "Token manquant ou invalide"}), 401
 
-    user_id = get_user_id_from_token(token_cookie)
-    if not user_id:
-        return None, None, jsonify({"error": "Token invalide"}), 401
-
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return None, None, jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     try:
+        # Token et utilisateur en un seul aller-retour
+        principal = load_principal(token_cookie, db)
+        if not principal:
+            return None, None, jsonify({"error": "Token invalide"}), 401
+
         # Vérifier si l'utilisateur existe
-        user = db.users.find_one({"_id": ObjectId(user_id)})
-        if not user:
-            print("❌ Utilisateur non trouvé")
+        if not principal.user:
+            logger.warning("Utilisateur non trouvé")
             return None, None, jsonify({"error": "Utilisateur non trouvé"}), 404
 
-        # Vérifier le rôle de l'utilisateur
-        role = db.role.find_one({"_id": user.get("role_id")})
-        if not role:
-            print("❌ Rôle non trouvé pour l'utilisateur")
-            return None, None, jsonify({"error": "Rôle non trouvé"}), 404
-
-        # Vérifier si l'utilisateur a les permissions nécessaires
-        user_role = role.get("nom_role")
-        if user_role not in ["administrateur", "super-administrateur"]:
-            print(f"❌ Accès refusé : l'utilisateur a le rôle '{user_role}'")
+        # Vérifier les permissions du rôle (table des rôles en mémoire)
+        if PERM_MANAGE_CATEGORIES not in principal.permissions:
+            logger.warning("Accès refusé : l'utilisateur a le rôle '%s'", principal.role_name)
             return None, None, jsonify({"error": "Accès non autorisé"}), 403
 
-        return user_id, db, None, None
+        return principal.user_id, db, None, None
 
     except Exception as e:
-        print(f"❌ Erreur lors de la vérification des permissions: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la vérification des permissions: %s", e)
         return None, None, jsonify({"error": f"Erreur lors de la vérification des permissions: {str(e)}"}), 500 
\ No newline at end of file
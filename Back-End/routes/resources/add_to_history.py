@@ -5,6 +5,12 @@ from config.database import get_db
 from . import resources_bp
 from utils.auth import get_user_id_from_token
 from flask_cors import cross_origin
+from pymongo.errors import DuplicateKeyError
+from utils.logger import get_logger
+from utils import repository
+from utils.conditional import bump_version_throttled, RESOURCE_COUNTERS
+
+logger = get_logger(__name__)
 
 @resources_bp.route('/add_to_history/<resource_id>', methods=['POST'])
 @cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
@@ -12,12 +18,12 @@ def add_to_history(resource_id):
     """
     Route pour ajouter une ressource à l'historique de l'utilisateur
     """
-    print(f"🔄 Début de la route add_to_history pour l'ID: {resource_id}")
+    logger.debug("Début de la route add_to_history pour l'ID: %s", resource_id)
 
     # Vérification du token
     token_cookie = request.cookies.get('access_token')
     if not token_cookie:
-        print("❌ Token manquant ou mal formé")
+        logger.warning("Token manquant ou mal formé")
         return jsonify({"error": "Token manquant ou invalide"}), 401
 
     user_id = get_user_id_from_token(token_cookie)
@@ -26,39 +32,33 @@ def add_to_history(resource_id):
 
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     try:
         # Vérifier si la ressource existe
-        resource = db.ressource.find_one({"_id": ObjectId(resource_id)})
-        if not resource:
-            print(f"❌ Ressource non trouvée pour l'ID: {resource_id}")
+        if not repository.resources(db).exists(resource_id):
+            logger.warning("Ressource non trouvée pour l'ID: %s", resource_id)
             return jsonify({"error": "Ressource non trouvée"}), 404
 
-        # Vérifier si l'entrée existe déjà dans l'historique
-        existing_entry = db.historique.find_one({
+        # Ajouter la ressource à l'historique (l'index unique user_id/resource_id refuse les doublons)
+        historique_entry = {
             "user_id": ObjectId(user_id),
-            "resource_id": ObjectId(resource_id)
-        })
+            "resource_id": ObjectId(resource_id),
+            "date_consultation": datetime.utcnow()
+        }
 
-        if not existing_entry:
-            # Ajouter la ressource à l'historique
-            historique_entry = {
-                "user_id": ObjectId(user_id),
-                "resource_id": ObjectId(resource_id),
-                "date_consultation": datetime.utcnow()
-            }
-            
-            db.historique.insert_one(historique_entry)
-            print(f"✅ Ressource {resource_id} ajoutée à l'historique de l'utilisateur {user_id}")
-        else:
-            print(f"ℹ️ La ressource {resource_id} est déjà dans l'historique de l'utilisateur {user_id}")
+        try:
+            repository.history(db).insert(historique_entry)
+            # Une consultation par utilisateur : compteur du tri "plus vues"
+            repository.resources(db).increment(resource_id, "views_count")
+            bump_version_throttled(db, RESOURCE_COUNTERS)
+            logger.info("Ressource %s ajoutée à l'historique de l'utilisateur %s", resource_id, user_id)
+        except DuplicateKeyError:
+            logger.debug("La ressource %s est déjà dans l'historique de l'utilisateur %s", resource_id, user_id)
 
         return jsonify({"message": "Ressource ajoutée à l'historique"}), 200
 
     except Exception as e:
-        print(f"❌ Erreur lors de l'ajout à l'historique: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de l'ajout à l'historique: %s", e)
         return jsonify({"error": f"Erreur lors de l'ajout à l'historique: {str(e)}"}), 500 
\ No newline at end of file
@@ -0,0 +1,55 @@
+from flask import request, jsonify
+from bson import ObjectId
+from config.database import get_db
+from . import resources_bp
+from utils.roles import requires, PERM_MODERATE
+from flask_cors import cross_origin
+from utils.logger import get_logger
+from utils.pagination import parse_limit
+from utils.projections import parse_fields
+from utils.moderation import claim_pending, MODERATION_CLAIM_MAX, MODERATION_LEASE_TTL
+
+logger = get_logger(__name__)
+
+# Ressources réservées par défaut (paramètre count)
+DEFAULT_CLAIM = 5
+
+
+@resources_bp.route('/pending/claim', methods=['POST', 'OPTIONS'])
+@cross_origin(supports_credentials=True, origins=["http://localhost:3000"], methods=['POST', 'OPTIONS'], allow_headers=['Content-Type', 'Authorization'])
+@requires(PERM_MODERATE)
+def claim_pending_resources(principal):
+    """
+    Route pour réserver les prochaines ressources en attente (les plus anciennes),
+    pour MODERATION_LEASE_TTL secondes. Une ressource réservée n'est proposée à
+    aucun autre modérateur tant que la réservation court.
+
+    Paramètres : count (5 par défaut), fields.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    logger.debug("Début de la route claim_pending_resources")
+
+    db = get_db()
+    if db is None:
+        logger.error("Erreur: Base de données non connectée")
+        return jsonify({"error": "Erreur de connexion à la base de données"}), 500
+
+    try:
+        data = request.get_json(silent=True) or {}
+        count = parse_limit(data.get('count', request.args.get('count')),
+                            default=min(DEFAULT_CLAIM, MODERATION_CLAIM_MAX), maximum=MODERATION_CLAIM_MAX)
+        projection = parse_fields('ressource', request.args.get('fields'))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
+
+    try:
+        resources = claim_pending(db, ObjectId(principal.user_id), count, projection)
+        logger.info("%s ressources réservées pour %s secondes", len(resources), MODERATION_LEASE_TTL)
+        return jsonify(resources), 200
+
+    except Exception as e:
+        logger.exception("Erreur lors de la réservation des ressources en attente: %s", e)
+        return jsonify({"error": f"Erreur lors de la réservation des ressources en attente: {str(e)}"}), 500
+
@@ -3,46 +3,49 @@ from datetime import datetime
 from bson import ObjectId
 from config.database import get_db
 from . import resources_bp
-from utils.auth import get_user_id_from_token
+from utils.sessions import find_by_access_token
+from utils.logger import get_logger
+from utils import repository
+from utils.conditional import bump_version, RESOURCES
+from utils.category_counts import adjust_counts
+from utils.projections import make_excerpt
+
+logger = get_logger(__name__)
 
 @resources_bp.route('/create_resources', methods=['POST'])
 def create_resource():
     """
     Route pour créer une nouvelle ressource
     """
-    print("🔄 Début de la route create_resource")
+    logger.debug("Début de la route create_resource")
 
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     # Vérification du token
     token_cookie = request.cookies.get('access_token')
     if not token_cookie:
-        print("❌ Token manquant ou mal formé")
+        logger.warning("Token manquant ou mal formé")
         return jsonify({"error": "Token manquant ou invalide"}), 401
-    print(token_cookie)
-    print(get_user_id_from_token(token_cookie))
-
 
     access_token = token_cookie
 
     # Recherche du token dans la base
-    token_data = db.token.find_one({'access_token': access_token})
+    token_data = find_by_access_token(db, access_token)
     if not token_data:
-        print("❌ Token non trouvé en base")
+        logger.warning("Token non trouvé en base")
         return jsonify({"error": "Token invalide"}), 401
 
     user_id = token_data['id_user']
-    print(f"🔐 Utilisateur authentifié avec l'ID: {user_id}")
+    logger.debug("Utilisateur authentifié avec l'ID: %s", user_id)
 
     # Données du body
     data = request.get_json()
-    print(f"📝 Données reçues: {data}")
 
     if not data or not all(k in data for k in ('title', 'content', 'categorie')):
-        print("❌ Erreur: Champs manquants")
+        logger.warning("Erreur: Champs manquants")
         return jsonify({"error": "Champs requis : title, content, categorie"}), 400
 
     try:
@@ -52,45 +55,35 @@ def create_resource():
         resource = {
             "titre": data['title'],
             "contenu": data['content'],
+            # Résumé en texte brut des cartes (vue card, sans contenu)
+            "extrait": make_excerpt(data['content']),
             "id_categorie": ObjectId(data['categorie']) if data['categorie'] else None,
             "id_publieur": ObjectId(user_id) if isinstance(user_id, str) else user_id,
             "date_publication": {
                 "date": now.isoformat() + "Z"
             },
             "createdAt": now,
-            "approved": False  # Par défaut, la ressource n'est pas approuvée
+            "approved": False,  # Par défaut, la ressource n'est pas approuvée
+            # Compteurs des tris "plus de favoris" / "plus vues" de la liste
+            "favorites_count": 0,
+            "views_count": 0
         }
 
         # Si une catégorie est spécifiée, vérifier qu'elle existe
         if data['categorie']:
-            category = db.categories.find_one({"_id": ObjectId(data['categorie'])})
-            if not category:
-                print(f"❌ Catégorie non trouvée pour l'ID: {data['categorie']}")
+            if not repository.categories(db).exists(data['categorie']):
+                logger.warning("Catégorie non trouvée pour l'ID: %s", data['categorie'])
                 return jsonify({"error": "Catégorie non trouvée"}), 404
 
-        # Insérer dans la collection des ressources en attente
-        result = db.ressource.insert_one(resource)
-        resource['_id'] = result.inserted_id
-        
-        # Copier la ressource dans la collection des ressources en attente
-        resource_en_attente = resource.copy()
-        db.ressources_en_attente.insert_one(resource_en_attente)
-        
-        # Sanitize
-        def sanitize(doc):
-            for key, value in doc.items():
-                if isinstance(value, ObjectId):
-                    doc[key] = str(value)
-                elif isinstance(value, datetime):
-                    doc[key] = value.isoformat()
-            return doc
+        # Insérer la ressource : approved à False la place dans la file de
+        # modération (index partiel de GET /resources/pending)
+        repository.resources(db).insert(resource)
+        adjust_counts(db, resource['id_categorie'], total=1)
+        bump_version(db, RESOURCES)
 
-        sanitized = sanitize(resource)
-        print(f"✅ Ressource créée avec ID: {sanitized['_id']}")
-        return jsonify(sanitized), 201
+        logger.info("Ressource créée avec ID: %s", resource['_id'])
+        return jsonify(resource), 201
 
     except Exception as e:
-        print(f"❌ Erreur lors de la création: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception("Erreur lors de la création: %s", e)
         return jsonify({"error": f"Erreur serveur: {str(e)}"}), 500
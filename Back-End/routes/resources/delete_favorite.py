@@ -3,18 +3,23 @@ from bson import ObjectId
 from config.database import get_db
 from . import resources_bp
 from utils.auth import get_user_id_from_token
+from utils.logger import get_logger
+from utils import repository
+from utils.conditional import bump_version, RESOURCE_COUNTERS
+
+logger = get_logger(__name__)
 
 @resources_bp.route('/favorite/<resource_id>', methods=['DELETE'])
 def remove_favorite(resource_id):
     """
     Route pour supprimer une ressource des favoris
     """
-    print("🔄 Début de la route remove_favorite")
+    logger.debug("Début de la route remove_favorite")
     
     # Vérification du token
     token_cookie = request.cookies.get('access_token')
     if not token_cookie:
-        print("❌ Token manquant ou mal formé")
+        logger.warning("Token manquant ou mal formé")
         return jsonify({"error": "Token manquant ou invalide"}), 401
 
     user_id = get_user_id_from_token(token_cookie)
@@ -23,35 +28,35 @@ def remove_favorite(resource_id):
     
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     try:
         # Vérifier si le favori existe
-        existing_favorite = db.favoris.find_one({
+        existing_favorite = repository.favorites(db).exists({
             "user_id": user_id,
             "resource_id": ObjectId(resource_id)
         })
         
         if not existing_favorite:
-            print(f"⚠️ Aucun favori trouvé pour l'utilisateur {user_id} et la ressource {resource_id}")
+            logger.warning("Aucun favori trouvé pour l'utilisateur %s et la ressource %s", user_id, resource_id)
             return jsonify({"error": "Cette ressource n'est pas dans vos favoris"}), 404
 
         # Supprimer le favori
-        result = db.favoris.delete_one({
+        deleted = repository.favorites(db).delete_one({
             "user_id": user_id,
             "resource_id": ObjectId(resource_id)
         })
         
-        if result.deleted_count == 0:
-            print(f"❌ Erreur lors de la suppression du favori")
+        if not deleted:
+            logger.error("Erreur lors de la suppression du favori")
             return jsonify({"error": "Erreur lors de la suppression du favori"}), 500
+        repository.resources(db).increment(resource_id, "favorites_count", -1, query={"favorites_count": {"$gt": 0}})
+        bump_version(db, RESOURCE_COUNTERS)
 
-        print(f"✅ Favori supprimé avec succès pour l'utilisateur {user_id} et la ressource {resource_id}")
+        logger.info("Favori supprimé avec succès pour l'utilisateur %s et la ressource %s", user_id, resource_id)
         return jsonify({"message": "Favori supprimé avec succès"}), 200
 
     except Exception as e:
-        print(f"❌ Erreur lors de la suppression du favori: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la suppression du favori: %s", e)
         return jsonify({"error": f"Erreur lors de la suppression du favori: {str(e)}"}), 500 
\ No newline at end of file
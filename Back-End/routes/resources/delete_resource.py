@@ -1,9 +1,15 @@
 from flask import request, jsonify
-from bson import ObjectId
 from config.database import get_db
 from . import resources_bp
-from utils.auth import get_user_id_from_token
+from utils.auth import load_principal
+from utils.roles import has_permission, PERM_MODERATE
 from flask_cors import cross_origin
+from utils.logger import get_logger
+from utils import repository
+from utils.conditional import bump_version, RESOURCES
+from utils.category_counts import adjust_counts
+
+logger = get_logger(__name__)
 
 @resources_bp.route('/delete/<resource_id>', methods=['DELETE'])
 @cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
@@ -12,74 +18,77 @@ def delete_resource(resource_id):
     Route pour supprimer une ressource
     Seuls le propriétaire de la ressource ou un modérateur peuvent la supprimer
     """
-    print(f" Début de la route delete_resource pour l'ID: {resource_id}")
+    logger.debug("Début de la route delete_resource pour l'ID: %s", resource_id)
 
     # Vérification du token
     token_cookie = request.cookies.get('access_token')
     if not token_cookie:
-        print(" Token manquant ou mal formé")
+        logger.warning("Token manquant ou mal formé")
         return jsonify({"error": "Token manquant ou invalide"}), 401
 
-    user_id = get_user_id_from_token(token_cookie)
-    if not user_id:
+    # Token et utilisateur en un seul aller-retour
+    principal = load_principal(token_cookie)
+    if not principal:
         return jsonify({"error": "Token invalide"}), 401
+    user_id = principal.user_id
 
     db = get_db()
     if db is None:
-        print(" Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     try:
         # Vérifier si l'utilisateur existe
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = principal.user
         if not user:
-            print(" Utilisateur non trouvé")
+            logger.warning("Utilisateur non trouvé")
             return jsonify({"error": "Utilisateur non trouvé"}), 404
 
-        # Vérifier si l'utilisateur est modérateur
-        role = db.role.find_one({"_id": user.get("role_id")})
-        is_moderator = role and role.get("nom_role") == "modérateur"
+        # Vérifier si l'utilisateur peut modérer
+        is_moderator = has_permission(principal, PERM_MODERATE)
 
         # Récupérer la ressource
-        resource = db.ressource.find_one({"_id": ObjectId(resource_id)})
+        resource = repository.resources(db).get(resource_id)
         if not resource:
-            print(f" Ressource non trouvée pour l'ID: {resource_id}")
+            logger.warning("Ressource non trouvée pour l'ID: %s", resource_id)
             return jsonify({"error": "Ressource non trouvée"}), 404
 
         # Vérifier les permissions
         is_owner = str(resource.get("id_publieur")) == str(user_id)
         if not (is_owner or is_moderator):
-            print(" Accès refusé : l'utilisateur n'est ni le propriétaire ni un modérateur")
+            logger.warning("Accès refusé : l'utilisateur n'est ni le propriétaire ni un modérateur")
             return jsonify({"error": "Accès non autorisé"}), 403
 
-        # Supprimer les commentaires associés
-        db.commentaire.delete_many({"resource_id": ObjectId(resource_id)})
-        print(f" Commentaires associés supprimés pour la ressource: {resource_id}")
+        resource_oid = resource["_id"]
+
+        # Supprimer les commentaires associés (id_ressource : post_comments ; resource_id : comments)
+        repository.comments(db).delete_many({"$or": [{"id_ressource": resource_oid}, {"resource_id": resource_oid}]})
+        logger.info("Commentaires associés supprimés pour la ressource: %s", resource_id)
 
         # Supprimer les sous-commentaires associés
-        db.sous_commentaire.delete_many({"resource_id": ObjectId(resource_id)})
-        print(f" Sous-commentaires associés supprimés pour la ressource: {resource_id}")
+        # Réponses antérieures à la migration 0003 : resource_id encore en chaîne
+        repository.replies(db).delete_many({"resource_id": {"$in": [resource_oid, str(resource_oid)]}})
+        logger.info("Sous-commentaires associés supprimés pour la ressource: %s", resource_id)
 
         # Supprimer les favoris associés
-        db.favoris.delete_many({"resource_id": ObjectId(resource_id)})
-        print(f" Favoris associés supprimés pour la ressource: {resource_id}")
+        repository.favorites(db).delete_many({"resource_id": resource_oid})
+        logger.info("Favoris associés supprimés pour la ressource: %s", resource_id)
 
         # Supprimer l'historique associé
-        db.historique.delete_many({"resource_id": ObjectId(resource_id)})
-        print(f" Historique associé supprimé pour la ressource: {resource_id}")
+        repository.history(db).delete_many({"resource_id": resource_oid})
+        logger.info("Historique associé supprimé pour la ressource: %s", resource_id)
 
         # Supprimer la ressource
-        result = db.ressource.delete_one({"_id": ObjectId(resource_id)})
-        
-        if result.deleted_count == 0:
-            print(" Erreur lors de la suppression de la ressource")
+        if not repository.resources(db).delete(resource_oid):
+            logger.error("Erreur lors de la suppression de la ressource")
             return jsonify({"error": "Erreur lors de la suppression de la ressource"}), 500
+        adjust_counts(db, resource.get("id_categorie"), total=-1,
+                      approved=-1 if resource.get("approved") is True else 0)
+        bump_version(db, RESOURCES)
 
-        print(f" Ressource supprimée avec succès: {resource_id}")
+        logger.info("Ressource supprimée avec succès: %s", resource_id)
         return jsonify({"message": "Ressource supprimée avec succès"}), 200
 
     except Exception as e:
-        print(f" Erreur lors de la suppression de la ressource: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la suppression de la ressource: %s", e)
         return jsonify({"error": f"Erreur lors de la suppression de la ressource: {str(e)}"}), 500 
\ No newline at end of file
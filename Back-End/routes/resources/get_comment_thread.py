@@ -0,0 +1,136 @@
+from flask import request, jsonify
+from bson import ObjectId
+from bson.errors import InvalidId
+from config.database import get_db
+from config.migrations import (is_applied, unwrap_dates, COMMENTAIRE_DATES, SOUS_COMMENTAIRE_DATES,
+                               SOUS_COMMENTAIRE_OBJECT_IDS, MIGRATIONS_RETRY_INTERVAL)
+from . import resources_bp
+from utils.logger import get_logger
+from utils import repository
+from utils.pagination import parse_limit, encode_cursor, decode_cursor, keyset_filter
+from utils.projections import projection_for, DETAIL
+from utils.profiles import get_public_profiles, hydrate_authors
+
+logger = get_logger(__name__)
+
+# Tri des commentaires : les plus récents d'abord
+SORT = 'recent'
+SORT_FIELD = 'date_publication'
+
+# Réponses renvoyées avec chaque commentaire (paramètre replies)
+DEFAULT_REPLIES = 3
+MAX_REPLIES = 20
+
+
+def thread_pipeline(resource_id, query, limit, replies, legacy_ids=False):
+    """
+    Page de commentaires avec, pour chacun, le nombre de réponses et les
+    premières réponses. Les deux $lookup filtrent sous_commentaire sur
+    resource_id puis comment_id : index (resource_id, comment_id, created_at).
+    legacy_ids : références des réponses encore en chaînes (migration en cours).
+    """
+    if legacy_ids:
+        replies_of = {
+            "resource_id": {"$in": [resource_id, str(resource_id)]},
+            "$expr": {"$in": ["$comment_id", ["$$comment_id", {"$toString": "$$comment_id"}]]},
+        }
+    else:
+        replies_of = {"resource_id": resource_id, "$expr": {"$eq": ["$comment_id", "$$comment_id"]}}
+    return [
+        {"$match": query},
+        {"$sort": {SORT_FIELD: -1, "_id": -1}},
+        # Un commentaire de plus que demandé pour savoir s'il reste une page
+        {"$limit": limit + 1},
+        {"$project": projection_for('commentaire', DETAIL)},
+        {"$lookup": {
+            "from": "sous_commentaire",
+            "let": {"comment_id": "$_id"},
+            "pipeline": [
+                {"$match": replies_of},
+                {"$sort": {"created_at": 1}},
+                {"$limit": replies},
+            ],
+            "as": "replies",
+        }},
+        {"$lookup": {
+            "from": "sous_commentaire",
+            "let": {"comment_id": "$_id"},
+            "pipeline": [
+                {"$match": replies_of},
+                {"$count": "count"},
+            ],
+            "as": "replies_total",
+        }},
+        {"$addFields": {"replies_count": {"$ifNull": [{"$arrayElemAt": ["$replies_total.count", 0]}, 0]}}},
+        {"$project": {"replies_total": 0}},
+    ]
+
+
+@resources_bp.route('/comments/<resource_id>/thread', methods=['GET'])
+def get_comment_thread(resource_id):
+    """
+    Route pour récupérer un fil de commentaires page par page, en un appel.
+
+    Paramètres : limit, cursor (valeur de l'en-tête X-Next-Cursor de la page
+    précédente), replies (nombre de réponses par commentaire, 3 par défaut).
+    Chaque commentaire porte replies, replies_count et le nom de son auteur.
+    Tant que la migration des dates des commentaires (0001) n'est pas terminée,
+    la route répond 503 : le curseur porte sur date_publication, dont les
+    valeurs {"$date": ...} ne se comparent pas aux dates BSON.
+    """
+    logger.debug("Début de la route get_comment_thread")
+
+    db = get_db()
+    if db is None:
+        logger.error("Erreur: Base de données non connectée")
+        return jsonify({"error": "Erreur de connexion à la base de données"}), 500
+
+    try:
+        resource_oid = ObjectId(resource_id)
+        limit = parse_limit(request.args.get('limit'))
+        replies = parse_limit(request.args.get('replies'), default=DEFAULT_REPLIES, maximum=MAX_REPLIES)
+        query = {"id_ressource": resource_oid}
+        if request.args.get('cursor'):
+            value, last_id = decode_cursor(request.args['cursor'], SORT)
+            query = {'$and': [query, keyset_filter(SORT_FIELD, value, last_id)]}
+    except (ValueError, InvalidId) as e:
+        logger.warning("Paramètres de fil de commentaires invalides: %s", e)
+        return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
+
+    try:
+        if not is_applied(db, COMMENTAIRE_DATES):
+            logger.warning("Fil de commentaires indisponible : migration %s en cours", COMMENTAIRE_DATES)
+            return (jsonify({"error": "Migration des dates des commentaires en cours, réessayez plus tard"}), 503,
+                    {'Retry-After': str(max(1, int(MIGRATIONS_RETRY_INTERVAL)))})
+
+        # Vérifier si la ressource existe
+        if not repository.resources(db).exists(resource_oid):
+            logger.warning("Ressource non trouvée pour l'ID: %s", resource_id)
+            return jsonify({"error": "Ressource non trouvée"}), 404
+
+        legacy_ids = not is_applied(db, SOUS_COMMENTAIRE_OBJECT_IDS)
+        comments = list(repository.comments(db).aggregate(thread_pipeline(resource_oid, query, limit, replies, legacy_ids)))
+        has_more = len(comments) > limit
+        comments = comments[:limit]
+        # Dates laissées en {"$date": ...} par la migration (valeur illisible, voir ses logs)
+        unwrap_dates(comments, SORT_FIELD)
+        unwrap_dates(comments, "createdAt")
+        next_cursor = encode_cursor(SORT, comments[-1], SORT_FIELD) if has_more else None
+
+        preview_replies = [reply for comment in comments for reply in comment["replies"]]
+        if not is_applied(db, SOUS_COMMENTAIRE_DATES):
+            unwrap_dates(preview_replies, "created_at")
+
+        # Auteurs des commentaires et des réponses, en une requête pour toute la page
+        get_public_profiles(db, [comment.get("id_user") for comment in comments]
+                            + [reply.get("user_id") for reply in preview_replies])
+        hydrate_authors(db, comments, "id_user")
+        hydrate_authors(db, preview_replies, "user_id")
+
+        logger.debug("%s commentaires récupérés pour la ressource %s", len(comments), resource_id)
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else None
+        return jsonify(comments), 200, headers
+
+    except Exception as e:
+        logger.exception("Erreur lors de la récupération du fil de commentaires: %s", e)
+        return jsonify({"error": f"Erreur lors de la récupération du fil de commentaires: {str(e)}"}), 500
@@ -1,49 +1,50 @@
 from flask import request, jsonify
-from datetime import datetime
 from bson import ObjectId
 from config.database import get_db
 from . import resources_bp
 from utils.auth import get_user_id_from_token
+from utils.logger import get_logger
+from utils import repository
+from utils.projections import parse_fields
+from utils.profiles import hydrate_authors
+
+logger = get_logger(__name__)
 
 @resources_bp.route('/comments/<resource_id>', methods=['GET'])
 def get_comments(resource_id):
     """
-    Route pour récupérer les commentaires d'une ressource spécifique
+    Route pour récupérer les commentaires d'une ressource spécifique (fields : detail par défaut),
+    avec le nom de leur auteur (nom_utilisateur, prenom_utilisateur)
     """
-    print("🔄 Début de la route get_comments")
+    logger.debug("Début de la route get_comments")
     
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
+    try:
+        projection = parse_fields('commentaire', request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
+
     try:
         # Vérifier si la ressource existe
-        resource = db.ressource.find_one({"_id": ObjectId(resource_id)})
-        if not resource:
-            print(f"❌ Ressource non trouvée pour l'ID: {resource_id}")
+        if not repository.resources(db).exists(resource_id):
+            logger.warning("Ressource non trouvée pour l'ID: %s", resource_id)
             return jsonify({"error": "Ressource non trouvée"}), 404
 
         # Récupérer les commentaires de la ressource
-        comments = list(db.commentaire.find({"id_ressource": ObjectId(resource_id)}).sort("date_publication", -1))
-        
-        # Fonction pour convertir les ObjectId et datetime
-        def sanitize(document):
-            for key, value in document.items():
-                if isinstance(value, ObjectId):
-                    document[key] = str(value)
-                elif isinstance(value, datetime):
-                    document[key] = value.isoformat()
-            return document
-
-        # Convertir les ObjectId et datetime en string
-        comments = [sanitize(comment) for comment in comments]
-
-        print(f"✅ {len(comments)} commentaires récupérés pour la ressource {resource_id}")
+        comments = list(repository.comments(db).find({"id_ressource": ObjectId(resource_id)}, projection,
+                                                    sort=[("date_publication", -1)]))
+
+        # Noms des auteurs, en une requête pour toute la liste
+        if projection is None or "id_user" in projection:
+            hydrate_authors(db, comments, "id_user")
+
+        logger.debug("%s commentaires récupérés pour la ressource %s", len(comments), resource_id)
         return jsonify(comments), 200
 
     except Exception as e:
-        print(f"❌ Erreur lors de la récupération des commentaires: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la récupération des commentaires: %s", e)
         return jsonify({"error": f"Erreur lors de la récupération des commentaires: {str(e)}"}), 500 
\ No newline at end of file
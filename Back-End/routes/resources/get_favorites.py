@@ -1,21 +1,42 @@
 from flask import request, jsonify
-from datetime import datetime
 from bson import ObjectId
+from bson.errors import InvalidId
 from config.database import get_db
 from . import resources_bp
 from utils.auth import get_user_id_from_token
+from utils.logger import get_logger
+from utils import repository
+from utils.pagination import parse_limit, decode_cursor
+from utils.projections import projection_for, CARD
+
+logger = get_logger(__name__)
+
+# Tri de la liste : favoris les plus récents d'abord
+SORT = 'recent'
+SORT_FIELD = 'created_at'
+
+
+def _resource_projection():
+    # Vue card (sans contenu) et date de publication
+    projection = projection_for('ressource', CARD)
+    projection['date_publication'] = 1
+    return projection
+
 
 @resources_bp.route('/favorites', methods=['GET'])
 def get_favorites():
     """
-    Route pour récupérer tous les favoris de l'utilisateur connecté
+    Route pour récupérer les favoris de l'utilisateur connecté, page par page.
+
+    Paramètres : limit, cursor (valeur de l'en-tête X-Next-Cursor de la page
+    précédente). Les ressources sont lues en une seule requête ($in), sans contenu.
     """
-    print("🔄 Début de la route get_favorites")
+    logger.debug("Début de la route get_favorites")
 
     # Vérification du token
     token_cookie = request.cookies.get('access_token')
     if not token_cookie:
-        print("❌ Token manquant ou mal formé")
+        logger.warning("Token manquant ou mal formé")
         return jsonify({"error": "Token manquant ou invalide"}), 401
 
     user_id = get_user_id_from_token(token_cookie)
@@ -24,43 +45,53 @@ def get_favorites():
 
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     try:
-        # Récupérer tous les favoris de l'utilisateur
-        favorites = list(db.favoris.find({"user_id": ObjectId(user_id)}))
+        limit = parse_limit(request.args.get('limit'))
+        query = {"user_id": ObjectId(user_id)}
+        after = decode_cursor(request.args['cursor'], SORT) if request.args.get('cursor') else None
+    except (ValueError, InvalidId) as e:
+        logger.warning("Paramètres de liste invalides: %s", e)
+        return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
+
+    try:
+        favorites, next_cursor = repository.favorites(db).page(query, SORT, SORT_FIELD, limit, after)
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else None
 
         if not favorites:
-            print(f"ℹ️ Aucun favori trouvé pour l'utilisateur {user_id}")
-            return jsonify([]), 200
+            logger.debug("Aucun favori trouvé pour l'utilisateur %s", user_id)
+            return jsonify([]), 200, headers
+
+        # Ressources de la page en un seul aller-retour
+        resource_ids = [favorite["resource_id"] for favorite in favorites]
+        resources = {
+            resource["_id"]: resource
+            for resource in repository.resources(db).get_many(resource_ids, projection=_resource_projection())
+        }
 
-        # Pour chaque favori, récupérer les détails de la ressource
         favorites_with_details = []
         for favorite in favorites:
-            # Récupérer la ressource associée
-            resource = db.ressource.find_one({"_id": favorite["resource_id"]})
+            resource = resources.get(favorite["resource_id"])
             if resource:
                 # Préparer les données du favori avec les détails de la ressource
-                favorite_data = {
+                favorites_with_details.append({
                     "favorite_id": str(favorite["_id"]),
                     "created_at": favorite["created_at"].isoformat(),
                     "resource": {
                         "id": str(resource["_id"]),
                         "titre": resource.get("titre", ""),
-                        "contenu": resource.get("contenu", ""),
-                        "categorie": resource.get("categorie", ""),
-                        "date_publication": resource.get("date_publication", {}).get("date", ""),
+                        "extrait": resource.get("extrait", ""),
+                        "categorie": str(resource.get("id_categorie") or ""),
+                        "date_publication": (resource.get("date_publication") or {}).get("date", ""),
                         "id_publieur": str(resource.get("id_publieur", ""))
                     }
-                }
-                favorites_with_details.append(favorite_data)
+                })
 
-        print(f"✅ {len(favorites_with_details)} favoris trouvés pour l'utilisateur {user_id}")
-        return jsonify(favorites_with_details), 200
+        logger.debug("%s favoris trouvés pour l'utilisateur %s", len(favorites_with_details), user_id)
+        return jsonify(favorites_with_details), 200, headers
 
     except Exception as e:
-        print(f"❌ Erreur lors de la récupération des favoris: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
-        return jsonify({"error": f"Erreur lors de la récupération des favoris: {str(e)}"}), 500
\ No newline at end of file
+        logger.exception("Erreur lors de la récupération des favoris: %s", e)
+        return jsonify({"error": f"Erreur lors de la récupération des favoris: {str(e)}"}), 500
@@ -1,46 +1,45 @@
-from flask import jsonify
-from bson import ObjectId
+from flask import jsonify, request
 from config.database import get_db
 from . import resources_bp
-from datetime import datetime
+from utils.logger import get_logger
+from utils import repository
+from utils.conditional import conditional, resource_versions
+from utils.response_cache import cached_response
+from utils.projections import parse_fields
+
+logger = get_logger(__name__)
 
 
 @resources_bp.route('/ressource=<id>', methods=['GET'])
+@conditional(resource_versions)
+@cached_response(resource_versions)
 def get_resource(id):
     """
-    Route pour récupérer une ressource par son ID
+    Route pour récupérer une ressource par son ID (fields : detail par défaut)
     """
-    print(f"🔄 Début de la route get_resource pour l'ID: {id}")
+    logger.debug("Début de la route get_resource pour l'ID: %s", id)
 
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
+    try:
+        projection = parse_fields('ressource', request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
+
     try:
         # Récupérer la ressource
-        resource = db.ressource.find_one({"_id": ObjectId(id)})
+        resource = repository.resources(db).get(id, projection=projection)
 
         if not resource:
-            print(f"❌ Ressource non trouvée pour l'ID: {id}")
+            logger.warning("Ressource non trouvée pour l'ID: %s", id)
             return jsonify({"error": "Ressource non trouvée"}), 404
 
-        # Fonction pour convertir les ObjectId et datetime
-        def sanitize(document):
-            for key, value in document.items():
-                if isinstance(value, ObjectId):
-                    document[key] = str(value)
-                elif isinstance(value, datetime):
-                    document[key] = value.isoformat()
-            return document
-
-        sanitized_resource = sanitize(resource)
-
-        print(f"✅ Ressource trouvée: {sanitized_resource.get('titre', '[sans titre]')}")
-        return jsonify(sanitized_resource), 200
+        logger.debug("Ressource trouvée: %s", resource.get('titre', '[sans titre]'))
+        return jsonify(resource), 200
 
     except Exception as e:
-        print(f"❌ Erreur lors de la récupération de la ressource: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la récupération de la ressource: %s", e)
         return jsonify({"error": f"Erreur lors de la récupération de la ressource: {str(e)}"}), 500
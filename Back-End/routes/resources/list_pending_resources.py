@@ -1,69 +1,60 @@
-from flask import request, jsonify
-from datetime import datetime
-from bson import ObjectId
+from flask import jsonify, request
+from bson.errors import InvalidId
 from config.database import get_db
 from . import resources_bp
-from utils.auth import get_user_id_from_token
+from utils.roles import requires, PERM_MODERATE
+from utils.logger import get_logger
+from utils import repository
+from utils.pagination import parse_limit, decode_cursor
+from utils.streaming import stream_json_array
+from utils.projections import parse_fields
+
+logger = get_logger(__name__)
+
+# File de modération : ressources non approuvées, les plus anciennes d'abord
+# (index partiel pending_createdAt_1__id_1, filtre approved: false)
+PENDING_FILTER = {"approved": False}
+SORT = 'pending'
+SORT_FIELD = 'createdAt'
+
 
 @resources_bp.route('/pending', methods=['GET'])
-def list_pending_resources():
+@requires(PERM_MODERATE)
+def list_pending_resources(principal):
     """
-    Route pour lister toutes les ressources en attente d'approbation
+    Route pour lister les ressources en attente d'approbation, page par page,
+    de la plus ancienne à la plus récente.
     Seuls les modérateurs peuvent accéder à cette route
-    """
-    print("🔄 Début de la route list_pending_resources")
-
-    # Vérification du token
-    token_cookie = request.cookies.get('access_token')
-    if not token_cookie:
-        print("❌ Token manquant ou mal formé")
-        return jsonify({"error": "Token manquant ou invalide"}), 401
 
-    user_id = get_user_id_from_token(token_cookie)
-    if not user_id:
-        return jsonify({"error": "Token invalide"}), 401
+    Paramètres : limit, cursor (valeur de l'en-tête X-Next-Cursor de la page
+    précédente), fields.
+    """
+    logger.debug("Début de la route list_pending_resources")
 
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-    print(user_id)
 
     try:
-        # Vérifier si l'utilisateur est modérateur
-        user = db.users.find_one({"_id": ObjectId(user_id)})
-        if not user:
-            print("❌ Utilisateur non trouvé")
-            return jsonify({"error": "Utilisateur non trouvé"}), 404
+        limit = parse_limit(request.args.get('limit'))
+        projection = parse_fields('ressource', request.args.get('fields'))
+        if projection and projection.get('_id') == 1:
+            # Le champ trié est nécessaire au curseur de la page suivante
+            projection.setdefault(SORT_FIELD, 1)
+        after = decode_cursor(request.args['cursor'], SORT) if request.args.get('cursor') else None
+    except (ValueError, InvalidId) as e:
+        logger.warning("Paramètres de file de modération invalides: %s", e)
+        return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
 
-        # Récupérer le rôle de l'utilisateur
-        role = db.role.find_one({"_id": user.get("role_id")})
-        if not role or (role.get("nom_role") != "modérateur" and role.get("nom_role") != "administrateur" and role.get("nom_role") != "super-administrateur"):
-            print("❌ Accès refusé : l'utilisateur n'a pas les droits suffisants")
-            return jsonify({"error": "Accès non autorisé"}), 403
-
-        # Récupérer toutes les ressources en attente
-        pending_resources = list(db.ressources_en_attente.find())
-
-        def sanitize(document):
-            """
-            Fonction pour convertir tous les ObjectId et datetime en string
-            """
-            for key, value in document.items():
-                if isinstance(value, ObjectId):
-                    document[key] = str(value)
-                elif isinstance(value, datetime):
-                    document[key] = value.isoformat()
-            return document
-
-        # Nettoyage des documents
-        sanitized_resources = [sanitize(resource) for resource in pending_resources]
-
-        print(f"✅ {len(sanitized_resources)} ressources en attente trouvées")
-        return jsonify(sanitized_resources), 200
+    try:
+        resources, next_cursor = repository.resources(db).page(
+            PENDING_FILTER, SORT, SORT_FIELD, limit, after, projection, ascending=True
+        )
+        logger.debug("%s ressources en attente", len(resources))
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else None
+        return stream_json_array(resources, headers=headers)
 
     except Exception as e:
-        print(f"❌ Erreur lors de la récupération des ressources en attente: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
-        return jsonify({"error": f"Erreur lors de la récupération des ressources en attente: {str(e)}"}), 500 
\ No newline at end of file
+        logger.exception("Erreur lors de la récupération des ressources en attente: %s", e)
+        return jsonify({"error": f"Erreur lors de la récupération des ressources en attente: {str(e)}"}), 500
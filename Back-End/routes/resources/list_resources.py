@@ -1,47 +1,97 @@
-from flask import jsonify
+from flask import jsonify, request
 from config.database import get_db
 from . import resources_bp
 from bson import ObjectId
+from bson.errors import InvalidId
 from datetime import datetime
-from flask_cors import cross_origin
+from utils.logger import get_logger
+from utils import repository
+from utils.conditional import conditional, resource_versions
+from utils.response_cache import cached_response
+from utils.pagination import parse_limit, decode_cursor
+from utils.streaming import stream_json_array
+from utils.projections import parse_fields, CARD
+
+logger = get_logger(__name__)
+
+# Modes de tri : champ trié (décroissant, puis _id décroissant)
+SORTS = {
+    'recent': 'createdAt',
+    'favorites': 'favorites_count',
+    'views': 'views_count',
+}
+
+
+def _parse_date(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+def build_filters(args):
+    """
+    Filtres de la liste à partir des paramètres de la requête ; ValueError si invalide
+    """
+    query = {}
+    if args.get('categorie'):
+        query['id_categorie'] = ObjectId(args['categorie'])
+    if args.get('id_publieur'):
+        query['id_publieur'] = ObjectId(args['id_publieur'])
+    if args.get('approved') in ('1', 'true'):
+        query['approved'] = True
+    elif args.get('approved') in ('0', 'false'):
+        query['approved'] = {'$ne': True}
+    if args.get('date_from') or args.get('date_to'):
+        query['createdAt'] = {}
+        if args.get('date_from'):
+            query['createdAt']['$gte'] = _parse_date(args['date_from'])
+        if args.get('date_to'):
+            query['createdAt']['$lt'] = _parse_date(args['date_to'])
+    return query
 
 
 @resources_bp.route('/', methods=['GET'])
-@cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
+@conditional(resource_versions)
+@cached_response(resource_versions)
 def list_resources():
     """
-    Route pour lister toutes les ressources
+    Route pour lister les ressources, page par page.
+
+    Paramètres : limit, cursor (valeur de l'en-tête X-Next-Cursor de la page
+    précédente), sort (recent, favorites, views), categorie, id_publieur,
+    approved, date_from, date_to, fields (card par défaut : sans contenu).
     """
-    print("🔄 Début de la route list_resources")
+    logger.debug("Début de la route list_resources")
 
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
+    sort = request.args.get('sort', 'recent')
+    if sort not in SORTS:
+        return jsonify({"error": f"Tri inconnu: {sort} ({', '.join(SORTS)})"}), 400
+    field = SORTS[sort]
+
     try:
-        # Récupérer toutes les ressources
-        resources = list(db.ressource.find())
-
-        def sanitize(document):
-            """
-            Fonction pour convertir tous les ObjectId et datetime en string
-            """
-            for key, value in document.items():
-                if isinstance(value, ObjectId):
-                    document[key] = str(value)
-                elif isinstance(value, datetime):
-                    document[key] = value.isoformat()
-            return document
-
-        # Nettoyage des documents
-        sanitized_resources = [sanitize(resource) for resource in resources]
-
-        print(f"✅ {len(sanitized_resources)} ressources trouvées")
-        return jsonify(sanitized_resources), 200
+        limit = parse_limit(request.args.get('limit'))
+        query = build_filters(request.args)
+        projection = parse_fields('ressource', request.args.get('fields'), default=CARD)
+        if projection and projection.get('_id') == 1:
+            # Le champ trié est nécessaire au curseur de la page suivante
+            projection.setdefault(field, 1)
+        after = decode_cursor(request.args['cursor'], sort) if request.args.get('cursor') else None
+    except (ValueError, InvalidId) as e:
+        logger.warning("Paramètres de liste invalides: %s", e)
+        return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
+
+    try:
+        resources, next_cursor = repository.resources(db).page(query, sort, field, limit, after, projection)
+
+        logger.debug("%s ressources trouvées", len(resources))
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else None
+        # La page est bornée par limit : elle est lue entièrement (le curseur
+        # suivant doit être connu avant l'envoi des en-têtes) puis encodée en flux
+        return stream_json_array(resources, headers=headers)
 
     except Exception as e:
-        print(f"❌ Erreur lors de la récupération des ressources: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la récupération des ressources: %s", e)
         return jsonify({"error": f"Erreur lors de la récupération des ressources: {str(e)}"}), 500
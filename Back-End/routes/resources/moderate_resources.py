@@ -0,0 +1,60 @@
+from collections import Counter
+from flask import request, jsonify
+from bson import ObjectId
+from config.database import get_db
+from . import resources_bp
+from utils.roles import requires, PERM_MODERATE
+from flask_cors import cross_origin
+from utils.logger import get_logger
+from utils.conditional import bump_version, RESOURCES
+from utils.category_counts import adjust_counts
+from utils.moderation import parse_decisions, apply_decisions
+
+logger = get_logger(__name__)
+
+
+@resources_bp.route('/moderate', methods=['POST', 'OPTIONS'])
+@cross_origin(supports_credentials=True, origins=["http://localhost:3000"], methods=['POST', 'OPTIONS'], allow_headers=['Content-Type', 'Authorization'])
+@requires(PERM_MODERATE)
+def moderate_resources(principal):
+    """
+    Route pour approuver ou rejeter plusieurs ressources en attente en un appel.
+
+    Corps : {"decisions": [{"id": "...", "decision": "approve" | "reject", "comment": "..."}]}
+    Les ressources déjà traitées ou réservées par un autre modérateur sont
+    ignorées (skipped).
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    logger.debug("Début de la route moderate_resources")
+
+    try:
+        decisions = parse_decisions(request.get_json(silent=True))
+    except ValueError as e:
+        logger.warning("Décisions invalides: %s", e)
+        return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
+
+    db = get_db()
+    if db is None:
+        logger.error("Erreur: Base de données non connectée")
+        return jsonify({"error": "Erreur de connexion à la base de données"}), 500
+
+    try:
+        approved, rejected, skipped = apply_decisions(db, ObjectId(principal.user_id), decisions)
+
+        # Compteurs des catégories : une mise à jour par catégorie touchée
+        for category_id, count in Counter(resource.get("id_categorie") for resource in approved).items():
+            adjust_counts(db, category_id, approved=count)
+        if approved or rejected:
+            bump_version(db, RESOURCES)
+
+        return jsonify({
+            "approved": [str(resource["_id"]) for resource in approved],
+            "rejected": [str(resource["_id"]) for resource in rejected],
+            "skipped": [str(resource_id) for resource_id in skipped],
+        }), 200
+
+    except Exception as e:
+        logger.exception("Erreur lors de l'application des décisions de modération: %s", e)
+        return jsonify({"error": f"Erreur lors de l'application des décisions de modération: {str(e)}"}), 500
@@ -4,79 +4,66 @@ from bson import ObjectId
 from config.database import get_db
 from . import resources_bp
 from utils.auth import get_user_id_from_token
+from utils.logger import get_logger
+from utils import repository
+from utils.profiles import hydrate_authors
+
+logger = get_logger(__name__)
 
 @resources_bp.route('/comments/<resource_id>', methods=['POST'])
 def post_comment(resource_id):
     """
     Route pour ajouter un commentaire à une ressource
     """
-    print("🔄 Début de la route post_comment")
+    logger.debug("Début de la route post_comment")
     
     # Vérification du token
     token_cookie = request.cookies.get('access_token')
-    print(f"🔑 Token reçu: {token_cookie}")
     if not token_cookie:
-        print("❌ Token manquant ou mal formé")
+        logger.warning("Token manquant ou mal formé")
         return jsonify({"error": "Token manquant ou invalide"}), 401
 
     user_id = get_user_id_from_token(token_cookie)
-    print(f"👤 User ID extrait du token: {user_id}")
+    logger.debug("User ID extrait du token: %s", user_id)
     if not user_id:
-        print("❌ Token invalide ou expiré")
+        logger.warning("Token invalide ou expiré")
         return jsonify({"error": "Token invalide"}), 401
     
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     data = request.get_json()
-    print(f"📝 Données reçues: {data}")
 
     if not data or 'content' not in data:
-        print("❌ Erreur: Contenu manquant")
+        logger.warning("Erreur: Contenu manquant")
         return jsonify({"error": "Contenu requis"}), 400
 
     try:
         # Vérifier si la ressource existe
-        resource = db.ressource.find_one({"_id": ObjectId(resource_id)})
-        if not resource:
-            print(f"❌ Ressource non trouvée pour l'ID: {resource_id}")
+        if not repository.resources(db).exists(resource_id):
+            logger.warning("Ressource non trouvée pour l'ID: %s", resource_id)
             return jsonify({"error": "Ressource non trouvée"}), 404
 
-        # Créer le commentaire avec le format exact de MongoDB
+        # Créer le commentaire (dates BSON, encodées en ISO 8601 dans la réponse)
         current_time = datetime.utcnow()
         comment = {
             "contenu": data['content'],
             "id_user": ObjectId(user_id),
             "id_ressource": ObjectId(resource_id),
             "format": "texte",
-            "date_publication": {"$date": current_time.isoformat()},
-            "createdAt": {"$date": current_time.isoformat()}
+            "date_publication": current_time,
+            "createdAt": current_time
         }
 
         # Insérer dans la base de données
-        result = db.commentaire.insert_one(comment)
-        
-        # Fonction pour convertir les ObjectId et datetime
-        def sanitize(document):
-            for key, value in document.items():
-                if isinstance(value, ObjectId):
-                    document[key] = str(value)
-                elif isinstance(value, dict) and "$date" in value:
-                    document[key] = value["$date"]
-            return document
-
-        # Préparer la réponse
-        comment = sanitize(comment)
-        comment['_id'] = str(result.inserted_id)
+        repository.comments(db).insert(comment)
+        hydrate_authors(db, [comment], 'id_user')
         
-        print(f"✅ Commentaire créé avec l'ID: {comment['_id']}")
-        print(f"📅 Date de publication: {comment['date_publication']}")
+        logger.info("Commentaire créé avec l'ID: %s", comment['_id'])
         return jsonify(comment), 201
 
     except Exception as e:
-        print(f"❌ Erreur lors de la création du commentaire: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la création du commentaire: %s", e)
         return jsonify({"error": f"Erreur lors de la création du commentaire: {str(e)}"}), 500 
\ No newline at end of file
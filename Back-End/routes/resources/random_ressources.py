@@ -1,4 +1,3 @@
-import random
 from flask import jsonify, request
 from bson import ObjectId
 from config.database import get_db
@@ -6,53 +5,48 @@ from . import resources_bp
 from datetime import datetime
 from utils.auth import get_user_id_from_token
 from flask_cors import cross_origin
+from pymongo.errors import DuplicateKeyError
+from utils.logger import get_logger
+from utils import repository
+from utils.conditional import bump_version_throttled, RESOURCE_COUNTERS
+from utils.projections import parse_fields
+from utils.sampling import pick_anonymous, pick_unseen
+
+logger = get_logger(__name__)
 
 
 @resources_bp.route('/randomressource', methods=['GET'])
 @cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
 def get_random_resource():
     """
-    Route pour récupérer une ressource aléatoire non consultée
+    Route pour récupérer une ressource aléatoire non consultée (fields : detail par défaut)
     """
-    print("🎲 Début de la route get_random_resource")
+    logger.debug("Début de la route get_random_resource")
 
     token_cookie = request.cookies.get('access_token')
     user_id = get_user_id_from_token(token_cookie) if token_cookie else None
 
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     try:
-        ressources_consultees = []
+        projection = parse_fields('ressource', request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
+
+    try:
         if user_id:
-            historique = list(db.historique.find({"user_id": ObjectId(user_id)}))
-            ressources_consultees = [str(h["resource_id"]) for h in historique]
-            print(f"📚 Ressources déjà consultées: {ressources_consultees}")
+            resource = pick_unseen(db, user_id, projection)
         else:
-            print("⚠️ Pas d'utilisateur connecté, envoi d'une ressource totalement aléatoire")
+            logger.debug("Pas d'utilisateur connecté, envoi d'une ressource totalement aléatoire")
+            resource = pick_anonymous(db, projection)
 
-        # Vérifier s'il y a des ressources validées
-        pipeline = []
-        
-        # Ne montrer que les ressources validées (date_validation non nulle)
-        pipeline.append({"$match": {"date_validation": {"$ne": None}}})
-        
-        # Exclure les ressources déjà consultées si l'utilisateur est connecté
-        if ressources_consultees:
-            pipeline.append({"$match": {"_id": {"$nin": [ObjectId(id) for id in ressources_consultees]}}})
-        
-        # Sélectionner une ressource aléatoire
-        pipeline.append({"$sample": {"size": 1}})
-
-        resource = list(db.ressource.aggregate(pipeline))
         if not resource:
-            print("ℹ️ Plus de nouvelles ressources disponibles")
+            logger.debug("Plus de nouvelles ressources disponibles")
             return jsonify({"message": "plus de ressources"}), 200
 
-        resource = resource[0]
-
         # Ajouter à l'historique si l'utilisateur est connecté
         if user_id:
             historique_entry = {
@@ -60,27 +54,18 @@ def get_random_resource():
                 "resource_id": resource["_id"],
                 "date_consultation": datetime.utcnow()
             }
-            db.historique.insert_one(historique_entry)
-            print(f"📝 Ressource {resource['_id']} ajoutée à l'historique de l'utilisateur {user_id}")
-
-        def sanitize(document):
-            """
-            Fonction pour convertir tous les ObjectId et datetime en string
-            """
-            result = document.copy()  # Créer une copie pour éviter de modifier l'original
-            for key, value in result.items():
-                if isinstance(value, ObjectId):
-                    result[key] = str(value)
-                elif isinstance(value, datetime):
-                    result[key] = value.isoformat()
-            return result
+            try:
+                repository.history(db).insert(historique_entry)
+                repository.resources(db).increment(resource["_id"], "views_count")
+                bump_version_throttled(db, RESOURCE_COUNTERS)
+                logger.info("Ressource %s ajoutée à l'historique de l'utilisateur %s", resource['_id'], user_id)
+            except DuplicateKeyError:
+                # Consultation concurrente de la même ressource
+                pass
 
-        sanitized_resource = sanitize(resource)
-        print(f"✅ Ressource aléatoire trouvée: {sanitized_resource.get('titre', '[sans titre]')}")
-        return jsonify(sanitized_resource), 200
+        logger.debug("Ressource aléatoire trouvée: %s", resource.get('titre', '[sans titre]'))
+        return jsonify(resource), 200
 
     except Exception as e:
-        print(f"❌ Erreur lors de la récupération de la ressource aléatoire: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la récupération de la ressource aléatoire: %s", e)
         return jsonify({"error": f"Erreur lors de la récupération de la ressource aléatoire: {str(e)}"}), 500
@@ -0,0 +1,43 @@
+from flask import request, jsonify
+from bson import ObjectId
+from config.database import get_db
+from . import resources_bp
+from utils.roles import requires, PERM_MODERATE
+from flask_cors import cross_origin
+from utils.logger import get_logger
+from utils.moderation import release_claims
+
+logger = get_logger(__name__)
+
+
+@resources_bp.route('/pending/release', methods=['POST', 'OPTIONS'])
+@cross_origin(supports_credentials=True, origins=["http://localhost:3000"], methods=['POST', 'OPTIONS'], allow_headers=['Content-Type', 'Authorization'])
+@requires(PERM_MODERATE)
+def release_pending_resources(principal):
+    """
+    Route pour rendre à la file des ressources réservées (corps : {"ids": [...]})
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        return jsonify({"error": "ids doit être une liste non vide"}), 400
+    invalid = [str(resource_id) for resource_id in ids if not ObjectId.is_valid(resource_id)]
+    if invalid:
+        return jsonify({"error": f"Identifiants invalides: {', '.join(invalid)}"}), 400
+
+    db = get_db()
+    if db is None:
+        logger.error("Erreur: Base de données non connectée")
+        return jsonify({"error": "Erreur de connexion à la base de données"}), 500
+
+    try:
+        released = release_claims(db, ObjectId(principal.user_id), ids)
+        logger.debug("%s réservations libérées", released)
+        return jsonify({"released": released}), 200
+
+    except Exception as e:
+        logger.exception("Erreur lors de la libération des réservations: %s", e)
+        return jsonify({"error": f"Erreur lors de la libération des réservations: {str(e)}"}), 500
@@ -2,8 +2,14 @@ from flask import request, jsonify
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_db
+from config.migrations import is_applied, unwrap_dates, SOUS_COMMENTAIRE_DATES, SOUS_COMMENTAIRE_OBJECT_IDS
 from . import resources_bp
 from utils.auth import get_user_id_from_token
+from utils.logger import get_logger
+from utils import repository
+from utils.profiles import hydrate_authors, get_public_profiles, UNKNOWN_AUTHOR
+
+logger = get_logger(__name__)
 
 
 @resources_bp.route('/sous_comments/<resource_id>/replies/<comment_id>', methods=['OPTIONS'])
@@ -19,75 +25,43 @@ def get_sous_comments(resource_id, comment_id):
     """
     Route pour récupérer les sous-commentaires d'un commentaire spécifique
     """
-    print("🔄 Début de la route get_sous_comments")
-    print(f"🔄 Ressource ID: {resource_id}")
-    print(f"🔄 Comment ID: {comment_id}")
+    logger.debug("Début de la route get_sous_comments")
+    logger.debug("Ressource ID: %s", resource_id)
+    logger.debug("Comment ID: %s", comment_id)
     
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     try:
         # Vérifier si la ressource existe
-        resource = db.ressource.find_one({"_id": ObjectId(resource_id)})
-        if not resource:
-            print(f"❌ Ressource non trouvée pour l'ID: {resource_id}")
+        if not repository.resources(db).exists(resource_id):
+            logger.warning("Ressource non trouvée pour l'ID: %s", resource_id)
             return jsonify({"error": "Ressource non trouvée"}), 404
 
         # Vérifier si le commentaire parent existe
-        comment = db.commentaire.find_one({"_id": ObjectId(comment_id)})
-        if not comment:
-            print(f"❌ Commentaire non trouvé pour l'ID: {comment_id}")
+        if not repository.comments(db).exists(comment_id):
+            logger.warning("Commentaire non trouvé pour l'ID: %s", comment_id)
             return jsonify({"error": "Commentaire non trouvé"}), 404
 
         # Récupérer tous les sous-commentaires pour ce commentaire
-        sous_comments = list(db.sous_commentaire.find({
-            "resource_id": resource_id,
-            "comment_id": comment_id
-        }).sort("created_at", 1))  # Tri par date croissante
-
-        # Fonction pour convertir les ObjectId et datetime
-        def sanitize(document):
-            for key, value in document.items():
-                if isinstance(value, ObjectId):
-                    document[key] = str(value)
-                elif isinstance(value, datetime):
-                    document[key] = value.isoformat()
-                elif isinstance(value, dict) and "$date" in value:
-                    document[key] = value["$date"]
-            return document
-
-        # Convertir et enrichir avec les informations utilisateur
-        enriched_sous_comments = []
-        for sous_comment in sous_comments:
-            sous_comment = sanitize(sous_comment)
-            
-            # Récupérer les informations utilisateur
-            user_id = sous_comment.get('user_id')
-            if user_id:
-                try:
-                    user = db.utilisateur.find_one({"_id": ObjectId(user_id)})
-                    if user:
-                        sous_comment['nom_utilisateur'] = user.get('nom', '')
-                        sous_comment['prenom_utilisateur'] = user.get('prenom', '')
-                    else:
-                        sous_comment['nom_utilisateur'] = 'Utilisateur'
-                        sous_comment['prenom_utilisateur'] = ''
-                except Exception as e:
-                    print(f"⚠️ Impossible de récupérer l'utilisateur {user_id}: {e}")
-                    sous_comment['nom_utilisateur'] = 'Utilisateur'
-                    sous_comment['prenom_utilisateur'] = ''
-            
-            enriched_sous_comments.append(sous_comment)
-
-        print(f"✅ {len(enriched_sous_comments)} sous-commentaires récupérés pour le commentaire {comment_id}")
-        return jsonify(enriched_sous_comments), 200
+        query = {"resource_id": ObjectId(resource_id), "comment_id": ObjectId(comment_id)}
+        if not is_applied(db, SOUS_COMMENTAIRE_OBJECT_IDS):
+            # Migration en cours : références encore enregistrées en chaînes
+            query = {field: {"$in": [value, str(value)]} for field, value in query.items()}
+        sous_comments = list(repository.replies(db).find(query, sort=[("created_at", 1)]))  # Tri par date croissante
+        if not is_applied(db, SOUS_COMMENTAIRE_DATES):
+            unwrap_dates(sous_comments, 'created_at')
+
+        # Enrichir avec les informations utilisateur, en une requête pour toutes les réponses
+        hydrate_authors(db, sous_comments, 'user_id')
+
+        logger.debug("%s sous-commentaires récupérés pour le commentaire %s", len(sous_comments), comment_id)
+        return jsonify(sous_comments), 200
 
     except Exception as e:
-        print(f"❌ Erreur lors de la récupération des sous-commentaires: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la récupération des sous-commentaires: %s", e)
         return jsonify({"error": f"Erreur lors de la récupération des sous-commentaires: {str(e)}"}), 500
 
 
@@ -96,14 +70,14 @@ def add_sous_comment(resource_id, comment_id):
     """
     Route pour ajouter un sous-commentaire à un commentaire
     """
-    print("🔄 Début de la route add_sous_comment")
-    print(f"🔄 Ressource ID: {resource_id}")
-    print(f"🔄 Comment ID: {comment_id}")
+    logger.debug("Début de la route add_sous_comment")
+    logger.debug("Ressource ID: %s", resource_id)
+    logger.debug("Comment ID: %s", comment_id)
     
     # Vérification du token
     token_cookie = request.cookies.get('access_token')
     if not token_cookie:
-        print("❌ Token manquant ou mal formé")
+        logger.warning("Token manquant ou mal formé")
         return jsonify({"error": "Token manquant ou invalide"}), 401
 
     user_id = get_user_id_from_token(token_cookie)
@@ -112,63 +86,58 @@ def add_sous_comment(resource_id, comment_id):
     
     db = get_db()
     if db is None:
-        print("❌ Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     data = request.get_json()
-    print(f"📝 Données reçues: {data}")
 
     if not data or 'content' not in data:
-        print("❌ Erreur: Contenu manquant")
+        logger.warning("Erreur: Contenu manquant")
         return jsonify({"error": "Contenu requis"}), 400
 
     try:
         # Vérifier si la ressource existe
-        resource = db.ressource.find_one({"_id": ObjectId(resource_id)})
-        if not resource:
-            print(f"❌ Ressource non trouvée pour l'ID: {resource_id}")
+        if not repository.resources(db).exists(resource_id):
+            logger.warning("Ressource non trouvée pour l'ID: %s", resource_id)
             return jsonify({"error": "Ressource non trouvée"}), 404
 
         # Vérifier si le commentaire parent existe
-        comment = db.commentaire.find_one({"_id": ObjectId(comment_id)})
-        if not comment:
-            print(f"❌ Commentaire non trouvé pour l'ID: {comment_id}")
+        if not repository.comments(db).exists(comment_id):
+            logger.warning("Commentaire non trouvé pour l'ID: %s", comment_id)
             return jsonify({"error": "Commentaire non trouvé"}), 404
 
         # Créer le sous-commentaire selon la structure de votre collection
         sous_comment = {
             "content": data['content'],
             "user_id": ObjectId(user_id),
-            "resource_id": resource_id,  # String comme dans votre exemple
-            "comment_id": comment_id,    # String comme dans votre exemple
-            "created_at": {"$date": datetime.utcnow().isoformat()}
+            "resource_id": ObjectId(resource_id),
+            "comment_id": ObjectId(comment_id),
+            "created_at": datetime.utcnow()
         }
 
         # Insérer dans la base de données
-        result = db.sous_commentaire.insert_one(sous_comment)
+        inserted_id = repository.replies(db).insert(sous_comment)
         
         # Récupérer les informations utilisateur pour la réponse
-        user = db.utilisateur.find_one({"_id": ObjectId(user_id)})
-        nom_utilisateur = user.get('nom', '') if user else 'Utilisateur'
-        prenom_utilisateur = user.get('prenom', '') if user else ''
+        profile = get_public_profiles(db, [user_id]).get(str(user_id), UNKNOWN_AUTHOR)
+        nom_utilisateur = profile['nom']
+        prenom_utilisateur = profile['prenom']
         
         # Préparer la réponse en convertissant les ObjectId
         response_comment = {
-            "_id": str(result.inserted_id),
+            "_id": str(inserted_id),
             "content": sous_comment['content'],
             "user_id": str(sous_comment['user_id']),
-            "resource_id": sous_comment['resource_id'],
-            "comment_id": sous_comment['comment_id'],
+            "resource_id": str(sous_comment['resource_id']),
+            "comment_id": str(sous_comment['comment_id']),
             "created_at": sous_comment['created_at'],
             "nom_utilisateur": nom_utilisateur,
             "prenom_utilisateur": prenom_utilisateur
         }
         
-        print(f"✅ Sous-commentaire créé avec l'ID: {response_comment['_id']}")
+        logger.info("Sous-commentaire créé avec l'ID: %s", response_comment['_id'])
         return jsonify(response_comment), 201
 
     except Exception as e:
-        print(f"❌ Erreur lors de la création du sous-commentaire: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la création du sous-commentaire: %s", e)
         return jsonify({"error": f"Erreur lors de la création du sous-commentaire: {str(e)}"}), 500 
\ No newline at end of file
@@ -3,8 +3,17 @@ from datetime import datetime
 from bson import ObjectId
 from config.database import get_db
 from . import resources_bp
-from utils.auth import get_user_id_from_token
+from utils.auth import load_principal
+from utils.roles import has_permission, PERM_MODERATE
 from flask_cors import cross_origin
+from utils.logger import get_logger
+from utils import repository
+from utils.repository import parse_version, VersionConflict
+from utils.conditional import bump_version, RESOURCES
+from utils.category_counts import move_counts
+from utils.projections import make_excerpt
+
+logger = get_logger(__name__)
 
 @resources_bp.route('/update/<resource_id>', methods=['PUT'])
 @cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
@@ -13,53 +22,44 @@ def update_resource(resource_id):
     Route pour mettre à jour une ressource existante
     Seuls le propriétaire de la ressource ou un modérateur peuvent la modifier
     """
-    print(f" Début de la route update_resource pour l'ID: {resource_id}")
+    logger.debug("Début de la route update_resource pour l'ID: %s", resource_id)
 
     # Vérification du token
     token_cookie = request.cookies.get('access_token')
     if not token_cookie:
-        print(" Token manquant ou mal formé")
+        logger.warning("Token manquant ou mal formé")
         return jsonify({"error": "Token manquant ou invalide"}), 401
 
-    user_id = get_user_id_from_token(token_cookie)
-    if not user_id:
+    # Token et utilisateur en un seul aller-retour
+    principal = load_principal(token_cookie)
+    if not principal:
         return jsonify({"error": "Token invalide"}), 401
+    user_id = principal.user_id
 
     db = get_db()
     if db is None:
-        print(" Erreur: Base de données non connectée")
+        logger.error("Erreur: Base de données non connectée")
         return jsonify({"error": "Erreur de connexion à la base de données"}), 500
 
     try:
         # Vérifier si l'utilisateur existe
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = principal.user
         if not user:
-            print(" Utilisateur non trouvé")
+            logger.warning("Utilisateur non trouvé")
             return jsonify({"error": "Utilisateur non trouvé"}), 404
 
         # Vérifier le rôle de l'utilisateur
-        role = db.role.find_one({"_id": user.get("role_id")})
-        role_name = role.get("nom_role") if role else None
-        is_moderator = role_name == "modérateur"
-        is_admin = role_name == "administrateur" or role_name == "super-administrateur"
-
-        # Récupérer la ressource
-        resource = db.ressource.find_one({"_id": ObjectId(resource_id)})
-        if not resource:
-            print(f" Ressource non trouvée pour l'ID: {resource_id}")
-            return jsonify({"error": "Ressource non trouvée"}), 404
-
-        # Vérifier les permissions
-        is_owner = str(resource.get("id_publieur")) == str(user_id)
-        if not (is_owner or is_moderator or is_admin):
-            print(" Accès refusé : l'utilisateur n'a pas les droits nécessaires")
-            return jsonify({"error": "Accès non autorisé"}), 403
+        is_moderator = has_permission(principal, PERM_MODERATE)
 
         # Récupérer les données de mise à jour
         data = request.get_json()
         if not data:
-            print(" Aucune donnée de mise à jour fournie")
+            logger.warning("Aucune donnée de mise à jour fournie")
             return jsonify({"error": "Aucune donnée de mise à jour fournie"}), 400
+        try:
+            version = parse_version(data)
+        except ValueError as e:
+            return jsonify({"error": f"Paramètres invalides: {str(e)}"}), 400
 
         # Préparer les champs à mettre à jour
         update_fields = {}
@@ -67,49 +67,53 @@ def update_resource(resource_id):
             update_fields["titre"] = data["titre"]
         if "contenu" in data:
             update_fields["contenu"] = data["contenu"]
+            update_fields["extrait"] = make_excerpt(data["contenu"])
         if "id_categorie" in data:
             # Vérifier si la catégorie existe
-            categories = db.categories.find_one({"_id": ObjectId(data["id_categorie"])})
-            if not categories:
-                print(f" Catégorie non trouvée pour l'ID: {data['id_categorie']}")
+            if not repository.categories(db).exists(data["id_categorie"]):
+                logger.warning("Catégorie non trouvée pour l'ID: %s", data['id_categorie'])
                 return jsonify({"error": "Catégorie non trouvée"}), 404
             update_fields["id_categorie"] = ObjectId(data["id_categorie"])
 
         if not update_fields:
-            print(" Aucun champ valide à mettre à jour")
+            logger.warning("Aucun champ valide à mettre à jour")
             return jsonify({"error": "Aucun champ valide à mettre à jour"}), 400
 
         # Ajouter la date de modification
         update_fields["date_modification"] = datetime.utcnow()
 
-        # Mettre à jour la ressource
-        result = db.ressource.update_one(
-            {"_id": ObjectId(resource_id)},
-            {"$set": update_fields}
-        )
-
-        if result.modified_count == 0:
-            print(" Aucune modification effectuée")
-            return jsonify({"error": "Aucune modification effectuée"}), 400
-
-        # Récupérer la ressource mise à jour
-        updated_resource = db.ressource.find_one({"_id": ObjectId(resource_id)})
-
-        # Sanitize la réponse
-        def sanitize(doc):
-            for key, value in doc.items():
-                if isinstance(value, ObjectId):
-                    doc[key] = str(value)
-                elif isinstance(value, datetime):
-                    doc[key] = value.isoformat()
-            return doc
+        # Mettre à jour la ressource en un aller-retour ; le filtre porte la
+        # vérification des permissions (propriétaire, sauf pour un modérateur)
+        owner_filter = None if is_moderator else {"id_publieur": ObjectId(user_id)}
+        resources = repository.resources(db)
+        if "id_categorie" in update_fields:
+            # Catégorie précédente nécessaire aux compteurs : état avant la mise à jour
+            resource, updated_resource = resources.update(
+                resource_id, update_fields, version=version, query=owner_filter, before=True
+            )
+        else:
+            resource = updated_resource = resources.update(
+                resource_id, update_fields, version=version, query=owner_filter
+            )
+
+        if not updated_resource:
+            # Chemin d'échec seulement : ressource absente ou d'un autre publieur
+            if owner_filter and resources.exists(resource_id):
+                logger.warning("Accès refusé : l'utilisateur n'a pas les droits nécessaires")
+                return jsonify({"error": "Accès non autorisé"}), 403
+            logger.warning("Ressource non trouvée pour l'ID: %s", resource_id)
+            return jsonify({"error": "Ressource non trouvée"}), 404
+        if "id_categorie" in update_fields:
+            move_counts(db, resource.get("id_categorie"), update_fields["id_categorie"],
+                        approved=resource.get("approved") is True)
+        bump_version(db, RESOURCES)
 
-        sanitized_resource = sanitize(updated_resource)
-        print(f" Ressource mise à jour avec succès: {sanitized_resource['_id']}")
-        return jsonify(sanitized_resource), 200
+        logger.info("Ressource mise à jour avec succès: %s", updated_resource['_id'])
+        return jsonify(updated_resource), 200
 
+    except VersionConflict as e:
+        logger.warning("Conflit de version pour la ressource %s (version actuelle %s)", resource_id, e.current)
+        return jsonify({"error": "La ressource a été modifiée entre-temps", "version": e.current}), 409
     except Exception as e:
-        print(f" Erreur lors de la mise à jour de la ressource: {str(e)}")
-        import traceback
-        print(f"Stack trace: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la mise à jour de la ressource: %s", e)
         return jsonify({"error": f"Erreur lors de la mise à jour de la ressource: {str(e)}"}), 500 
\ No newline at end of file
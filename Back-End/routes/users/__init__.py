@@ -2,4 +2,4 @@ from flask import Blueprint
 
 users_bp = Blueprint('users', __name__)
 
-from . import get_own_profile, update_profile, get_user_role, get_user_public_info
+from . import get_own_profile, update_profile, get_user_role, get_user_public_info, get_users_public_info
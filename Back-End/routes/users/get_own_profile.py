@@ -4,37 +4,37 @@ import jwt
 from config.database import get_db
 from config.config import SECRET_KEY
 from routes.users import users_bp
+from utils.logger import get_logger
+from utils import repository
+
+logger = get_logger(__name__)
 
 @users_bp.route('/get_own_profile', methods=['GET'])
 def get_own_profile():
-    print("Received /get_own_profile request")
+    logger.debug("Received /get_own_profile request")
     try:
         # Récupérer le token depuis les cookies
         token = request.cookies.get('access_token')
-        print(f"Token from cookies: {token}")
         
         if not token:
             # Si pas de token dans les cookies, vérifier les en-têtes
             auth_cookie = request.cookies.get('Authorization')
-            print(f"Auth cookie: {auth_cookie}")
             if auth_cookie and auth_cookie.startswith('Bearer '):
                 token = auth_cookie.split(' ')[1]
-                print(f"Token from cookie: {token}")
             else:
-                print("No token found")
+                logger.warning("No token found")
                 return jsonify({'error': 'Non authentifié'}), 401
         
         # Vérifier et décoder le token
         try:
-            print(f"Decoding token: {token}")
             payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
             user_id = payload['user_id']
-            print(f"User ID from token: {user_id}")
+            logger.debug("User ID from token: %s", user_id)
         except jwt.ExpiredSignatureError:
-            print("Token expired")
+            logger.warning("Token expired")
             return jsonify({'error': 'Token expiré'}), 401
         except jwt.InvalidTokenError as e:
-            print(f"Invalid token: {str(e)}")
+            logger.warning("Invalid token: %s", e)
             return jsonify({'error': 'Token invalide'}), 401
         
         # Récupérer les informations de l'utilisateur depuis la base de données
@@ -42,15 +42,15 @@ def get_own_profile():
         from bson import ObjectId
         try:
             user_id_obj = ObjectId(user_id)
-            print(f"Looking for user with ID: {user_id_obj}")
-            user = db.users.find_one({'_id': user_id_obj})
-            print(f"User found: {user}")
+            logger.debug("Looking for user with ID: %s", user_id_obj)
+            user = repository.users(db).get(user_id_obj)
+            logger.debug("User found: %s", user)
         except Exception as e:
-            print(f"Error finding user: {str(e)}")
+            logger.exception("Error finding user: %s", e)
             return jsonify({'error': f'Erreur lors de la recherche de l\'utilisateur: {str(e)}'}), 500
         
         if not user:
-            print("User not found")
+            logger.warning("User not found")
             return jsonify({'error': 'Utilisateur non trouvé'}), 404
         
         # Retourner les informations de l'utilisateur (sans le mot de passe)
@@ -61,12 +61,13 @@ def get_own_profile():
             'nom': user.get('nom', ''),
             'prenom': user.get('prenom', ''),
             'genre': user.get('genre', ''),
-            'role': user.get('role', '')
+            'role': user.get('role', ''),
+            'version': user.get('version', 0)
         }
         
-        print(f"Returning user data: {user_data}")
+        logger.debug("Returning user data: %s", user_data)
         return jsonify(user_data), 200
     
     except Exception as e:
-        print(f"Error in get_user_info: {str(e)}")
+        logger.exception("Error in get_user_info: %s", e)
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
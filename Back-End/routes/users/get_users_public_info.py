@@ -0,0 +1,51 @@
+from flask import jsonify, request
+from bson import ObjectId
+from config.database import get_db
+from . import users_bp
+from flask_cors import cross_origin
+from utils.logger import get_logger
+from utils.conditional import conditional, USERS
+from utils.response_cache import cached_response
+from utils.profiles import get_public_profiles
+
+logger = get_logger(__name__)
+
+# Nombre maximal d'identifiants par requête
+MAX_IDS = 100
+
+
+@users_bp.route('/public_info', methods=['GET'])
+@cross_origin(supports_credentials=True, origins=["http://localhost:3000"])
+@conditional(USERS)
+@cached_response(USERS)
+def get_users_public_info():
+    """
+    Route pour récupérer les informations publiques de plusieurs utilisateurs
+    (paramètre ids : identifiants séparés par des virgules), en une seule requête.
+    Les utilisateurs introuvables sont absents de la réponse.
+    """
+    ids = [user_id.strip() for user_id in request.args.get('ids', '').split(',') if user_id.strip()]
+    if not ids:
+        return jsonify({"error": "Paramètre ids requis"}), 400
+    if len(ids) > MAX_IDS:
+        return jsonify({"error": f"{MAX_IDS} identifiants au plus"}), 400
+    invalid = [user_id for user_id in ids if not ObjectId.is_valid(user_id)]
+    if invalid:
+        return jsonify({"error": f"Identifiants invalides: {', '.join(invalid)}"}), 400
+    ids = [str(ObjectId(user_id)) for user_id in ids]
+
+    db = get_db()
+    if db is None:
+        logger.error("Erreur: Base de données non connectée")
+        return jsonify({"error": "Erreur de connexion à la base de données"}), 500
+
+    try:
+        profiles = get_public_profiles(db, ids)
+        # Ordre de la requête, sans doublon
+        ordered = [profiles[user_id] for user_id in dict.fromkeys(ids) if user_id in profiles]
+        logger.debug("%s profils publics sur %s demandés", len(ordered), len(ids))
+        return jsonify(ordered), 200
+
+    except Exception as e:
+        logger.exception("Erreur lors de la récupération des informations des utilisateurs: %s", e)
+        return jsonify({"error": f"Erreur lors de la récupération des informations des utilisateurs: {str(e)}"}), 500
@@ -4,49 +4,57 @@ import jwt
 from config.database import get_db
 from config.config import SECRET_KEY
 from routes.users import users_bp
+from utils.auth import evict_user
+from utils.conditional import bump_version, USERS
+from utils.profiles import evict_profile
+from utils.logger import get_logger
+from utils import repository
+from utils.repository import parse_version, VersionConflict
+
+logger = get_logger(__name__)
+
+# Champs du profil renvoyés après la mise à jour
+PROFILE_FIELDS = {'username': 1, 'mail': 1, 'nom': 1, 'prenom': 1, 'genre': 1, 'version': 1}
 
 @users_bp.route('/update_profile', methods=['PUT'])
 def update_profile():
-    print("Received update_profile request")
+    logger.debug("Received update_profile request")
     try:
         # Récupérer le token depuis les cookies
         token = request.cookies.get('access_token')
-        print(f"Token from cookies: {token}")
         
         if not token:
             # Si pas de token dans les cookies, vérifier les en-têtes
             auth_cookie = request.cookies.get('Authorization')
-            print(f"Auth cookie: {auth_cookie}")
             if auth_cookie and auth_cookie.startswith('Bearer '):
                 token = auth_cookie.split(' ')[1]
-                print(f"Token from cookie: {token}")
             else:
-                print("No token found")
+                logger.warning("No token found")
                 return jsonify({'error': 'Non authentifié'}), 401
         
         # Vérifier et décoder le token
         try:
-            print(f"Decoding token: {token}")
             payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
             user_id = payload['user_id']
-            print(f"User ID from token: {user_id}")
+            logger.debug("User ID from token: %s", user_id)
         except jwt.ExpiredSignatureError:
-            print("Token expired")
+            logger.warning("Token expired")
             return jsonify({'error': 'Token expiré'}), 401
         except jwt.InvalidTokenError as e:
-            print(f"Invalid token: {str(e)}")
+            logger.warning("Invalid token: %s", e)
             return jsonify({'error': 'Token invalide'}), 401
         
         # Récupérer les données du formulaire
         data = request.get_json()
-        print(f"Received data for profile update: {data}")
-        print(f"Data type: {type(data)}")
-        print(f"Data keys: {data.keys() if data else 'No data'}")
         
         # Vérifier les données reçues
         if not data:
-            print("No data received")
+            logger.warning("No data received")
             return jsonify({'error': 'Aucune donnée reçue'}), 400
+        try:
+            version = parse_version(data)
+        except ValueError as e:
+            return jsonify({'error': f'Paramètres invalides: {str(e)}'}), 400
         
         # Préparer les champs à mettre à jour
         update_fields = {}
@@ -69,7 +77,7 @@ def update_profile():
         
         # Si aucun champ à mettre à jour, retourner une erreur
         if not update_fields:
-            print("No fields to update")
+            logger.warning("No fields to update")
             return jsonify({'error': 'Aucun champ à mettre à jour'}), 400
         
         # Mettre à jour l'utilisateur dans la base de données
@@ -77,22 +85,22 @@ def update_profile():
         from bson import ObjectId
         try:
             user_id_obj = ObjectId(user_id)
-            print(f"Updating user with ID: {user_id_obj}")
-            print(f"Update fields: {update_fields}")
+            logger.debug("Updating user with ID: %s", user_id_obj)
+            logger.debug("Update fields: %s", update_fields)
             
-            result = db.users.update_one(
-                {'_id': user_id_obj},
-                {'$set': update_fields}
+            # Mise à jour et lecture du profil mis à jour en un aller-retour
+            updated_user = repository.users(db).update(
+                user_id_obj, update_fields, version=version, projection=PROFILE_FIELDS
             )
             
-            if result.modified_count == 0:
-                print("No document was updated")
-                return jsonify({'error': 'Aucune modification effectuée'}), 400
-            
-            print(f"User updated successfully: {result.modified_count} document(s) modified")
+            if not updated_user:
+                logger.warning("User not found: %s", user_id_obj)
+                return jsonify({'error': 'Utilisateur non trouvé'}), 404
             
-            # Récupérer les informations mises à jour de l'utilisateur
-            updated_user = db.users.find_one({'_id': user_id_obj})
+            logger.debug("User updated successfully")
+            evict_user(user_id)
+            evict_profile(user_id)
+            bump_version(db, USERS)
             
             # Retourner les informations mises à jour
             user_data = {
@@ -101,15 +109,19 @@ def update_profile():
                 'mail': updated_user.get('mail', ''),
                 'nom': updated_user.get('nom', ''),
                 'prenom': updated_user.get('prenom', ''),
-                'genre': updated_user.get('genre', '')
+                'genre': updated_user.get('genre', ''),
+                'version': updated_user.get('version', 0)
             }
             
             return jsonify({'message': 'Profil mis à jour avec succès', 'user': user_data}), 200
             
+        except VersionConflict as e:
+            logger.warning("Version conflict for user %s (current version %s)", user_id, e.current)
+            return jsonify({'error': 'Le profil a été modifié entre-temps', 'version': e.current}), 409
         except Exception as e:
-            print(f"Error updating user: {str(e)}")
+            logger.exception("Error updating user: %s", e)
             return jsonify({'error': f'Erreur lors de la mise à jour de l\'utilisateur: {str(e)}'}), 500
     
     except Exception as e:
-        print(f"Error in update_profile: {str(e)}")
+        logger.exception("Error in update_profile: %s", e)
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,63 @@
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+import jwt
+from bson import ObjectId
+from utils import auth
+
+
+class TestPrincipalCache(unittest.TestCase):
+    def setUp(self):
+        auth.clear_principal_cache()
+        self.user_id = ObjectId()
+        self.role_id = ObjectId()
+        self.db = MagicMock()
+        self.db.token.aggregate.return_value = [{
+            "id_user": self.user_id,
+            "user": {"_id": self.user_id, "role_id": self.role_id, "mail": "a@b.fr"},
+        }]
+
+    def make_token(self, lifetime=900):
+        return jwt.encode({"user_id": str(self.user_id), "exp": int(time.time()) + lifetime}, "test", algorithm="HS256")
+
+    @patch('utils.auth.get_db')
+    def test_principal_is_cached(self, mock_get_db):
+        """Le second appel ne touche pas la base"""
+        mock_get_db.return_value = self.db
+        token = self.make_token()
+        first = auth.load_principal(token)
+        second = auth.load_principal(token)
+        self.assertIs(first, second)
+        self.assertEqual(first.role_id, self.role_id)
+        self.assertEqual(self.db.token.aggregate.call_count, 1)
+
+    @patch('utils.auth.get_db')
+    def test_expired_token_not_cached(self, mock_get_db):
+        """Un principal ne survit jamais à l'expiration de son token"""
+        mock_get_db.return_value = self.db
+        token = self.make_token(lifetime=-10)
+        auth.load_principal(token)
+        auth.load_principal(token)
+        self.assertEqual(self.db.token.aggregate.call_count, 2)
+
+    @patch('utils.auth.get_db')
+    def test_evict_token(self, mock_get_db):
+        """Le logout retire immédiatement l'entrée du cache"""
+        mock_get_db.return_value = self.db
+        token = self.make_token()
+        auth.load_principal(token)
+        auth.evict_token(token)
+        self.db.token.aggregate.return_value = []
+        self.assertIsNone(auth.load_principal(token))
+
+    @patch('utils.auth.get_db')
+    def test_evict_user(self, mock_get_db):
+        """Toutes les sessions d'un utilisateur modifié sont retirées"""
+        mock_get_db.return_value = self.db
+        auth.load_principal(self.make_token())
+        auth.load_principal(self.make_token(lifetime=600))
+        self.assertEqual(auth.evict_user(self.user_id), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import MagicMock
+from bson import ObjectId
+from pymongo import DeleteOne, ReplaceOne
+from utils import category_counts
+
+
+class TestAdjustCounts(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.category_id = ObjectId()
+
+    def test_adjust_increments(self):
+        category_counts.adjust_counts(self.db, self.category_id, total=1)
+        self.db.category_counts.update_one.assert_called_once_with(
+            {"_id": self.category_id}, {"$inc": {"total": 1, "approved": 0}}, upsert=True
+        )
+
+    def test_adjust_without_category(self):
+        category_counts.adjust_counts(self.db, None, total=1)
+        self.db.category_counts.update_one.assert_not_called()
+
+    def test_adjust_error_is_logged(self):
+        """Une erreur du compteur ne fait pas échouer l'écriture de la ressource"""
+        self.db.category_counts.update_one.side_effect = Exception("timeout")
+        category_counts.adjust_counts(self.db, self.category_id, total=1)
+
+    def test_move_approved_resource(self):
+        new_id = ObjectId()
+        category_counts.move_counts(self.db, self.category_id, new_id, approved=True)
+        calls = self.db.category_counts.update_one.call_args_list
+        self.assertEqual(calls[0][0], ({"_id": self.category_id}, {"$inc": {"total": -1, "approved": -1}}))
+        self.assertEqual(calls[1][0], ({"_id": new_id}, {"$inc": {"total": 1, "approved": 1}}))
+
+    def test_move_same_category(self):
+        category_counts.move_counts(self.db, self.category_id, self.category_id)
+        self.db.category_counts.update_one.assert_not_called()
+
+
+class TestReconcile(unittest.TestCase):
+    def test_reconcile_fixes_drift(self):
+        """Seuls les compteurs différents de l'agrégation sont réécrits ; les orphelins sont supprimés"""
+        correct, drifted, orphan = ObjectId(), ObjectId(), ObjectId()
+        db = MagicMock()
+        db.ressource.aggregate.return_value = [
+            {"_id": correct, "total": 2, "approved": 1},
+            {"_id": drifted, "total": 5, "approved": 3},
+        ]
+        db.category_counts.find.return_value = [
+            {"_id": correct, "total": 2, "approved": 1},
+            {"_id": drifted, "total": 4, "approved": 3},
+            {"_id": orphan, "total": 1, "approved": 0},
+        ]
+
+        report = category_counts.reconcile(db)
+
+        self.assertEqual(report, {"updated": 1, "removed": 1})
+        db.ressource.aggregate.assert_called_once_with(category_counts.RECOUNT_PIPELINE)
+        operations = db.category_counts.bulk_write.call_args[0][0]
+        self.assertEqual(operations, [
+            ReplaceOne({"_id": drifted}, {"total": 5, "approved": 3}, upsert=True),
+            DeleteOne({"_id": orphan}),
+        ])
+
+    def test_reconcile_nothing_to_do(self):
+        db = MagicMock()
+        db.ressource.aggregate.return_value = []
+        db.category_counts.find.return_value = []
+        self.assertEqual(category_counts.reconcile(db), {"updated": 0, "removed": 0})
+        db.category_counts.bulk_write.assert_not_called()
+
+    def test_counts_of(self):
+        self.assertEqual(category_counts.counts_of({"counts": {"total": 3, "approved": 2}}), (3, 2))
+        self.assertEqual(category_counts.counts_of({}), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
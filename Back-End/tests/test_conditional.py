@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock
+from flask import Flask, jsonify
+from utils import conditional
+
+
+class TestConditional(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.calls = 0
+        self.db = MagicMock()
+        self.db.versions.find.return_value = [
+            {"_id": "ressource", "version": 3, "updated_at": datetime(2024, 5, 1, 12, 0)}
+        ]
+        patcher = patch('utils.conditional.get_db', return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        conditional.get_version_stamps().clear()
+
+        @self.app.route('/items')
+        @conditional.conditional(conditional.RESOURCES)
+        def items():
+            self.calls += 1
+            return jsonify([1, 2, 3])
+
+        self.client = self.app.test_client()
+
+    def test_not_modified_without_query(self):
+        """Un If-None-Match valide reçoit un 304 sans exécuter la route ni relire les versions"""
+        response = self.client.get('/items')
+        etag = response.headers['ETag']
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        self.assertEqual(response.headers['Last-Modified'], 'Wed, 01 May 2024 12:00:00 GMT')
+
+        response = self.client.get('/items', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.db.versions.find.call_count, 1)
+
+    def test_if_modified_since(self):
+        response = self.client.get('/items', headers={'If-Modified-Since': 'Wed, 01 May 2024 12:00:00 GMT'})
+        self.assertEqual(response.status_code, 304)
+
+    def test_bump_changes_etag(self):
+        """Une écriture du worker change immédiatement l'ETag"""
+        etag = self.client.get('/items').headers['ETag']
+        self.db.versions.find_one_and_update.return_value = {
+            "_id": "ressource", "version": 4, "updated_at": datetime.now(timezone.utc)
+        }
+        conditional.bump_version(self.db, conditional.RESOURCES)
+
+        response = self.client.get('/items', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_counter_bump_throttled(self):
+        """Les consultations n'incrémentent le tampon des compteurs qu'une fois par intervalle"""
+        conditional._last_bumps.clear()
+        self.addCleanup(conditional._last_bumps.clear)
+        self.db.versions.find_one_and_update.return_value = {"_id": "ressource_counters", "version": 1}
+
+        bumped = [conditional.bump_version_throttled(self.db, conditional.RESOURCE_COUNTERS, interval=60)
+                  for _ in range(5)]
+
+        self.assertEqual(bumped, [True, False, False, False, False])
+        self.assertEqual(self.db.versions.find_one_and_update.call_count, 1)
+        self.assertTrue(conditional.bump_version_throttled(self.db, conditional.RESOURCE_COUNTERS, interval=0))
+
+    def test_etag_depends_on_query(self):
+        first = self.client.get('/items?limit=10').headers['ETag']
+        second = self.client.get('/items?limit=20').headers['ETag']
+        self.assertNotEqual(first, second)
+
+    def test_versions_unavailable(self):
+        """Sans tampons de version, la route répond normalement sans ETag"""
+        self.db.versions.find.side_effect = RuntimeError("timeout")
+        response = self.client.get('/items')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from unittest.mock import patch
+from config import database
+
+
+class TestDatabaseClient(unittest.TestCase):
+    def setUp(self):
+        database.close_client()
+
+    def tearDown(self):
+        database.close_client()
+
+    def test_get_db_reuses_client(self):
+        """Le même client est réutilisé entre deux appels à get_db"""
+        first = database.get_db()
+        second = database.get_db()
+        self.assertIs(first.client, second.client)
+        self.assertEqual(first.name, database.DB_NAME)
+
+    def test_new_client_after_fork(self):
+        """Un client hérité d'un autre processus n'est pas réutilisé"""
+        parent_client = database.get_client()
+        with patch('config.database.os.getpid', return_value=database._client_pid + 1):
+            child_client = database.get_client()
+        self.assertIsNot(parent_client, child_client)
+
+    def test_pool_stats(self):
+        """Les statistiques du pool sont exposées"""
+        database.get_client()
+        stats = database.get_pool_stats()
+        self.assertTrue(stats["client_initialized"])
+        self.assertEqual(stats["max_pool_size"], database.MONGO_MAX_POOL_SIZE)
+        self.assertIn("connections_in_use", stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
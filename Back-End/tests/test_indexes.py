@@ -0,0 +1,97 @@
+import os
+import unittest
+from unittest.mock import MagicMock
+from config import indexes
+
+
+class FakeDb(dict):
+    """Base minimale : chaque collection expose index_information()"""
+
+    def __missing__(self, name):
+        collection = MagicMock()
+        collection.index_information.return_value = {"_id_": {"key": [("_id", 1)]}}
+        self[name] = collection
+        return collection
+
+
+class TestIndexManifest(unittest.TestCase):
+    def test_ensure_creates_missing_indexes(self):
+        """Tous les index du manifeste sont créés sur une base vide"""
+        db = FakeDb()
+        report = indexes.ensure_indexes(db)
+        self.assertEqual(len(report["created"]), len(indexes.INDEXES))
+        self.assertEqual(report["errors"], [])
+        self.assertTrue(db["users"].create_indexes.called)
+
+    def test_ensure_skips_existing_indexes(self):
+        """Un index déjà présent avec la même définition n'est pas recréé"""
+        db = FakeDb()
+        db["users"].index_information.return_value = {
+            "_id_": {"key": [("_id", 1)]},
+            "mail_1": {"key": [("mail", 1)], "unique": True},
+        }
+        report = indexes.ensure_indexes(db)
+        self.assertIn("users.mail_1", report["existing"])
+        db["users"].create_indexes.assert_not_called()
+
+    def test_drift_reports_conflicts_and_unmanaged(self):
+        """Un index modifié ou non déclaré est signalé"""
+        db = FakeDb()
+        db["users"].index_information.return_value = {
+            "_id_": {"key": [("_id", 1)]},
+            "mail_1": {"key": [("mail", 1)]},
+            "username_1": {"key": [("username", 1)]},
+        }
+        report = indexes.check_drift(db)
+        self.assertIn("users.mail_1", report["conflicting"])
+        self.assertIn("users.username_1", report["unmanaged"])
+        self.assertIn("token.access_token_hash_1", report["missing"])
+
+    def test_require_unique_indexes(self):
+        """Démarrage refusé sans l'index unique sur mail ; un index ordinaire manquant est toléré"""
+        db = FakeDb()
+        with self.assertRaises(indexes.MissingUniqueIndex) as context:
+            indexes.require_unique_indexes(db)
+        self.assertIn("users.mail_1", str(context.exception))
+        self.assertNotIn("token.access_token_hash_1", str(context.exception))
+
+        # Index présent mais non unique : les doublons ne seraient pas refusés
+        db = FakeDb()
+        db["users"].index_information.return_value = {"mail_1": {"key": [("mail", 1)]}}
+        with self.assertRaises(indexes.MissingUniqueIndex):
+            indexes.require_unique_indexes(db)
+
+        db = FakeDb()
+        for spec in indexes.INDEXES:
+            if spec["options"].get("unique"):
+                info = db[spec["collection"]].index_information.return_value
+                info[spec["options"]["name"]] = {"key": spec["keys"], **spec["options"]}
+        indexes.require_unique_indexes(db)
+
+    def test_plan_stages(self):
+        """Les étapes imbriquées d'un plan sont toutes listées"""
+        plan = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}
+        self.assertEqual(indexes._plan_stages(plan), ["FETCH", "IXSCAN"])
+
+
+@unittest.skipUnless(os.getenv('MONGO_TEST_URI'), "MONGO_TEST_URI non défini")
+class TestIndexedQueries(unittest.TestCase):
+    """Vérifie avec explain() qu'aucune requête principale ne parcourt une collection"""
+
+    def test_no_collscan(self):
+        from pymongo import MongoClient
+        client = MongoClient(os.getenv('MONGO_TEST_URI'))
+        db = client['test_indexes_manifest']
+        try:
+            for spec in indexes.INDEXES:
+                db[spec["collection"]].insert_one({"_seed": True})
+            indexes.ensure_indexes(db)
+            for result in indexes.explain_queries(db):
+                self.assertFalse(result["collscan"], f"{result['name']}: {result['stages']}")
+        finally:
+            client.drop_database('test_indexes_manifest')
+            client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import logging
+import queue
+import sys
+import unittest
+from flask import Flask, g
+from utils import logger as app_logger
+
+
+class TestLogger(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+
+    def make_record(self, level=logging.INFO, msg="message %s", args=("ok",), **extra):
+        record = logging.LogRecord("routes.test", level, __file__, 1, msg, args, None)
+        for key, value in extra.items():
+            setattr(record, key, value)
+        return record
+
+    def test_json_formatter(self):
+        """Une ligne JSON avec le message formaté et les champs extra"""
+        line = app_logger.JsonFormatter().format(self.make_record(duration_ms=1.5))
+        entry = json.loads(line)
+        self.assertEqual(entry["msg"], "message ok")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["duration_ms"], 1.5)
+
+    def test_request_context(self):
+        """Les enregistrements émis pendant une requête portent son identifiant et sa route"""
+        log_filter = app_logger.RequestContextFilter(sample_rate=1.0)
+        with self.app.test_request_context('/resources/42', method='GET'):
+            g.request_id = "abc"
+            record = self.make_record()
+            self.assertTrue(log_filter.filter(record))
+        self.assertEqual(record.request_id, "abc")
+        self.assertEqual(record.method, "GET")
+
+    def test_debug_sampling(self):
+        """Une requête non échantillonnée n'émet aucun log DEBUG"""
+        log_filter = app_logger.RequestContextFilter(sample_rate=1.0)
+        with self.app.test_request_context('/'):
+            g.log_debug_sampled = False
+            self.assertFalse(log_filter.filter(self.make_record(level=logging.DEBUG)))
+            self.assertTrue(log_filter.filter(self.make_record(level=logging.WARNING)))
+
+    def test_full_queue_drops(self):
+        """File pleine : l'enregistrement est abandonné sans bloquer"""
+        handler = app_logger.NonBlockingQueueHandler(queue.Queue(1))
+        handler.handle(self.make_record())
+        handler.handle(self.make_record())
+        self.assertEqual(handler.dropped, 1)
+
+    def test_exception_serialized(self):
+        """La trace d'une exception est calculée avant la mise en file"""
+        handler = app_logger.NonBlockingQueueHandler(queue.Queue())
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("routes.test", logging.ERROR, __file__, 1, "échec", (), sys.exc_info())
+        handler.handle(record)
+        queued = handler.queue.get_nowait()
+        self.assertIsNone(queued.exc_info)
+        self.assertIn("ValueError: boom", app_logger.JsonFormatter().format(queued))
+
+
+if __name__ == '__main__':
+    unittest.main()
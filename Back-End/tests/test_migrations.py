@@ -0,0 +1,250 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from config import migrations
+
+
+class TestParseExtendedDate(unittest.TestCase):
+    def test_iso_string(self):
+        self.assertEqual(migrations.parse_extended_date({"$date": "2024-05-01T12:00:00.000Z"}),
+                         datetime(2024, 5, 1, 12, 0))
+        self.assertEqual(migrations.parse_extended_date({"$date": "2024-05-01T14:00:00+02:00"}),
+                         datetime(2024, 5, 1, 12, 0))
+
+    def test_milliseconds(self):
+        self.assertEqual(migrations.parse_extended_date({"$date": {"$numberLong": "1714564800000"}}),
+                         datetime(2024, 5, 1, 12, 0))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            migrations.parse_extended_date({"$date": None})
+
+
+class TestApplyMigrations(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.db.migrations.find.return_value = []
+        self.db.migrations.find_one.return_value = None
+        self.collection = self.db.__getitem__.return_value
+        self.batches = self.collection.find.return_value.sort.return_value.limit
+        self.migration = migrations.MIGRATIONS[0]
+        self.addCleanup(migrations._applied.clear)
+
+    def test_converts_in_batches(self):
+        """Chaque lot est réécrit en un bulk_write et le point de reprise est enregistré"""
+        first, second = ObjectId(), ObjectId()
+        self.batches.side_effect = [
+            [{"_id": first, "date_publication": {"$date": "2024-05-01T12:00:00Z"}}],
+            [{"_id": second, "createdAt": {"$date": "2024-05-02T12:00:00Z"}}],
+            [],
+        ]
+
+        report = migrations.apply_migrations(self.db, [self.migration], batch_size=1)
+
+        self.assertEqual(report["applied"], [self.migration.id])
+        self.db.__getitem__.assert_called_with("commentaire")
+        operations = self.collection.bulk_write.call_args_list[0][0][0]
+        self.assertEqual(operations, [UpdateOne({"_id": first}, {"$set": {"date_publication": datetime(2024, 5, 1, 12, 0)}})])
+        query = self.collection.find.call_args_list[1][0][0]
+        self.assertEqual(query["$and"][1], {"_id": {"$gt": first}})
+        checkpoint = self.db.migrations.update_one.call_args_list[1][0][1]["$set"]
+        self.assertEqual(checkpoint["last_id"], second)
+        self.assertEqual(checkpoint["migrated"], 2)
+        done = self.db.migrations.update_one.call_args_list[-1][0][1]
+        self.assertIn("done_at", done["$set"])
+
+    def test_resumes_after_last_batch(self):
+        last_id = ObjectId()
+        self.db.migrations.find_one.return_value = {"_id": self.migration.id, "last_id": last_id, "migrated": 10}
+        self.batches.return_value = []
+
+        migrations.apply_migrations(self.db, [self.migration])
+
+        query = self.collection.find.call_args[0][0]
+        self.assertEqual(query["$and"][1], {"_id": {"$gt": last_id}})
+
+    def test_done_migrations_skipped(self):
+        self.db.migrations.find.return_value = [{"_id": self.migration.id}]
+        report = migrations.apply_migrations(self.db, [self.migration])
+        self.assertEqual(report["done"], [self.migration.id])
+        self.collection.find.assert_not_called()
+
+    def test_locked_migration_stops_runner(self):
+        """Une migration verrouillée par un autre worker arrête l'application des suivantes"""
+        self.db.migrations.find_one_and_update.side_effect = DuplicateKeyError("verrou")
+        report = migrations.apply_migrations(self.db, migrations.MIGRATIONS)
+        self.assertEqual(report["locked"], [migrations.MIGRATIONS[0].id])
+        self.assertEqual(report["applied"], [])
+        self.collection.find.assert_not_called()
+
+    def test_object_id_conversion(self):
+        resource_id, comment_id = ObjectId(), ObjectId()
+        convert = migrations.MIGRATIONS[2].convert
+        self.assertEqual(
+            convert({"_id": ObjectId(), "resource_id": str(resource_id), "comment_id": comment_id}),
+            {"resource_id": resource_id},
+        )
+        self.assertEqual(convert({"_id": ObjectId(), "resource_id": "abc"}), {})
+
+    def test_fold_pending_resources(self):
+        """Les copies de ressources_en_attente sont repliées dans ressource puis supprimées"""
+        fold = migrations.MIGRATIONS[3]
+        pending_id = ObjectId()
+        self.batches.side_effect = [[{"_id": pending_id}], []]
+        self.db.ressource.update_many.return_value.modified_count = 1
+
+        report = migrations.apply_migrations(self.db, [fold])
+
+        self.assertEqual(report["applied"], [fold.id])
+        self.db.__getitem__.assert_called_with("ressources_en_attente")
+        self.db.ressource.update_many.assert_called_once_with(
+            {"_id": {"$in": [pending_id]}, "approved": {"$exists": False}},
+            {"$set": {"approved": False}},
+        )
+        self.db.ressources_en_attente.delete_many.assert_called_once_with({"_id": {"$in": [pending_id]}})
+        self.collection.bulk_write.assert_not_called()
+        checkpoint = self.db.migrations.update_one.call_args_list[0][0][1]["$set"]
+        self.assertEqual(checkpoint["migrated"], 1)
+
+
+class TestPopularityCounters(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.db.migrations.find.return_value = []
+        self.db.migrations.find_one.return_value = None
+        self.addCleanup(migrations._applied.clear)
+
+    @staticmethod
+    def _grouped(rows):
+        # $match resource_id $in, puis utilisateurs distincts par ressource (pipeline de la migration)
+        def aggregate(pipeline):
+            ids = pipeline[0]["$match"]["resource_id"]["$in"]
+            pairs = {(row["resource_id"], row["user_id"]) for row in rows if row["resource_id"] in ids}
+            counts = {}
+            for resource_id, _ in pairs:
+                counts[resource_id] = counts.get(resource_id, 0) + 1
+            return [{"_id": resource_id, "count": count} for resource_id, count in counts.items()]
+        return aggregate
+
+    def test_popularity_sort_on_legacy_resources(self):
+        """Les ressources antérieures aux compteurs sont classées d'après favoris et historique"""
+        counters = migrations.MIGRATIONS[4]
+        old, popular, recent = ObjectId(), ObjectId(), ObjectId()
+        # Ressources legacy : sans compteur, ou compteur commencé à 0 au premier $inc
+        resources = {old: {"_id": old}, popular: {"_id": popular, "favorites_count": 1}, recent: {"_id": recent}}
+        alice, bob, carol = ObjectId(), ObjectId(), ObjectId()
+        self.db.favoris.aggregate.side_effect = self._grouped([
+            {"resource_id": popular, "user_id": alice}, {"resource_id": popular, "user_id": bob},
+            {"resource_id": popular, "user_id": carol}, {"resource_id": old, "user_id": alice},
+            # Doublon antérieur à l'index unique : compté une fois
+            {"resource_id": old, "user_id": alice},
+        ])
+        self.db.historique.aggregate.side_effect = self._grouped([
+            {"resource_id": old, "user_id": alice}, {"resource_id": old, "user_id": bob},
+            {"resource_id": recent, "user_id": carol},
+        ])
+        self.db.__getitem__.return_value.find.return_value.sort.return_value.limit.side_effect = [
+            sorted(resources.values(), key=lambda resource: resource["_id"]), [],
+        ]
+
+        report = migrations.apply_migrations(self.db, [counters])
+
+        self.assertEqual(report["applied"], [counters.id])
+        self.db.__getitem__.assert_called_with("ressource")
+        for operation in self.db.ressource.bulk_write.call_args[0][0]:
+            resources[operation._filter["_id"]].update(operation._doc["$set"])
+
+        def ranking(field):
+            # Tri de list_resources : champ décroissant puis _id décroissant
+            ordered = sorted(resources.values(), key=lambda resource: (resource[field], resource["_id"]), reverse=True)
+            return [resource["_id"] for resource in ordered]
+
+        self.assertEqual(ranking("favorites_count"), [popular, old, recent])
+        self.assertEqual(ranking("views_count"), [old, recent, popular])
+        self.assertEqual(resources[recent]["favorites_count"], 0)
+
+
+class TestDedupe(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.db.migrations.find.return_value = []
+        self.addCleanup(migrations._applied.clear)
+
+    def test_keeps_oldest_entry(self):
+        """Les doublons (user_id, resource_id) sont supprimés, l'entrée la plus ancienne reste"""
+        dedupe = next(m for m in migrations.MIGRATIONS if m.id == "0006_dedupe_historique")
+        oldest, duplicate, other_oldest, other_duplicate = ObjectId(), ObjectId(), ObjectId(), ObjectId()
+        collection = self.db.__getitem__.return_value
+        collection.aggregate.return_value = [
+            {"_id": {"user_id": 1, "resource_id": 2}, "ids": [oldest, duplicate], "count": 2},
+            {"_id": {"user_id": 1, "resource_id": 3}, "ids": [other_oldest, other_duplicate], "count": 2},
+        ]
+        collection.delete_many.return_value.deleted_count = 2
+
+        report = migrations.apply_migrations(self.db, [dedupe])
+
+        self.assertEqual(report["applied"], [dedupe.id])
+        self.db.__getitem__.assert_any_call("historique")
+        collection.delete_many.assert_called_once_with({"_id": {"$in": [duplicate, other_duplicate]}})
+        collection.find.assert_not_called()
+
+    @patch('config.migrations.time.sleep')
+    @patch('config.migrations.apply_migrations')
+    def test_before_indexes_waits_for_other_worker(self, mock_apply, _):
+        """Les index uniques ne sont créés qu'une fois le dédoublonnage terminé par l'autre worker"""
+        mock_apply.side_effect = [
+            {"applied": [], "done": [], "locked": ["0006_dedupe_historique"]},
+            {"applied": [], "done": ["0006_dedupe_historique", "0007_dedupe_favoris"], "locked": []},
+        ]
+
+        report = migrations.apply_before_indexes(self.db, timeout=60)
+
+        self.assertEqual(report["locked"], [])
+        pending = mock_apply.call_args[0][1]
+        self.assertEqual([m.id for m in pending], ["0006_dedupe_historique", "0007_dedupe_favoris"])
+
+
+class TestPendingMigrations(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        migrations._applied.clear()
+        self.addCleanup(migrations._applied.clear)
+
+    def test_is_applied_cached_once_done(self):
+        """Une migration terminée n'est plus relue ; une migration en cours l'est à chaque appel"""
+        self.db.migrations.find_one.return_value = None
+        self.assertFalse(migrations.is_applied(self.db, migrations.SOUS_COMMENTAIRE_OBJECT_IDS))
+        self.db.migrations.find_one.return_value = {"_id": migrations.SOUS_COMMENTAIRE_OBJECT_IDS}
+        self.assertTrue(migrations.is_applied(self.db, migrations.SOUS_COMMENTAIRE_OBJECT_IDS))
+        self.assertTrue(migrations.is_applied(self.db, migrations.SOUS_COMMENTAIRE_OBJECT_IDS))
+        self.assertEqual(self.db.migrations.find_one.call_count, 2)
+
+    def test_unwrap_dates(self):
+        replies = [{"created_at": {"$date": "2024-05-01T12:00:00Z"}},
+                   {"created_at": datetime(2024, 5, 2)},
+                   {"created_at": {"$date": None}}]
+        migrations.unwrap_dates(replies, "created_at")
+        self.assertEqual([reply["created_at"] for reply in replies],
+                         [datetime(2024, 5, 1, 12, 0), datetime(2024, 5, 2), None])
+
+    @patch('config.migrations.apply_migrations')
+    def test_retrier_until_unlocked(self, mock_apply):
+        """Le thread retente tant qu'une migration est verrouillée ailleurs (verrou expiré d'un worker mort)"""
+        mock_apply.side_effect = [
+            {"applied": [], "done": [], "locked": ["0001_commentaire_dates"]},
+            {"applied": ["0001_commentaire_dates"], "done": [], "locked": []},
+        ]
+        stop = MagicMock()
+        stop.wait.return_value = False
+
+        migrations._run_retrier(lambda: self.db, 30, stop)
+
+        self.assertEqual(mock_apply.call_count, 2)
+        stop.wait.assert_called_with(30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from utils import moderation, sampling
+
+
+def _matches(document, query):
+    # Sous-ensemble des filtres MongoDB utilisés par le tirage ($exists, $ne, égalité)
+    for field, condition in query.items():
+        if isinstance(condition, dict) and "$exists" in condition:
+            if (field in document) != condition["$exists"]:
+                return False
+        elif isinstance(condition, dict) and "$ne" in condition:
+            if document.get(field) == condition["$ne"]:
+                return False
+        elif document.get(field) != condition:
+            return False
+    return True
+
+
+def _apply(document, update):
+    document = {**document, **update.get("$set", {})}
+    for field in update.get("$unset", {}):
+        document.pop(field, None)
+    return document
+
+
+class TestClaimPending(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.moderator_id = ObjectId()
+
+    def test_claims_until_queue_empty(self):
+        """Une réservation par find_one_and_update, jusqu'à épuisement de la file"""
+        first = {"_id": ObjectId(), "claimed_by": self.moderator_id}
+        self.db.ressource.find_one_and_update.side_effect = [first, None]
+
+        claimed = moderation.claim_pending(self.db, self.moderator_id, 5)
+
+        self.assertEqual(claimed, [first])
+        self.assertEqual(self.db.ressource.find_one_and_update.call_count, 2)
+        args, kwargs = self.db.ressource.find_one_and_update.call_args
+        self.assertFalse(args[0]["approved"])
+        self.assertEqual(args[0]["$or"][0], {"claim_expires": None})
+        self.assertEqual(args[1]["$set"]["claimed_by"], self.moderator_id)
+        self.assertGreater(args[1]["$set"]["claim_expires"], datetime.utcnow())
+        self.assertEqual(kwargs["sort"], [("createdAt", 1), ("_id", 1)])
+        self.assertEqual(kwargs["return_document"], ReturnDocument.AFTER)
+
+    def test_projection_keeps_expiry(self):
+        self.db.ressource.find_one_and_update.return_value = None
+        moderation.claim_pending(self.db, self.moderator_id, 1, {"_id": 1, "titre": 1})
+        projection = self.db.ressource.find_one_and_update.call_args[1]["projection"]
+        self.assertEqual(projection, {"_id": 1, "titre": 1, "claim_expires": 1})
+
+
+class TestDecisions(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.moderator_id = ObjectId()
+
+    def test_parse_decisions(self):
+        resource_id = ObjectId()
+        decisions = moderation.parse_decisions({"decisions": [
+            {"id": str(resource_id), "decision": "approve"},
+            {"id": str(resource_id), "decision": "reject", "comment": "hors sujet"},
+        ]})
+        # Une seule décision par ressource : la dernière
+        self.assertEqual(decisions, [(resource_id, "reject", "hors sujet")])
+        for invalid in ({}, {"decisions": []}, {"decisions": [{"id": "abc", "decision": "approve"}]},
+                        {"decisions": [{"id": str(resource_id), "decision": "maybe"}]}):
+            with self.assertRaises(ValueError):
+                moderation.parse_decisions(invalid)
+
+    def test_apply_decisions_in_one_bulk_write(self):
+        approved_id, rejected_id, taken_id = ObjectId(), ObjectId(), ObjectId()
+        category_id = ObjectId()
+        self.db.ressource.bulk_write.return_value.modified_count = 2
+        self.db.ressource.find.return_value = [
+            {"_id": approved_id, "id_categorie": category_id, "approved": True},
+            {"_id": rejected_id},
+        ]
+
+        approved, rejected, skipped = moderation.apply_decisions(self.db, self.moderator_id, [
+            (approved_id, "approve", ""),
+            (rejected_id, "reject", "doublon"),
+            (taken_id, "approve", ""),
+        ])
+
+        self.assertEqual([r["_id"] for r in approved], [approved_id])
+        self.assertEqual([r["_id"] for r in rejected], [rejected_id])
+        self.assertEqual(skipped, [taken_id])
+        operations = self.db.ressource.bulk_write.call_args[0][0]
+        self.assertEqual(len(operations), 3)
+        self.assertIsInstance(operations[0], UpdateOne)
+        approve, reject = operations[0]._doc, operations[1]._doc
+        self.assertTrue(approve["$set"]["approved"])
+        self.assertIn("random_key", approve["$set"])
+        self.assertIn("approved", reject["$unset"])
+        self.assertTrue(reject["$set"]["rejected"])
+        selector = operations[0]._filter
+        self.assertIn({"claimed_by": self.moderator_id}, selector["$or"])
+        self.assertFalse(selector["approved"])
+        self.assertEqual(self.db.ressource.bulk_write.call_args[1], {"ordered": False})
+
+    def test_rejected_resource_stays_out_of_draw(self):
+        """Rejetée puis backfill au démarrage : jamais de random_key, absente du tirage anonyme"""
+        # Ressource ayant reçu une clé d'un ancien backfill avant son rejet
+        resource = {"_id": ObjectId(), "approved": False, "random_key": 0.3}
+        reject = moderation._decision_update("reject", self.moderator_id, "", datetime.utcnow())
+        resource = _apply(resource, reject)
+        self.assertNotIn("date_validation", resource)
+        self.assertNotIn("random_key", resource)
+
+        # Ancienne forme : rejet daté par date_validation, clé encore présente
+        legacy = {**resource, "date_validation": datetime.utcnow(), "random_key": 0.3}
+        db = MagicMock()
+        sampling.backfill_random_keys(db)
+        documents = [resource, legacy]
+        for call in db.ressource.update_many.call_args_list:
+            query, update = call[0]
+            documents = [
+                # Pipeline $rand : une clé est attribuée
+                ({**document, "random_key": 0.5} if isinstance(update, list) else _apply(document, update))
+                if _matches(document, query) else document
+                for document in documents
+            ]
+        for document in documents:
+            self.assertNotIn("random_key", document)
+
+        sampling.get_approved_pool().clear()
+        sampling.get_approved_pool().ids(db)
+        pool_query = db.ressource.find.call_args[0][0]
+        for document in documents:
+            self.assertFalse(_matches(document, pool_query))
+        sampling.get_approved_pool().clear()
+
+    def test_nothing_applied(self):
+        self.db.ressource.bulk_write.return_value.modified_count = 0
+        resource_id = ObjectId()
+        approved, rejected, skipped = moderation.apply_decisions(self.db, self.moderator_id, [(resource_id, "approve", "")])
+        self.assertEqual((approved, rejected, skipped), ([], [], [resource_id]))
+        self.db.ressource.find.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from datetime import datetime
+from bson import ObjectId
+from utils import pagination
+
+
+class TestPagination(unittest.TestCase):
+    def test_cursor_round_trip(self):
+        """Le curseur restitue la valeur de tri (datetime) et l'_id"""
+        document = {"_id": ObjectId(), "createdAt": datetime(2024, 5, 1, 12, 30)}
+        cursor = pagination.encode_cursor("recent", document, "createdAt")
+        self.assertEqual(pagination.decode_cursor(cursor, "recent"), (document["createdAt"], document["_id"]))
+
+    def test_cursor_bound_to_sort(self):
+        """Un curseur émis pour un tri n'est pas accepté pour un autre"""
+        cursor = pagination.encode_cursor("views", {"_id": ObjectId(), "views_count": 3}, "views_count")
+        with self.assertRaises(ValueError):
+            pagination.decode_cursor(cursor, "recent")
+
+    def test_keyset_filter_missing_values(self):
+        """Les documents sans champ de tri restent atteignables après les valeurs renseignées"""
+        last_id = ObjectId()
+        self.assertIn({"favorites_count": None}, pagination.keyset_filter("favorites_count", 4, last_id)["$or"])
+        self.assertEqual(
+            pagination.keyset_filter("favorites_count", None, last_id),
+            {"favorites_count": None, "_id": {"$lt": last_id}},
+        )
+
+    def test_keyset_filter_ascending(self):
+        """En tri croissant, les documents sans champ viennent en premier puis tous les autres"""
+        last_id = ObjectId()
+        self.assertEqual(
+            pagination.keyset_filter("createdAt", datetime(2024, 5, 1), last_id, ascending=True),
+            {"$or": [{"createdAt": {"$gt": datetime(2024, 5, 1)}},
+                     {"createdAt": datetime(2024, 5, 1), "_id": {"$gt": last_id}}]},
+        )
+        self.assertIn({"createdAt": {"$ne": None}},
+                      pagination.keyset_filter("createdAt", None, last_id, ascending=True)["$or"])
+
+    def test_parse_limit(self):
+        self.assertEqual(pagination.parse_limit(None), pagination.DEFAULT_LIMIT)
+        self.assertEqual(pagination.parse_limit("1000"), pagination.MAX_LIMIT)
+        with self.assertRaises(ValueError):
+            pagination.parse_limit("0")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import time
+import unittest
+from concurrent.futures import Future
+from unittest.mock import patch, MagicMock
+from utils import passwords
+
+
+class TestPasswords(unittest.TestCase):
+    def setUp(self):
+        passwords._stats.reset()
+
+    @patch.object(passwords, 'BCRYPT_ROUNDS', 4)
+    @patch.object(passwords, 'PASSWORD_POOL_SIZE', 0)
+    def test_hash_and_check_inline(self):
+        """Sans pool, le calcul se fait sur le thread appelant"""
+        hashed = passwords.hash_password("secret")
+        self.assertTrue(passwords.check_password("secret", hashed))
+        self.assertFalse(passwords.check_password("autre", hashed))
+        self.assertEqual(passwords.get_password_stats()["operations"]["check"]["count"], 2)
+
+    @patch.object(passwords, 'BCRYPT_ROUNDS', 4)
+    @patch.object(passwords, 'PASSWORD_POOL_SIZE', 1)
+    def test_hash_in_pool(self):
+        """Le hachage passe par le pool de processus"""
+        try:
+            hashed = passwords.hash_password("secret")
+            self.assertTrue(passwords.check_password("secret", hashed.decode('utf-8')))
+        finally:
+            passwords.shutdown_pool()
+        stats = passwords.get_password_stats()
+        self.assertEqual(stats["operations"]["hash"]["count"], 1)
+        # La place est rendue par le callback de fin du calcul, juste après le résultat
+        deadline = time.time() + 1
+        while passwords.get_password_stats()["inflight"] and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(passwords.get_password_stats()["inflight"], 0)
+
+    @patch.object(passwords, 'PASSWORD_POOL_SIZE', 1)
+    @patch.object(passwords, 'PASSWORD_QUEUE_LIMIT', 0)
+    @patch.object(passwords, 'PASSWORD_TIMEOUT', 0.01)
+    def test_timeout_keeps_slot_until_job_ends(self):
+        """Un calcul commencé qui dépasse le délai occupe sa place jusqu'à sa fin"""
+        future = Future()
+        future.set_running_or_notify_cancel()
+        executor = MagicMock()
+        executor.submit.return_value = future
+        with patch.object(passwords, '_get_executor', return_value=executor):
+            with self.assertRaises(passwords.PasswordPoolBusy):
+                passwords.hash_password("secret")
+            self.assertEqual(passwords.get_password_stats()["inflight"], 1)
+            with self.assertRaises(passwords.PasswordPoolBusy):
+                passwords.hash_password("secret")
+            executor.submit.assert_called_once()
+
+        future.set_result((b"hash", time.time(), 0.0))
+        self.assertEqual(passwords.get_password_stats()["inflight"], 0)
+
+    @patch.object(passwords, 'PASSWORD_POOL_SIZE', 1)
+    @patch.object(passwords, 'PASSWORD_QUEUE_LIMIT', 0)
+    def test_rejects_when_queue_full(self):
+        """File pleine : PasswordPoolBusy sans soumettre de calcul"""
+        with patch.object(passwords, '_inflight', 1):
+            with self.assertRaises(passwords.PasswordPoolBusy):
+                passwords.hash_password("secret")
+        self.assertEqual(passwords.get_password_stats()["rejected"], 1)
+
+    @patch.object(passwords, 'BCRYPT_ROUNDS', 12)
+    def test_needs_rehash(self):
+        """Un coût différent ou un mot de passe en clair est re-haché"""
+        self.assertFalse(passwords.needs_rehash(b"$2b$12$abcdefghijklmnopqrstuv"))
+        self.assertTrue(passwords.needs_rehash("$2b$10$abcdefghijklmnopqrstuv"))
+        self.assertTrue(passwords.needs_rehash("motdepasse"))
+
+
+if __name__ == '__main__':
+    unittest.main()
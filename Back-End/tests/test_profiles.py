@@ -0,0 +1,50 @@
+import unittest
+from unittest.mock import MagicMock
+from bson import ObjectId
+from utils import profiles
+
+
+class TestPublicProfiles(unittest.TestCase):
+    def setUp(self):
+        profiles.get_profile_cache().clear()
+        self.db = MagicMock()
+        self.alice, self.bob, self.deleted = ObjectId(), ObjectId(), ObjectId()
+        self.db.users.find.return_value = [
+            {"_id": self.alice, "nom": "Martin", "prenom": "Alice"},
+            {"_id": self.bob, "nom": "Durand", "prenom": "Bob"},
+        ]
+
+    def test_one_query_for_distinct_authors(self):
+        """Les auteurs distincts d'une page sont résolus en une seule requête $in"""
+        documents = [
+            {"user_id": self.alice}, {"user_id": str(self.alice)}, {"user_id": self.bob}, {"user_id": self.deleted},
+        ]
+        profiles.hydrate_authors(self.db, documents, "user_id")
+
+        self.db.users.find.assert_called_once()
+        query, projection = self.db.users.find.call_args[0]
+        self.assertEqual(set(query["_id"]["$in"]), {self.alice, self.bob, self.deleted})
+        self.assertEqual(projection, profiles.PUBLIC_FIELDS)
+        self.assertEqual([d["prenom_utilisateur"] for d in documents], ["Alice", "Alice", "Bob", ""])
+        self.assertEqual(documents[3]["nom_utilisateur"], "Utilisateur")
+
+    def test_cached_profiles_not_reread(self):
+        """Les profils en cache, y compris les utilisateurs introuvables, ne sont pas relus"""
+        profiles.get_public_profiles(self.db, [self.alice, self.deleted])
+        result = profiles.get_public_profiles(self.db, [self.alice, self.deleted])
+        self.assertEqual(self.db.users.find.call_count, 1)
+        self.assertEqual(list(result), [str(self.alice)])
+
+    def test_evict_profile(self):
+        profiles.get_public_profiles(self.db, [self.alice])
+        profiles.evict_profile(self.alice)
+        profiles.get_public_profiles(self.db, [self.alice])
+        self.assertEqual(self.db.users.find.call_count, 2)
+
+    def test_invalid_ids_ignored(self):
+        self.assertEqual(profiles.get_public_profiles(self.db, ["abc", None, ""]), {})
+        self.db.users.find.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from utils import projections
+
+
+class TestProjections(unittest.TestCase):
+    def test_card_never_includes_content(self):
+        """La vue card d'une ressource remplace contenu par l'extrait"""
+        projection = projections.parse_fields('ressource', 'card')
+        self.assertNotIn('contenu', projection)
+        self.assertIn('$ifNull', projection['extrait'])
+        self.assertEqual(projection['titre'], 1)
+
+    def test_default_and_admin_views(self):
+        self.assertIn('contenu', projections.parse_fields('ressource', None))
+        self.assertIsNone(projections.parse_fields('ressource', 'admin'))
+        self.assertEqual(projections.parse_fields('users', 'admin'), {'password': 0})
+
+    def test_sparse_fields(self):
+        """Une liste de champs est limitée aux champs des vues autorisées"""
+        self.assertEqual(
+            projections.parse_fields('users', 'nom,prenom', allowed=('card',)),
+            {'_id': 1, 'nom': 1, 'prenom': 1},
+        )
+        with self.assertRaises(ValueError):
+            projections.parse_fields('users', 'nom,mail', allowed=('card',))
+        with self.assertRaises(ValueError):
+            projections.parse_fields('users', 'password')
+        with self.assertRaises(ValueError):
+            projections.parse_fields('ressource', 'admin', allowed=('card', 'detail'))
+
+    def test_make_excerpt(self):
+        self.assertEqual(projections.make_excerpt("<p>Bonjour&nbsp;<b>à</b>\n tous</p>"), "Bonjour à tous")
+        excerpt = projections.make_excerpt("<p>" + "mot " * 100 + "</p>", length=20)
+        self.assertEqual(excerpt, "mot mot mot mot mot...")
+
+
+if __name__ == '__main__':
+    unittest.main()
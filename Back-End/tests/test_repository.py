@@ -0,0 +1,156 @@
+import os
+import re
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+from bson import ObjectId
+from pymongo import ReturnDocument
+from utils import repository
+from utils.pagination import decode_cursor
+from utils.projections import projection_for, CARD
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# db.<collection>.<méthode>( ou db["<collection>"]
+COLLECTION_ACCESS = re.compile(r"\bdb\.(\w+)\.\w+\(|\bdb\[['\"](\w+)['\"]\]")
+
+
+class TestRepository(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+
+    def test_registered_collection_names(self):
+        self.assertIs(repository.resources(self.db).collection, self.db.ressource)
+        self.assertIs(repository.comments(self.db).collection, self.db.commentaire)
+        self.assertIs(repository.sessions(self.db).collection, self.db.token)
+        with self.assertRaises(KeyError):
+            repository.Repository(self.db, 'resources')
+
+    def test_get_with_view(self):
+        resource_id = ObjectId()
+        repository.resources(self.db).get(str(resource_id), view=CARD)
+        self.db.ressource.find_one.assert_called_once_with(
+            {'_id': resource_id}, projection_for('ressource', CARD))
+
+    def test_exists_reads_only_id(self):
+        comment_id = ObjectId()
+        self.db.commentaire.find_one.return_value = None
+        self.assertFalse(repository.comments(self.db).exists(str(comment_id)))
+        self.db.commentaire.find_one.assert_called_once_with({'_id': comment_id}, {'_id': 1})
+
+    def test_count_with_limit(self):
+        repository.users(self.db).count({'role_id': 1}, limit=1)
+        self.db.users.count_documents.assert_called_once_with({'role_id': 1}, limit=1)
+
+    def test_page(self):
+        documents = [{'_id': ObjectId(), 'createdAt': datetime(2024, 5, i + 1)} for i in range(3)]
+        self.db.ressource.find.return_value.sort.return_value.limit.return_value = documents
+        page, next_cursor = repository.resources(self.db).page({'approved': True}, 'recent', 'createdAt', 2)
+
+        self.assertEqual(page, documents[:2])
+        self.db.ressource.find.return_value.sort.return_value.limit.assert_called_once_with(3)
+        value, last_id = decode_cursor(next_cursor, 'recent')
+        self.assertEqual(last_id, documents[1]['_id'])
+
+        repository.resources(self.db).page({'approved': True}, 'recent', 'createdAt', 2, (value, last_id))
+        query = self.db.ressource.find.call_args[0][0]
+        self.assertEqual(query['$and'][0], {'approved': True})
+        self.assertEqual(query['$and'][1]['$or'][1], {'createdAt': value, '_id': {'$lt': last_id}})
+
+
+class TestUpdate(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.role_id = ObjectId()
+
+    def test_update_returns_document_after(self):
+        self.db.role.find_one_and_update.return_value = {'_id': self.role_id, 'nom_role': 'x', 'version': 2}
+        role = repository.roles(self.db).update(str(self.role_id), {'nom_role': 'x'}, version=1)
+
+        self.assertEqual(role['version'], 2)
+        args, kwargs = self.db.role.find_one_and_update.call_args
+        self.assertEqual(args, ({'_id': self.role_id, 'version': 1},
+                                {'$set': {'nom_role': 'x'}, '$inc': {'version': 1}}))
+        self.assertEqual(kwargs['return_document'], ReturnDocument.AFTER)
+        self.db.role.find_one.assert_not_called()
+
+    def test_version_zero_matches_unversioned_documents(self):
+        repository.roles(self.db).update(self.role_id, {'nom_role': 'x'}, version=0)
+        selector = self.db.role.find_one_and_update.call_args[0][0]
+        self.assertEqual(selector['version'], {'$in': [0, None]})
+
+    def test_conflict(self):
+        self.db.role.find_one_and_update.return_value = None
+        self.db.role.find_one.return_value = {'_id': self.role_id, 'version': 5}
+        with self.assertRaises(repository.VersionConflict) as context:
+            repository.roles(self.db).update(self.role_id, {'nom_role': 'x'}, version=4)
+        self.assertEqual(context.exception.current, 5)
+
+    def test_not_found(self):
+        self.db.role.find_one_and_update.return_value = None
+        self.db.role.find_one.return_value = None
+        self.assertIsNone(repository.roles(self.db).update(self.role_id, {'nom_role': 'x'}, version=4))
+
+    def test_before(self):
+        self.db.ressource.find_one_and_update.return_value = {'_id': self.role_id, 'approved': False}
+        before, after = repository.resources(self.db).update(self.role_id, {'approved': True}, before=True)
+        self.assertFalse(before['approved'])
+        self.assertEqual(after, {'_id': self.role_id, 'approved': True, 'version': 1})
+        self.assertEqual(self.db.ressource.find_one_and_update.call_args[1]['return_document'], ReturnDocument.BEFORE)
+
+    def test_unset(self):
+        self.db.ressource.find_one_and_update.return_value = {'_id': self.role_id, 'claimed_by': 'x', 'version': 1}
+        _, after = repository.resources(self.db).update(self.role_id, {'approved': True}, before=True,
+                                                        unset=('claimed_by',))
+        self.assertEqual(after, {'_id': self.role_id, 'approved': True, 'version': 2})
+        update = self.db.ressource.find_one_and_update.call_args[0][1]
+        self.assertEqual(update['$unset'], {'claimed_by': ""})
+
+    def test_increment_keeps_version(self):
+        """Un compteur ($inc) ne change pas la version du document"""
+        repository.resources(self.db).increment(str(self.role_id), 'views_count')
+        self.db.ressource.update_one.assert_called_once_with({'_id': self.role_id}, {'$inc': {'views_count': 1}})
+
+    def test_parse_version(self):
+        self.assertIsNone(repository.parse_version({}))
+        self.assertEqual(repository.parse_version({'version': 3}), 3)
+        for invalid in ('3', -1, True):
+            with self.assertRaises(ValueError):
+                repository.parse_version({'version': invalid})
+
+
+class TestCollectionNames(unittest.TestCase):
+    def test_no_unregistered_collection(self):
+        """Aucune requête du code ne vise une collection absente de COLLECTIONS"""
+        registered = set(repository.COLLECTIONS.values())
+        unknown = []
+        for folder in ('routes', 'utils', 'config'):
+            for root, _, files in os.walk(os.path.join(BACKEND, folder)):
+                for name in files:
+                    if not name.endswith('.py'):
+                        continue
+                    path = os.path.join(root, name)
+                    with open(path, encoding='utf-8') as source:
+                        for match in COLLECTION_ACCESS.finditer(source.read()):
+                            collection = match.group(1) or match.group(2)
+                            if collection not in registered:
+                                unknown.append(f"{os.path.relpath(path, BACKEND)}: {collection}")
+        self.assertEqual(unknown, [])
+
+    def test_routes_use_repository(self):
+        """Les routes passent par les accesseurs du repository, jamais par db.<nom> ni .collection"""
+        direct = []
+        for root, _, files in os.walk(os.path.join(BACKEND, 'routes')):
+            for name in files:
+                if not name.endswith('.py'):
+                    continue
+                path = os.path.join(root, name)
+                with open(path, encoding='utf-8') as source:
+                    for number, line in enumerate(source, 1):
+                        if COLLECTION_ACCESS.search(line) or '.collection.' in line:
+                            direct.append(f"{os.path.relpath(path, BACKEND)}:{number}")
+        self.assertEqual(direct, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
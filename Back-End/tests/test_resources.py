@@ -1,19 +1,37 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from flask import Flask
+from flask_cors import CORS
 from bson import ObjectId
 from datetime import datetime
 import json
 from routes.resources import resources_bp
+from utils.auth import Principal
+from utils.roles import PERM_MODERATE
+from utils.serialization import init_app as init_json
+from utils.conditional import get_version_stamps
+from utils.response_cache import get_response_cache
+from utils.profiles import get_profile_cache
+from config import migrations
 
 class TestResourcesRoutes(unittest.TestCase):
     def setUp(self):
         """Configuration initiale pour chaque test"""
         self.app = Flask(__name__)
+        init_json(self.app)
         self.app.register_blueprint(resources_bp, url_prefix='/resources')
         self.client = self.app.test_client()
         self.app.config['TESTING'] = True
 
+        # Tampons de version des réponses conditionnelles (ETag)
+        self.versions_db = MagicMock()
+        self.versions_db.versions.find.return_value = []
+        patcher = patch('utils.conditional.get_db', return_value=self.versions_db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        get_version_stamps().clear()
+        get_response_cache().clear()
+
         # Mock token pour les tests
         self.valid_token = "valid_token"
         self.invalid_token = "invalid_token"
@@ -34,6 +52,13 @@ class TestResourcesRoutes(unittest.TestCase):
             return self.moderator_id
         return None
 
+    def mock_load_principal(self, token, db=None):
+        """Mock pour la fonction load_principal"""
+        user_id = self.mock_get_user_id_from_token(token)
+        if not user_id:
+            return None
+        return Principal(user_id, {"_id": ObjectId(user_id)})
+
     def mock_get_db(self):
         """Mock pour la fonction get_db"""
         db = MagicMock()
@@ -62,7 +87,7 @@ class TestResourcesRoutes(unittest.TestCase):
         # Mock du retour de insert_one
         mock_insert_result = MagicMock()
         mock_insert_result.inserted_id = ObjectId()
-        db.ressources_en_attente.insert_one.return_value = mock_insert_result
+        db.ressource.insert_one.return_value = mock_insert_result
         test_data = {
             "title": "New Resource",
             "content": "New Content",
@@ -100,11 +125,53 @@ class TestResourcesRoutes(unittest.TestCase):
                 "date_publication": {"date": datetime.utcnow()}
             }
         ]
-        db.ressource.find.return_value = test_resources
+        db.ressource.find.return_value.sort.return_value.limit.return_value = test_resources
         response = self.client.get('/resources/')
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
         self.assertEqual(len(data), 2)
+        self.assertNotIn('X-Next-Cursor', response.headers)
+        # Vue card par défaut : le contenu n'est pas lu
+        projection = db.ressource.find.call_args[0][1]
+        self.assertNotIn('contenu', projection)
+        self.assertIn('createdAt', projection)
+
+    @patch('routes.resources.list_resources.get_db')
+    def test_list_resources_next_page(self, mock_get_db):
+        """Une ressource de plus que limit : la réponse porte le curseur de la page suivante"""
+        mock_get_db.return_value = self.mock_get_db()
+        db = mock_get_db.return_value
+        test_resources = [{"_id": ObjectId(), "titre": f"R{i}", "createdAt": datetime.utcnow()} for i in range(3)]
+        cursor = db.ressource.find.return_value.sort.return_value.limit
+        cursor.return_value = test_resources
+        response = self.client.get(f'/resources/?limit=2&categorie={self.category_id}')
+        self.assertEqual(len(json.loads(response.data)), 2)
+        cursor.assert_called_with(3)
+        self.assertEqual(db.ressource.find.call_args[0][0], {"id_categorie": ObjectId(self.category_id)})
+
+        next_cursor = response.headers['X-Next-Cursor']
+        self.client.get(f'/resources/?limit=2&cursor={next_cursor}')
+        query = db.ressource.find.call_args[0][0]
+        self.assertEqual(query["$or"][1]["_id"], {"$lt": ObjectId(str(test_resources[1]["_id"]))})
+
+    @patch('routes.resources.list_resources.get_db')
+    def test_list_resources_exposes_cursor(self, mock_get_db):
+        """La configuration CORS globale (main.py) expose X-Next-Cursor : la route ne la remplace pas"""
+        CORS(self.app, resources={r"/*": {"origins": ["http://localhost:3000"], "supports_credentials": True,
+                                          "expose_headers": ["X-Next-Cursor"]}})
+        mock_get_db.return_value = self.mock_get_db()
+        cursor = mock_get_db.return_value.ressource.find.return_value.sort.return_value.limit
+        cursor.return_value = [{"_id": ObjectId(), "createdAt": datetime.utcnow()} for _ in range(3)]
+        response = self.client.get('/resources/?limit=2', headers={'Origin': 'http://localhost:3000'})
+        self.assertIn('X-Next-Cursor', response.headers)
+        self.assertIn('X-Next-Cursor', response.headers.get('Access-Control-Expose-Headers', ''))
+
+    @patch('routes.resources.list_resources.get_db')
+    def test_list_resources_invalid_cursor(self, mock_get_db):
+        """Un curseur invalide ou d'un autre tri est refusé"""
+        mock_get_db.return_value = self.mock_get_db()
+        self.assertEqual(self.client.get('/resources/?cursor=abc').status_code, 400)
+        self.assertEqual(self.client.get('/resources/?sort=popular').status_code, 400)
 
     @patch('routes.resources.get_resource.get_db')
     def test_get_resource(self, mock_get_db):
@@ -125,11 +192,96 @@ class TestResourcesRoutes(unittest.TestCase):
         data = json.loads(response.data)
         self.assertEqual(data["titre"], "Test Resource")
 
-    @patch('routes.resources.update_resource.get_user_id_from_token')
+    @patch('utils.auth.load_principal')
+    @patch('routes.resources.list_pending_resources.get_db')
+    def test_list_pending_resources(self, mock_get_db, mock_load_principal):
+        """La file de modération est lue sur ressource (approved: false), des plus anciennes aux plus récentes"""
+        mock_load_principal.return_value = MagicMock(user={"_id": ObjectId()}, permissions=frozenset([PERM_MODERATE]))
+        mock_get_db.return_value = self.mock_get_db()
+        db = mock_get_db.return_value
+        pending = [{"_id": ObjectId(), "titre": f"R{i}", "createdAt": datetime(2024, 5, i + 1)} for i in range(3)]
+        cursor = db.ressource.find.return_value.sort.return_value.limit
+        cursor.return_value = pending
+        self.client.set_cookie('access_token', self.moderator_token)
+
+        response = self.client.get('/resources/pending?limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["titre"] for r in json.loads(response.data)], ["R0", "R1"])
+        self.assertEqual(db.ressource.find.call_args[0][0], {"approved": False})
+        db.ressource.find.return_value.sort.assert_called_with([("createdAt", 1), ("_id", 1)])
+        db.ressources_en_attente.find.assert_not_called()
+
+        self.client.get(f'/resources/pending?limit=2&cursor={response.headers["X-Next-Cursor"]}')
+        query = db.ressource.find.call_args[0][0]
+        self.assertEqual(query["$and"][1]["$or"][1], {"createdAt": pending[1]["createdAt"], "_id": {"$gt": pending[1]["_id"]}})
+
+    @patch('routes.resources.moderate_resources.adjust_counts')
+    @patch('utils.auth.load_principal')
+    @patch('routes.resources.moderate_resources.get_db')
+    def test_moderate_resources(self, mock_get_db, mock_load_principal, mock_adjust_counts):
+        """Décisions groupées : un bulk_write, compteurs ajustés par catégorie"""
+        mock_load_principal.return_value = MagicMock(user={"_id": ObjectId()}, user_id=self.moderator_id,
+                                                     permissions=frozenset([PERM_MODERATE]))
+        mock_get_db.return_value = self.mock_get_db()
+        db = mock_get_db.return_value
+        first, second = ObjectId(), ObjectId()
+        category_id = ObjectId(self.category_id)
+        db.ressource.bulk_write.return_value.modified_count = 2
+        db.ressource.find.return_value = [
+            {"_id": first, "id_categorie": category_id, "approved": True},
+            {"_id": second, "id_categorie": category_id, "approved": True},
+        ]
+        self.client.set_cookie('access_token', self.moderator_token)
+        response = self.client.post('/resources/moderate', json={"decisions": [
+            {"id": str(first), "decision": "approve"},
+            {"id": str(second), "decision": "approve"},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data["approved"], [str(first), str(second)])
+        self.assertEqual(data["skipped"], [])
+        db.ressource.bulk_write.assert_called_once()
+        mock_adjust_counts.assert_called_once_with(db, category_id, approved=2)
+
+        response = self.client.post('/resources/moderate', json={"decisions": [{"id": "abc", "decision": "approve"}]})
+        self.assertEqual(response.status_code, 400)
+
+    @patch('routes.resources.approve_resource.adjust_counts')
+    @patch('utils.auth.load_principal')
+    @patch('routes.resources.approve_resource.get_db')
+    def test_approve_resource_respects_leases(self, mock_get_db, mock_load_principal, mock_adjust_counts):
+        """L'approbation unitaire ne prend pas une ressource réservée par un autre modérateur et retire le bail"""
+        mock_load_principal.return_value = MagicMock(user={"_id": ObjectId()}, user_id=self.moderator_id,
+                                                     permissions=frozenset([PERM_MODERATE]))
+        mock_get_db.return_value = self.mock_get_db()
+        db = mock_get_db.return_value
+        category_id = ObjectId(self.category_id)
+        db.ressource.find_one_and_update.return_value = {
+            "_id": ObjectId(self.resource_id), "approved": False, "id_categorie": category_id,
+            "claimed_by": ObjectId(self.moderator_id), "claim_expires": datetime.utcnow(),
+        }
+        self.client.set_cookie('access_token', self.moderator_token)
+
+        response = self.client.post(f'/resources/approve/{self.resource_id}', json={"comment": "ok"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("claimed_by", json.loads(response.data))
+        selector, update = db.ressource.find_one_and_update.call_args[0]
+        self.assertEqual(selector["$or"][0], {"claimed_by": ObjectId(self.moderator_id)})
+        self.assertEqual(set(update["$unset"]), {"claimed_by", "claim_expires", "rejected", "date_rejet"})
+        mock_adjust_counts.assert_called_once_with(db, category_id, approved=1)
+
+        # Bail d'un autre modérateur en cours : la ressource existe mais n'est pas modifiable
+        db.ressource.find_one_and_update.return_value = None
+        db.ressource.find_one.return_value = {"_id": ObjectId(self.resource_id)}
+        response = self.client.post(f'/resources/approve/{self.resource_id}', json={})
+        self.assertEqual(response.status_code, 409)
+
+    @patch('routes.resources.update_resource.load_principal')
     @patch('routes.resources.update_resource.get_db')
-    def test_update_resource(self, mock_get_db, mock_get_user_id):
+    def test_update_resource(self, mock_get_db, mock_load_principal):
         """Test de la route update_resource"""
-        mock_get_user_id.side_effect = self.mock_get_user_id_from_token
+        mock_load_principal.side_effect = self.mock_load_principal
         mock_get_db.return_value = self.mock_get_db()
         db = mock_get_db.return_value
         existing_resource = {
@@ -141,28 +293,49 @@ class TestResourcesRoutes(unittest.TestCase):
         updated_resource = existing_resource.copy()
         updated_resource["titre"] = "Updated Title"
         updated_resource["contenu"] = "Updated Content"
-        db.ressource.find_one.side_effect = [existing_resource, updated_resource]
-        db.users.find_one.return_value = {"_id": ObjectId(self.user_id)}
-        db.role.find_one.return_value = {"nom_role": "utilisateur"}
-        db.ressource.update_one.return_value.modified_count = 1
+        updated_resource["version"] = 1
+        db.ressource.find_one_and_update.return_value = updated_resource
         update_data = {
-            "title": "Updated Title",
-            "content": "Updated Content"
+            "titre": "Updated Title",
+            "contenu": "Updated Content"
         }
+        self.client.set_cookie('access_token', self.valid_token)
         response = self.client.put(
             f'/resources/update/{self.resource_id}',
-            json=update_data,
-            cookies={'token': self.valid_token}
+            json=update_data
         )
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
         self.assertEqual(data["titre"], "Updated Title")
+        # Mise à jour et relecture en un seul aller-retour, filtrée sur le propriétaire
+        selector = db.ressource.find_one_and_update.call_args[0][0]
+        self.assertEqual(selector, {"_id": ObjectId(self.resource_id), "id_publieur": ObjectId(self.user_id)})
+        db.ressource.find_one.assert_not_called()
+        db.ressource.update_one.assert_not_called()
 
-    @patch('routes.resources.delete_resource.get_user_id_from_token')
+    @patch('routes.resources.update_resource.load_principal')
+    @patch('routes.resources.update_resource.get_db')
+    def test_update_resource_version_conflict(self, mock_get_db, mock_load_principal):
+        """Une version périmée est refusée avec 409 et la version actuelle"""
+        mock_load_principal.side_effect = self.mock_load_principal
+        mock_get_db.return_value = self.mock_get_db()
+        db = mock_get_db.return_value
+        db.ressource.find_one_and_update.return_value = None
+        db.ressource.find_one.return_value = {"_id": ObjectId(self.resource_id), "version": 4}
+        self.client.set_cookie('access_token', self.valid_token)
+        response = self.client.put(
+            f'/resources/update/{self.resource_id}',
+            json={"titre": "Updated Title", "version": 3}
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(json.loads(response.data)["version"], 4)
+        self.assertEqual(db.ressource.find_one_and_update.call_args[0][0]["version"], 3)
+
+    @patch('routes.resources.delete_resource.load_principal')
     @patch('routes.resources.delete_resource.get_db')
-    def test_delete_resource(self, mock_get_db, mock_get_user_id):
+    def test_delete_resource(self, mock_get_db, mock_load_principal):
         """Test de la route delete_resource"""
-        mock_get_user_id.side_effect = self.mock_get_user_id_from_token
+        mock_load_principal.side_effect = self.mock_load_principal
         mock_get_db.return_value = self.mock_get_db()
         db = mock_get_db.return_value
         existing_resource = {
@@ -171,15 +344,17 @@ class TestResourcesRoutes(unittest.TestCase):
             "id_publieur": ObjectId(self.user_id)
         }
         db.ressource.find_one.return_value = existing_resource
-        db.users.find_one.return_value = {"_id": ObjectId(self.user_id)}
-        db.role.find_one.return_value = {"nom_role": "utilisateur"}
+        db.ressource.delete_one.return_value.deleted_count = 1
+        self.client.set_cookie('access_token', self.valid_token)
         response = self.client.delete(
-            f'/resources/delete/{self.resource_id}',
-            cookies={'token': self.valid_token}
+            f'/resources/delete/{self.resource_id}'
         )
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
         self.assertEqual(data["message"], "Ressource supprimée avec succès")
+        # Commentaires enregistrés par post_comments (id_ressource) comme par comments (resource_id)
+        db.commentaire.delete_many.assert_called_once_with(
+            {"$or": [{"id_ressource": ObjectId(self.resource_id)}, {"resource_id": ObjectId(self.resource_id)}]})
 
     @patch('routes.resources.comments.get_user_id_from_token')
     @patch('routes.resources.comments.get_db')
@@ -224,5 +399,121 @@ class TestResourcesRoutes(unittest.TestCase):
         data = json.loads(response.data)
         self.assertEqual(str(data["resource_id"]), self.resource_id)
 
+    @patch('routes.resources.get_favorites.get_user_id_from_token')
+    @patch('routes.resources.get_favorites.get_db')
+    def test_get_favorites(self, mock_get_db, mock_get_user_id):
+        """Les ressources d'une page de favoris sont lues en une requête, sans contenu"""
+        mock_get_user_id.side_effect = self.mock_get_user_id_from_token
+        mock_get_db.return_value = self.mock_get_db()
+        db = mock_get_db.return_value
+        resource_ids = [ObjectId() for _ in range(3)]
+        favorites = [
+            {"_id": ObjectId(), "user_id": ObjectId(self.user_id), "resource_id": resource_id,
+             "created_at": datetime.utcnow()}
+            for resource_id in resource_ids
+        ]
+        cursor = db.favoris.find.return_value.sort.return_value.limit
+        cursor.return_value = favorites
+        db.ressource.find.return_value = [
+            {"_id": resource_id, "titre": f"R{i}", "extrait": "..."} for i, resource_id in enumerate(resource_ids[:2])
+        ]
+        self.client.set_cookie('access_token', self.valid_token)
+
+        response = self.client.get('/resources/favorites?limit=2')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([favorite["resource"]["titre"] for favorite in data], ["R0", "R1"])
+        cursor.assert_called_with(3)
+        db.ressource.find_one.assert_not_called()
+        query, projection = db.ressource.find.call_args[0]
+        self.assertEqual(query, {"_id": {"$in": resource_ids[:2]}})
+        self.assertNotIn("contenu", projection)
+
+        next_cursor = response.headers['X-Next-Cursor']
+        self.client.get(f'/resources/favorites?limit=2&cursor={next_cursor}')
+        query = db.favoris.find.call_args[0][0]
+        self.assertEqual(query["$and"][1]["$or"][1]["_id"], {"$lt": favorites[1]["_id"]})
+
+    @patch('routes.resources.get_comment_thread.get_db')
+    def test_get_comment_thread(self, mock_get_db):
+        """Un seul appel renvoie la page de commentaires, leurs réponses et le nom des auteurs"""
+        mock_get_db.return_value = self.mock_get_db()
+        db = mock_get_db.return_value
+        get_profile_cache().clear()
+        author = ObjectId()
+        comments = [
+            {"_id": ObjectId(), "contenu": f"C{i}", "id_user": author, "date_publication": datetime.utcnow(),
+             "replies": [{"_id": ObjectId(), "content": "R", "user_id": author}], "replies_count": 4}
+            for i in range(3)
+        ]
+        db.ressource.find_one.return_value = {"_id": ObjectId(self.resource_id)}
+        db.commentaire.aggregate.return_value = comments
+        db.users.find.return_value = [{"_id": author, "nom": "Martin", "prenom": "Alice"}]
+
+        response = self.client.get(f'/resources/comments/{self.resource_id}/thread?limit=2&replies=5')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0]["replies_count"], 4)
+        self.assertEqual(data[0]["prenom_utilisateur"], "Alice")
+        self.assertEqual(data[0]["replies"][0]["nom_utilisateur"], "Martin")
+        db.users.find.assert_called_once()
+        pipeline = db.commentaire.aggregate.call_args[0][0]
+        self.assertEqual(pipeline[0]["$match"], {"id_ressource": ObjectId(self.resource_id)})
+        self.assertEqual(pipeline[2], {"$limit": 3})
+        self.assertEqual(pipeline[4]["$lookup"]["pipeline"][2], {"$limit": 5})
+
+        next_cursor = response.headers['X-Next-Cursor']
+        self.client.get(f'/resources/comments/{self.resource_id}/thread?limit=2&cursor={next_cursor}')
+        query = db.commentaire.aggregate.call_args[0][0][0]["$match"]
+        self.assertEqual(query["$and"][1]["$or"][1]["_id"], {"$lt": comments[1]["_id"]})
+
+    @patch('routes.resources.get_comment_thread.get_db')
+    def test_get_comment_thread_dates_pending(self, mock_get_db):
+        """Tant que la migration 0001 n'est pas terminée, le fil répond 503 au lieu de curseurs faux"""
+        mock_get_db.return_value = self.mock_get_db()
+        db = mock_get_db.return_value
+        migrations._applied.clear()
+        self.addCleanup(migrations._applied.clear)
+        db.migrations.find_one.side_effect = lambda query, projection=None: (
+            None if query["_id"] == migrations.COMMENTAIRE_DATES else {"_id": query["_id"]})
+
+        response = self.client.get(f'/resources/comments/{self.resource_id}/thread')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+        db.commentaire.aggregate.assert_not_called()
+
+    @patch('routes.resources.get_comment_thread.get_db')
+    def test_get_comment_thread_during_migration(self, mock_get_db):
+        """Tant que les migrations 0002/0003 ne sont pas terminées, les réponses à l'ancien format sont lues"""
+        mock_get_db.return_value = self.mock_get_db()
+        db = mock_get_db.return_value
+        get_profile_cache().clear()
+        migrations._applied.clear()
+        self.addCleanup(migrations._applied.clear)
+        migrations._applied.add(migrations.COMMENTAIRE_DATES)
+        db.migrations.find_one.return_value = None
+        db.ressource.find_one.return_value = {"_id": ObjectId(self.resource_id)}
+        db.commentaire.aggregate.return_value = [
+            {"_id": ObjectId(), "contenu": "C", "id_user": ObjectId(),
+             "date_publication": {"$date": "2024-05-02T08:00:00Z"},
+             "replies": [{"_id": ObjectId(), "content": "R", "created_at": {"$date": "2024-05-01T12:00:00Z"}}],
+             "replies_count": 1}
+        ]
+        db.users.find.return_value = []
+
+        response = self.client.get(f'/resources/comments/{self.resource_id}/thread')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertTrue(data[0]["replies"][0]["created_at"].startswith("2024-05-01T12:00:00"))
+        self.assertTrue(data[0]["date_publication"].startswith("2024-05-02T08:00:00"))
+        replies_of = db.commentaire.aggregate.call_args[0][0][4]["$lookup"]["pipeline"][0]["$match"]
+        self.assertEqual(replies_of["resource_id"],
+                         {"$in": [ObjectId(self.resource_id), self.resource_id]})
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
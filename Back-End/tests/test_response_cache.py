@@ -0,0 +1,129 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock
+from flask import Flask, jsonify
+from utils import conditional, response_cache
+from utils.response_cache import ResponseCache, cached_response
+from utils.streaming import stream_json_array
+
+
+class TestResponseCacheStore(unittest.TestCase):
+    def test_lru_eviction_by_bytes(self):
+        """Les entrées les moins récemment lues sont évincées quand la taille totale dépasse max_bytes"""
+        cache = ResponseCache(max_bytes=250, ttl=30, max_entry_bytes=250)
+        for key in ('a', 'b'):
+            cache.set(key, {'ressource': 1}, 200, [], b'x' * 100)
+        cache.get('a', {'ressource': 1})
+        cache.set('c', {'ressource': 1}, 200, [], b'x' * 100)
+
+        self.assertIsNotNone(cache.get('a', {'ressource': 1}))
+        self.assertIsNone(cache.get('b', {'ressource': 1}))
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.bytes, 250)
+
+    def test_entry_too_large(self):
+        cache = ResponseCache(max_bytes=1000, ttl=30, max_entry_bytes=10)
+        self.assertFalse(cache.set('a', {}, 200, [], b'x' * 100))
+        self.assertEqual(len(cache), 0)
+
+    def test_version_mismatch_and_expiry(self):
+        cache = ResponseCache(max_bytes=1000, ttl=30)
+        cache.set('a', {'ressource': 1}, 200, [], b'[]')
+        self.assertIsNone(cache.get('a', {'ressource': 2}))
+        self.assertEqual(cache.bytes, 0)
+
+        with patch('utils.response_cache.time.monotonic', side_effect=[0, 100]):
+            cache.set('b', {'ressource': 1}, 200, [], b'[]')
+            self.assertIsNone(cache.get('b', {'ressource': 1}))
+
+    def test_invalidate_by_tag(self):
+        cache = ResponseCache(max_bytes=1000, ttl=30)
+        cache.set('a', {'ressource': 1}, 200, [], b'[]')
+        cache.set('b', {'categories': 1}, 200, [], b'[]')
+        self.assertEqual(cache.invalidate('ressource'), 1)
+        self.assertIsNone(cache.get('a', {'ressource': 1}))
+        self.assertIsNotNone(cache.get('b', {'categories': 1}))
+        self.assertEqual(cache.stats()['invalidations'], 1)
+
+
+class TestCachedResponse(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.calls = 0
+        self.db = MagicMock()
+        self.db.versions.find.return_value = [
+            {"_id": "ressource", "version": 3, "updated_at": datetime(2024, 5, 1, 12, 0)}
+        ]
+        patcher = patch('utils.conditional.get_db', return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        conditional.get_version_stamps().clear()
+        response_cache.get_response_cache().clear()
+
+        @self.app.route('/items')
+        @cached_response(conditional.RESOURCES)
+        def items():
+            self.calls += 1
+            return jsonify([1, 2, 3]), 200, {'X-Next-Cursor': 'abc'}
+
+        @self.app.route('/stream')
+        @cached_response(conditional.RESOURCES)
+        def stream():
+            self.calls += 1
+            return stream_json_array([{'n': 1}, {'n': 2}])
+
+        @self.app.route('/missing')
+        @cached_response(conditional.RESOURCES)
+        def missing():
+            self.calls += 1
+            return jsonify({"error": "Ressource non trouvée"}), 404
+
+        self.client = self.app.test_client()
+
+    def test_hit_skips_route(self):
+        first = self.client.get('/items?limit=2')
+        second = self.client.get('/items?limit=2')
+        self.assertEqual(first.headers['X-Cache'], 'MISS')
+        self.assertEqual(second.headers['X-Cache'], 'HIT')
+        self.assertEqual(second.get_json(), [1, 2, 3])
+        self.assertEqual(second.headers['X-Next-Cursor'], 'abc')
+        self.assertEqual(self.calls, 1)
+
+    def test_key_depends_on_query(self):
+        self.client.get('/items?limit=2')
+        self.client.get('/items?limit=3')
+        self.assertEqual(self.calls, 2)
+
+    def test_streamed_body_is_cached(self):
+        self.assertEqual(self.client.get('/stream').get_json(), [{'n': 1}, {'n': 2}])
+        response = self.client.get('/stream')
+        self.assertEqual(response.headers['X-Cache'], 'HIT')
+        self.assertEqual(response.get_json(), [{'n': 1}, {'n': 2}])
+        self.assertEqual(self.calls, 1)
+
+    def test_errors_not_cached(self):
+        self.client.get('/missing')
+        self.client.get('/missing')
+        self.assertEqual(self.calls, 2)
+
+    def test_bump_invalidates(self):
+        """Une écriture du worker supprime les réponses qui dépendent de la collection"""
+        self.client.get('/items')
+        self.db.versions.find_one_and_update.return_value = {
+            "_id": "ressource", "version": 4, "updated_at": datetime.now(timezone.utc)
+        }
+        conditional.bump_version(self.db, conditional.RESOURCES)
+
+        self.assertEqual(self.client.get('/items').headers['X-Cache'], 'MISS')
+        self.assertEqual(self.calls, 2)
+
+    def test_versions_unavailable(self):
+        self.db.versions.find.side_effect = Exception("timeout")
+        self.client.get('/items')
+        response = self.client.get('/items')
+        self.assertNotIn('X-Cache', response.headers)
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from flask import Flask
+from bson import ObjectId
+from utils import roles
+from utils.auth import Principal
+
+
+class TestRoleRegistry(unittest.TestCase):
+    def setUp(self):
+        self.moderator_id = ObjectId()
+        self.custom_id = ObjectId()
+        self.db = MagicMock()
+        self.db.versions.find_one.return_value = {"_id": "role", "version": 1}
+        self.db.role.find.return_value = [
+            {"_id": self.moderator_id, "nom_role": "modérateur", "permissions": []},
+            {"_id": self.custom_id, "nom_role": "éditeur", "permissions": ["manage_categories"]},
+        ]
+        self.registry = roles.RoleRegistry(check_interval=0)
+
+    @patch('utils.roles.get_db')
+    def test_builtin_and_stored_permissions(self, mock_get_db):
+        """Les permissions implicites s'ajoutent à celles stockées en base"""
+        mock_get_db.return_value = self.db
+        self.assertIn(roles.PERM_MODERATE, self.registry.permissions(self.moderator_id))
+        self.assertEqual(self.registry.permissions(str(self.custom_id)), frozenset(["manage_categories"]))
+        self.assertEqual(self.registry.permissions(ObjectId()), frozenset())
+
+    def test_reload_only_on_version_change(self):
+        """La collection role n'est relue que si le tampon de version change"""
+        self.registry.refresh(self.db)
+        self.registry.refresh(self.db)
+        self.assertEqual(self.db.role.find.call_count, 1)
+        self.db.versions.find_one.return_value = {"_id": "role", "version": 2}
+        self.registry.refresh(self.db)
+        self.assertEqual(self.db.role.find.call_count, 2)
+
+
+class TestRequiresDecorator(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.client = self.app.test_client()
+
+        @self.app.route('/moderation')
+        @roles.requires(roles.PERM_MODERATE)
+        def moderation(principal):
+            return {"user_id": str(principal.user_id)}
+
+    @patch('utils.auth.load_principal')
+    def test_forbidden_without_permission(self, mock_load_principal):
+        mock_load_principal.return_value = Principal(ObjectId(), {"_id": ObjectId()})
+        self.client.set_cookie('access_token', 'token')
+        response = self.client.get('/moderation')
+        self.assertEqual(response.status_code, 403)
+
+    @patch('utils.auth.load_principal')
+    def test_allowed_with_permission(self, mock_load_principal):
+        principal = MagicMock(user={"_id": ObjectId()}, permissions=frozenset([roles.PERM_MODERATE]))
+        mock_load_principal.return_value = principal
+        self.client.set_cookie('access_token', 'token')
+        response = self.client.get('/moderation')
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_token(self):
+        response = self.client.get('/moderation')
+        self.assertEqual(response.status_code, 401)
+
+    @patch('utils.auth.load_principal')
+    def test_cookie_only(self, mock_load_principal):
+        """Comme les routes qu'il remplace, requires ne lit pas les en-têtes Authorization et token"""
+        response = self.client.get('/moderation', headers={'Authorization': 'Bearer token', 'token': 'token'})
+        self.assertEqual(response.status_code, 401)
+        mock_load_principal.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from bson import ObjectId
+from utils import sampling
+
+
+def _batch(*keys):
+    return [{"_id": ObjectId(), "random_key": key} for key in keys]
+
+
+class TestPickUnseen(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.user_id = str(ObjectId())
+        self.find = self.db.ressource.find.return_value.sort.return_value.limit
+
+    def _seen(self, *batches):
+        ids = [doc["_id"] for batch in batches for doc in batch]
+        self.db.historique.find.return_value = [{"resource_id": resource_id} for resource_id in ids]
+
+    @patch('utils.sampling.RANDOM_BATCH_SIZE', 2)
+    @patch('utils.sampling.new_random_key', return_value=0.5)
+    def test_skips_seen_resources(self, _):
+        """Les ressources déjà vues du lot sont ignorées ; l'historique n'est lu que pour le lot"""
+        first = _batch(0.6, 0.7)
+        self.find.return_value = first
+        self.db.historique.find.return_value = [{"resource_id": first[0]["_id"]}]
+
+        resource = sampling.pick_unseen(self.db, self.user_id)
+
+        self.assertEqual(resource["_id"], first[1]["_id"])
+        query = self.db.historique.find.call_args[0][0]
+        self.assertEqual(query["resource_id"], {"$in": [first[0]["_id"], first[1]["_id"]]})
+        self.assertEqual(self.db.ressource.find.call_args[0][0], {"random_key": {"$gte": 0.5}})
+        self.db.ressource.find_one.assert_not_called()
+
+    @patch('utils.sampling.new_random_key', return_value=0.5)
+    def test_projection_read_with_batch(self, _):
+        """Les champs demandés sont lus par la requête du lot, sans random_key s'il n'est pas demandé"""
+        batch = [{"_id": ObjectId(), "random_key": 0.6, "titre": "T"}]
+        self.find.return_value = batch
+        self._seen()
+
+        resource = sampling.pick_unseen(self.db, self.user_id, {"_id": 1, "titre": 1})
+
+        self.assertEqual(resource, {"_id": batch[0]["_id"], "titre": "T"})
+        self.assertEqual(self.db.ressource.find.call_args[0][1], {"_id": 1, "titre": 1, "random_key": 1})
+
+    @patch('utils.sampling.RANDOM_BATCH_SIZE', 2)
+    @patch('utils.sampling.new_random_key', return_value=0.5)
+    def test_wraps_around(self, _):
+        """Après la fin de l'index, le parcours reprend au début jusqu'au point de départ"""
+        after = _batch(0.6, 0.7)
+        before = _batch(0.1)
+        self.find.side_effect = [after, [], before]
+        self._seen(after)
+
+        resource = sampling.pick_unseen(self.db, self.user_id)
+
+        self.assertEqual(resource["_id"], before[0]["_id"])
+        queries = [call[0][0] for call in self.db.ressource.find.call_args_list]
+        self.assertEqual(queries[1], {"random_key": {"$gt": 0.7}})
+        self.assertEqual(queries[2], {"random_key": {"$lt": 0.5}})
+
+    @patch('utils.sampling.new_random_key', return_value=0.5)
+    def test_everything_seen(self, _):
+        batch = _batch(0.6)
+        self.find.side_effect = [batch, batch]
+        self._seen(batch)
+        self.assertIsNone(sampling.pick_unseen(self.db, self.user_id))
+
+    @patch('utils.sampling.RANDOM_MAX_BATCHES', 2)
+    @patch('utils.sampling.RANDOM_BATCH_SIZE', 2)
+    def test_gives_up_after_max_batches(self):
+        """Après RANDOM_MAX_BATCHES lots déjà vus : aucune ressource, sans lire tout l'historique"""
+        batch = _batch(0.6, 0.7)
+        self.find.return_value = batch
+        self._seen(batch)
+
+        self.assertIsNone(sampling.pick_unseen(self.db, self.user_id))
+        self.assertEqual(self.db.ressource.find.call_count, 2)
+        self.db.ressource.aggregate.assert_not_called()
+
+
+class TestPickAnonymous(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.ids = [ObjectId(), ObjectId()]
+        self.db.ressource.find.return_value = [{"_id": resource_id} for resource_id in self.ids]
+        sampling.get_approved_pool().clear()
+
+    def test_pool_loaded_once(self):
+        self.db.ressource.find_one.side_effect = lambda query, projection=None: {"_id": query["_id"]}
+        for _ in range(3):
+            self.assertIn(sampling.pick_anonymous(self.db)["_id"], self.ids)
+        self.assertEqual(self.db.ressource.find.call_count, 1)
+
+    def test_deleted_resource_discarded(self):
+        deleted = self.ids[0]
+        self.db.ressource.find_one.side_effect = (
+            lambda query, projection=None: None if query["_id"] == deleted else {"_id": query["_id"]}
+        )
+        for _ in range(5):
+            self.assertEqual(sampling.pick_anonymous(self.db)["_id"], self.ids[1])
+        self.assertNotIn(deleted, sampling.get_approved_pool().ids(self.db))
+
+    def test_empty_pool(self):
+        self.db.ressource.find.return_value = []
+        self.assertIsNone(sampling.pick_anonymous(self.db))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+from bson import ObjectId
+from flask import Flask, jsonify
+from utils import serialization
+
+
+class TestSerialization(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        serialization.init_app(self.app)
+        self.document = {
+            "_id": ObjectId(),
+            "createdAt": datetime(2024, 5, 1, 12, 30, 15, 250000),
+            "role_info": {"created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)},
+            "favoris": [ObjectId(), {"id": ObjectId()}],
+        }
+        self.expected = {
+            "_id": str(self.document["_id"]),
+            "createdAt": "2024-05-01T12:30:15.250000",
+            "role_info": {"created_at": "2024-01-01T00:00:00+00:00"},
+            "favoris": [str(self.document["favoris"][0]), {"id": str(self.document["favoris"][1]["id"])}],
+        }
+
+    def test_jsonify_bson_document(self):
+        """jsonify encode les ObjectId et datetime imbriqués, sans modifier le document"""
+        with self.app.test_request_context():
+            response = jsonify([self.document])
+        self.assertEqual(json.loads(response.data), [self.expected])
+        self.assertIsInstance(self.document["_id"], ObjectId)
+
+    def test_same_output_without_orjson(self):
+        """Le json standard produit le même résultat qu'orjson"""
+        orjson = serialization.orjson
+        serialization.orjson = None
+        try:
+            encoded = serialization.dumps_bytes(self.document, sort_keys=True)
+        finally:
+            serialization.orjson = orjson
+        self.assertEqual(encoded, serialization.dumps_bytes(self.document, sort_keys=True))
+
+    def test_flask_types_still_supported(self):
+        """Les types gérés par Flask (Decimal...) passent par l'encodeur standard"""
+        with self.app.app_context():
+            self.assertEqual(json.loads(self.app.json.dumps({"prix": Decimal("1.5")})), {"prix": "1.5"})
+            self.assertEqual(self.app.json.loads(self.app.json.dumps({"a": 1})), {"a": 1})
+
+    def test_unknown_type_raises(self):
+        with self.assertRaises(TypeError):
+            serialization.dumps_bytes({"valeur": object()})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, MagicMock
+import jwt
+from bson import ObjectId
+from flask import Flask
+from routes.auth import auth_bp
+from utils import sessions
+
+
+class TestSessions(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.db.token.insert_one.return_value = MagicMock(inserted_id=ObjectId())
+        self.user_id = ObjectId()
+
+    def test_tokens_stored_as_hashes(self):
+        """Seules les empreintes des tokens sont enregistrées"""
+        self.db.token.find.return_value.sort.return_value.skip.return_value = []
+        now = datetime.utcnow()
+        session = sessions.create_session(self.db, self.user_id, "access", "refresh",
+                                          now + timedelta(minutes=15), now + timedelta(days=7))
+        stored = self.db.token.insert_one.call_args[0][0]
+        self.assertNotIn("access_token", stored)
+        self.assertEqual(stored["access_token_hash"], sessions.hash_token("access"))
+        self.assertEqual(len(stored["refresh_token_hash"]), 64)
+        self.assertIsInstance(stored["expiration_refresh_token"], datetime)
+        self.assertEqual(session["_id"], self.db.token.insert_one.return_value.inserted_id)
+
+    @patch('utils.auth.evict_token_hash')
+    def test_session_limit_evicts_oldest(self, mock_evict):
+        """Au-delà de la limite, les sessions les plus anciennes sont supprimées"""
+        oldest = [{"_id": ObjectId(), "access_token_hash": "a"}, {"_id": ObjectId(), "access_token_hash": "b"}]
+        self.db.token.find.return_value.sort.return_value.skip.return_value = oldest
+        self.assertEqual(sessions.enforce_session_limit(self.db, self.user_id, limit=3), 2)
+        self.db.token.find.return_value.sort.return_value.skip.assert_called_with(3)
+        deleted_ids = self.db.token.delete_many.call_args[0][0]["_id"]["$in"]
+        self.assertEqual(deleted_ids, [doc["_id"] for doc in oldest])
+        self.assertEqual(mock_evict.call_count, 2)
+
+    @patch('utils.auth.evict_token_hash')
+    def test_revoke_keeps_current_session(self, mock_evict):
+        """La révocation groupée épargne la session courante"""
+        self.db.token.find.return_value = []
+        sessions.revoke_sessions(self.db, self.user_id, keep_access_token="courant")
+        query = self.db.token.find.call_args[0][0]
+        self.assertEqual(query["access_token_hash"], {"$ne": sessions.hash_token("courant")})
+        self.db.token.delete_many.assert_not_called()
+
+
+class TestRefreshRotation(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.user_id = ObjectId()
+        now = datetime.now(timezone.utc)
+        self.args = ("nouvel-access", "nouveau-refresh", now + timedelta(minutes=15), now + timedelta(days=7))
+
+    @patch('utils.auth.evict_token_hash')
+    def test_rotation_single_round_trip(self, mock_evict):
+        """Le chemin nominal se fait en un seul find_one_and_update"""
+        self.db.token.find_one_and_update.return_value = {"_id": ObjectId(), "access_token_hash": "ancien"}
+        result, _ = sessions.rotate_session(self.db, self.user_id, "refresh", *self.args)
+        self.assertEqual(result, sessions.ROTATED)
+        query, update = self.db.token.find_one_and_update.call_args[0]
+        self.assertEqual(query["refresh_token_hash"], sessions.hash_token("refresh"))
+        self.assertEqual(update["$set"]["refresh_token_hash"], sessions.hash_token("nouveau-refresh"))
+        self.db.token.find_one.assert_not_called()
+        mock_evict.assert_called_once_with("ancien")
+
+    @patch('utils.auth.evict_token_hash')
+    def test_parallel_refresh_is_not_reuse(self, mock_evict):
+        """Le token qui vient d'être tourné reçoit CONCURRENT sans révoquer la session"""
+        self.db.token.find_one_and_update.return_value = None
+        self.db.token.find_one.return_value = {
+            "_id": ObjectId(), "id_user": self.user_id, "refresh_token_hash": "autre",
+            "previous_refresh_hashes": [sessions.hash_token("refresh")],
+            "rotated_at": datetime.utcnow(),
+        }
+        result, _ = sessions.rotate_session(self.db, self.user_id, "refresh", *self.args)
+        self.assertEqual(result, sessions.CONCURRENT)
+        self.db.token.delete_one.assert_not_called()
+
+    @patch('utils.auth.evict_token_hash')
+    def test_reuse_revokes_family(self, mock_evict):
+        """Un ancien refresh token réutilisé révoque toute la session"""
+        session_id = ObjectId()
+        self.db.token.find_one_and_update.return_value = None
+        self.db.token.find_one.return_value = {
+            "_id": session_id, "id_user": self.user_id, "refresh_token_hash": "autre",
+            "previous_refresh_hashes": [sessions.hash_token("refresh"), "plus-recent"],
+            "rotated_at": datetime.utcnow() - timedelta(hours=1),
+        }
+        result, _ = sessions.rotate_session(self.db, self.user_id, "refresh", *self.args)
+        self.assertEqual(result, sessions.REUSED)
+        self.db.token.delete_one.assert_called_once_with({"_id": session_id})
+
+
+class TestRefreshRoute(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(auth_bp, url_prefix='/auth')
+        self.client = self.app.test_client()
+
+    @patch('routes.auth.refresh_token.JWT_SECRET_KEY', 'test')
+    @patch('routes.auth.refresh_token.rotate_session')
+    @patch('routes.auth.refresh_token.get_db')
+    def test_parallel_refresh_succeeds_without_cookies(self, mock_get_db, mock_rotate):
+        """Refresh parallèle (autre onglet) : succès, les cookies de l'autre requête font foi"""
+        mock_rotate.return_value = (sessions.CONCURRENT, {"_id": ObjectId()})
+        token = jwt.encode({"user_id": str(ObjectId()), "exp": int(time.time()) + 60}, "test", algorithm="HS256")
+        self.client.set_cookie('refresh_token', token)
+
+        response = self.client.post('/auth/refresh_token')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Set-Cookie', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
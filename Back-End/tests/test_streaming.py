@@ -0,0 +1,58 @@
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+from bson import ObjectId
+from flask import Flask
+from utils.streaming import stream_json_array
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+
+    def read(self, response):
+        with self.app.test_request_context():
+            return [chunk for chunk in response.response]
+
+    def test_encodes_bson_types(self):
+        """ObjectId et datetime, y compris imbriqués, sont encodés comme le faisait sanitize"""
+        user_id = ObjectId()
+        documents = [{"_id": user_id, "role_info": {"created": datetime(2024, 1, 2, 3, 4)}, "tags": [user_id]}]
+        with self.app.test_request_context():
+            response = stream_json_array(documents)
+            body = b''.join(response.response)
+        self.assertEqual(json.loads(body), [
+            {"_id": str(user_id), "role_info": {"created": "2024-01-02T03:04:00"}, "tags": [str(user_id)]}
+        ])
+        self.assertEqual(response.mimetype, 'application/json')
+
+    def test_empty_array(self):
+        with self.app.test_request_context():
+            self.assertEqual(b''.join(stream_json_array([]).response), b'[]')
+
+    def test_cursor_read_in_batches_and_chunks(self):
+        """Le curseur est lu par lots et la réponse envoyée en plusieurs morceaux"""
+        documents = [{"n": i, "texte": "x" * 50} for i in range(100)]
+        cursor = MagicMock()
+        cursor.batch_size.return_value = cursor
+        cursor.__iter__.return_value = iter(documents)
+        with self.app.test_request_context():
+            response = stream_json_array(cursor, transform=lambda d: {"n": d["n"]}, batch_size=25, chunk_size=256)
+            chunks = list(response.response)
+        cursor.batch_size.assert_called_once_with(25)
+        cursor.close.assert_called_once()
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(json.loads(b''.join(chunks)), [{"n": i} for i in range(100)])
+
+    def test_query_error_raised_before_response(self):
+        """Une erreur sur le premier lot est levée avant l'envoi du statut 200"""
+        cursor = MagicMock()
+        cursor.batch_size.return_value = cursor
+        cursor.__iter__.side_effect = RuntimeError("requête invalide")
+        with self.assertRaises(RuntimeError):
+            stream_json_array(cursor)
+
+
+if __name__ == '__main__':
+    unittest.main()
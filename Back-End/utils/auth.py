@@ -2,103 +2,227 @@ from functools import wraps
 from flask import request, jsonify
 import jwt
 import os
+import time
 from config.database import get_db
-from bson import ObjectId
+from utils.cache import TTLCache
+from utils.roles import get_role_registry
+from utils.sessions import hash_token
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Clé secrète pour JWT
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', '')
 
+# Cache des principals vérifiés (token -> utilisateur)
+PRINCIPAL_CACHE_SIZE = int(os.getenv('PRINCIPAL_CACHE_SIZE', '1024'))
+PRINCIPAL_CACHE_TTL = int(os.getenv('PRINCIPAL_CACHE_TTL', '30'))
+
+_principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+
+class Principal:
+    """
+    Utilisateur authentifié par un access token. Le rôle et les permissions
+    sont lus dans la table des rôles du worker (utils.roles), jamais en base.
+    """
+    __slots__ = ('user_id', 'user')
+
+    def __init__(self, user_id, user=None):
+        self.user_id = user_id
+        self.user = user
+
+    @property
+    def role_id(self):
+        return self.user.get('role_id') if self.user else None
+
+    @property
+    def role(self):
+        return get_role_registry().get(self.role_id)
+
+    @property
+    def role_name(self):
+        role = self.role
+        return role.get('nom_role') if role else None
+
+    @property
+    def permissions(self):
+        return get_role_registry().permissions(self.role_id)
+
+
+def _token_key(token):
+    # Même empreinte que access_token_hash en base : le token n'est jamais une clé
+    return hash_token(token)
+
+
+def _token_ttl(token):
+    """
+    Durée de vie restante du token d'après son claim exp (None si absent).
+    La signature est vérifiée ailleurs ; seule l'expiration est lue ici.
+    """
+    try:
+        exp = jwt.decode(token, options={'verify_signature': False}).get('exp')
+    except jwt.InvalidTokenError:
+        return 0
+    if exp is None:
+        return None
+    return exp - time.time()
+
+
+def _principal_pipeline(token):
+    """
+    Session et utilisateur résolus en une seule agrégation
+    """
+    return [
+        {"$match": {"access_token_hash": hash_token(token)}},
+        {"$limit": 1},
+        {"$lookup": {"from": "users", "localField": "id_user", "foreignField": "_id", "as": "user"}},
+        {"$unwind": {"path": "$user", "preserveNullAndEmptyArrays": True}},
+        {"$project": {"_id": 0, "id_user": 1, "user": 1}},
+    ]
+
+
+def load_principal(token, db=None):
+    """
+    Retourne le Principal associé à un access token présent en base, ou None.
+    Un seul aller-retour MongoDB en cas d'absence du cache ; le résultat est
+    gardé au plus PRINCIPAL_CACHE_TTL secondes et jamais au-delà de
+    l'expiration du token.
+    """
+    if not token:
+        return None
+
+    key = _token_key(token)
+    principal = _principal_cache.get(key)
+    if principal is not None:
+        return principal
+
+    db = db if db is not None else get_db()
+    docs = list(db.token.aggregate(_principal_pipeline(token)))
+    if not docs:
+        return None
+
+    doc = docs[0]
+    principal = Principal(doc.get('id_user'), doc.get('user'))
+
+    ttl = _token_ttl(token)
+    _principal_cache.set(key, principal, ttl=ttl)
+    return principal
+
+
+def evict_token(token):
+    """
+    Retire du cache le principal associé à un access token (logout, refresh)
+    """
+    if token:
+        _principal_cache.delete(_token_key(token))
+
+
+def evict_token_hash(access_token_hash):
+    """
+    Même chose à partir de l'empreinte stockée en base (révocation de sessions)
+    """
+    if access_token_hash:
+        _principal_cache.delete(access_token_hash)
+
+
+def evict_user(user_id):
+    """
+    Retire du cache tous les principals d'un utilisateur
+    """
+    return _principal_cache.delete_where(lambda principal: str(principal.user_id) == str(user_id))
+
+
+def clear_principal_cache():
+    _principal_cache.clear()
+
+
+def get_principal_cache_stats():
+    return _principal_cache.stats()
+
+def get_request_token():
+    """
+    Access token de la requête, lu dans le cookie access_token uniquement :
+    routes protégées par requires() et routes /auth/sessions. Seul
+    token_required accepte aussi les en-têtes Authorization (Bearer) et token.
+    """
+    return request.cookies.get('access_token') or None
+
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        print("\n=== DÉBUT VÉRIFICATION TOKEN ===")
-        print(f"Route appelée: {request.path} [{request.method}]")
-        print(f"Cookies reçus: {request.cookies}")
-        print(f"En-têtes: {dict(request.headers)}")
+        logger.debug("Route appelée: %s [%s]", request.path, request.method)
         
         token = None
         
         # Vérifier dans les cookies (priorité)
         if 'access_token' in request.cookies:
             token = request.cookies.get('access_token')
-            print(f"Token trouvé dans les cookies: {token[:10]}...")
         
         # Vérifier dans l'en-tête Authorization
         if not token and 'Authorization' in request.headers:
             auth_header = request.headers['Authorization']
             if auth_header.startswith('Bearer '):
                 token = auth_header.split(' ')[1]
-                print(f"Token trouvé dans l'en-tête Authorization: {token[:10]}...")
         
         # Vérifier dans l'en-tête token (fallback)
         if not token and 'token' in request.headers:
             token = request.headers['token']
-            print(f"Token trouvé dans l'en-tête token: {token[:10]}...")
         
         if not token:
-            print("❌ Aucun token trouvé")
-            print("=== FIN VÉRIFICATION TOKEN (ÉCHEC) ===\n")
+            logger.warning("Aucun token trouvé")
             return jsonify({'error': 'Token manquant'}), 401
         
         try:
             # Vérifier la signature et l'expiration du token
             decoded = jwt.decode(token, JWT_SECRET_KEY, algorithms=['HS256'])
             user_id = decoded['user_id']
-            print(f"✅ Token décodé avec succès: user_id={user_id}")
+            logger.debug("Token décodé avec succès: user_id=%s", user_id)
             
-            # Vérifier que le token existe dans la base de données
-            db = get_db()
-            token_doc = db.token.find_one({"access_token": token})
+            # Vérifier que le token existe dans la base de données (ou dans le cache)
+            principal = load_principal(token)
             
-            if not token_doc:
-                print("❌ Token non trouvé dans la base de données")
-                print("=== FIN VÉRIFICATION TOKEN (ÉCHEC) ===\n")
+            if not principal:
+                logger.warning("Token non trouvé dans la base de données")
                 return jsonify({'error': 'Token invalide'}), 401
             
             # Vérifier que l'ID utilisateur correspond
-            if str(token_doc['id_user']) != user_id:
-                print(f"❌ ID utilisateur ne correspond pas: {token_doc['id_user']} != {user_id}")
-                print("=== FIN VÉRIFICATION TOKEN (ÉCHEC) ===\n")
+            if str(principal.user_id) != user_id:
+                logger.warning("ID utilisateur ne correspond pas: %s != %s", principal.user_id, user_id)
                 return jsonify({'error': 'Token invalide'}), 401
             
             # Récupérer l'utilisateur
-            user = db.users.find_one({"_id": ObjectId(user_id)})
+            user = principal.user
             if not user:
-                print(f"❌ Utilisateur avec ID {user_id} non trouvé")
-                print("=== FIN VÉRIFICATION TOKEN (ÉCHEC) ===\n")
+                logger.warning("Utilisateur avec ID %s non trouvé", user_id)
                 return jsonify({'error': 'Utilisateur non trouvé'}), 404
             
-            print(f"✅ Utilisateur trouvé: {user.get('mail')}")
-            print("=== FIN VÉRIFICATION TOKEN (SUCCÈS) ===\n")
+            logger.debug("Utilisateur trouvé: %s", user.get('mail'))
             
             # Passer l'utilisateur à la fonction décorée
             return f(user, *args, **kwargs)
             
         except jwt.ExpiredSignatureError:
-            print("❌ Token expiré")
-            print("=== FIN VÉRIFICATION TOKEN (ÉCHEC) ===\n")
+            logger.warning("Token expiré")
             return jsonify({'error': 'Token expiré'}), 401
         except jwt.InvalidTokenError:
-            print("❌ Token invalide")
-            print("=== FIN VÉRIFICATION TOKEN (ÉCHEC) ===\n")
+            logger.warning("Token invalide")
             return jsonify({'error': 'Token invalide'}), 401
         except Exception as e:
-            print(f"❌ Erreur lors de la vérification du token: {str(e)}")
-            print("=== FIN VÉRIFICATION TOKEN (ÉCHEC) ===\n")
+            logger.exception("Erreur lors de la vérification du token: %s", e)
             return jsonify({'error': str(e)}), 500
     
     return decorated
 
 def get_user_id_from_token(token: str):
-    print("token = ",token)
     if not token:
         return "None"
 
-    db = get_db()
-
-    # Chercher le token en base
-    token_data = db.token.find_one({'access_token': token})
-    if token_data:
-        return token_data.get('id_user')
+    # Chercher le token en base (ou dans le cache)
+    principal = load_principal(token)
+    if principal:
+        return principal.user_id
 
     return None
+
@@ -0,0 +1,157 @@
+"""
+Nombre de ressources par catégorie, maintenu dans la collection category_counts
+({_id: id de la catégorie, total, approved}).
+
+Les routes d'écriture ajustent les compteurs au fil de l'eau (adjust_counts) :
+création, approbation, changement de catégorie et suppression d'une ressource.
+reconcile recalcule tous les compteurs en une seule agrégation $group et corrige
+les écarts (écriture interrompue entre la ressource et son compteur...). Elle
+est exécutée périodiquement par un thread de chaque worker
+(CATEGORY_COUNTS_RECONCILE_INTERVAL) ou en ligne de commande :
+
+    python -m utils.category_counts
+"""
+import os
+import sys
+import threading
+from pymongo import DeleteOne, ReplaceOne
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Intervalle (secondes) entre deux réconciliations des compteurs ; 0 désactive le thread
+CATEGORY_COUNTS_RECONCILE_INTERVAL = float(os.getenv('CATEGORY_COUNTS_RECONCILE_INTERVAL', '3600'))
+
+# Agrégation de référence : une seule passe sur les ressources
+RECOUNT_PIPELINE = [
+    {"$match": {"id_categorie": {"$ne": None}}},
+    {"$group": {
+        "_id": "$id_categorie",
+        "total": {"$sum": 1},
+        "approved": {"$sum": {"$cond": [{"$eq": ["$approved", True]}, 1, 0]}},
+    }},
+]
+
+# Catégories et compteurs en une requête ($lookup sur l'_id de category_counts)
+CATEGORIES_WITH_COUNTS_PIPELINE = [
+    {"$lookup": {"from": "category_counts", "localField": "_id", "foreignField": "_id", "as": "counts"}},
+    {"$project": {
+        "nom_categorie": 1,
+        "description_categorie": 1,
+        "counts": {"$arrayElemAt": ["$counts", 0]},
+    }},
+]
+
+
+def adjust_counts(db, category_id, total=0, approved=0):
+    """
+    Ajoute total / approved aux compteurs d'une catégorie
+    (à appeler après l'écriture de la ressource)
+    """
+    if category_id is None or (total == 0 and approved == 0):
+        return
+    try:
+        db.category_counts.update_one(
+            {"_id": category_id},
+            {"$inc": {"total": total, "approved": approved}},
+            upsert=True,
+        )
+    except Exception as e:
+        # La ressource est écrite : l'écart sera corrigé par la prochaine réconciliation
+        logger.exception("Impossible d'ajuster les compteurs de la catégorie %s: %s", category_id, e)
+
+
+def move_counts(db, old_category_id, new_category_id, approved=False):
+    """
+    Changement de catégorie d'une ressource
+    """
+    if old_category_id == new_category_id:
+        return
+    delta = 1 if approved else 0
+    adjust_counts(db, old_category_id, total=-1, approved=-delta)
+    adjust_counts(db, new_category_id, total=1, approved=delta)
+
+
+def reconcile(db):
+    """
+    Recalcule les compteurs et réécrit ceux qui diffèrent.
+    Retourne le nombre de compteurs corrigés et supprimés.
+    """
+    expected = {doc["_id"]: doc for doc in db.ressource.aggregate(RECOUNT_PIPELINE)}
+    current = {doc["_id"]: doc for doc in db.category_counts.find()}
+
+    operations = []
+    for category_id, doc in expected.items():
+        counts = {"total": doc["total"], "approved": doc["approved"]}
+        stored = current.get(category_id) or {}
+        if {"total": stored.get("total"), "approved": stored.get("approved")} != counts:
+            operations.append(ReplaceOne({"_id": category_id}, counts, upsert=True))
+    removed = [category_id for category_id in current if category_id not in expected]
+    operations.extend(DeleteOne({"_id": category_id}) for category_id in removed)
+
+    if operations:
+        db.category_counts.bulk_write(operations, ordered=False)
+    report = {"updated": len(operations) - len(removed), "removed": len(removed)}
+    if operations:
+        logger.info("Compteurs de catégories corrigés: %s", report)
+    return report
+
+
+def counts_of(category):
+    """
+    Compteurs d'une catégorie lue avec CATEGORIES_WITH_COUNTS_PIPELINE
+    """
+    counts = category.get("counts") or {}
+    return counts.get("total", 0), counts.get("approved", 0)
+
+
+_reconciler = None
+_reconciler_pid = None
+_reconciler_lock = threading.Lock()
+
+
+def _run_reconciler(get_db, interval, stop):
+    # Première passe immédiate : compteurs créés au premier démarrage
+    while True:
+        try:
+            db = get_db()
+            if db is not None:
+                reconcile(db)
+        except Exception as e:
+            logger.exception("Erreur lors de la réconciliation des compteurs de catégories: %s", e)
+        if stop.wait(interval):
+            return
+
+
+def start_reconciler(get_db, interval=CATEGORY_COUNTS_RECONCILE_INTERVAL):
+    """
+    Démarre le thread de réconciliation du processus courant (refait après un fork)
+    """
+    global _reconciler, _reconciler_pid
+    if interval <= 0:
+        return None
+    with _reconciler_lock:
+        if _reconciler_pid == os.getpid():
+            return _reconciler
+        stop = threading.Event()
+        thread = threading.Thread(target=_run_reconciler, args=(get_db, interval, stop),
+                                  name='category-counts-reconciler', daemon=True)
+        thread.start()
+        _reconciler, _reconciler_pid = stop, os.getpid()
+        return stop
+
+
+def main():
+    from config.database import get_db
+
+    db = get_db()
+    if db is None:
+        print("❌ Erreur: Base de données non connectée")
+        return 2
+    report = reconcile(db)
+    print(f"✅ Compteurs corrigés: {report['updated']}, supprimés: {report['removed']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Requêtes GET conditionnelles (ETag / Last-Modified, réponses 304).
+
+Chaque collection lue par une route publique a un tampon de version dans la
+collection versions ({_id: nom, version, updated_at}), incrémenté par les routes
+d'écriture (bump_version). L'ETag d'une réponse est calculé à partir de la
+route, de ses paramètres et des versions dont elle dépend : il est donc connu
+avant d'exécuter la requête MongoDB de la route.
+
+Les versions sont gardées en mémoire par worker et relues au plus toutes les
+VERSION_CHECK_INTERVAL secondes : un If-None-Match valide reçoit un 304 sans
+aucun accès à MongoDB. Une écriture faite par un autre worker est vue après au
+plus cet intervalle ; celles du worker courant le sont immédiatement.
+"""
+from datetime import datetime, timezone
+from functools import wraps
+import hashlib
+import os
+import threading
+import time
+from flask import request, make_response
+from pymongo import ReturnDocument
+from config.database import get_db
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Intervalle (secondes) entre deux lectures des tampons de version
+VERSION_CHECK_INTERVAL = float(os.getenv('VERSION_CHECK_INTERVAL', '2'))
+# Intervalle minimal (secondes) entre deux incréments du tampon des compteurs par
+# les consultations (bump_version_throttled)
+COUNTER_VERSION_INTERVAL = float(os.getenv('COUNTER_VERSION_INTERVAL', '60'))
+
+# Tampons de version des réponses conditionnelles
+RESOURCES = 'ressource'
+# Compteurs favorites_count / views_count, séparés : une consultation ne doit
+# pas invalider les réponses qui ne les contiennent pas
+RESOURCE_COUNTERS = 'ressource_counters'
+CATEGORIES = 'categories'
+USERS = 'users'
+
+# Politiques Cache-Control des routes
+NO_CACHE = 'no-cache'
+
+
+def max_age(seconds):
+    return f'public, max-age={seconds}, must-revalidate'
+
+
+def _as_utc(value):
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class VersionStamps:
+    """
+    Cache par worker des tampons de version : nom -> (version, updated_at)
+    """
+
+    def __init__(self, check_interval=VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stamps = {}
+        self._checked_at = {}
+        self.reads = 0
+
+    def get(self, db, names):
+        now = time.monotonic()
+        with self._lock:
+            stale = [name for name in names if now - self._checked_at.get(name, float('-inf')) >= self.check_interval]
+        if stale:
+            self.reads += 1
+            found = {doc['_id']: doc for doc in db.versions.find({'_id': {'$in': stale}})}
+            with self._lock:
+                for name in stale:
+                    doc = found.get(name) or {}
+                    self._stamps[name] = (doc.get('version', 0), _as_utc(doc.get('updated_at')))
+                    self._checked_at[name] = now
+        with self._lock:
+            return {name: self._stamps[name] for name in names}
+
+    def bump(self, db, name):
+        doc = db.versions.find_one_and_update(
+            {'_id': name},
+            {'$inc': {'version': 1}, '$set': {'updated_at': datetime.now(timezone.utc)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        with self._lock:
+            self._stamps[name] = (doc.get('version', 0), _as_utc(doc.get('updated_at')))
+            self._checked_at[name] = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._stamps.clear()
+            self._checked_at.clear()
+
+
+_version_stamps = VersionStamps()
+
+
+def get_version_stamps():
+    return _version_stamps
+
+
+def bump_version(db, *names):
+    """
+    Invalide les ETag des réponses qui dépendent de ces collections
+    (à appeler après chaque écriture réussie)
+    """
+    for name in names:
+        try:
+            _version_stamps.bump(db, name)
+        except Exception as e:
+            # L'écriture est faite : au pire les clients gardent leur copie
+            # jusqu'à la prochaine écriture
+            logger.exception("Impossible d'incrémenter la version %s: %s", name, e)
+    # Import local : utils.response_cache dépend de ce module
+    from utils.response_cache import invalidate
+    invalidate(*names)
+
+
+_throttle_lock = threading.Lock()
+_last_bumps = {}
+
+
+def bump_version_throttled(db, name, interval=None):
+    """
+    bump_version limité à un incrément par interval secondes et par worker,
+    pour les écritures fréquentes dont la réponse peut retarder un peu
+    (consultations : views_count). Un incrément sauté est rattrapé par le
+    premier appel après l'intervalle ; retourne True si la version a changé.
+    """
+    interval = COUNTER_VERSION_INTERVAL if interval is None else interval
+    now = time.monotonic()
+    with _throttle_lock:
+        if now - _last_bumps.get(name, float('-inf')) < interval:
+            return False
+        _last_bumps[name] = now
+    bump_version(db, name)
+    return True
+
+
+def resource_versions():
+    """
+    Tampons d'une lecture de ressources : les compteurs ne sont renvoyés que par
+    les tris de popularité ou une projection explicite (fields)
+    """
+    if request.args.get('sort', 'recent') != 'recent' or request.args.get('fields'):
+        return (RESOURCES, RESOURCE_COUNTERS)
+    return (RESOURCES,)
+
+
+def compute_etag(stamps):
+    """
+    ETag fort d'une réponse : route, paramètres triés et versions
+    """
+    query = '&'.join(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+    versions = ','.join(f'{name}:{stamps[name][0]}' for name in sorted(stamps))
+    key = f'{request.path}?{query}|{versions}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def _resolve(names):
+    resolved = []
+    for name in names:
+        resolved.extend(name() if callable(name) else [name])
+    return resolved
+
+
+def current_stamps(names):
+    """
+    Tampons de version dont dépend la requête courante (None sans base).
+    names : noms de tampons ou fonctions qui les retournent selon la requête.
+    """
+    db = get_db()
+    if db is None:
+        return None
+    return _version_stamps.get(db, _resolve(names))
+
+
+def conditional(*names, cache_control=NO_CACHE):
+    """
+    Décorateur des routes GET dont la réponse ne dépend que des tampons names
+    et des paramètres de la requête (pas de l'utilisateur). Un élément de names
+    peut être une fonction qui retourne les tampons selon la requête.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            try:
+                stamps = current_stamps(names)
+            except Exception as e:
+                logger.warning("Versions indisponibles, réponse sans ETag: %s", e)
+                stamps = None
+            if stamps is None:
+                return f(*args, **kwargs)
+
+            etag = compute_etag(stamps)
+            dates = [updated_at for _, updated_at in stamps.values() if updated_at is not None]
+            last_modified = max(dates) if dates else None
+
+            if _not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return decorated
+    return decorator
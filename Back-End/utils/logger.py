@@ -0,0 +1,210 @@
+"""
+Journalisation de l'application.
+
+Les routes n'écrivent jamais directement sur stdout : chaque enregistrement est
+déposé dans une file mémoire bornée (QueueHandler) puis formaté en JSON et écrit
+par un thread d'arrière-plan (QueueListener). Sur le chemin de la requête, un
+log ne coûte qu'un put_nowait ; si la file est pleine, l'enregistrement est
+abandonné et compté plutôt que de bloquer la requête.
+
+Chaque enregistrement émis pendant une requête porte son request_id, sa route
+et sa méthode. Les niveaux se règlent par logger :
+
+    LOG_LEVEL=INFO
+    LOG_LEVELS=routes.auth=DEBUG,pymongo=WARNING
+
+Les logs DEBUG sont échantillonnés par requête (LOG_DEBUG_SAMPLE_RATE) : une
+requête tirée garde toutes ses lignes DEBUG, les autres n'en émettent aucune.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# Niveaux par logger : "routes.auth=DEBUG,pymongo=WARNING"
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+# Proportion des requêtes dont les logs DEBUG sont conservés
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '0.1'))
+# Taille maximale de la file d'attente des enregistrements
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+# Attributs standard d'un LogRecord, exclus des champs supplémentaires
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def get_logger(name):
+    return logging.getLogger(name)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Une ligne JSON par enregistrement ; les champs passés par extra= sont ajoutés
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Ajoute le contexte de la requête et applique l'échantillonnage des logs DEBUG.
+    Exécuté sur le thread de la requête, avant la mise en file.
+    """
+
+    def __init__(self, sample_rate=LOG_DEBUG_SAMPLE_RATE):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        if has_request_context():
+            if record.levelno <= logging.DEBUG and not g.get('log_debug_sampled', True):
+                return False
+            record.request_id = g.get('request_id')
+            record.route = request.url_rule.rule if request.url_rule else request.path
+            record.method = request.method
+        elif record.levelno <= logging.DEBUG and random.random() >= self.sample_rate:
+            return False
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler qui abandonne l'enregistrement quand la file est pleine
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Message et trace calculés ici : les arguments ne traversent pas la file
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+_handler = None
+_setup_pid = None
+_setup_lock = threading.Lock()
+
+
+def _parse_levels(spec):
+    levels = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level=LOG_LEVEL, levels=LOG_LEVELS, stream=None):
+    """
+    Installe le QueueHandler sur le logger racine et démarre le thread d'écriture.
+    Idempotent dans un même processus ; refait après un fork.
+    """
+    global _listener, _handler, _setup_pid
+    with _setup_lock:
+        if _setup_pid == os.getpid():
+            return _handler
+
+        stream_handler = logging.StreamHandler(stream or sys.stdout)
+        stream_handler.setFormatter(JsonFormatter())
+
+        handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        handler.addFilter(RequestContextFilter())
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            if isinstance(existing, NonBlockingQueueHandler):
+                root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level)
+        for name, logger_level in _parse_levels(levels).items():
+            logging.getLogger(name).setLevel(logger_level)
+
+        listener = QueueListener(handler.queue, stream_handler, respect_handler_level=True)
+        listener.start()
+
+        _listener, _handler, _setup_pid = listener, handler, os.getpid()
+        return handler
+
+
+def shutdown_logging():
+    """
+    Vide la file et arrête le thread d'écriture (arrêt du worker)
+    """
+    global _listener, _setup_pid
+    with _setup_lock:
+        if _listener is not None and _setup_pid == os.getpid():
+            _listener.stop()
+        _listener = None
+        _setup_pid = None
+
+
+atexit.register(shutdown_logging)
+
+
+def get_logging_stats():
+    return {
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+        "queue_size": LOG_QUEUE_SIZE,
+        "debug_sample_rate": LOG_DEBUG_SAMPLE_RATE,
+    }
+
+
+def init_app(app):
+    """
+    Identifiant et durée de chaque requête, plus une ligne de log d'accès
+    """
+    access_logger = get_logger('access')
+
+    @app.before_request
+    def _start_request_log():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+        g.log_debug_sampled = random.random() < LOG_DEBUG_SAMPLE_RATE
+
+    @app.after_request
+    def _end_request_log(response):
+        started = g.get('request_started')
+        duration_ms = round((time.perf_counter() - started) * 1000, 2) if started else None
+        response.headers['X-Request-ID'] = g.get('request_id', '')
+        access_logger.info(
+            "%s %s %s", request.method, request.path, response.status_code,
+            extra={"status": response.status_code, "duration_ms": duration_ms},
+        )
+        return response
+
+    return app
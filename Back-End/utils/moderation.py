@@ -0,0 +1,167 @@
+"""
+File de travail des modérateurs : réservation (bail) et décisions groupées.
+
+Un modérateur réserve les prochaines ressources en attente (approved: false,
+des plus anciennes aux plus récentes) : chaque réservation est un
+find_one_and_update qui pose claimed_by et claim_expires sur une ressource libre
+ou dont le bail a expiré. Deux modérateurs ne reçoivent donc jamais la même
+ressource, et une ressource réservée puis abandonnée revient dans la file après
+MODERATION_LEASE_TTL secondes, sans tâche de nettoyage.
+
+Les décisions (approbation ou rejet) de plusieurs ressources sont appliquées en
+un seul bulk_write ; une ressource réservée par un autre modérateur (bail en
+cours) ou déjà traitée est ignorée. Une ressource rejetée quitte la file : son
+champ approved est retiré (l'index partiel de la file ne porte que sur
+approved: false) et rejected passe à True. Le rejet est daté par date_rejet et
+non par date_validation (signe d'une ressource validée, pour le tirage
+aléatoire comme pour le front), et retire random_key.
+"""
+import os
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from utils.logger import get_logger
+from utils.repository import as_object_id, resources, VERSION_FIELD
+from utils.sampling import new_random_key
+
+logger = get_logger(__name__)
+
+# Durée (secondes) d'une réservation
+MODERATION_LEASE_TTL = int(os.getenv('MODERATION_LEASE_TTL', '600'))
+# Ressources réservées au plus par appel
+MODERATION_CLAIM_MAX = int(os.getenv('MODERATION_CLAIM_MAX', '20'))
+# Décisions au plus par appel
+MODERATION_DECISIONS_MAX = int(os.getenv('MODERATION_DECISIONS_MAX', '100'))
+
+APPROVE = 'approve'
+REJECT = 'reject'
+DECISIONS = (APPROVE, REJECT)
+
+# Champs de la réservation, retirés par une décision
+_CLAIM_FIELDS = {"claimed_by": "", "claim_expires": ""}
+# Champs retirés par une approbation (réservation et rejet antérieur)
+APPROVAL_UNSET = (*_CLAIM_FIELDS, "rejected", "date_rejet")
+
+
+def not_claimed_by_others(now, moderator_id=None):
+    """
+    Filtre des ressources libres, au bail expiré, ou (pour une décision)
+    réservées par moderator_id
+    """
+    conditions = [{"claim_expires": None}, {"claim_expires": {"$lt": now}}]
+    if moderator_id is not None:
+        conditions.insert(0, {"claimed_by": moderator_id})
+    return {"$or": conditions}
+
+
+def _available(now, moderator_id=None):
+    # Ressource en attente et non réservée par un autre modérateur
+    return {"approved": False, **not_claimed_by_others(now, moderator_id)}
+
+
+def claim_pending(db, moderator_id, count, projection=None):
+    """
+    Réserve au plus count ressources en attente pour moderator_id, les plus
+    anciennes d'abord. Retourne les ressources réservées (état après réservation).
+    """
+    now = datetime.utcnow()
+    expires = now + timedelta(seconds=MODERATION_LEASE_TTL)
+    if projection is not None:
+        projection = {**projection, "claim_expires": 1}
+    claimed = []
+    for _ in range(count):
+        resource = resources(db).collection.find_one_and_update(
+            _available(now),
+            {"$set": {"claimed_by": moderator_id, "claim_expires": expires}},
+            projection=projection,
+            sort=[("createdAt", ASCENDING), ("_id", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if resource is None:
+            # File vide (ou entièrement réservée)
+            break
+        claimed.append(resource)
+    logger.debug("%s ressources réservées par %s jusqu'à %s", len(claimed), moderator_id, expires)
+    return claimed
+
+
+def release_claims(db, moderator_id, resource_ids):
+    """
+    Rend à la file les ressources réservées par moderator_id.
+    Retourne le nombre de réservations libérées.
+    """
+    result = resources(db).collection.update_many(
+        {"_id": {"$in": [as_object_id(resource_id) for resource_id in resource_ids]},
+         "claimed_by": moderator_id},
+        {"$unset": _CLAIM_FIELDS},
+    )
+    return result.modified_count
+
+
+def parse_decisions(data):
+    """
+    Décisions du corps de la requête : [(ObjectId, decision, commentaire)] ;
+    ValueError si invalides
+    """
+    decisions = (data or {}).get('decisions')
+    if not isinstance(decisions, list) or not decisions:
+        raise ValueError("decisions doit être une liste non vide")
+    if len(decisions) > MODERATION_DECISIONS_MAX:
+        raise ValueError(f"{MODERATION_DECISIONS_MAX} décisions au plus")
+    parsed = {}
+    for item in decisions:
+        if not isinstance(item, dict) or item.get('decision') not in DECISIONS:
+            raise ValueError(f"décision invalide (attendu : {', '.join(DECISIONS)})")
+        if not ObjectId.is_valid(item.get('id')):
+            raise ValueError(f"identifiant invalide: {item.get('id')}")
+        parsed[as_object_id(item['id'])] = (item['decision'], item.get('comment', ''))
+    return [(resource_id, decision, comment) for resource_id, (decision, comment) in parsed.items()]
+
+
+def _decision_update(decision, moderator_id, comment, now):
+    fields = {
+        "commentaire_validation": comment,
+        "id_validateur": moderator_id,
+    }
+    if decision == APPROVE:
+        # Clé du tirage aléatoire (utils/sampling.py)
+        fields.update({"approved": True, "date_validation": now, "random_key": new_random_key()})
+        unset = {field: "" for field in APPROVAL_UNSET}
+    else:
+        fields.update({"rejected": True, "date_rejet": now})
+        unset = {**_CLAIM_FIELDS, "approved": "", "date_validation": "", "random_key": ""}
+    return {"$set": fields, "$unset": unset, "$inc": {VERSION_FIELD: 1}}
+
+
+def apply_decisions(db, moderator_id, decisions):
+    """
+    Applique les décisions [(id, decision, commentaire)] en un bulk_write, puis
+    relit en une requête les ressources effectivement traitées par cet appel.
+    Retourne (ressources approuvées, ressources rejetées, identifiants ignorés) ;
+    les ressources sont réduites à _id et id_categorie.
+    """
+    now = datetime.utcnow()
+    # Précision des dates BSON (millisecondes) : la relecture compare date_validation / date_rejet
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    operations = [
+        UpdateOne({"_id": resource_id, **_available(now, moderator_id)},
+                  _decision_update(decision, moderator_id, comment, now))
+        for resource_id, decision, comment in decisions
+    ]
+    result = resources(db).collection.bulk_write(operations, ordered=False)
+
+    ids = [resource_id for resource_id, _, _ in decisions]
+    approved, rejected = [], []
+    if result.modified_count:
+        # Traitées par cet appel : même validateur et même date de décision
+        for resource in resources(db).collection.find(
+            {"_id": {"$in": ids}, "id_validateur": moderator_id,
+             "$or": [{"date_validation": now}, {"date_rejet": now}]},
+            {"id_categorie": 1, "approved": 1},
+        ):
+            (approved if resource.get("approved") is True else rejected).append(resource)
+    done = {resource["_id"] for resource in approved + rejected}
+    skipped = [resource_id for resource_id in ids if resource_id not in done]
+    logger.info("Décisions de %s : %s approuvées, %s rejetées, %s ignorées",
+                moderator_id, len(approved), len(rejected), len(skipped))
+    return approved, rejected, skipped
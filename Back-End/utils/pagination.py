@@ -0,0 +1,97 @@
+"""
+Pagination par curseur (keyset).
+
+Une page est lue avec un filtre "après le dernier élément vu" sur
+(champ de tri, _id) au lieu d'un skip : le coût d'une page reste constant quelle
+que soit sa position, à condition qu'un index couvre (filtres..., champ, _id).
+Le curseur renvoyé au client est opaque (JSON encodé en base64 url-safe).
+"""
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """
+    Valeur du paramètre limit, bornée à [1, maximum] ; ValueError si invalide
+    """
+    if value in (None, ''):
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError("limit doit être positif")
+    return min(limit, maximum)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "$date" in value:
+            return datetime.fromisoformat(value["$date"])
+        if "$oid" in value:
+            return ObjectId(value["$oid"])
+        raise ValueError("valeur de curseur invalide")
+    return value
+
+
+def encode_cursor(sort, document, field):
+    """
+    Curseur pointant juste après document pour le tri sort (champ field)
+    """
+    payload = {"s": sort, "v": _encode_value(document.get(field)), "id": str(document["_id"])}
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """
+    Retourne (valeur, _id) du dernier élément vu ; ValueError si le curseur
+    est invalide ou a été émis pour un autre tri
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload.get("s") != sort:
+            raise ValueError("curseur émis pour un autre tri")
+        return _decode_value(payload.get("v")), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError(f"curseur invalide: {e}")
+
+
+def keyset_filter(field, value, last_id, ascending=False):
+    """
+    Filtre des éléments qui suivent (value, last_id) dans le tri
+    [(field, -1), ('_id', -1)], ou [(field, 1), ('_id', 1)] si ascending.
+
+    Les documents sans le champ sont triés en dernier (null est la plus petite
+    valeur BSON) mais ne sont jamais retournés par $lt : ils sont ajoutés
+    explicitement tant que le curseur n'a pas atteint cette zone. En tri
+    croissant, ils viennent en premier : après eux, tous les documents qui ont
+    le champ suivent.
+    """
+    if ascending:
+        if value is None:
+            return {"$or": [{field: None, "_id": {"$gt": last_id}}, {field: {"$ne": None}}]}
+        return {"$or": [
+            {field: {"$gt": value}},
+            {field: value, "_id": {"$gt": last_id}},
+        ]}
+    if value is None:
+        return {field: None, "_id": {"$lt": last_id}}
+    return {"$or": [
+        {field: {"$lt": value}},
+        {field: value, "_id": {"$lt": last_id}},
+        {field: None},
+    ]}
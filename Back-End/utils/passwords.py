@@ -0,0 +1,230 @@
+"""
+Hachage et vérification des mots de passe hors des threads de requête.
+
+bcrypt est volontairement lent : exécuté sur les threads gunicorn, quelques
+connexions simultanées bloquent toutes les autres routes. Les calculs sont donc
+confiés à un pool de processus de taille fixe, avec une file d'attente bornée :
+au-delà, PasswordPoolBusy est levée et la route répond 503 + Retry-After.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+
+# Coût bcrypt des nouveaux hachages ; les mots de passe d'un coût différent
+# sont re-hachés à la connexion suivante
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+# Nombre de processus dédiés par worker gunicorn (0 : calcul sur le thread appelant)
+PASSWORD_POOL_SIZE = int(os.getenv('PASSWORD_POOL_SIZE', '2'))
+# Nombre de calculs pouvant attendre un processus libre avant de refuser
+PASSWORD_QUEUE_LIMIT = int(os.getenv('PASSWORD_QUEUE_LIMIT', '8'))
+# Attente maximale d'un résultat (secondes)
+PASSWORD_TIMEOUT = float(os.getenv('PASSWORD_TIMEOUT', '10'))
+# Valeur de l'en-tête Retry-After renvoyé quand le pool est saturé
+PASSWORD_RETRY_AFTER = int(os.getenv('PASSWORD_RETRY_AFTER', '2'))
+
+
+class PasswordPoolBusy(Exception):
+    """
+    Le pool de hachage est saturé : la requête doit être retentée plus tard
+    """
+
+    def __init__(self, retry_after=PASSWORD_RETRY_AFTER):
+        super().__init__("Pool de hachage saturé")
+        self.retry_after = retry_after
+
+
+class PasswordStats:
+    """
+    Compteurs de latence (calcul bcrypt) et d'attente dans la file
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.operations = {}
+            self.rejected = 0
+            self.rehashed = 0
+
+    def record(self, operation, duration, queue_wait):
+        with self._lock:
+            entry = self.operations.setdefault(operation, {
+                "count": 0, "total_ms": 0.0, "max_ms": 0.0, "queue_wait_total_ms": 0.0, "queue_wait_max_ms": 0.0,
+            })
+            entry["count"] += 1
+            entry["total_ms"] += duration * 1000
+            entry["max_ms"] = max(entry["max_ms"], duration * 1000)
+            entry["queue_wait_total_ms"] += queue_wait * 1000
+            entry["queue_wait_max_ms"] = max(entry["queue_wait_max_ms"], queue_wait * 1000)
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            operations = {}
+            for name, entry in self.operations.items():
+                count = entry["count"] or 1
+                operations[name] = {
+                    "count": entry["count"],
+                    "avg_ms": round(entry["total_ms"] / count, 2),
+                    "max_ms": round(entry["max_ms"], 2),
+                    "queue_wait_avg_ms": round(entry["queue_wait_total_ms"] / count, 2),
+                    "queue_wait_max_ms": round(entry["queue_wait_max_ms"], 2),
+                }
+            return {"operations": operations, "rejected": self.rejected, "rehashed": self.rehashed}
+
+
+# Fonctions exécutées dans les processus du pool : elles renvoient aussi
+# l'heure de début et la durée du calcul pour mesurer l'attente en file
+def _hash_job(password, rounds):
+    started = time.time()
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+    return hashed, started, time.time() - started
+
+
+def _check_job(password, stored):
+    started = time.time()
+    result = bcrypt.checkpw(password, stored)
+    return result, started, time.time() - started
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_inflight = 0
+_inflight_lock = threading.Lock()
+_stats = PasswordStats()
+
+
+def _get_executor():
+    """
+    Pool du processus courant, créé à la première demande. Comme pour le
+    MongoClient, un pool hérité d'un fork n'est jamais réutilisé.
+    """
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is not None and _executor_pid == pid:
+        return _executor
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != pid:
+            # spawn : les processus du pool ne dupliquent ni les threads ni les sockets du worker
+            _executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_POOL_SIZE,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            _executor_pid = pid
+    return _executor
+
+
+def shutdown_pool():
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _executor_pid = None
+
+
+atexit.register(shutdown_pool)
+
+
+def _release(future):
+    # Appelé quand le calcul se termine ou est annulé : la place dans la file
+    # n'est rendue qu'à ce moment, pas à l'expiration de l'attente
+    global _inflight
+    with _inflight_lock:
+        _inflight -= 1
+
+
+def _run(operation, job, *args):
+    """
+    Exécute job dans le pool en respectant la limite de file d'attente
+    """
+    global _inflight
+    if PASSWORD_POOL_SIZE <= 0:
+        result, _, duration = job(*args)
+        _stats.record(operation, duration, 0.0)
+        return result
+
+    with _inflight_lock:
+        if _inflight >= PASSWORD_POOL_SIZE + PASSWORD_QUEUE_LIMIT:
+            _stats.incr('rejected')
+            raise PasswordPoolBusy()
+        _inflight += 1
+    submitted = time.time()
+    try:
+        future = _get_executor().submit(job, *args)
+    except BaseException:
+        _release(None)
+        raise
+    future.add_done_callback(_release)
+
+    try:
+        result, started, duration = future.result(timeout=PASSWORD_TIMEOUT)
+    except TimeoutError:
+        # Le calcul a trop attendu : même réponse qu'une file pleine. Un calcul
+        # déjà commencé n'est pas annulable et occupe sa place jusqu'à la fin.
+        future.cancel()
+        _stats.incr('rejected')
+        raise PasswordPoolBusy()
+    _stats.record(operation, duration, max(0.0, started - submitted))
+    return result
+
+
+def _to_bytes(value):
+    return value.encode('utf-8') if isinstance(value, str) else value
+
+
+def hash_password(password, rounds=None):
+    """
+    Hache un mot de passe avec le coût BCRYPT_ROUNDS
+    """
+    return _run('hash', _hash_job, _to_bytes(password), rounds or BCRYPT_ROUNDS)
+
+
+def check_password(password, stored):
+    """
+    Vérifie un mot de passe ; lève ValueError si stored n'est pas un hachage bcrypt
+    """
+    return _run('check', _check_job, _to_bytes(password), _to_bytes(stored))
+
+
+def hash_rounds(stored):
+    """
+    Coût d'un hachage bcrypt ($2b$12$...), None si le format est inconnu
+    """
+    try:
+        return int(_to_bytes(stored).split(b'$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(stored):
+    return hash_rounds(stored) != BCRYPT_ROUNDS
+
+
+def record_rehash():
+    _stats.incr('rehashed')
+
+
+def get_password_stats():
+    stats = _stats.snapshot()
+    with _inflight_lock:
+        inflight = _inflight
+    stats.update({
+        "pid": os.getpid(),
+        "pool_size": PASSWORD_POOL_SIZE,
+        "queue_limit": PASSWORD_QUEUE_LIMIT,
+        "inflight": inflight,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+    })
+    return stats
@@ -0,0 +1,108 @@
+"""
+Profils publics des utilisateurs (nom, prénom) pour l'affichage des auteurs.
+
+Les routes qui renvoient une liste de documents écrits par des utilisateurs
+(commentaires, réponses) collectent les identifiants distincts des auteurs de
+la page et les résolvent en une seule requête $in sur users, à travers un cache
+TTL par worker. Une modification de profil retire l'entrée du cache du worker
+courant (evict_profile) ; les autres workers la relisent au plus tard après
+PROFILE_CACHE_TTL secondes.
+"""
+import os
+from bson import ObjectId
+from bson.errors import InvalidId
+from utils.cache import TTLCache
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Durée de vie (secondes) d'un profil public en cache
+PROFILE_CACHE_TTL = float(os.getenv('PROFILE_CACHE_TTL', '120'))
+# Nombre de profils gardés par worker
+PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', '2048'))
+
+# Champs publics d'un utilisateur
+PUBLIC_FIELDS = {"nom": 1, "prenom": 1}
+
+# Nom affiché pour un auteur supprimé ou introuvable
+UNKNOWN_AUTHOR = {"nom": "Utilisateur", "prenom": ""}
+
+# Utilisateur absent de la base : mis en cache pour ne pas le relire à chaque page
+_NOT_FOUND = {}
+
+_profile_cache = TTLCache(maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL)
+
+
+def get_profile_cache():
+    return _profile_cache
+
+
+def evict_profile(user_id):
+    """
+    Retire le profil du cache (après une modification ou une suppression)
+    """
+    return _profile_cache.delete(str(user_id))
+
+
+def public_profile(user):
+    return {
+        "_id": str(user["_id"]),
+        "nom": user.get("nom", ""),
+        "prenom": user.get("prenom", ""),
+    }
+
+
+def _object_ids(ids):
+    object_ids = {}
+    for user_id in ids:
+        if user_id is None or user_id == '':
+            continue
+        try:
+            object_id = user_id if isinstance(user_id, ObjectId) else ObjectId(user_id)
+        except (InvalidId, TypeError):
+            logger.debug("Identifiant d'utilisateur invalide ignoré: %s", user_id)
+            continue
+        object_ids[str(object_id)] = object_id
+    return object_ids
+
+
+def get_public_profiles(db, ids):
+    """
+    Profils publics des utilisateurs ids : {id (str): {_id, nom, prenom}}.
+    Les utilisateurs introuvables et les identifiants invalides sont absents du résultat.
+    """
+    object_ids = _object_ids(ids)
+    profiles = {}
+    missing = []
+    for key, object_id in object_ids.items():
+        profile = _profile_cache.get(key)
+        if profile is None:
+            missing.append(object_id)
+        elif profile is not _NOT_FOUND:
+            profiles[key] = profile
+
+    if missing:
+        found = {str(user["_id"]): public_profile(user)
+                 for user in db.users.find({"_id": {"$in": missing}}, PUBLIC_FIELDS)}
+        for object_id in missing:
+            key = str(object_id)
+            profile = found.get(key, _NOT_FOUND)
+            _profile_cache.set(key, profile)
+            if profile is not _NOT_FOUND:
+                profiles[key] = profile
+    return profiles
+
+
+def hydrate_authors(db, documents, field):
+    """
+    Ajoute nom_utilisateur et prenom_utilisateur à chaque document, d'après
+    l'auteur désigné par field, avec une seule requête pour toute la liste
+    """
+    profiles = get_public_profiles(db, {document.get(field) for document in documents})
+    for document in documents:
+        author_id = document.get(field)
+        profile = profiles.get(str(author_id)) if author_id is not None else None
+        profile = profile or UNKNOWN_AUTHOR
+        document["nom_utilisateur"] = profile["nom"]
+        document["prenom_utilisateur"] = profile["prenom"]
+    return documents
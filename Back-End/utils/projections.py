@@ -0,0 +1,116 @@
+"""
+Projections MongoDB des lectures (paramètre fields=).
+
+Une route lit seulement les champs de la vue demandée ; le document est réduit
+par MongoDB avant d'être envoyé sur le réseau. fields accepte :
+
+    fields=card                 vue nommée (card, detail, admin)
+    fields=titre,createdAt      liste de champs, parmi ceux des vues autorisées
+
+La vue card d'une ressource ne contient jamais contenu : elle porte à la place
+extrait, un résumé en texte brut calculé à l'écriture (make_excerpt).
+"""
+import html
+import re
+
+CARD = 'card'
+DETAIL = 'detail'
+ADMIN = 'admin'
+
+# Longueur (caractères) de l'extrait affiché par les cartes de ressources
+EXCERPT_LENGTH = 250
+
+_RESOURCE_CARD = ('titre', 'extrait', 'id_publieur', 'id_categorie', 'createdAt', 'approved')
+_USER_CARD = ('username', 'nom', 'prenom')
+_COMMENT_CARD = ('contenu', 'id_user', 'id_ressource', 'date_publication', 'createdAt')
+
+# Champs de chaque vue (None : document entier, hors champs exclus)
+VIEWS = {
+    'ressource': {
+        CARD: _RESOURCE_CARD,
+        DETAIL: _RESOURCE_CARD + ('contenu', 'date_publication', 'id_validateur', 'date_validation',
+                                  'commentaire_validation', 'rejected', 'date_rejet', 'version'),
+        ADMIN: None,
+    },
+    'users': {
+        CARD: _USER_CARD,
+        DETAIL: _USER_CARD + ('genre', 'created_at', 'role_id', 'version'),
+        ADMIN: None,
+    },
+    'commentaire': {
+        CARD: _COMMENT_CARD,
+        DETAIL: _COMMENT_CARD + ('format',),
+        ADMIN: None,
+    },
+}
+
+# Champs jamais renvoyés, quelle que soit la vue
+EXCLUDED = {
+    'users': ('password',),
+}
+
+# Champs calculés par MongoDB dans la projection
+COMPUTED = {
+    'ressource': {
+        # Ressources antérieures à extrait : début du contenu
+        'extrait': {'$ifNull': ['$extrait', {'$substrCP': [{'$ifNull': ['$contenu', '']}, 0, EXCERPT_LENGTH]}]},
+    },
+}
+
+
+def _include(collection, fields):
+    computed = COMPUTED.get(collection, {})
+    projection = {'_id': 1}
+    for field in fields:
+        projection[field] = computed.get(field, 1)
+    return projection
+
+
+def _exclude(collection):
+    excluded = EXCLUDED.get(collection)
+    return {field: 0 for field in excluded} if excluded else None
+
+
+def projection_for(collection, view):
+    """
+    Projection MongoDB d'une vue nommée (None : document entier)
+    """
+    fields = VIEWS[collection][view]
+    if fields is None:
+        return _exclude(collection)
+    return _include(collection, fields)
+
+
+def parse_fields(collection, value, default=DETAIL, allowed=(CARD, DETAIL, ADMIN)):
+    """
+    Projection correspondant au paramètre fields d'une requête.
+
+    allowed limite les vues accessibles depuis la route ; une liste de champs
+    ne peut contenir que des champs de ces vues. ValueError si invalide.
+    """
+    if value in (None, ''):
+        return projection_for(collection, default)
+    if value in VIEWS[collection]:
+        if value not in allowed:
+            raise ValueError(f"vue non autorisée: {value} ({', '.join(allowed)})")
+        return projection_for(collection, value)
+
+    views = [VIEWS[collection][view] for view in allowed]
+    permitted = None if any(fields is None for fields in views) else {f for fields in views for f in fields}
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    excluded = set(EXCLUDED.get(collection, ()))
+    for field in fields:
+        if field in excluded or field.startswith('$') or (permitted is not None and field not in permitted):
+            raise ValueError(f"champ non autorisé: {field}")
+    return _include(collection, fields)
+
+
+def make_excerpt(content, length=EXCERPT_LENGTH):
+    """
+    Extrait en texte brut d'un contenu HTML, suivi de "..." s'il est tronqué
+    """
+    text = html.unescape(re.sub(r'<[^>]+>', ' ', content or ''))
+    text = re.sub(r'\s+', ' ', text).strip()
+    if len(text) <= length:
+        return text
+    return text[:length].rstrip() + '...'
@@ -0,0 +1,309 @@
+"""
+Accès aux collections MongoDB (noms, projections et formes de requêtes communes).
+
+Les routes n'écrivent plus le nom d'une collection à la main : elles passent par
+les accesseurs de ce module (resources(db), users(db), ...), dont le nom réel est
+défini une seule fois dans COLLECTIONS. Une faute de frappe (db.resources au
+lieu de db.ressource) ne produit donc plus de requête sur une collection
+toujours vide ; tests/test_repository.py vérifie qu'aucune route n'écrit
+db.<nom>, et que tout db.<nom> restant (utils, config) vise une collection
+enregistrée.
+
+Les formes de requêtes communes sont regroupées dans Repository :
+
+    get(id, view=DETAIL)        document par _id, réduit à une vue de projections.py
+    get_many(ids, view=CARD)    documents par _id, en une requête $in
+    exists(query)               projection {_id: 1}, sans lire le document
+    count(query, limit=...)     comptage arrêté à limit documents
+    page(query, sort, field, limit, after)
+                                page keyset (champ trié puis _id, décroissants
+                                ou croissants)
+    update(id, changes, version=...)
+                                $set et document mis à jour en un aller-retour
+    find_one(query), find(query, sort=...), aggregate(pipeline)
+                                lectures sans forme commune
+    insert(document)            insertion, retourne l'_id
+    increment(id, field, amount, query=...)
+                                compteur ($inc) sans changer la version
+    update_one(query, changes)  mise à jour par filtre (opérateurs MongoDB)
+    delete(id), delete_one(query), delete_many(query)
+                                suppression par _id ou par filtre
+
+Verrouillage optimiste : update incrémente le champ version de chaque document
+modifié. Un client qui envoie la version qu'il a lue n'écrase pas une
+modification faite entre-temps : update lève VersionConflict (409 dans les routes).
+"""
+from bson import ObjectId
+from pymongo import ReturnDocument
+from utils.pagination import encode_cursor, keyset_filter
+from utils.projections import VIEWS, projection_for
+
+# Nom logique -> nom réel de la collection
+COLLECTIONS = {
+    'resources': 'ressource',
+    # Ancienne file de modération, repliée dans ressource (migration 0004)
+    'pending_resources': 'ressources_en_attente',
+    'categories': 'categories',
+    'category_counts': 'category_counts',
+    'comments': 'commentaire',
+    'replies': 'sous_commentaire',
+    'favorites': 'favoris',
+    'history': 'historique',
+    'users': 'users',
+    'roles': 'role',
+    'sessions': 'token',
+    'versions': 'versions',
+    'migrations': 'migrations',
+}
+
+
+# Champ du numéro de version des documents (verrouillage optimiste)
+VERSION_FIELD = 'version'
+
+
+class VersionConflict(Exception):
+    """
+    Le document a été modifié depuis la version lue par le client
+    """
+
+    def __init__(self, current):
+        super().__init__(f"version actuelle: {current}")
+        self.current = current
+
+
+def parse_version(data):
+    """
+    Version envoyée par le client (champ version du corps), None si absente ;
+    ValueError si invalide
+    """
+    version = (data or {}).get(VERSION_FIELD)
+    if version is None:
+        return None
+    if isinstance(version, bool) or not isinstance(version, int) or version < 0:
+        raise ValueError("version doit être un entier positif")
+    return version
+
+
+def _version_filter(version):
+    # Les documents antérieurs au verrouillage optimiste n'ont pas de version (0)
+    return {'$in': [0, None]} if version == 0 else version
+
+
+def as_object_id(value):
+    """
+    ObjectId d'un identifiant reçu en chaîne ; InvalidId si invalide
+    """
+    return value if isinstance(value, ObjectId) else ObjectId(value)
+
+
+class Repository:
+    """
+    Requêtes communes sur une collection enregistrée dans COLLECTIONS
+    """
+
+    def __init__(self, db, name):
+        if name not in COLLECTIONS.values():
+            raise KeyError(f"collection non enregistrée: {name}")
+        self.name = name
+        self.collection = getattr(db, name)
+
+    def projection(self, view):
+        """
+        Projection d'une vue nommée (None : document entier)
+        """
+        if view is None or self.name not in VIEWS:
+            return None
+        return projection_for(self.name, view)
+
+    def get(self, id, view=None, projection=None):
+        """
+        Document d'identifiant id, ou None ; projection prime sur view
+        """
+        if projection is None:
+            projection = self.projection(view)
+        return self.collection.find_one({'_id': as_object_id(id)}, projection)
+
+    def get_many(self, ids, view=None, projection=None):
+        """
+        Documents d'identifiants ids, en une seule requête $in (ordre non garanti)
+        """
+        if projection is None:
+            projection = self.projection(view)
+        return list(self.collection.find({'_id': {'$in': [as_object_id(id) for id in ids]}}, projection))
+
+    def find_one(self, query, projection=None):
+        """
+        Premier document correspondant à query, ou None
+        """
+        return self.collection.find_one(query, projection)
+
+    def find(self, query=None, projection=None, sort=None):
+        """
+        Curseur des documents correspondants, triés par sort ([(champ, sens)])
+        """
+        cursor = self.collection.find(query or {}, projection)
+        return cursor.sort(sort) if sort else cursor
+
+    def aggregate(self, pipeline, **options):
+        """
+        Curseur d'une agrégation sur la collection
+        """
+        return self.collection.aggregate(pipeline, **options)
+
+    def insert(self, document):
+        """
+        Insère document (qui reçoit son _id) et retourne l'_id ;
+        DuplicateKeyError si un index unique le refuse
+        """
+        return self.collection.insert_one(document).inserted_id
+
+    def exists(self, query):
+        """
+        True si un document correspond (query : filtre ou identifiant)
+        """
+        if not isinstance(query, dict):
+            query = {'_id': as_object_id(query)}
+        return self.collection.find_one(query, {'_id': 1}) is not None
+
+    def count(self, query, limit=None):
+        """
+        Nombre de documents correspondants ; avec limit, MongoDB s'arrête au
+        limit-ième (suffisant pour "au moins un")
+        """
+        if limit:
+            return self.collection.count_documents(query, limit=limit)
+        return self.collection.count_documents(query)
+
+    def page(self, query, sort, field, limit, after=None, projection=None, ascending=False):
+        """
+        Page triée sur (field, _id), décroissants (croissants si ascending).
+        after : (valeur, _id) du dernier élément vu, tel que retourné par decode_cursor.
+        Retourne (documents, curseur de la page suivante ou None).
+        """
+        if after is not None:
+            keyset = keyset_filter(field, *after, ascending=ascending)
+            query = {'$and': [query, keyset]} if query else keyset
+        direction = 1 if ascending else -1
+        # Un document de plus que demandé pour savoir s'il reste une page
+        documents = list(
+            self.collection.find(query, projection)
+            .sort([(field, direction), ('_id', direction)])
+            .limit(limit + 1)
+        )
+        has_more = len(documents) > limit
+        documents = documents[:limit]
+        next_cursor = encode_cursor(sort, documents[-1], field) if has_more else None
+        return documents, next_cursor
+
+    def increment(self, id, field, amount=1, query=None):
+        """
+        Ajoute amount au compteur field du document id ; un compteur n'est pas
+        une modification du document (sa version ne change pas)
+        """
+        self.collection.update_one({'_id': as_object_id(id), **(query or {})}, {'$inc': {field: amount}})
+
+    def update_one(self, query, changes):
+        """
+        Applique changes (opérateurs MongoDB) au premier document correspondant ;
+        retourne le nombre de documents modifiés
+        """
+        return self.collection.update_one(query, changes).modified_count
+
+    def delete(self, id):
+        """
+        Supprime le document id ; True s'il existait
+        """
+        return self.collection.delete_one({'_id': as_object_id(id)}).deleted_count == 1
+
+    def delete_one(self, query):
+        """
+        Supprime le premier document correspondant ; True s'il existait
+        """
+        return self.collection.delete_one(query).deleted_count == 1
+
+    def delete_many(self, query):
+        """
+        Supprime les documents correspondants ; retourne leur nombre
+        """
+        return self.collection.delete_many(query).deleted_count
+
+    def update(self, id, changes, version=None, query=None, projection=None, before=False, unset=None):
+        """
+        Applique changes ($set) au document id, retire les champs unset et
+        incrémente sa version, en un seul find_one_and_update. query restreint
+        les documents modifiables (propriétaire...), version est celle lue par
+        le client.
+
+        Retourne le document mis à jour (réduit à projection), ou None si aucun
+        document ne correspond ; avec before=True, retourne (avant, après), le
+        document après étant déduit de l'état avant (projection ignorée).
+        Lève VersionConflict si le document existe dans une autre version.
+        """
+        object_id = as_object_id(id)
+        selector = {'_id': object_id, **(query or {})}
+        if version is not None:
+            selector[VERSION_FIELD] = _version_filter(version)
+        operations = {'$set': changes, '$inc': {VERSION_FIELD: 1}}
+        if unset:
+            operations['$unset'] = {field: "" for field in unset}
+        document = self.collection.find_one_and_update(
+            selector,
+            operations,
+            projection=None if before else projection,
+            return_document=ReturnDocument.BEFORE if before else ReturnDocument.AFTER,
+        )
+        if document is None:
+            if version is not None:
+                # Chemin d'échec seulement : distinguer le conflit de l'absence
+                current = self.collection.find_one({'_id': object_id, **(query or {})}, {VERSION_FIELD: 1})
+                if current is not None:
+                    raise VersionConflict(current.get(VERSION_FIELD, 0))
+            return (None, None) if before else None
+        if before:
+            after = {field: value for field, value in document.items() if field not in (unset or ())}
+            after.update({**changes, VERSION_FIELD: document.get(VERSION_FIELD, 0) + 1})
+            return document, after
+        return document
+
+
+def repository(db, name):
+    """
+    Repository de la collection de nom logique name (clé de COLLECTIONS)
+    """
+    return Repository(db, COLLECTIONS[name])
+
+
+def resources(db):
+    return repository(db, 'resources')
+
+
+def categories(db):
+    return repository(db, 'categories')
+
+
+def comments(db):
+    return repository(db, 'comments')
+
+
+def replies(db):
+    return repository(db, 'replies')
+
+
+def favorites(db):
+    return repository(db, 'favorites')
+
+
+def history(db):
+    return repository(db, 'history')
+
+
+def users(db):
+    return repository(db, 'users')
+
+
+def roles(db):
+    return repository(db, 'roles')
+
+
+def sessions(db):
+    return repository(db, 'sessions')
@@ -0,0 +1,241 @@
+"""
+Cache mémoire des réponses des routes publiques de lecture.
+
+Une réponse 200 est gardée par worker, sous la clé route + paramètres triés,
+dans un cache LRU borné en octets (RESPONSE_CACHE_MAX_BYTES) dont les entrées
+expirent après RESPONSE_CACHE_TTL secondes. Chaque entrée est étiquetée avec
+les tampons de version dont elle dépend (utils.conditional) :
+
+- une écriture du worker courant (bump_version) supprime aussitôt les entrées
+  portant ses étiquettes ;
+- une écriture d'un autre worker change la version lue dans la collection
+  versions : l'entrée est ignorée au plus VERSION_CHECK_INTERVAL secondes après.
+
+Le décorateur se place sous @conditional : une requête If-None-Match valide
+reçoit toujours un 304 sans lire le cache.
+"""
+from functools import partial, wraps
+import os
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, make_response, request
+from utils.conditional import current_stamps
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Durée de vie (secondes) d'une réponse en cache ; 0 désactive le cache
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '30'))
+# Taille totale (octets) des réponses gardées par worker
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+# Taille (octets) au-delà de laquelle une réponse n'est pas gardée
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRY_BYTES', str(1024 * 1024)))
+
+# En-têtes recalculés à chaque réponse, jamais recopiés depuis le cache
+_SKIPPED_HEADERS = {'content-length', 'set-cookie', 'x-cache'}
+
+
+class _Entry:
+    __slots__ = ('expires_at', 'versions', 'status', 'headers', 'body', 'size')
+
+    def __init__(self, expires_at, versions, status, headers, body, size):
+        self.expires_at = expires_at
+        self.versions = versions
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.size = size
+
+
+class ResponseCache:
+    """
+    Cache LRU de réponses borné en octets, avec TTL et étiquettes d'invalidation.
+    Partagé entre les threads d'un worker (accès protégés par un verrou).
+    """
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_MAX_BYTES, ttl=RESPONSE_CACHE_TTL,
+                 max_entry_bytes=RESPONSE_CACHE_MAX_ENTRY_BYTES):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self._data = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_bytes > 0
+
+    def get(self, key, versions):
+        """
+        Entrée encore valide pour ces versions d'étiquettes, sinon None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= now or entry.versions != versions:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, versions, status, headers, body):
+        size = len(key) + len(body) + sum(len(name) + len(value) for name, value in headers)
+        if not self.enabled or size > self.max_entry_bytes:
+            return False
+        entry = _Entry(time.monotonic() + self.ttl, versions, status, headers, body, size)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = entry
+            self.bytes += size
+            for tag in versions:
+                self._tags.setdefault(tag, set()).add(key)
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+        return True
+
+    def invalidate(self, *tags):
+        """
+        Supprime les entrées portant l'une des étiquettes
+        """
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def _remove(self, key):
+        entry = self._data.pop(key)
+        self.bytes -= entry.size
+        for tag in entry.versions:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_response_cache = ResponseCache()
+
+
+def get_response_cache():
+    return _response_cache
+
+
+def invalidate(*tags):
+    return _response_cache.invalidate(*tags)
+
+
+def get_response_cache_stats():
+    return _response_cache.stats()
+
+
+def _request_key():
+    query = '&'.join(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+    return f'{request.path}?{query}'
+
+
+def _tee(chunks, store, limit):
+    """
+    Renvoie les morceaux d'une réponse en flux et garde le corps complet s'il
+    ne dépasse pas limit (rien n'est gardé si le client se déconnecte)
+    """
+    parts = []
+    size = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if parts is not None:
+                size += len(chunk)
+                parts = parts if size <= limit else None
+                if parts is not None:
+                    parts.append(chunk)
+            yield chunk
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+    if parts is not None:
+        store(b''.join(parts))
+
+
+def cached_response(*names):
+    """
+    Décorateur des routes GET publiques dont la réponse ne dépend que des
+    tampons names et des paramètres de la requête (comme @conditional).
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            cache = _response_cache
+            if not cache.enabled:
+                return f(*args, **kwargs)
+            try:
+                stamps = current_stamps(names)
+            except Exception as e:
+                logger.warning("Versions indisponibles, réponse non mise en cache: %s", e)
+                stamps = None
+            if stamps is None:
+                return f(*args, **kwargs)
+
+            versions = {name: version for name, (version, _) in stamps.items()}
+            key = _request_key()
+            entry = cache.get(key, versions)
+            if entry is not None:
+                response = current_app.response_class(entry.body, status=entry.status, headers=entry.headers)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            headers = [(name, value) for name, value in response.headers.items()
+                       if name.lower() not in _SKIPPED_HEADERS]
+            store = partial(cache.set, key, versions, response.status_code, headers)
+            if response.is_streamed:
+                response.response = _tee(response.response, store, cache.max_entry_bytes)
+            else:
+                store(response.get_data())
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return decorated
+    return decorator
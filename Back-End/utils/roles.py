@@ -0,0 +1,171 @@
+from functools import wraps
+from flask import request, jsonify
+import os
+import threading
+import time
+from config.database import get_db
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Permissions vérifiées par les routes
+PERM_READ = 'read'
+PERM_MODERATE = 'moderate'
+PERM_MANAGE_CATEGORIES = 'manage_categories'
+PERM_ADMIN = 'admin'
+PERM_SUPER_ADMIN = 'super_admin'
+
+# Permissions implicites des rôles système : seul endroit où l'on décide
+# quels rôles peuvent modérer ou administrer
+BUILTIN_ROLE_PERMISSIONS = {
+    'modérateur': {PERM_MODERATE},
+    'administrateur': {PERM_MODERATE, PERM_MANAGE_CATEGORIES, PERM_ADMIN},
+    'super-administrateur': {PERM_MODERATE, PERM_MANAGE_CATEGORIES, PERM_ADMIN, PERM_SUPER_ADMIN},
+}
+
+# Rôles qui ne peuvent pas être supprimés
+SYSTEM_ROLES = ('administrateur', 'super-administrateur')
+
+# Intervalle (secondes) entre deux lectures du tampon de version des rôles
+ROLE_REGISTRY_CHECK_INTERVAL = float(os.getenv('ROLE_REGISTRY_CHECK_INTERVAL', '5'))
+
+ROLE_VERSION_ID = 'role'
+
+
+def compile_permissions(role):
+    """
+    Permissions effectives d'un rôle : celles stockées en base plus celles
+    implicites de son nom
+    """
+    permissions = set(role.get('permissions') or [])
+    permissions |= BUILTIN_ROLE_PERMISSIONS.get(role.get('nom_role'), set())
+    return frozenset(permissions)
+
+
+class RoleRegistry:
+    """
+    Table des rôles chargée une fois par worker. Elle est rechargée lorsque le
+    tampon de version (collection versions) change, vérifié au plus toutes les
+    ROLE_REGISTRY_CHECK_INTERVAL secondes.
+    """
+
+    def __init__(self, check_interval=ROLE_REGISTRY_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._roles = {}
+        self._by_name = {}
+        self._permissions = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._loaded = False
+
+    def _read_version(self, db):
+        doc = db.versions.find_one({'_id': ROLE_VERSION_ID})
+        return doc.get('version', 0) if doc else 0
+
+    def _load(self, db, version):
+        roles = {}
+        by_name = {}
+        permissions = {}
+        for role in db.role.find():
+            key = str(role['_id'])
+            roles[key] = role
+            by_name[role.get('nom_role')] = role
+            permissions[key] = compile_permissions(role)
+        self._roles, self._by_name, self._permissions = roles, by_name, permissions
+        self._version = version
+        self._loaded = True
+
+    def refresh(self, db=None, force=False):
+        now = time.monotonic()
+        if not force and self._loaded and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if not force and self._loaded and now - self._checked_at < self.check_interval:
+                return
+            db = db if db is not None else get_db()
+            version = self._read_version(db)
+            if force or not self._loaded or version != self._version:
+                logger.debug("Chargement de la table des rôles (version %s)", version)
+                self._load(db, version)
+            self._checked_at = now
+
+    def invalidate(self):
+        self._loaded = False
+
+    def get(self, role_id):
+        if not role_id:
+            return None
+        self.refresh()
+        return self._roles.get(str(role_id))
+
+    def find_by_name(self, name):
+        self.refresh()
+        return self._by_name.get(name)
+
+    def role_ids_with(self, permission):
+        """
+        Identifiants (ObjectId) des rôles qui accordent permission
+        """
+        self.refresh()
+        return [role['_id'] for key, role in self._roles.items() if permission in self._permissions.get(key, ())]
+
+    def permissions(self, role_id):
+        if not role_id:
+            return frozenset()
+        self.refresh()
+        return self._permissions.get(str(role_id), frozenset())
+
+
+_registry = RoleRegistry()
+
+
+def get_role_registry():
+    return _registry
+
+
+def bump_role_version(db):
+    """
+    A appeler après chaque écriture dans la collection role : les autres
+    workers rechargent leur table au prochain contrôle de version
+    """
+    db.versions.update_one({'_id': ROLE_VERSION_ID}, {'$inc': {'version': 1}}, upsert=True)
+    _registry.invalidate()
+
+
+def has_permission(principal, permission):
+    return principal is not None and permission in principal.permissions
+
+
+def requires(permission):
+    """
+    Décorateur : vérifie le token puis la permission demandée et passe le
+    Principal en premier argument de la route
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            # Les requêtes preflight CORS ne portent pas de token
+            if request.method == 'OPTIONS':
+                return f(None, *args, **kwargs)
+
+            from utils.auth import get_request_token, load_principal
+
+            token = get_request_token()
+            if not token:
+                logger.warning("Token manquant ou mal formé")
+                return jsonify({"error": "Token manquant ou invalide"}), 401
+
+            principal = load_principal(token)
+            if not principal:
+                return jsonify({"error": "Token invalide"}), 401
+            if not principal.user:
+                logger.warning("Utilisateur non trouvé")
+                return jsonify({"error": "Utilisateur non trouvé"}), 404
+            if permission not in principal.permissions:
+                logger.warning("Accès refusé : permission '%s' requise, rôle '%s'", permission, principal.role_name)
+                return jsonify({"error": "Accès non autorisé"}), 403
+
+            return f(principal, *args, **kwargs)
+        return decorated
+    return decorator
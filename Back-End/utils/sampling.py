@@ -0,0 +1,166 @@
+"""
+Tirage aléatoire des ressources validées (route /resources/randomressource).
+
+Chaque ressource validée porte une clé aléatoire random_key (dans [0, 1)),
+fixée à l'approbation et indexée. Pour un utilisateur connecté, on tire un point
+de départ au hasard et on parcourt l'index à partir de ce point, par lots de
+RANDOM_BATCH_SIZE ressources lues avec les champs demandés. L'historique n'est lu
+que pour les identifiants du lot (index unique user_id + resource_id) : le coût
+d'un tirage ne dépend pas de la taille de l'historique. Le parcours s'arrête
+après RANDOM_MAX_BATCHES lots entièrement déjà vus (au plus deux allers-retours
+par lot) : le tirage répond alors "aucune ressource non vue", et le tirage
+suivant repart d'un autre point de l'index.
+
+Un visiteur anonyme tire un identifiant dans un ensemble gardé en mémoire
+(ApprovedPool), rechargé toutes les RANDOM_POOL_TTL secondes.
+"""
+import os
+import random
+import threading
+import time
+from bson import ObjectId
+from pymongo import ASCENDING
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Ressources lues par aller-retour lors du parcours de l'index random_key
+RANDOM_BATCH_SIZE = int(os.getenv('RANDOM_BATCH_SIZE', '50'))
+# Lots entièrement déjà vus parcourus avant d'abandonner le tirage
+RANDOM_MAX_BATCHES = int(os.getenv('RANDOM_MAX_BATCHES', '4'))
+# Durée de vie (secondes) de l'ensemble des ressources validées des visiteurs anonymes
+RANDOM_POOL_TTL = float(os.getenv('RANDOM_POOL_TTL', '60'))
+
+# Tentatives d'un tirage anonyme quand l'identifiant tiré a été supprimé
+_ANONYMOUS_ATTEMPTS = 3
+
+
+def new_random_key():
+    return random.random()
+
+
+def backfill_random_keys(db):
+    """
+    Attribue une clé aléatoire aux ressources validées qui n'en ont pas
+    (validées avant l'introduction de random_key) et la retire des ressources
+    non validées (rejetées) qui en portent une : seules les ressources
+    approved: True participent au tirage
+    """
+    db.ressource.update_many(
+        {"approved": {"$ne": True}, "random_key": {"$exists": True}},
+        {"$unset": {"random_key": ""}},
+    )
+    result = db.ressource.update_many(
+        {"approved": True, "random_key": {"$exists": False}},
+        [{"$set": {"random_key": {"$rand": {}}}}],
+    )
+    return result.modified_count
+
+
+class ApprovedPool:
+    """
+    Identifiants des ressources validées, gardés en mémoire par worker
+    """
+
+    def __init__(self, ttl=RANDOM_POOL_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._ids = []
+        self._loaded_at = float('-inf')
+        self.loads = 0
+
+    def _load(self, db):
+        ids = [doc["_id"] for doc in db.ressource.find({"approved": True, "random_key": {"$exists": True}}, {"_id": 1})]
+        with self._lock:
+            self._ids = ids
+            self._loaded_at = time.monotonic()
+            self.loads += 1
+        logger.debug("Ensemble des ressources validées rechargé: %s", len(ids))
+
+    def ids(self, db):
+        if time.monotonic() - self._loaded_at >= self.ttl:
+            self._load(db)
+        with self._lock:
+            return list(self._ids)
+
+    def discard(self, resource_id):
+        with self._lock:
+            if resource_id in self._ids:
+                self._ids.remove(resource_id)
+
+    def clear(self):
+        with self._lock:
+            self._ids = []
+            self._loaded_at = float('-inf')
+
+
+_approved_pool = ApprovedPool()
+
+
+def get_approved_pool():
+    return _approved_pool
+
+
+def pick_anonymous(db, projection=None):
+    """
+    Ressource validée au hasard, sans historique (None s'il n'y en a aucune)
+    """
+    for _ in range(_ANONYMOUS_ATTEMPTS):
+        ids = _approved_pool.ids(db)
+        if not ids:
+            return None
+        resource_id = random.choice(ids)
+        resource = db.ressource.find_one({"_id": resource_id}, projection)
+        if resource is not None:
+            return resource
+        # Supprimée depuis le dernier chargement
+        _approved_pool.discard(resource_id)
+    return None
+
+
+def _key_ranges(start):
+    # Du point de départ à la fin de l'index, puis du début jusqu'au point de départ
+    yield {"$gte": start}
+    yield {"$lt": start}
+
+
+def pick_unseen(db, user_id, projection=None):
+    """
+    Ressource validée au hasard parmi celles absentes de l'historique de
+    l'utilisateur (None s'il les a toutes vues ou si RANDOM_MAX_BATCHES lots
+    parcourus n'en contiennent aucune)
+    """
+    user_id = ObjectId(user_id)
+    # Champs demandés lus avec le lot : pas de relecture de la ressource tirée
+    batch_projection = None if projection is None else {**projection, "random_key": 1}
+    batches = 0
+    for key_range in _key_ranges(new_random_key()):
+        while True:
+            batch = list(
+                db.ressource.find({"random_key": key_range}, batch_projection)
+                .sort("random_key", ASCENDING)
+                .limit(RANDOM_BATCH_SIZE)
+            )
+            if not batch:
+                break
+            batches += 1
+            ids = [doc["_id"] for doc in batch]
+            seen = {
+                entry["resource_id"]
+                for entry in db.historique.find({"user_id": user_id, "resource_id": {"$in": ids}}, {"resource_id": 1})
+            }
+            for resource in batch:
+                if resource["_id"] not in seen:
+                    if projection is not None and "random_key" not in projection:
+                        resource.pop("random_key", None)
+                    return resource
+
+            if batches >= RANDOM_MAX_BATCHES:
+                logger.debug("%s lots déjà vus parcourus, aucune ressource non vue", batches)
+                return None
+            if len(batch) < RANDOM_BATCH_SIZE:
+                break
+            # Lot suivant : après la dernière clé lue, sans sortir de l'intervalle
+            key_range = dict(key_range, **{"$gt": batch[-1]["random_key"]})
+            key_range.pop("$gte", None)
+    return None
@@ -0,0 +1,94 @@
+"""
+Encodage JSON des documents MongoDB.
+
+Un seul fournisseur JSON (BSONJSONProvider) est enregistré sur l'application :
+jsonify encode directement les ObjectId (en chaîne) et les datetime (ISO 8601),
+à toute profondeur, en une seule passe. Les routes renvoient donc les documents
+tels que lus dans la base, sans les recopier avec une fonction sanitize.
+
+orjson (encodeur en C) est utilisé s'il est installé ; sinon, ou pour une valeur
+qu'il ne sait pas encoder, le module json standard prend le relais.
+"""
+import json
+from datetime import datetime
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def bson_default(o):
+    """
+    Valeurs BSON non natives en JSON ; TypeError pour tout autre type
+    """
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, datetime):
+        return o.isoformat()
+    raise TypeError(f"Type {type(o).__name__} non sérialisable en JSON")
+
+
+def _orjson_dumps(obj, sort_keys=False):
+    option = orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, default=bson_default, option=option)
+
+
+def dumps_bytes(obj, sort_keys=False, fallback=bson_default):
+    """
+    JSON compact encodé en UTF-8 ; fallback est la fonction default de
+    l'encodeur standard, utilisé sans orjson ou quand orjson échoue
+    """
+    if orjson is not None:
+        try:
+            return _orjson_dumps(obj, sort_keys)
+        except TypeError:
+            # Entier hors 64 bits, type inconnu (Decimal...) : encodeur standard
+            pass
+    return json.dumps(obj, default=fallback, ensure_ascii=False, sort_keys=sort_keys,
+                      separators=(',', ':')).encode('utf-8')
+
+
+class BSONJSONProvider(DefaultJSONProvider):
+    """
+    Fournisseur JSON de l'application (app.json_provider_class)
+    """
+
+    @staticmethod
+    def default(o):
+        try:
+            return bson_default(o)
+        except TypeError:
+            # date, Decimal, UUID, dataclass... : comportement Flask par défaut
+            return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            return dumps_bytes(obj, self.sort_keys, self.default).decode('utf-8')
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            # Sortie indentée en mode debug, comme le fournisseur par défaut
+            return super().response(obj)
+        return self._app.response_class(
+            dumps_bytes(obj, self.sort_keys, self.default), mimetype=self.mimetype
+        )
+
+
+def init_app(app):
+    """
+    Enregistre BSONJSONProvider comme fournisseur JSON de l'application
+    """
+    app.json = BSONJSONProvider(app)
+    return app
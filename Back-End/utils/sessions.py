@@ -0,0 +1,201 @@
+"""
+Sessions d'authentification (collection token).
+
+Un document par session : les tokens n'y sont jamais stockés en clair, seulement
+leur empreinte SHA-256 (64 caractères hexadécimaux, indexée). Les dates
+d'expiration sont des dates BSON ; l'index TTL sur expiration_refresh_token
+laisse MongoDB supprimer les sessions expirées. Au-delà de
+MAX_SESSIONS_PER_USER sessions actives, les plus anciennes sont révoquées.
+
+Le document d'une session représente toute la famille de ses refresh tokens :
+la rotation le met à jour en place et garde les empreintes déjà utilisées dans
+previous_refresh_hashes. Présenter un refresh token déjà tourné révoque la
+session entière (réutilisation d'un token volé).
+"""
+from datetime import datetime, timezone
+import hashlib
+import os
+from bson import ObjectId
+from pymongo import DESCENDING, ReturnDocument
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Nombre maximal de sessions actives par utilisateur (0 : illimité)
+MAX_SESSIONS_PER_USER = int(os.getenv('MAX_SESSIONS_PER_USER', '10'))
+# Nombre d'empreintes de refresh tokens déjà utilisés conservées par session
+REFRESH_TOKEN_HISTORY = int(os.getenv('REFRESH_TOKEN_HISTORY', '20'))
+# Délai (secondes) pendant lequel le refresh token précédent reçoit un succès
+# sans nouveaux cookies au lieu de révoquer la session (refresh parallèles des
+# onglets du front)
+REFRESH_REUSE_GRACE = int(os.getenv('REFRESH_REUSE_GRACE', '10'))
+
+# Résultats de rotate_session
+ROTATED = 'rotated'
+CONCURRENT = 'concurrent'
+REUSED = 'reused'
+EXPIRED = 'expired'
+INVALID = 'invalid'
+
+
+def hash_token(token):
+    """
+    Empreinte SHA-256 d'un token, seule forme sous laquelle il est stocké
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def _evict_cached(access_token_hashes):
+    # Import local : utils.auth dépend de ce module
+    from utils.auth import evict_token_hash
+    for access_token_hash in access_token_hashes:
+        evict_token_hash(access_token_hash)
+
+
+def create_session(db, user_id, access_token, refresh_token, expiration_access, expiration_refresh,
+                   user_agent=None, ip_address=None):
+    """
+    Enregistre une nouvelle session puis applique la limite de sessions par utilisateur
+    """
+    session = {
+        'id_user': user_id,
+        'access_token_hash': hash_token(access_token),
+        'expiration_access_token': expiration_access,
+        'refresh_token_hash': hash_token(refresh_token),
+        'expiration_refresh_token': expiration_refresh,
+        'created_at': datetime.now(timezone.utc),
+        'user_agent': user_agent,
+        'ip_address': ip_address,
+    }
+    result = db.token.insert_one(session)
+    session['_id'] = result.inserted_id
+    enforce_session_limit(db, user_id)
+    return session
+
+
+def enforce_session_limit(db, user_id, limit=None):
+    """
+    Supprime les sessions les plus anciennes au-delà de la limite.
+    Retourne le nombre de sessions révoquées.
+    """
+    limit = MAX_SESSIONS_PER_USER if limit is None else limit
+    if limit <= 0:
+        return 0
+    overflow = list(
+        db.token.find({'id_user': user_id}, {'_id': 1, 'access_token_hash': 1})
+        .sort('created_at', DESCENDING)
+        .skip(limit)
+    )
+    if not overflow:
+        return 0
+    db.token.delete_many({'_id': {'$in': [doc['_id'] for doc in overflow]}})
+    _evict_cached(doc.get('access_token_hash') for doc in overflow)
+    logger.info("%s session(s) révoquée(s) pour l'utilisateur %s (limite %s)", len(overflow), user_id, limit)
+    return len(overflow)
+
+
+def find_by_access_token(db, access_token):
+    return db.token.find_one({'access_token_hash': hash_token(access_token)})
+
+
+def find_by_refresh_token(db, refresh_token):
+    return db.token.find_one({'refresh_token_hash': hash_token(refresh_token)})
+
+
+def rotate_session(db, user_id, refresh_token, new_access_token, new_refresh_token,
+                   expiration_access, expiration_refresh):
+    """
+    Rotation atomique d'un refresh token : un seul find_one_and_update, dont le
+    filtre porte sur l'empreinte du token présenté. Deux rotations simultanées
+    du même token ne peuvent donc pas réussir toutes les deux.
+    Retourne (résultat, document de session avant la mise à jour).
+    """
+    old_hash = hash_token(refresh_token)
+    now = datetime.now(timezone.utc)
+    before = db.token.find_one_and_update(
+        {
+            'refresh_token_hash': old_hash,
+            'id_user': user_id,
+            'expiration_refresh_token': {'$gt': now},
+        },
+        {
+            '$set': {
+                'access_token_hash': hash_token(new_access_token),
+                'expiration_access_token': expiration_access,
+                'refresh_token_hash': hash_token(new_refresh_token),
+                'expiration_refresh_token': expiration_refresh,
+                'rotated_at': now,
+            },
+            '$push': {'previous_refresh_hashes': {'$each': [old_hash], '$slice': -REFRESH_TOKEN_HISTORY}},
+        },
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is not None:
+        _evict_cached([before.get('access_token_hash')])
+        return ROTATED, before
+
+    # Chemin d'échec uniquement : token expiré, déjà tourné ou inconnu
+    session = db.token.find_one({
+        '$or': [{'refresh_token_hash': old_hash}, {'previous_refresh_hashes': old_hash}]
+    })
+    if session is None or session.get('id_user') != user_id:
+        return INVALID, None
+    if session.get('refresh_token_hash') == old_hash:
+        delete_session(db, session)
+        return EXPIRED, session
+
+    rotated_at = session.get('rotated_at')
+    if rotated_at is not None and rotated_at.tzinfo is None:
+        rotated_at = rotated_at.replace(tzinfo=timezone.utc)
+    previous = session.get('previous_refresh_hashes') or []
+    if previous and previous[-1] == old_hash and rotated_at and (now - rotated_at).total_seconds() <= REFRESH_REUSE_GRACE:
+        return CONCURRENT, session
+
+    # Réutilisation d'un ancien refresh token : toute la famille est révoquée
+    delete_session(db, session)
+    return REUSED, session
+
+
+def delete_session(db, session):
+    """
+    Supprime une session (document token déjà chargé)
+    """
+    db.token.delete_one({'_id': session['_id']})
+    _evict_cached([session.get('access_token_hash')])
+
+
+def revoke_access_token(db, access_token):
+    """
+    Supprime la session d'un access token (logout)
+    """
+    access_token_hash = hash_token(access_token)
+    result = db.token.delete_one({'access_token_hash': access_token_hash})
+    _evict_cached([access_token_hash])
+    return result.deleted_count
+
+
+def list_sessions(db, user_id):
+    """
+    Sessions actives d'un utilisateur, de la plus récente à la plus ancienne
+    """
+    projection = {'refresh_token_hash': 0}
+    return list(db.token.find({'id_user': user_id}, projection).sort('created_at', DESCENDING))
+
+
+def revoke_sessions(db, user_id, session_ids=None, keep_access_token=None):
+    """
+    Révoque les sessions d'un utilisateur : toutes, ou seulement session_ids,
+    en conservant éventuellement la session de keep_access_token (session courante).
+    Retourne le nombre de sessions révoquées.
+    """
+    query = {'id_user': user_id}
+    if session_ids is not None:
+        query['_id'] = {'$in': [ObjectId(session_id) for session_id in session_ids]}
+    if keep_access_token:
+        query['access_token_hash'] = {'$ne': hash_token(keep_access_token)}
+    revoked = list(db.token.find(query, {'_id': 1, 'access_token_hash': 1}))
+    if not revoked:
+        return 0
+    db.token.delete_many({'_id': {'$in': [doc['_id'] for doc in revoked]}})
+    _evict_cached(doc.get('access_token_hash') for doc in revoked)
+    return len(revoked)
@@ -0,0 +1,81 @@
+"""
+Réponses JSON en flux pour les listes volumineuses.
+
+Au lieu de charger tout le curseur MongoDB dans une liste puis de produire une
+seule chaîne avec jsonify, stream_json_array parcourt le curseur par lots de
+STREAM_BATCH_SIZE documents, encode chaque document au fil de l'eau (utils.serialization) et envoie
+le tableau JSON par morceaux d'environ STREAM_CHUNK_SIZE octets. La mémoire
+d'une requête ne dépend plus du nombre de documents retournés.
+"""
+import os
+from flask import Response, stream_with_context
+from utils.logger import get_logger
+from utils.serialization import dumps_bytes
+
+logger = get_logger(__name__)
+
+# Nombre de documents demandés à MongoDB par aller-retour
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', '200'))
+# Taille (octets) à partir de laquelle un morceau de réponse est envoyé
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', '65536'))
+
+_EMPTY = object()
+
+
+def _iter_chunks(source, first, documents, transform, chunk_size):
+    buffer = [b'[']
+    size = 1
+    count = 0
+    try:
+        for document in _chain(first, documents):
+            if transform is not None:
+                document = transform(document)
+            item = dumps_bytes(document)
+            buffer.append(item if count == 0 else b',' + item)
+            size += len(item) + 1
+            count += 1
+            if size >= chunk_size:
+                yield b''.join(buffer)
+                buffer = []
+                size = 0
+    except Exception as e:
+        # Le statut 200 est déjà envoyé : le tableau est interrompu (JSON invalide)
+        # plutôt que complété avec des données partielles présentées comme entières
+        logger.exception("Flux JSON interrompu après %s documents: %s", count, e)
+        raise
+    finally:
+        # Libère le curseur côté serveur, y compris si le client se déconnecte
+        close = getattr(source, 'close', None)
+        if close is not None:
+            close()
+    buffer.append(b']')
+    yield b''.join(buffer)
+    logger.debug("%s documents envoyés en flux", count)
+
+
+def _chain(first, documents):
+    if first is not _EMPTY:
+        yield first
+        yield from documents
+
+
+def stream_json_array(documents, transform=None, status=200, headers=None,
+                      batch_size=None, chunk_size=None):
+    """
+    Réponse Flask dont le corps est le tableau JSON des documents.
+
+    documents est un curseur pymongo (find ou aggregate) ou tout itérable ;
+    transform, s'il est fourni, est appliqué à chaque document avant encodage.
+    Le premier document est lu avant de construire la réponse : une erreur de
+    requête est donc levée ici et peut encore être transformée en 500 par la route.
+    """
+    batch_size = batch_size or STREAM_BATCH_SIZE
+    if hasattr(documents, 'batch_size'):
+        documents = documents.batch_size(batch_size)
+
+    iterator = iter(documents)
+    first = next(iterator, _EMPTY)
+
+    body = _iter_chunks(documents, first, iterator, transform, chunk_size or STREAM_CHUNK_SIZE)
+    return Response(stream_with_context(body), status=status, headers=headers,
+                    mimetype='application/json')
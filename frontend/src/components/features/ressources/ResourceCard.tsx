@@ -59,10 +59,12 @@ const ResourceCard = ({ resource, author, category }: ResourceCardProps) => {
   const { showToast } = useToast();
   const { isFavorite, addFavorite, removeFavorite } = useFavoritesStore();
   
-  // Tronquer le contenu HTML
-  const { html: truncatedContent, isTruncated } = !isExpanded 
-    ? truncateHTML(resource.contenu) 
-    : { html: resource.contenu, isTruncated: false };
+  // Les listes envoient la vue card : extrait (texte brut, terminé par "..." s'il est tronqué) au lieu du contenu
+  const content = resource.contenu ?? resource.extrait ?? '';
+  const { html: truncatedContent, isTruncated: isContentTruncated } = !isExpanded 
+    ? truncateHTML(content) 
+    : { html: content, isTruncated: false };
+  const isTruncated = isContentTruncated || (resource.contenu === undefined && content.endsWith('...'));
   
   const handleResourceClick = () => {
     navigate(`/feed/ressource/${resource._id}`);
@@ -140,7 +142,7 @@ const ResourceCard = ({ resource, author, category }: ResourceCardProps) => {
         <h2 className="text-lg font-semibold mb-2">{resource.titre}</h2>
         <div
           className="text-sm sm:text-base mb-3 content-container"
-          dangerouslySetInnerHTML={{ __html: isExpanded ? resource.contenu : truncatedContent }}
+          dangerouslySetInnerHTML={{ __html: isExpanded ? content : truncatedContent }}
         />
         
         {isTruncated && (
@@ -0,0 +1,28 @@
+import React from 'react';
+
+interface LoadMoreButtonProps {
+  // Une page suivante existe (curseur X-Next-Cursor reçu)
+  hasMore: boolean;
+  loading: boolean;
+  onClick: () => void;
+  label?: string;
+}
+
+// Bouton de chargement de la page suivante d'une liste paginée
+const LoadMoreButton: React.FC<LoadMoreButtonProps> = ({ hasMore, loading, onClick, label = 'Charger plus' }) => {
+  if (!hasMore) return null;
+
+  return (
+    <div className="flex justify-center py-4">
+      <button
+        onClick={onClick}
+        disabled={loading}
+        className="px-4 py-2 bg-gray-100 text-gray-700 rounded-md text-sm hover:bg-gray-200 disabled:opacity-50"
+      >
+        {loading ? 'Chargement...' : label}
+      </button>
+    </div>
+  );
+};
+
+export default LoadMoreButton;
@@ -1,8 +1,22 @@
 import { create } from 'zustand';
 import { Resource, User, Category } from '../types/types';
 import { api } from './authStore';
+import { fetchPage } from './pagination';
 import useCategoryStore from './categoryStore';
 
+// Ressources validées de la catégorie, des plus récentes aux plus anciennes
+const categoryQuery = (categoryId: string) => `approved=1&categorie=${encodeURIComponent(categoryId)}`;
+
+const fetchErrorMessage = (err: any) => {
+  if (err.response) {
+    return err.response.data?.error || 'Erreur lors de la récupération des ressources';
+  }
+  if (err.request) {
+    return 'Impossible de se connecter au serveur.';
+  }
+  return 'Une erreur est survenue.';
+};
+
 interface CategoryResourcesState {
   resources: (Resource & { 
     author?: User | null;
@@ -15,9 +29,14 @@ interface CategoryResourcesState {
   selectedCategoryId: string | null;
   loading: boolean;
   error: string | null;
+  // Curseur de la page suivante (X-Next-Cursor), null en fin de liste
+  nextCursor: string | null;
+  loadingMore: boolean;
   
   // Actions
-  fetchAllResources: () => Promise<void>;
+  fetchCategoryResources: (categoryId: string) => Promise<void>;
+  fetchMoreResources: () => Promise<void>;
+  addResources: (resources: Resource[]) => void;
   setSelectedCategory: (categoryId: string | null) => void;
   filterResourcesByCategory: () => void;
   resetResources: () => void;
@@ -31,73 +50,68 @@ const useCategoryResourcesStore = create<CategoryResourcesState>((set, get) => (
   selectedCategoryId: null,
   loading: false,
   error: null,
+  nextCursor: null,
+  loadingMore: false,
   
-  fetchAllResources: async () => {
-    const { loading } = get();
-    
-    // Éviter les appels multiples
-    if (loading) return;
-    
-    set({ loading: true });
+  // Première page des ressources validées d'une catégorie (filtrées et triées par le serveur)
+  fetchCategoryResources: async (categoryId: string) => {
+    set({ loading: true, selectedCategoryId: categoryId, nextCursor: null });
     
     try {
-      const response = await api.get('/resources/');
-      
-      if (response.data && Array.isArray(response.data)) {
-        // Filtrer seulement les ressources validées
-        const validatedResources = response.data.filter(resource => 
-          resource.date_validation !== null && resource.date_validation !== undefined
-        );
-        
-        // Trier par date de publication (plus récent en premier)
-        validatedResources.sort((a, b) => {
-          const dateA = new Date(a.createdAt || a.date_publication?.date || 0);
-          const dateB = new Date(b.createdAt || b.date_publication?.date || 0);
-          return dateB.getTime() - dateA.getTime();
-        });
-        
-        // Ajouter les champs author et category initialisés à null
-        const resourcesWithExtra = validatedResources.map(resource => ({
-          ...resource,
-          author: null,
-          category: null
-        }));
-        
-        set({ 
-          resources: resourcesWithExtra,
-          error: null
-        });
-        
-        // Appliquer le filtre de catégorie si nécessaire
-        get().filterResourcesByCategory();
-        
-        // Récupérer les informations des auteurs et des catégories pour chaque ressource
-        for (const resource of resourcesWithExtra) {
-          if (resource.id_publieur) {
-            get().fetchResourceAuthor(resource._id, resource.id_publieur);
-          }
-          if (resource.id_categorie) {
-            get().fetchResourceCategory(resource._id, resource.id_categorie);
-          }
-        }
-      } else {
-        set({ error: 'Aucune ressource trouvée' });
-      }
+      const page = await fetchPage<Resource>('/resources/', categoryQuery(categoryId));
+      set({ resources: [], error: null });
+      get().addResources(page.items);
+      set({ nextCursor: page.nextCursor });
     } catch (err: any) {
       console.error('Erreur lors de la récupération des ressources:', err);
-      
-      let errorMessage = 'Une erreur est survenue.';
-      if (err.response) {
-        errorMessage = err.response.data?.error || 'Erreur lors de la récupération des ressources';
-      } else if (err.request) {
-        errorMessage = 'Impossible de se connecter au serveur.';
-      }
-      
-      set({ error: errorMessage });
+      set({ error: fetchErrorMessage(err) });
     } finally {
       set({ loading: false });
     }
   },
+
+  // Page suivante de la catégorie sélectionnée
+  fetchMoreResources: async () => {
+    const { nextCursor, loadingMore, selectedCategoryId } = get();
+    if (!nextCursor || loadingMore || !selectedCategoryId) return;
+
+    set({ loadingMore: true });
+    try {
+      const page = await fetchPage<Resource>('/resources/', categoryQuery(selectedCategoryId), nextCursor);
+      get().addResources(page.items);
+      set({ nextCursor: page.nextCursor });
+    } catch (err: any) {
+      console.error('Erreur lors de la récupération des ressources:', err);
+      set({ error: fetchErrorMessage(err) });
+    } finally {
+      set({ loadingMore: false });
+    }
+  },
+
+  // Ajoute une page à la liste, puis charge auteurs et catégories de ses ressources
+  addResources: (resources: Resource[]) => {
+    // Ajouter les champs author et category initialisés à null
+    const resourcesWithExtra = resources.map(resource => ({
+      ...resource,
+      author: null,
+      category: null
+    }));
+
+    set(state => ({ resources: [...state.resources, ...resourcesWithExtra] }));
+    
+    // Appliquer le filtre de catégorie si nécessaire
+    get().filterResourcesByCategory();
+    
+    // Récupérer les informations des auteurs et des catégories pour chaque ressource
+    for (const resource of resourcesWithExtra) {
+      if (resource.id_publieur) {
+        get().fetchResourceAuthor(resource._id, resource.id_publieur);
+      }
+      if (resource.id_categorie) {
+        get().fetchResourceCategory(resource._id, resource.id_categorie);
+      }
+    }
+  },
   
   // Définir la catégorie sélectionnée et filtrer les ressources
   setSelectedCategory: (categoryId: string | null) => {
@@ -265,7 +279,9 @@ const useCategoryResourcesStore = create<CategoryResourcesState>((set, get) => (
       filteredResources: [],
       selectedCategoryId: null,
       loading: false,
-      error: null
+      error: null,
+      nextCursor: null,
+      loadingMore: false
     });
   }
 }));
@@ -1,5 +1,6 @@
 import { create } from 'zustand';
 import axios from 'axios';
+import { fetchAllPages } from './pagination';
 
 interface Favorite {
     _id: string;
@@ -14,7 +15,7 @@ export interface FavoriteWithDetails {
     resource: {
         id: string;
         titre: string;
-        contenu: string;
+        extrait: string;
         categorie: string;
         date_publication: string;
         id_publieur: string;
@@ -53,16 +54,12 @@ const useFavoritesStore = create<FavoritesState>((set, get) => ({
         set({ loading: true, error: null });
         
         try {
-            const response = await axios.get('https://guillaume-lechevallier.freeboxos.fr:5001/resources/favorites', {
-                withCredentials: true,
-                headers: {
-                    'Content-Type': 'application/json',
-                    'Accept': 'application/json'
-                }
-            });
+            // Liste paginée : toutes les pages sont lues, dans la limite de MAX_WALK_ITEMS
+            // (isFavorite marque chaque carte affichée et porte sur l'ensemble des favoris)
+            const favorites = await fetchAllPages<FavoriteWithDetails>('/resources/favorites');
 
             set({ 
-                favorites: response.data,
+                favorites,
                 loading: false,
                 error: null
             });
@@ -150,19 +147,11 @@ const useFavoritesStore = create<FavoritesState>((set, get) => ({
     // Vérifier si une ressource est en favoris (avec appel API)
     checkIfFavorite: async (resourceId: string) => {
         try {
-            const response = await axios.get('https://guillaume-lechevallier.freeboxos.fr:5001/resources/favorites', {
-                withCredentials: true,
-                headers: {
-                    'Content-Type': 'application/json',
-                    'Accept': 'application/json'
-                }
-            });
-
-            const favorites = response.data;
+            const favorites = await fetchAllPages<FavoriteWithDetails>('/resources/favorites');
             const isFavorite = favorites.some((fav: any) => fav.resource.id === resourceId);
             
             // Mettre à jour la liste locale si elle n'est pas à jour
-            set({ favorites: response.data });
+            set({ favorites });
             
             return isFavorite;
         } catch (error) {
@@ -0,0 +1,52 @@
+import { api } from './authStore';
+
+// Taille de page par défaut des listes paginées (la page suivante est chargée à la demande)
+export const PAGE_SIZE = 20;
+// Plafond d'un parcours complet (listes dont l'ensemble est réellement nécessaire)
+export const MAX_WALK_ITEMS = 500;
+
+export interface Page<T> {
+  items: T[];
+  // Curseur de la page suivante (en-tête X-Next-Cursor), null en fin de liste
+  nextCursor: string | null;
+}
+
+// Lit une page d'une liste paginée par curseur
+export const fetchPage = async <T = any>(
+  path: string,
+  query: string = '',
+  cursor: string | null = null,
+  limit: number = PAGE_SIZE
+): Promise<Page<T>> => {
+  const params = new URLSearchParams(query);
+  params.set('limit', String(limit));
+  if (cursor) {
+    params.set('cursor', cursor);
+  }
+  const response = await api.get(`${path}?${params.toString()}`);
+  return {
+    items: Array.isArray(response.data) ? response.data : [],
+    nextCursor: response.headers?.['x-next-cursor'] || null,
+  };
+};
+
+// Parcourt les pages d'une liste jusqu'à sa fin ou jusqu'à maxItems éléments
+export const fetchAllPages = async <T = any>(
+  path: string,
+  query: string = '',
+  maxItems: number = MAX_WALK_ITEMS
+): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | null = null;
+
+  do {
+    const page: Page<T> = await fetchPage<T>(path, query, cursor, 100);
+    items.push(...page.items);
+    cursor = page.nextCursor;
+  } while (cursor && items.length < maxItems);
+
+  if (cursor) {
+    console.warn(`${path} : parcours arrêté à ${items.length} éléments`);
+  }
+  return items.slice(0, maxItems);
+};
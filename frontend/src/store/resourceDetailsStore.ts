@@ -1,6 +1,7 @@
 import { create } from 'zustand';
 import { api } from './authStore';
 import { Resource, Comment, User, Category } from '../types/types';
+import { fetchPage } from './pagination';
 import useCategoryStore from './categoryStore';
 
 interface ResourceDetailsState {
@@ -9,6 +10,9 @@ interface ResourceDetailsState {
   author: User | null;
   category: Category | null;
   comments: Comment[];
+  // Curseur de la page de commentaires suivante (X-Next-Cursor), null en fin de fil
+  commentsCursor: string | null;
+  loadingMoreComments: boolean;
   loading: boolean;
   loadingComments: boolean;
   error: string | null;
@@ -17,6 +21,7 @@ interface ResourceDetailsState {
   // Actions
   fetchResource: (resourceId: string) => Promise<void>;
   fetchComments: (resourceId: string) => Promise<void>;
+  fetchMoreComments: (resourceId: string) => Promise<void>;
   fetchSubComments: (resourceId: string, commentId: string) => Promise<Comment[]>;
   fetchAuthor: (publisherId: string) => Promise<void>;
   fetchCategory: (categoryId: string) => Promise<void>;
@@ -26,12 +31,43 @@ interface ResourceDetailsState {
   resetState: () => void;
 }
 
-const useResourceDetailsStore = create<ResourceDetailsState>((set) => ({
+// Fil paginé : commentaires triés du plus récent au plus ancien, avec leurs
+// premières réponses, leur nombre de réponses et le nom des auteurs
+const fetchThreadPage = async (resourceId: string, cursor: string | null) => {
+  const page = await fetchPage<Comment>(`/resources/comments/${resourceId}/thread`, 'replies=20', cursor);
+
+  // Réponses au-delà de l'aperçu : lues uniquement pour les commentaires concernés
+  const comments = await Promise.all(
+    page.items.map(async (comment: Comment) => {
+      const replies = comment.replies || [];
+      if ((comment.replies_count || 0) <= replies.length) {
+        return { ...comment, replies };
+      }
+      const allReplies = await useResourceDetailsStore.getState().fetchSubComments(resourceId, comment._id);
+      return { ...comment, replies: allReplies, replies_count: allReplies.length };
+    })
+  );
+  return { comments, cursor: page.nextCursor };
+};
+
+const commentsErrorMessage = (err: any) => {
+  if (err.response) {
+    return err.response.data?.error || 'Erreur lors de la récupération des commentaires';
+  }
+  if (err.request) {
+    return 'Impossible de se connecter au serveur.';
+  }
+  return 'Erreur lors de la récupération des commentaires';
+};
+
+const useResourceDetailsStore = create<ResourceDetailsState>((set, get) => ({
   // États initiaux
   resource: null,
   author: null,
   category: null,
   comments: [],
+  commentsCursor: null,
+  loadingMoreComments: false,
   loading: false,
   loadingComments: false,
   error: null,
@@ -214,70 +250,42 @@ const useResourceDetailsStore = create<ResourceDetailsState>((set) => ({
       set({ loadingComments: true, commentError: null });
       console.log(`Récupération des commentaires pour la ressource: ${resourceId}`);
       
-      const response = await api.get(`/resources/comments/${resourceId}`);
-      
-      console.log('Commentaires récupérés:', response.data);
-      
-      const sortedComments = response.data.sort((a: Comment, b: Comment) => {
-        const getTimestamp = (comment: Comment): number => {
-          const dateValue = comment.date_publication || comment.created_at;
-          
-          if (!dateValue) return 0;
-          
-          if (typeof dateValue === 'object' && '$date' in dateValue) {
-            return new Date(dateValue.$date).getTime();
-          }
-          
-          if (typeof dateValue === 'string') {
-            return new Date(dateValue).getTime();
-          }
-          
-          return 0;
-        };
-        
-        return getTimestamp(b) - getTimestamp(a);
-      });
-
-      // Pour chaque commentaire, récupérer ses sous-commentaires
-      const commentsWithReplies = await Promise.all(
-        sortedComments.map(async (comment: Comment) => {
-          try {
-            const replies = await useResourceDetailsStore.getState().fetchSubComments(resourceId, comment._id);
-            return {
-              ...comment,
-              replies: replies,
-              replies_count: replies.length
-            };
-          } catch (error) {
-            console.warn(`Impossible de récupérer les sous-commentaires pour ${comment._id}:`, error);
-            return {
-              ...comment,
-              replies: [],
-              replies_count: 0
-            };
-          }
-        })
-      );
+      const { comments, cursor } = await fetchThreadPage(resourceId, null);
+      console.log('Commentaires récupérés:', comments);
       
       set({ 
-        comments: commentsWithReplies,
+        comments,
+        commentsCursor: cursor,
         loadingComments: false,
         commentError: null
       });
     } catch (err: any) {
       console.error('Erreur lors de la récupération des commentaires:', err);
-      
-      let errorMessage = 'Erreur lors de la récupération des commentaires';
-      
-      if (err.response) {
-        errorMessage = err.response.data?.error || errorMessage;
-      } else if (err.request) {
-        errorMessage = 'Impossible de se connecter au serveur.';
-      }
-      
       set({ 
         loadingComments: false,
-        commentError: errorMessage
+        commentError: commentsErrorMessage(err)
+      });
+    }
+  },
+
+  // Page suivante du fil de commentaires
+  fetchMoreComments: async (resourceId: string) => {
+    const { commentsCursor, loadingMoreComments } = get();
+    if (!commentsCursor || loadingMoreComments) return;
+
+    set({ loadingMoreComments: true });
+    try {
+      const { comments, cursor } = await fetchThreadPage(resourceId, commentsCursor);
+      set(state => ({
+        comments: [...state.comments, ...comments],
+        commentsCursor: cursor,
+        loadingMoreComments: false
+      }));
+    } catch (err: any) {
+      console.error('Erreur lors de la récupération des commentaires:', err);
+      set({ 
+        loadingMoreComments: false,
+        commentError: commentsErrorMessage(err)
       });
     }
   },
@@ -446,6 +454,8 @@ const useResourceDetailsStore = create<ResourceDetailsState>((set) => ({
       author: null,
       category: null,
       comments: [],
+      commentsCursor: null,
+      loadingMoreComments: false,
       loading: false,
       loadingComments: false,
       error: null,
@@ -2,17 +2,23 @@ import { create } from 'zustand';
 import { Resource, Category } from '../types/types';
 import useCategoryStore from './categoryStore';
 import { api } from './authStore';
+import { fetchPage } from './pagination';
 
 interface ResourcesState {
   // État
   resources: Resource[];
   loading: boolean;
   error: string | null;
+  // Filtres de la liste courante (paramètres de GET /resources/) et curseur de sa page suivante
+  query: string;
+  nextCursor: string | null;
+  loadingMore: boolean;
   categories: Category[];
   loadingCategories: boolean;
 
   // Actions
-  fetchResources: () => Promise<void>;
+  fetchResources: (query?: string) => Promise<void>;
+  fetchMoreResources: () => Promise<void>;
   fetchCategories: () => Promise<void>;
   deleteResource: (id: string) => Promise<void>;
   approveResource: (id: string, comment?: string) => Promise<any>;
@@ -30,15 +36,19 @@ const useResourcesStore = create<ResourcesState>((set, get) => ({
   resources: [],
   loading: false,
   error: null,
+  query: '',
+  nextCursor: null,
+  loadingMore: false,
   categories: [],
   loadingCategories: false,
 
-  // Récupérer les ressources
-  fetchResources: async () => {
-    set({ loading: true });
+  // Récupérer la première page des ressources (sans argument : filtres de la liste courante)
+  fetchResources: async (query?: string) => {
+    const listQuery = query ?? get().query;
+    set({ loading: true, query: listQuery });
     try {
-      const response = await api.get('/resources/');
-      set({ resources: response.data, loading: false });
+      const page = await fetchPage<Resource>('/resources/', listQuery);
+      set({ resources: page.items, nextCursor: page.nextCursor, loading: false });
     } catch (err: any) {
       console.error('Erreur lors de la récupération des ressources:', err);
       set({ 
@@ -48,40 +58,36 @@ const useResourcesStore = create<ResourcesState>((set, get) => ({
     }
   },
 
-  // Récupérer les catégories (utilise maintenant le categoryStore)
+  // Charger la page suivante de la liste courante
+  fetchMoreResources: async () => {
+    const { nextCursor, loadingMore, query } = get();
+    if (!nextCursor || loadingMore) return;
+
+    set({ loadingMore: true });
+    try {
+      const page = await fetchPage<Resource>('/resources/', query, nextCursor);
+      set(state => ({
+        resources: [...state.resources, ...page.items],
+        nextCursor: page.nextCursor,
+        loadingMore: false
+      }));
+    } catch (err: any) {
+      console.error('Erreur lors de la récupération des ressources:', err);
+      set({ 
+        error: err.response?.data?.error || 'Erreur lors de la récupération des ressources', 
+        loadingMore: false 
+      });
+    }
+  },
+
+  // Récupérer les catégories avec leur nombre de ressources (compteurs tenus par le serveur :
+  // les ressources ne sont chargées que page par page)
   fetchCategories: async () => {
     set({ loadingCategories: true });
     try {
-      const categoryStore = useCategoryStore.getState();
-      await categoryStore.fetchCategories();
-      
-      const categories = categoryStore.categories;
-      console.log("Catégories récupérées du categoryStore:", categories);
-      
-      if (categories.length === 0) {
-        console.log("Aucune catégorie trouvée dans le categoryStore, tentative de récupération directe");
-        const response = await api.get('/categories/all_categories');
-        console.log("Réponse directe de l'API:", response.data);
-        
-        if (response.data && response.data.length > 0) {
-          set({ categories: response.data, loadingCategories: false });
-          return;
-        }
-      }
-      
-      const resources = get().resources;
-      const categoriesWithCount = categories.map(category => {
-        const categoryId = category._id.toString();
-        const count = resources.filter(r => {
-          const resourceCategoryId = r.id_categorie ? r.id_categorie.toString() : '';
-          return resourceCategoryId === categoryId;
-        }).length;
-        
-        return { ...category, resourceCount: count };
-      });
-      
-      console.log("Catégories avec comptage:", categoriesWithCount);
-      set({ categories: categoriesWithCount, loadingCategories: false });
+      const response = await api.get('/resources/categories');
+      const categories = Array.isArray(response.data) ? response.data : [];
+      set({ categories, loadingCategories: false });
     } catch (err: any) {
       console.error('Erreur lors de la récupération des catégories:', err);
       set({ 
@@ -321,8 +327,8 @@ const useResourcesStore = create<ResourcesState>((set, get) => ({
   deleteCategory: async (id: string) => {
     set({ loadingCategories: true });
     try {
-      const resources = get().resources;
-      const isUsed = resources.some(resource => resource.id_categorie === id);
+      const category = get().categories.find(cat => cat._id === id);
+      const isUsed = Boolean(category?.resourceCount && category.resourceCount > 0);
       
       if (isUsed) {
         throw new Error('Cette catégorie est utilisée par des ressources et ne peut pas être supprimée.');
@@ -1,17 +1,84 @@
 import { create } from 'zustand';
 import { Resource, User, Category } from '../types/types';
 import { api } from './authStore';
+import { fetchPage, PAGE_SIZE } from './pagination';
+
+type SearchResult = Resource & { 
+  author?: User | null;
+  category?: Category | null;
+};
+
+// Ressources parcourues au plus par recherche (ou par "plus de résultats")
+const MAX_SCANNED_PER_SEARCH = 500;
+
+// Parcourt les ressources à partir de cursor jusqu'à trouver une page de résultats.
+// Retourne les résultats et le curseur où reprendre (null : tout a été parcouru)
+const scanMatches = async (query: string, cursor: string | null): Promise<{ matches: SearchResult[]; cursor: string | null }> => {
+  const queryLower = query.toLowerCase();
+
+  // Récupérer toutes les catégories en une seule requête
+  let allCategories: Category[] = [];
+  try {
+    const categoriesResponse = await api.get('/categories/all_categories');
+    if (categoriesResponse.data && Array.isArray(categoriesResponse.data)) {
+      allCategories = categoriesResponse.data;
+    }
+  } catch (error) {
+    console.warn('Impossible de récupérer les catégories:', error);
+  }
+
+  const matches: SearchResult[] = [];
+  let scanned = 0;
+  do {
+    // Vue detail : la recherche porte aussi sur le contenu
+    const page = await fetchPage<Resource>('/resources/', 'fields=detail', cursor, 100);
+    scanned += page.items.length;
+    cursor = page.nextCursor;
+
+    for (const resource of page.items) {
+      // Si nous avons déjà la catégorie, l'ajouter directement
+      const category = (resource.id_categorie && allCategories.find(cat => cat._id === resource.id_categorie)) || null;
+
+      // Vérifier le titre et le contenu
+      const tempDiv = document.createElement('div');
+      tempDiv.innerHTML = resource.contenu || '';
+      const textContent = tempDiv.textContent || tempDiv.innerText || '';
+
+      const matchesTitleOrContent = 
+        resource.titre.toLowerCase().includes(queryLower) ||
+        textContent.toLowerCase().includes(queryLower);
+      // Vérifier la catégorie si nous avons les données
+      const matchesCategory = !!category && !!category.nom && category.nom.toLowerCase().includes(queryLower);
+
+      if (matchesTitleOrContent || matchesCategory) {
+        matches.push({ ...resource, author: null, category });
+      }
+    }
+  } while (cursor && matches.length < PAGE_SIZE && scanned < MAX_SCANNED_PER_SEARCH);
+
+  return { matches, cursor };
+};
+
+const searchErrorMessage = (err: any) => {
+  if (err.response) {
+    return err.response.data?.error || 'Erreur lors de la recherche';
+  }
+  if (err.request) {
+    return 'Impossible de se connecter au serveur.';
+  }
+  return 'Une erreur est survenue lors de la recherche.';
+};
 
 interface SearchState {
   // État
   query: string;
-  results: (Resource & { 
-    author?: User | null;
-    category?: Category | null;
-  })[];
+  results: SearchResult[];
   loading: boolean;
   error: string | null;
   hasSearched: boolean;
+  // Curseur où reprendre la recherche (ressources pas encore parcourues), null en fin de liste
+  scanCursor: string | null;
+  loadingMore: boolean;
   
   // Filtres avancés
   categoryFilter: string | null;
@@ -19,11 +86,13 @@ interface SearchState {
   // Actions
   setQuery: (query: string) => void;
   searchResources: () => Promise<void>;
+  searchMore: () => Promise<void>;
+  fetchResultsDetails: (resources: SearchResult[]) => void;
   clearResults: () => void;
   fetchResourceAuthor: (resourceId: string, publisherId: string) => Promise<void>;
   fetchResourceCategory: (resourceId: string, categoryId: string) => Promise<void>;
   setCategoryFilter: (categoryId: string | null) => void;
-  getFilteredResults: () => (Resource & { author?: User | null; category?: Category | null; })[];
+  getFilteredResults: () => SearchResult[];
 }
 
 const useSearchStore = create<SearchState>((set, get) => ({
@@ -32,6 +101,8 @@ const useSearchStore = create<SearchState>((set, get) => ({
   loading: false,
   error: null,
   hasSearched: false,
+  scanCursor: null,
+  loadingMore: false,
   categoryFilter: null,
   
   // Définir la requête de recherche
@@ -60,124 +131,81 @@ const useSearchStore = create<SearchState>((set, get) => ({
     });
   },
   
-  // Rechercher des ressources
+  // Rechercher des ressources (premiers résultats)
   searchResources: async () => {
     const { query } = get();
     
     if (!query.trim()) {
-      set({ results: [], error: null, hasSearched: true });
+      set({ results: [], scanCursor: null, error: null, hasSearched: true });
       return;
     }
     
-    set({ loading: true, error: null });
+    set({ loading: true, error: null, scanCursor: null });
     
     try {
       // Nous savons que l'endpoint de recherche n'existe pas, donc nous allons directement
       // utiliser le fallback sans essayer l'endpoint qui génère des erreurs CORS
       console.log('Utilisation du fallback pour la recherche');
-      const response = await api.get('/resources/');
+      const { matches, cursor } = await scanMatches(query, null);
       
-      if (response.data && Array.isArray(response.data)) {
-        const queryLower = query.toLowerCase();
-        
-        // Récupérer toutes les catégories en une seule requête
-        let allCategories = [];
-        try {
-          const categoriesResponse = await api.get('/categories/all_categories');
-          if (categoriesResponse.data && Array.isArray(categoriesResponse.data)) {
-            allCategories = categoriesResponse.data;
-          }
-        } catch (error) {
-          console.warn('Impossible de récupérer les catégories:', error);
-        }
-        
-        // Première étape : filtrer par titre et contenu
-        // ET par catégorie si nous avons les données des catégories
-        const filteredResources = response.data.filter((resource: Resource) => {
-          // Vérifier le titre et le contenu
-          const tempDiv = document.createElement('div');
-          tempDiv.innerHTML = resource.contenu;
-          const textContent = tempDiv.textContent || tempDiv.innerText || '';
-          
-          const matchesTitleOrContent = 
-            resource.titre.toLowerCase().includes(queryLower) ||
-            textContent.toLowerCase().includes(queryLower);
-          
-          if (matchesTitleOrContent) return true;
-          
-          // Vérifier la catégorie si nous avons les données
-          if (allCategories.length > 0 && resource.id_categorie) {
-            const category = allCategories.find(cat => cat._id === resource.id_categorie);
-            if (category && category.nom && category.nom.toLowerCase().includes(queryLower)) {
-              return true;
-            }
-          }
-          
-          return false;
-        });
-        
-        // Ajouter les champs author et category initialisés
-        const resourcesWithExtra = filteredResources.map((resource: Resource) => {
-          // Si nous avons déjà la catégorie, l'ajouter directement
-          let category = null;
-          if (allCategories.length > 0 && resource.id_categorie) {
-            category = allCategories.find(cat => cat._id === resource.id_categorie) || null;
-          }
-          
-          return {
-            ...resource,
-            author: null,
-            category
-          };
-        });
-        
-        set({ 
-          results: resourcesWithExtra,
-          error: null,
-          hasSearched: true
-        });
-        
-        // Récupérer les informations des auteurs pour chaque ressource
-        // et des catégories si nous ne les avons pas déjà
-        for (const resource of resourcesWithExtra) {
-          if (resource.id_publieur) {
-            get().fetchResourceAuthor(resource._id, resource.id_publieur);
-          }
-          
-          if (resource.id_categorie && !resource.category) {
-            get().fetchResourceCategory(resource._id, resource.id_categorie);
-          }
-        }
-      } else {
-        set({ 
-          results: [],
-          error: null,
-          hasSearched: true
-        });
-      }
+      set({ 
+        results: matches,
+        scanCursor: cursor,
+        error: null,
+        hasSearched: true
+      });
+      get().fetchResultsDetails(matches);
     } catch (err: any) {
       console.error('Erreur lors de la recherche:', err);
-      
-      let errorMessage = 'Une erreur est survenue lors de la recherche.';
-      if (err.response) {
-        errorMessage = err.response.data?.error || 'Erreur lors de la recherche';
-      } else if (err.request) {
-        errorMessage = 'Impossible de se connecter au serveur.';
-      }
-      
       set({ 
-        error: errorMessage,
+        error: searchErrorMessage(err),
         hasSearched: true
       });
     } finally {
       set({ loading: false });
     }
   },
+
+  // Résultats suivants : la recherche reprend après la dernière page parcourue
+  searchMore: async () => {
+    const { query, scanCursor, loadingMore } = get();
+    if (!scanCursor || loadingMore) return;
+
+    set({ loadingMore: true });
+    try {
+      const { matches, cursor } = await scanMatches(query, scanCursor);
+      set(state => ({
+        results: [...state.results, ...matches],
+        scanCursor: cursor
+      }));
+      get().fetchResultsDetails(matches);
+    } catch (err: any) {
+      console.error('Erreur lors de la recherche:', err);
+      set({ error: searchErrorMessage(err) });
+    } finally {
+      set({ loadingMore: false });
+    }
+  },
+
+  // Récupérer les informations des auteurs pour chaque ressource
+  // et des catégories si nous ne les avons pas déjà
+  fetchResultsDetails: (resources: SearchResult[]) => {
+    for (const resource of resources) {
+      if (resource.id_publieur) {
+        get().fetchResourceAuthor(resource._id, resource.id_publieur);
+      }
+      
+      if (resource.id_categorie && !resource.category) {
+        get().fetchResourceCategory(resource._id, resource.id_categorie);
+      }
+    }
+  },
   
   // Effacer les résultats
   clearResults: () => {
     set({ 
       results: [],
+      scanCursor: null,
       error: null,
       hasSearched: false
     });
@@ -1,5 +1,6 @@
 import { create } from 'zustand';
 import { api } from './authStore';
+import { fetchAllPages } from './pagination';
 import { User, Resource, Favorite } from '../types/types';
 
 interface StatisticsState {
@@ -26,15 +27,16 @@ export const useStatisticsStore = create<StatisticsState>((set, get) => ({
     
     try {
       const usersResponse = await api.get('/admin/get_users');
-      const resourcesResponse = await api.get('/resources/');
-      const pendingResourcesResponse = await api.get('/resources/pending');
-      const favoritesResponse = await api.get('/resources/favorites');
+      // Les statistiques portent sur l'ensemble des listes : parcours complet, plafonné (MAX_WALK_ITEMS)
+      const resourcesResponse = { data: await fetchAllPages<Resource>('/resources/') };
+      const pendingResources = await fetchAllPages('/resources/pending', 'fields=card');
+      const favorites = await fetchAllPages<Favorite>('/resources/favorites');
       
       set({
         users: usersResponse.data || [],
         resources: resourcesResponse.data || [],
-        pendingResources: pendingResourcesResponse.data || [],
-        favorites: favoritesResponse.data || [],
+        pendingResources,
+        favorites,
         loading: false
       });
     } catch (err) {
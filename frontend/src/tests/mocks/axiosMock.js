@@ -108,13 +108,24 @@ const setupDefaultMocks = () => {
       return Promise.resolve({ data: mockUser });
     }
     
-    if (url === '/resources/') {
-      return Promise.resolve({ data: mockResources });
+    // Liste paginée : une seule page (pas d'en-tête X-Next-Cursor)
+    if (url === '/resources/' || url.startsWith('/resources/?')) {
+      return Promise.resolve({ data: mockResources, headers: {} });
     }
     
     if (url === '/categories/all_categories' || url === '/categories') {
       return Promise.resolve({ data: mockCategories });
     }
+
+    // Catégories avec leur nombre de ressources
+    if (url === '/resources/categories') {
+      return Promise.resolve({
+        data: mockCategories.map(category => ({
+          ...category,
+          resourceCount: mockResources.filter(r => r.id_categorie === category._id).length
+        }))
+      });
+    }
     
     if (url.startsWith('/resources/') && url.includes('/')) {
       const resourceId = url.split('/').pop();
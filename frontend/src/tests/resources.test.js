@@ -32,6 +32,9 @@ describe("Gestion des ressources", () => {
       resources: [],
       loading: false,
       error: null,
+      query: "",
+      nextCursor: null,
+      loadingMore: false,
       categories: [],
       loadingCategories: false,
     });
@@ -44,22 +47,37 @@ describe("Gestion des ressources", () => {
   describe("TF06 : Récupération des ressources", () => {
     test("Récupération réussie des ressources depuis l'API", async () => {
       mockAxios.get.mockImplementation((url) => {
-        if (url === "/resources/") {
-          return Promise.resolve({ data: mockResources });
+        if (url.startsWith("/resources/?")) {
+          return Promise.resolve({ data: mockResources, headers: { "x-next-cursor": "page-2" } });
         }
         return Promise.reject(new Error("URL non gérée"));
       });
 
       await useResourcesStore.getState().fetchResources();
 
-      expect(mockAxios.get).toHaveBeenCalledWith("/resources/");
+      // Première page seulement : la suite est chargée à la demande
+      expect(mockAxios.get).toHaveBeenCalledTimes(1);
+      expect(mockAxios.get).toHaveBeenCalledWith("/resources/?limit=20");
 
       const state = useResourcesStore.getState();
       expect(state.resources).toEqual(mockResources);
+      expect(state.nextCursor).toBe("page-2");
       expect(state.loading).toBe(false);
       expect(state.error).toBeNull();
     });
 
+    test("Chargement de la page suivante à la demande", async () => {
+      useResourcesStore.setState({ resources: mockResources.slice(0, 1), query: "approved=0", nextCursor: "page-2" });
+      mockAxios.get.mockResolvedValueOnce({ data: mockResources.slice(1), headers: {} });
+
+      await useResourcesStore.getState().fetchMoreResources();
+
+      expect(mockAxios.get).toHaveBeenCalledWith("/resources/?approved=0&limit=20&cursor=page-2");
+      const state = useResourcesStore.getState();
+      expect(state.resources).toEqual(mockResources);
+      expect(state.nextCursor).toBeNull();
+    });
+
     test("Gestion des erreurs lors de la récupération des ressources", async () => {
       mockAxios.get.mockRejectedValueOnce({
         response: {
@@ -31,7 +31,9 @@ export interface RegisterFormData {
 export interface Resource {
     _id: string;
     titre: string;
-    contenu: string;
+    // Absent de la vue card des listes, remplacé par extrait
+    contenu?: string;
+    extrait?: string;
     id_publieur: string;
     id_categorie?: string;
     createdAt: string;
@@ -39,6 +41,11 @@ export interface Resource {
     id_validateur?: string;
     date_validation?: string | null;
     commentaire_validation?: string | null;
+    // Rejetée par un modérateur (POST /resources/moderate) : approved absent
+    rejected?: boolean;
+    date_rejet?: string | null;
+    // Numéro de version : renvoyé avec une modification, 409 si périmé
+    version?: number;
 }
 
 export interface Category {
@@ -46,6 +53,7 @@ export interface Category {
     nom: string;
     description?: string;
     resourceCount?: number;
+    approvedCount?: number;
 }
 
 export interface Comment {
@@ -3,6 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import MainLayout from '../../components/layout/MainLayout';
 import ResourceCard from '../../components/features/ressources/ResourceCard';
 import ResourceModal from '../../components/features/ressources/ResourceModal';
+import LoadMoreButton from '../../components/ui/LoadMoreButton';
 import useCategoryStore from '../../store/categoryStore';
 import useCategoryResourcesStore from '../../store/categoryResourcesStore';
 import useResourcesStore from '../../store/resourcesStore';
@@ -23,8 +24,10 @@ const CategoryFeed = () => {
   const { 
     filteredResources, 
     loading: resourcesLoading, 
-    setSelectedCategory, 
-    fetchAllResources,
+    nextCursor,
+    loadingMore,
+    fetchCategoryResources,
+    fetchMoreResources,
     resetResources 
   } = useCategoryResourcesStore();
   const { createResource } = useResourcesStore();
@@ -46,10 +49,9 @@ const CategoryFeed = () => {
         fetchFavorites();
       }
       
-      // Réinitialiser les ressources et définir le filtre de catégorie
+      // Réinitialiser les ressources et charger la première page de la catégorie
       resetResources();
-      fetchAllResources();
-      setSelectedCategory(categoryId);
+      fetchCategoryResources(categoryId);
     }
   }, [categoryId, categories.length, isAuthenticated, fetchCategories, fetchFavorites]);
 
@@ -70,7 +72,9 @@ const CategoryFeed = () => {
       );
       
       // Recharger les ressources pour afficher la nouvelle ressource (après validation)
-      fetchAllResources();
+      if (categoryId) {
+        fetchCategoryResources(categoryId);
+      }
     } catch (error) {
       console.error('Erreur lors de la création de la ressource:', error);
       showToast(
@@ -155,6 +159,7 @@ const CategoryFeed = () => {
                     category={resource.category}
                   />
                 ))}
+                <LoadMoreButton hasMore={!!nextCursor} loading={loadingMore} onClick={fetchMoreResources} />
               </>
             ) : (
               // Message quand aucune ressource n'est trouvée
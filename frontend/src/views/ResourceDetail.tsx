@@ -7,6 +7,7 @@ import useResourceDetailsStore from '../store/resourceDetailsStore';
 import useFavoritesStore from '../store/favoritesStore';
 import { useToast } from '../contexts/ToastContext';
 import CommentItem from '../components/features/ressources/CommentItem';
+import LoadMoreButton from '../components/ui/LoadMoreButton';
 
 const ResourceDetail = () => {
     const { id } = useParams<{ id: string }>();
@@ -18,12 +19,15 @@ const ResourceDetail = () => {
         author, 
         category, 
         comments,
+        commentsCursor,
+        loadingMoreComments,
         loading,
         loadingComments,
         error,
         commentError,
         fetchResource,
         fetchComments,
+        fetchMoreComments,
         addComment,
         addReply,
         resetState
@@ -233,7 +237,7 @@ const ResourceDetail = () => {
                         <h2 className="text-2xl font-semibold mb-4">{resource.titre}</h2>
                         <div 
                             className="text-sm sm:text-base mb-3 content-container"
-                            dangerouslySetInnerHTML={{ __html: resource.contenu }}
+                            dangerouslySetInnerHTML={{ __html: resource.contenu || '' }}
                         />
                         {resource.approved && (
                             <div className="text-xs text-green-600 mb-2">
@@ -344,6 +348,14 @@ const ResourceDetail = () => {
                                             level={0}
                                         />
                                     ))}
+                                {id && (
+                                    <LoadMoreButton
+                                        hasMore={!!commentsCursor}
+                                        loading={loadingMoreComments}
+                                        onClick={() => fetchMoreComments(id)}
+                                        label="Afficher plus de commentaires"
+                                    />
+                                )}
                             </div>
                         )}
                     </div>
@@ -2,6 +2,7 @@ import { useEffect, useState } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
 import MainLayout from '../components/layout/MainLayout';
 import ResourceCard from '../components/features/ressources/ResourceCard';
+import LoadMoreButton from '../components/ui/LoadMoreButton';
 import useSearchStore from '../store/searchStore';
 import useFavoritesStore from '../store/favoritesStore';
 import useAuthStore from '../store/authStore';
@@ -19,7 +20,10 @@ const SearchResults = () => {
     loading, 
     error, 
     hasSearched,
+    scanCursor,
+    loadingMore,
     searchResources,
+    searchMore,
     setQuery,
     clearResults,
     categoryFilter,
@@ -202,6 +206,11 @@ const SearchResults = () => {
             </p>
           </div>
         ) : null}
+
+        {/* Ressources pas encore parcourues : la recherche continue à la demande */}
+        {!loading && !error && (
+          <LoadMoreButton hasMore={!!scanCursor} loading={loadingMore} onClick={searchMore} label="Plus de résultats" />
+        )}
       </div>
     </MainLayout>
   );
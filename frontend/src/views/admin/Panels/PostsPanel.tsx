@@ -3,10 +3,15 @@ import useResourcesStore from '../../../store/resourcesStore';
 import { Resource } from '../../../types/types';
 import { Trash2, SquarePen, Eye, Plus, Filter } from 'lucide-react';
 import ResourceModal from '../../../components/features/ressources/ResourceModal';
+import LoadMoreButton from '../../../components/ui/LoadMoreButton';
 import { useToast } from '../../../contexts/ToastContext';
+import { api } from '../../../store/authStore';
+
+// Filtre de statut -> paramètres de GET /resources/ (filtré côté serveur, page par page)
+const STATUS_QUERIES = { all: '', pending: 'approved=0', approved: 'approved=1' };
 
 const PostsPanel = () => {
-    const { resources, loading, error, categories, fetchResources, fetchCategories, deleteResource, approveResource, updateResourceCategory, updateResource, createResource } = useResourcesStore();
+    const { resources, loading, error, categories, nextCursor, loadingMore, fetchResources, fetchMoreResources, fetchCategories, deleteResource, approveResource, updateResourceCategory, updateResource, createResource } = useResourcesStore();
     const [editingCategoryId, setEditingCategoryId] = useState<string | null>(null);
     const [selectedCategoryId, setSelectedCategoryId] = useState<string>('');
     const [isEditModalOpen, setIsEditModalOpen] = useState(false);
@@ -15,11 +20,15 @@ const PostsPanel = () => {
     const [filterStatus, setFilterStatus] = useState<'all' | 'pending' | 'approved'>('all');
     const { showToast } = useToast();
 
-    // Charger les ressources et les catégories au montage du composant
+    // Charger les catégories au montage du composant
     useEffect(() => {
-        fetchResources();
         fetchCategories();
-    }, [fetchResources, fetchCategories]);
+    }, [fetchCategories]);
+
+    // Première page des ressources du statut sélectionné
+    useEffect(() => {
+        fetchResources(STATUS_QUERIES[filterStatus]);
+    }, [filterStatus, fetchResources]);
 
     const handleDeleteResource = async (id: string) => {
         if (confirm('Êtes-vous sûr de vouloir supprimer cette ressource ?')) {
@@ -55,11 +64,23 @@ const PostsPanel = () => {
         setEditingCategoryId(null);
     };
 
-    const handleEditResource = (resource: Resource) => {
+    const handleEditResource = async (resource: Resource) => {
+        // La liste ne contient que la vue card : le contenu est chargé pour l'édition
+        let contenu = resource.contenu;
+        if (contenu === undefined) {
+            try {
+                const response = await api.get(`/resources/ressource=${resource._id}`);
+                contenu = response.data.contenu;
+            } catch (error) {
+                console.error('Erreur lors du chargement de la ressource:', error);
+                showToast('Impossible de charger la ressource.', 'error');
+                return;
+            }
+        }
         setEditingResource({
             id: resource._id,
             titre: resource.titre,
-            contenu: resource.contenu,
+            contenu: contenu || '',
             id_categorie: resource.id_categorie
         });
         setIsEditModalOpen(true);
@@ -407,6 +428,8 @@ const PostsPanel = () => {
                 </div>
             </div>
 
+            <LoadMoreButton hasMore={!!nextCursor} loading={loadingMore} onClick={fetchMoreResources} />
+
             {isCreateModalOpen && (
                 <ResourceModal
                     isOpen={isCreateModalOpen}
@@ -3,14 +3,16 @@ import useResourcesStore from '../../../store/resourcesStore';
 import { Resource } from '../../../types/types';
 import { Trash2, Eye } from 'lucide-react';
 import { useToast } from '../../../contexts/ToastContext';
+import LoadMoreButton from '../../../components/ui/LoadMoreButton';
 
 const ModeratorPanel = () => {
-    const { resources, loading, error, fetchResources, deleteResource, approveResource } = useResourcesStore();
+    const { resources, loading, error, nextCursor, loadingMore, fetchResources, fetchMoreResources, deleteResource, approveResource } = useResourcesStore();
     const [viewingResource, setViewingResource] = useState<Resource | null>(null);
     const { showToast } = useToast();
 
+    // Ressources en attente uniquement (filtre serveur), page par page
     useEffect(() => {
-        fetchResources();
+        fetchResources('approved=0');
     }, [fetchResources]);
 
     // Supprimer une ressource
@@ -88,7 +90,7 @@ const ModeratorPanel = () => {
             <div className="flex justify-between items-center">
                 <h2 className="text-xl font-semibold">Modération des ressources</h2>
                 <div className="text-sm text-gray-500">
-                    {pendingResources.length} ressource{pendingResources.length !== 1 ? 's' : ''} en attente
+                    {pendingResources.length}{nextCursor ? '+' : ''} ressource{pendingResources.length !== 1 ? 's' : ''} en attente
                 </div>
             </div>
 
@@ -110,7 +112,7 @@ const ModeratorPanel = () => {
                                 Date: {new Date(viewingResource.createdAt).toLocaleDateString()}
                             </p>
                         </div>
-                        <div className="content-container mb-6" dangerouslySetInnerHTML={{ __html: viewingResource.contenu }} />
+                        <div className="content-container mb-6" dangerouslySetInnerHTML={{ __html: viewingResource.contenu || '' }} />
                         <div className="flex space-x-3 justify-end">
                             <button
                                 onClick={() => {
@@ -255,6 +257,8 @@ const ModeratorPanel = () => {
                     )}
                 </div>
             </div>
+
+            <LoadMoreButton hasMore={!!nextCursor} loading={loadingMore} onClick={fetchMoreResources} />
         </div>
     );
 };
@@ -498,14 +498,11 @@ const Profile = () => {
                                                                             <p className="text-sm font-medium text-gray-900 truncate max-w-md">
                                                                                 {favorite.resource.titre}
                                                                             </p>
-                                                                            <div 
-                                                                                className="text-sm text-gray-500 truncate max-w-md"
-                                                                                dangerouslySetInnerHTML={{ 
-                                                                                    __html: favorite.resource.contenu.length > 100 
-                                                                                        ? favorite.resource.contenu.substring(0, 100) + '...' 
-                                                                                        : favorite.resource.contenu 
-                                                                                }}
-                                                                            />
+                                                                            <p className="text-sm text-gray-500 truncate max-w-md">
+                                                                                {favorite.resource.extrait.length > 100 
+                                                                                    ? favorite.resource.extrait.substring(0, 100) + '...' 
+                                                                                    : favorite.resource.extrait}
+                                                                            </p>
                                                                         </>
                                                                     ) : (
                                                                         <p className="text-sm text-gray-500 italic">